@@ -1,6 +1,6 @@
 import streamlit as st
-import sqlite3
 from utils.utils import gerar_hash_senha
+from shared.db import get_conn
 
 def validar_login(email: str, senha: str, caminho_banco: str) -> dict | None:
     """
@@ -20,7 +20,7 @@ def validar_login(email: str, senha: str, caminho_banco: str) -> dict | None:
         FROM usuarios
         WHERE email = ? AND senha = ? AND ativo = 1
     """
-    with sqlite3.connect(caminho_banco) as conn:
+    with get_conn(caminho_banco) as conn:
         cursor = conn.execute(query, (email, senha_hash))
         resultado = cursor.fetchone()
 
@@ -1,24 +1,31 @@
 
-import sqlite3
 import pandas as pd
+from shared.db import get_conn
 
 # ============================
 # Função Genérica
 # ============================
 
-def carregar_tabela(nome_tabela: str, caminho_banco: str) -> pd.DataFrame:
+def carregar_tabela(nome_tabela: str, caminho_banco: str, colunas=None, **opcoes) -> pd.DataFrame:
     """
     Carrega qualquer tabela do banco de dados SQLite como DataFrame.
 
     Args:
         nome_tabela (str): Nome da tabela.
         caminho_banco (str): Caminho do banco de dados .db.
+        colunas (list[str], opcional): Projeção. Quando informada, a leitura passa
+            por `flowdash_pages.dataframes.ler_tabela`, que também aceita
+            `coluna_data`, `inicio`, `fim`, `dtypes`, `float32`, `chunksize` etc.
+            em `opcoes` (com `chunksize` o retorno é um gerador de DataFrames).
 
     Returns:
         pd.DataFrame: Dados da tabela ou DataFrame vazio em caso de erro.
     """
+    if colunas:
+        from flowdash_pages.dataframes.dataframes import ler_tabela
+        return ler_tabela(caminho_banco, nome_tabela, colunas, **opcoes)
     try:
-        with sqlite3.connect(caminho_banco) as conn:
+        with get_conn(caminho_banco) as conn:
             return pd.read_sql(f"SELECT * FROM {nome_tabela}", conn)
     except Exception as e:
         print(f"[ERRO] Não foi possível carregar a tabela '{nome_tabela}': {e}")
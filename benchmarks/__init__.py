@@ -0,0 +1,31 @@
+"""
+Pacote Benchmarks
+=================
+
+Medição dos caminhos quentes do FlowDash sobre um histórico sintético.
+
+Módulos
+-------
+- gerador ... cria um banco a partir de `data/flowdash_template.db` com anos de
+              vendas, saídas, compras no cartão, empréstimos, boletos,
+              depósitos e transferências.
+- suite ..... cenários cronometrados (vendas, ledger, resumo do dia,
+              fechamento, listagens do CAP) e relatório JSON com percentis.
+- importacao  custo de importação a frio (`-X importtime`) do `main.py` e de
+              cada página de `ROTAS`, por módulo e por pacote.
+
+Uso
+---
+    python -m benchmarks.suite run --saida bench.json
+    python -m benchmarks.suite run --base bench.json   # código 1 se regredir
+    python -m benchmarks.importacao --top 20
+
+Observação
+----------
+Os submódulos não são importados aqui para que `python -m benchmarks.<módulo>`
+não carregue o módulo duas vezes.
+"""
+
+from __future__ import annotations
+
+__all__ = ["gerador", "importacao", "suite"]
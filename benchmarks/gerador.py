@@ -0,0 +1,626 @@
+"""
+Módulo Gerador (Benchmarks)
+===========================
+
+Cria um banco de benchmark a partir de `data/flowdash_template.db` e o preenche
+com um histórico sintético de loja: anos de vendas (formas, bandeiras e
+maquinetas), saídas, compras parceladas no cartão, empréstimos, boletos,
+depósitos e transferências.
+
+Funcionalidades principais
+--------------------------
+- `gerar_banco(destino, ...)`: copia o template, aplica as migrações do app e
+  grava o histórico em lote; retorna as quantidades por tabela.
+- Dados determinísticos por `semente` (mesma semente ⇒ mesmo banco), para que
+  execuções de benchmark em máquinas/versões diferentes sejam comparáveis.
+
+Detalhes técnicos
+-----------------
+- As linhas têm o mesmo formato das gravadas pelos serviços (`entrada` +
+  log idempotente em `movimentacoes_bancarias`, deltas diários em
+  `saldos_bancos`, snapshots em `saldos_caixas`, LANCAMENTOs do CAP com
+  acumulados de pagamento, itens de fatura), mas são inseridas com
+  `executemany` numa única transação — gerar anos de histórico pelos serviços
+  levaria minutos.
+- Depois da carga: `saldos_bancos_acumulado` é reconstruída e o status do CAP
+  recalculado pelo motor set-based (`recalcular_status_cap`).
+- Obrigações vencidas até a data final são quitadas; as seguintes ficam em
+  aberto (com algumas parciais), como numa base real.
+
+Linha de comando
+----------------
+    python -m benchmarks.gerador <destino.db> [--anos 3] [--vendas-dia 35] [--semente 42]
+
+Dependências
+------------
+- sqlite3
+- shared.db / shared.schema
+- repository.saldos_bancos_repository / repository.contas_a_pagar_mov_repository
+"""
+
+from __future__ import annotations
+
+import argparse
+import calendar
+import logging
+import random
+import shutil
+import sqlite3
+from collections import defaultdict
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from repository.contas_a_pagar_mov_repository import recalcular_status_cap
+from repository.saldos_bancos_repository import reconstruir_saldos_acumulados
+from shared.db import close_pooled_conns, get_conn
+from shared.schema import executar_migracoes, invalidar
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE = Path(__file__).resolve().parent.parent / "data" / "flowdash_template.db"
+
+# Cadastros do histórico sintético
+VENDEDORES = ("Ana", "Bruno", "Carla", "Diego")
+BANCOS = ("Inter", "InfinitePay", "Bradesco", "Banco 1")
+MAQUINETAS = ("InfinitePay", "Inter")  # banco de destino = nome da maquineta
+BANDEIRAS = ("VISA", "MASTER", "ELO")
+CARTOES = (("Nubank", 7, 10), ("Itaucard", 5, 20))  # (nome, dias de fechamento, dia de vencimento)
+FORNECEDORES = ("Tecidos Sul", "Confecções Aurora", "Aviamentos Rio", "Embalagens JK", "Energia Elétrica")
+CATEGORIAS = {
+    "Despesas Fixas": ("Aluguel", "Internet", "Energia"),
+    "Pessoal": ("Salários", "Comissões", "Vale-transporte"),
+    "Operacional": ("Limpeza", "Manutenção", "Material de escritório"),
+    "Marketing": ("Anúncios", "Brindes"),
+}
+
+# Mix de formas de pagamento das vendas: (forma, peso)
+_MIX_FORMAS = (("DINHEIRO", 20), ("PIX", 25), ("DÉBITO", 20), ("CRÉDITO", 30), ("LINK_PAGAMENTO", 5))
+# Movimento relativo por dia da semana (segunda=0 … domingo=6)
+_PESO_DIA = (0.8, 0.85, 0.9, 1.0, 1.2, 1.5, 0.0)
+
+__all__ = ["TEMPLATE", "VENDEDORES", "BANCOS", "MAQUINETAS", "BANDEIRAS", "CARTOES", "gerar_banco"]
+
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+def _add_meses(d: date, meses: int, dia: Optional[int] = None) -> date:
+    total = d.year * 12 + (d.month - 1) + meses
+    ano, mes = divmod(total, 12)
+    dia = dia or d.day
+    return date(ano, mes + 1, min(dia, calendar.monthrange(ano, mes + 1)[1]))
+
+
+def _taxa(forma: str, parcelas: int) -> float:
+    """Taxa (%) da tabela sintética de `taxas_maquinas`."""
+    if forma == "DÉBITO":
+        return 1.39
+    if forma == "PIX":
+        return 0.75
+    base = 3.15 if forma == "CRÉDITO" else 3.99
+    return round(base + 1.25 * (parcelas - 1), 2)
+
+
+class _Carga:
+    """Acumula as linhas do histórico antes da gravação em lote."""
+
+    def __init__(self, rnd: random.Random) -> None:
+        self.rnd = rnd
+        self.entradas: List[Tuple[Any, ...]] = []
+        self.saidas: List[Tuple[Any, ...]] = []
+        self.movs: List[Tuple[Any, ...]] = []
+        self.cap: List[Tuple[Any, ...]] = []
+        self.itens: List[Tuple[Any, ...]] = []
+        self.depositos: List[Tuple[Any, ...]] = []
+        self.emprestimos: List[Tuple[Any, ...]] = []
+        self.bancos: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.caixa_vendas: Dict[str, float] = defaultdict(float)
+        self.caixa_saidas: Dict[str, float] = defaultdict(float)
+        self.caixa2_saidas: Dict[str, float] = defaultdict(float)
+        self._obrigacao = 0
+
+    def uid(self, prefixo: str) -> str:
+        return f"{prefixo}-{self.rnd.getrandbits(64):016x}"
+
+    def obrigacao(self) -> int:
+        self._obrigacao += 1
+        return self._obrigacao
+
+    def mov(self, data: str, banco: str, tipo: str, valor: float, origem: str, obs: str,
+            tabela: str, ref: Optional[int], usuario: str) -> None:
+        self.movs.append(
+            (data, banco, tipo, round(valor, 2), origem, obs, tabela, ref,
+             self.uid("BENCH"), usuario, f"{data} {self.rnd.randint(8, 19):02d}:{self.rnd.randint(0, 59):02d}:00")
+        )
+
+    def saida(self, data: str, valor: float, forma: str, categoria: str, sub: str, descricao: str,
+              usuario: str, origem: Optional[str], banco: Optional[str]) -> None:
+        """Saída paga (linha em `saida` + log + efeito no caixa/banco)."""
+        self.saidas.append((data, round(valor, 2), forma, 1, categoria, sub, descricao, usuario, origem, banco))
+        ref = len(self.saidas)
+        conta = origem if forma == "DINHEIRO" else banco
+        self.mov(data, conta or "Caixa", "saida", valor, "saidas",
+                 f"Lançamento SAÍDA {forma} • {categoria} / {sub} • {descricao}", "saida", ref, usuario)
+        if forma == "DINHEIRO":
+            alvo = self.caixa_saidas if origem == "Caixa" else self.caixa2_saidas
+            alvo[data] += valor
+        else:
+            self.bancos[data][banco or BANCOS[0]] -= valor
+
+    def lancamento_cap(self, *, obrigacao_id: int, tipo: str, data_evento: str, vencimento: str,
+                       valor: float, descricao: str, credor: str, competencia: str, parcela: int,
+                       total: int, usuario: str, cartao_id: Optional[int] = None,
+                       emprestimo_id: Optional[int] = None, pago: float = 0.0) -> None:
+        pago = round(min(pago, valor), 2)
+        self.cap.append(
+            (obrigacao_id, tipo, data_evento, vencimento, round(valor, 2), descricao, credor,
+             competencia, parcela, total, usuario, tipo if tipo == "FATURA_CARTAO" else None,
+             cartao_id, emprestimo_id, pago, pago, vencimento if pago > 0 else None)
+        )
+
+
+# -----------------------------------------------------------------------------
+# Geração por domínio
+# -----------------------------------------------------------------------------
+def _gerar_vendas(c: _Carga, dias: List[date], vendas_dia: int) -> None:
+    rnd = c.rnd
+    formas = [f for f, _ in _MIX_FORMAS]
+    pesos = [p for _, p in _MIX_FORMAS]
+    for d in dias:
+        peso = _PESO_DIA[d.weekday()]
+        if not peso:
+            continue
+        # Sazonalidade leve (dezembro e maio mais fortes)
+        fator = peso * (1.35 if d.month == 12 else 1.15 if d.month == 5 else 1.0)
+        n = max(1, int(rnd.gauss(vendas_dia * fator, vendas_dia * fator * 0.2)))
+        for _ in range(n):
+            forma = rnd.choices(formas, pesos)[0]
+            valor = round(max(19.9, rnd.lognormvariate(4.8, 0.6)), 2)
+            usuario = rnd.choice(VENDEDORES)
+            parcelas = rnd.choice((1, 1, 1, 2, 3, 4, 6)) if forma in ("CRÉDITO", "LINK_PAGAMENTO") else 1
+            maquineta = bandeira = None
+            if forma == "DINHEIRO":
+                taxa, liq_em, banco = 0.0, d, None
+            elif forma == "PIX" and rnd.random() < 0.7:
+                taxa, liq_em, banco = 0.0, d, rnd.choice(BANCOS[:3])  # PIX direto
+            else:
+                maquineta = rnd.choice(MAQUINETAS)
+                bandeira = None if forma == "PIX" else rnd.choice(BANDEIRAS)
+                taxa = _taxa(forma, parcelas)
+                liq_em = d + timedelta(days=1 if forma in ("DÉBITO", "PIX") else 30)
+                banco = maquineta
+            liquido = round(valor * (1 - taxa / 100.0), 2)
+            data, data_liq = d.isoformat(), liq_em.isoformat()
+            hora = f"{data}T{rnd.randint(9, 20):02d}:{rnd.randint(0, 59):02d}:00"
+            c.entradas.append((data, valor, forma, parcelas, bandeira, usuario, maquineta, liquido, hora))
+            if banco is None:
+                meio = "Caixa"
+            elif maquineta is None:
+                meio = f"Direto — {banco}"
+            else:
+                meio = f"{bandeira or '—'}/{maquineta}"
+            obs = (
+                f"Lançamento VENDA {forma} {parcelas}x / {meio} • "
+                f"Bruto R$ {valor:.2f} • Taxa {taxa:.2f}% -> Líquido R$ {liquido:.2f}"
+            )
+            if banco is None:
+                c.caixa_vendas[data_liq] += liquido
+                conta = "Caixa_Vendas"
+            else:
+                c.bancos[data_liq][banco] += liquido
+                conta = banco
+            c.mov(data_liq, conta, "entrada", liquido, "lancamentos", obs, "entrada", len(c.entradas), usuario)
+
+
+def _gerar_saidas(c: _Carga, dias: List[date], saidas_dia: int) -> None:
+    rnd = c.rnd
+    cats = list(CATEGORIAS)
+    for d in dias:
+        data = d.isoformat()
+        if d.day == 5:  # despesas fixas do mês
+            c.saida(data, 3200.0, "PIX", "Despesas Fixas", "Aluguel", "Aluguel da loja",
+                    "admin", None, "Bradesco")
+            for v in VENDEDORES:
+                c.saida(data, round(rnd.uniform(1800, 2600), 2), "PIX", "Pessoal", "Salários",
+                        f"Salário {v}", "admin", None, "Inter")
+        for _ in range(rnd.randint(0, saidas_dia)):
+            cat = rnd.choice(cats)
+            sub = rnd.choice(CATEGORIAS[cat])
+            forma = rnd.choice(("DINHEIRO", "DINHEIRO", "PIX", "DÉBITO"))
+            valor = round(rnd.lognormvariate(3.8, 0.8), 2)
+            if forma == "DINHEIRO":
+                c.saida(data, valor, forma, cat, sub, f"{sub} {d:%d/%m}", rnd.choice(VENDEDORES),
+                        rnd.choice(("Caixa", "Caixa", "Caixa 2")), None)
+            else:
+                c.saida(data, valor, forma, cat, sub, f"{sub} {d:%d/%m}", "admin", None, rnd.choice(BANCOS[:3]))
+
+
+def _gerar_cartao(c: _Carga, inicio: date, fim: date, compras_mes: int, cartao_ids: Dict[str, int]) -> None:
+    """Compras parceladas → itens de fatura + um LANCAMENTO por cartão/competência."""
+    rnd = c.rnd
+    faturas: Dict[Tuple[str, str], float] = defaultdict(float)
+    n_meses = (fim.year - inicio.year) * 12 + fim.month - inicio.month + 1
+    for m in range(n_meses):
+        base = _add_meses(inicio.replace(day=1), m)
+        for _ in range(compras_mes):
+            nome, fech, venc = rnd.choice(CARTOES)
+            dia = rnd.randint(1, calendar.monthrange(base.year, base.month)[1])
+            compra = base.replace(day=dia)
+            if compra > fim:
+                continue
+            parcelas = rnd.choice((1, 1, 2, 3, 4, 6, 10, 12))
+            total = round(rnd.lognormvariate(5.5, 0.9), 2)
+            vp = round(total / parcelas, 2)
+            # Competência: vencimento do mês da compra, ou do seguinte após o fechamento
+            fechamento = _add_meses(compra, 0, venc) - timedelta(days=fech)
+            comp0 = _add_meses(compra.replace(day=1), 1 if compra >= fechamento else 0)
+            uid = c.uid("COMPRA")
+            cat = rnd.choice(list(CATEGORIAS))
+            for p in range(1, parcelas + 1):
+                comp = _add_meses(comp0, p - 1)
+                valor = round(total - vp * (parcelas - 1), 2) if p == parcelas else vp
+                chave = (nome, f"{comp:%Y-%m}")
+                faturas[chave] += valor
+                c.itens.append((uid, nome, chave[1], compra.isoformat(), f"Compra {cat}", cat,
+                                p, parcelas, valor, "admin"))
+
+    for (nome, comp), valor in sorted(faturas.items(), key=lambda kv: (kv[0][1], kv[0][0])):
+        venc_dia = next(v for n, _f, v in CARTOES if n == nome)
+        ano, mes = map(int, comp.split("-"))
+        vencimento = _add_meses(date(ano, mes, 1), 0, venc_dia)
+        pago = valor if vencimento <= fim else 0.0
+        oid = c.obrigacao()
+        c.lancamento_cap(obrigacao_id=oid, tipo="FATURA_CARTAO", data_evento=f"{comp}-01",
+                         vencimento=vencimento.isoformat(), valor=valor, descricao=f"Fatura {nome} {comp}",
+                         credor=nome, competencia=comp, parcela=1, total=1, usuario="admin",
+                         cartao_id=cartao_ids.get(nome), pago=pago)
+        if pago:
+            c.saida(vencimento.isoformat(), pago, "PIX", "Fatura Cartão de Crédito", f"Fatura {nome}",
+                    f"Pagamento fatura {nome} {comp}", "admin", None, "Bradesco")
+
+
+def _gerar_boletos(c: _Carga, inicio: date, fim: date, boletos_mes: int) -> None:
+    rnd = c.rnd
+    n_meses = (fim.year - inicio.year) * 12 + fim.month - inicio.month + 1
+    for m in range(n_meses):
+        base = _add_meses(inicio.replace(day=1), m)
+        for _ in range(boletos_mes):
+            emissao = base.replace(day=rnd.randint(1, 28))
+            if emissao > fim:
+                continue
+            credor = rnd.choice(FORNECEDORES)
+            parcelas = rnd.choice((1, 1, 2, 3, 4, 6))
+            vp = round(rnd.uniform(250, 2500), 2)
+            oid = c.obrigacao()
+            for p in range(1, parcelas + 1):
+                venc = emissao + timedelta(days=30 * p)
+                if venc <= fim:
+                    pago = vp if rnd.random() > 0.03 else round(vp * rnd.uniform(0.2, 0.8), 2)
+                else:
+                    pago = 0.0
+                c.lancamento_cap(obrigacao_id=oid, tipo="BOLETO", data_evento=emissao.isoformat(),
+                                 vencimento=venc.isoformat(), valor=vp, descricao=f"Boleto {credor}",
+                                 credor=credor, competencia=f"{venc:%Y-%m}", parcela=p, total=parcelas,
+                                 usuario="admin", pago=pago)
+                if pago:
+                    c.saida(venc.isoformat(), pago, "PIX", "Boletos", credor,
+                            f"Boleto {credor} {p}/{parcelas}", "admin", None, rnd.choice(BANCOS[:3]))
+
+
+def _gerar_emprestimos(c: _Carga, inicio: date, fim: date, quantidade: int) -> None:
+    rnd = c.rnd
+    dias_total = max(1, (fim - inicio).days)
+    for i in range(quantidade):
+        contratacao = inicio + timedelta(days=int(dias_total * i / max(1, quantidade)) + rnd.randint(0, 20))
+        if contratacao > fim:
+            continue
+        banco = rnd.choice(BANCOS[:3])
+        n = rnd.choice((12, 18, 24, 36, 48))
+        principal = round(rnd.uniform(10000, 60000), 2)
+        taxa = rnd.choice((1.29, 1.59, 1.99))
+        i_m = taxa / 100.0
+        parcela = round(principal * i_m / (1 - (1 + i_m) ** -n), 2)
+        venc_dia = rnd.randint(5, 25)
+        primeira = _add_meses(contratacao, 1, venc_dia)
+        pagas = sum(1 for k in range(n) if _add_meses(primeira, k, venc_dia) <= fim)
+        c.emprestimos.append(
+            (contratacao.isoformat(), principal, "Capital de giro", banco, n, pagas, parcela, taxa,
+             venc_dia, "Quitado" if pagas == n else "Em aberto", "admin", round(parcela * pagas, 2),
+             round(parcela * (n - pagas), 2), f"Empréstimo {banco}", primeira.isoformat())
+        )
+        emp_id = len(c.emprestimos)
+        c.bancos[contratacao.isoformat()][banco] += principal
+        c.mov(contratacao.isoformat(), banco, "entrada", principal, "emprestimo",
+              f"Crédito empréstimo {banco}", "emprestimos_financiamentos", emp_id, "admin")
+        oid = c.obrigacao()
+        for k in range(n):
+            venc = _add_meses(primeira, k, venc_dia)
+            pago = parcela if venc <= fim else 0.0
+            c.lancamento_cap(obrigacao_id=oid, tipo="EMPRESTIMO", data_evento=contratacao.isoformat(),
+                             vencimento=venc.isoformat(), valor=parcela, descricao=f"Empréstimo {banco}",
+                             credor=banco, competencia=f"{venc:%Y-%m}", parcela=k + 1, total=n,
+                             usuario="admin", emprestimo_id=emp_id, pago=pago)
+            if pago:
+                c.saida(venc.isoformat(), pago, "DÉBITO", "Empréstimos e Financiamentos", banco,
+                        f"Parcela {k + 1}/{n} {banco}", "admin", None, banco)
+
+
+def _gerar_depositos_transferencias(c: _Carga, dias: List[date]) -> None:
+    rnd = c.rnd
+    for d in dias:
+        data = d.isoformat()
+        if d.weekday() == 0:  # depósito semanal Caixa 2 → banco
+            banco = rnd.choice(BANCOS[:3])
+            valor = round(rnd.uniform(800, 3000), 2)
+            c.caixa2_saidas[data] += valor
+            c.bancos[data][banco] += valor
+            c.mov(data, banco, "entrada", valor, "deposito", f"Lançamento DEPÓSITO Cx2→{banco}",
+                  "movimentacoes_bancarias", None, "admin")
+            c.depositos.append((data, banco, valor, "Caixa 2", 0.0, valor, len(c.movs), c.movs[-1][8]))
+        if d.day in (10, 25):  # transferência entre bancos
+            origem, destino = rnd.sample(BANCOS[:3], 2)
+            valor = round(rnd.uniform(1000, 8000), 2)
+            c.bancos[data][origem] -= valor
+            c.bancos[data][destino] += valor
+            c.mov(data, origem, "saida", valor, "transferencia",
+                  f"Lançamento TRANSFERÊNCIA para {destino}", "transferencias", None, "admin")
+            c.mov(data, destino, "entrada", valor, "transferencia",
+                  f"Lançamento TRANSFERÊNCIA de {origem}", "transferencias", len(c.movs), "admin")
+
+
+def _snapshots_caixas(c: _Carga, dias: List[date], rnd: random.Random) -> List[Tuple[Any, ...]]:
+    """Um snapshot por dia: vendas em dinheiro do dia entram no caixa do dia seguinte."""
+    linhas = []
+    caixa, caixa_2 = 1500.0, 4000.0
+    for d in dias:
+        data = d.isoformat()
+        vendas = round(c.caixa_vendas.get(data, 0.0), 2)
+        caixa = round(max(0.0, caixa - c.caixa_saidas.get(data, 0.0)), 2)
+        caixa_2 = round(max(0.0, caixa_2 - c.caixa2_saidas.get(data, 0.0)), 2)
+        # Parte do dinheiro do dia vai para o Caixa 2 (casa)
+        dia2 = round(vendas * rnd.uniform(0.3, 0.6), 2) if vendas else 0.0
+        linhas.append((data, caixa, caixa_2, vendas, round(caixa + vendas, 2), dia2, round(caixa_2 + dia2, 2)))
+        caixa, caixa_2 = round(caixa + vendas - dia2, 2), round(caixa_2 + dia2, 2)
+    return linhas
+
+
+# -----------------------------------------------------------------------------
+# Gravação
+# -----------------------------------------------------------------------------
+def _cadastros(conn: sqlite3.Connection, inicio: date, fim: date) -> Dict[str, int]:
+    conn.executemany(
+        "INSERT INTO usuarios (nome, email, senha, perfil, ativo) VALUES (?, ?, '', 'vendedor', 1)",
+        [(v, f"{v.lower()}@flowdash.local") for v in VENDEDORES],
+    )
+    conn.executemany("INSERT OR IGNORE INTO bancos_cadastrados (nome) VALUES (?)", [(b,) for b in BANCOS])
+    conn.executemany(
+        "INSERT INTO cartoes_credito (nome, fechamento, vencimento) VALUES (?, ?, ?)", CARTOES
+    )
+    taxas = []
+    for maq in MAQUINETAS:
+        taxas.append((maq, "PIX", "", 1, _taxa("PIX", 1), maq))
+        for band in BANDEIRAS:
+            taxas.append((maq, "DÉBITO", band, 1, _taxa("DÉBITO", 1), maq))
+            for p in range(1, 13):
+                taxas.append((maq, "CRÉDITO", band, p, _taxa("CRÉDITO", p), maq))
+                taxas.append((maq, "LINK_PAGAMENTO", band, p, _taxa("LINK_PAGAMENTO", p), maq))
+    conn.executemany(
+        "INSERT OR REPLACE INTO taxas_maquinas "
+        "(maquineta, forma_pagamento, bandeira, parcelas, taxa_percentual, banco_destino) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        taxas,
+    )
+    for cat, subs in CATEGORIAS.items():
+        cid = conn.execute("INSERT INTO categorias_saida (nome) VALUES (?)", (cat,)).lastrowid
+        conn.executemany(
+            "INSERT INTO subcategorias_saida (categoria_id, nome) VALUES (?, ?)", [(cid, s) for s in subs]
+        )
+
+    usuarios = dict(conn.execute("SELECT nome, id FROM usuarios").fetchall())
+    metas = []
+    mes = inicio.replace(day=1)
+    while mes <= fim:
+        for v in VENDEDORES:
+            metas.append((usuarios[v], f"{mes:%Y-%m}", 30000.0, 25.0, 14.0, 14.0, 14.0, 16.0, 18.0, 24.0, 0.0,
+                          75.0, 87.5, v))
+        mes = _add_meses(mes, 1)
+    conn.executemany(
+        """
+        INSERT INTO metas (id_usuario, mes, meta_mensal, perc_semanal, perc_segunda, perc_terca,
+                           perc_quarta, perc_quinta, perc_sexta, perc_sabado, perc_domingo,
+                           perc_bronze, perc_prata, vendedor)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        metas,
+    )
+    return dict(conn.execute("SELECT nome, id FROM cartoes_credito").fetchall())
+
+
+def _gravar(conn: sqlite3.Connection, c: _Carga, snapshots: List[Tuple[Any, ...]]) -> None:
+    conn.executemany(
+        """
+        INSERT INTO entrada (Data, Valor, Forma_de_Pagamento, Parcelas, Bandeira, Usuario,
+                             maquineta, valor_liquido, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        c.entradas,
+    )
+    conn.executemany(
+        """
+        INSERT INTO saida (Data, Valor, Forma_de_Pagamento, Parcelas, Categoria, Sub_Categoria,
+                           Descricao, Usuario, Origem_Dinheiro, Banco_Saida)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        c.saidas,
+    )
+    conn.executemany(
+        """
+        INSERT INTO movimentacoes_bancarias (data, banco, tipo, valor, origem, observacao,
+                                             referencia_tabela, referencia_id, trans_uid,
+                                             usuario, data_hora)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        c.movs,
+    )
+    conn.executemany(
+        """
+        INSERT INTO contas_a_pagar_mov
+            (obrigacao_id, tipo_obrigacao, categoria_evento, data_evento, vencimento, valor_evento,
+             descricao, credor, competencia, parcela_num, parcelas_total, usuario, tipo_origem,
+             cartao_id, emprestimo_id, status, principal_pago_acumulado, valor_pago_acumulado,
+             data_pagamento)
+        VALUES (?, ?, 'LANCAMENTO', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 'EM ABERTO', ?, ?, ?)
+        """,
+        c.cap,
+    )
+    conn.executemany(
+        """
+        INSERT INTO fatura_cartao_itens (purchase_uid, cartao, competencia, data_compra,
+                                         descricao_compra, categoria, parcela_num, parcelas,
+                                         valor_parcela, usuario)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        c.itens,
+    )
+    conn.executemany(
+        """
+        INSERT INTO depositos_bancarios (data, banco, valor, origem, usar_de_dia, usar_de_saldo,
+                                         mov_id, trans_uid)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        c.depositos,
+    )
+    conn.executemany(
+        """
+        INSERT INTO emprestimos_financiamentos
+            (data_contratacao, valor_total, tipo, banco, parcelas_total, parcelas_pagas, valor_parcela,
+             taxa_juros_am, vencimento_dia, status, usuario, valor_pago, valor_em_aberto, descricao,
+             data_inicio_pagamento)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        c.emprestimos,
+    )
+    conn.executemany(
+        """
+        INSERT INTO saldos_caixas (data, caixa, caixa_2, caixa_vendas, caixa_total, caixa2_dia, caixa2_total)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        snapshots,
+    )
+    cols = ", ".join(f'"{b}"' for b in BANCOS)
+    conn.executemany(
+        f"INSERT INTO saldos_bancos (data, {cols}) VALUES (?{', ?' * len(BANCOS)})",
+        [
+            (data, *(round(deltas.get(b, 0.0), 2) for b in BANCOS))
+            for data, deltas in sorted(c.bancos.items())
+        ],
+    )
+
+
+# -----------------------------------------------------------------------------
+# API
+# -----------------------------------------------------------------------------
+def gerar_banco(
+    destino: Any,
+    *,
+    anos: float = 3.0,
+    vendas_dia: int = 35,
+    saidas_dia: int = 4,
+    compras_cartao_mes: int = 25,
+    boletos_mes: int = 4,
+    emprestimos: int = 4,
+    ate: Optional[date] = None,
+    semente: int = 42,
+    template: Any = TEMPLATE,
+    sobrescrever: bool = False,
+) -> Dict[str, int]:
+    """
+    Cria `destino` a partir do template e grava o histórico sintético.
+
+    Args:
+        destino: Caminho do banco a criar.
+        anos: Anos de histórico (terminando em `ate`).
+        vendas_dia: Média de vendas por dia "normal" (sábado ~1,5×, domingo fechado).
+        saidas_dia: Máximo de saídas avulsas por dia (além das fixas do mês).
+        compras_cartao_mes: Compras no cartão por mês (parceladas em 1–12×).
+        boletos_mes: Boletos de fornecedores emitidos por mês (1–6 parcelas).
+        emprestimos: Empréstimos contratados ao longo do período (12–48 parcelas).
+        ate: Último dia do histórico (padrão: hoje).
+        semente: Semente do gerador pseudoaleatório.
+        template: Banco modelo (schema vazio).
+        sobrescrever: Substitui `destino` se já existir.
+
+    Returns:
+        dict: Quantidade de linhas por tabela.
+
+    Raises:
+        FileExistsError: `destino` existe e `sobrescrever` é False.
+    """
+    destino = Path(destino)
+    if destino.exists():
+        if not sobrescrever:
+            raise FileExistsError(f"{destino} já existe (use sobrescrever=True).")
+        close_pooled_conns(destino)
+        destino.unlink()
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(template, destino)
+
+    fim = ate or date.today()
+    inicio = fim - timedelta(days=int(365 * anos))
+    dias = [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+    rnd = random.Random(semente)
+
+    # Colunas/índices que o app garante na inicialização
+    executar_migracoes(destino, forcar=True)
+
+    c = _Carga(rnd)
+    with get_conn(destino) as conn:
+        cartao_ids = _cadastros(conn, inicio, fim)
+        _gerar_vendas(c, dias, vendas_dia)
+        _gerar_saidas(c, dias, saidas_dia)
+        _gerar_cartao(c, inicio, fim, compras_cartao_mes, cartao_ids)
+        _gerar_boletos(c, inicio, fim, boletos_mes)
+        _gerar_emprestimos(c, inicio, fim, emprestimos)
+        _gerar_depositos_transferencias(c, dias)
+        _gravar(conn, c, _snapshots_caixas(c, dias, rnd))
+        reconstruir_saldos_acumulados(conn)
+        recalcular_status_cap(conn)
+        invalidar(conn)
+
+        contagem = {
+            t: int(conn.execute(f'SELECT COUNT(*) FROM "{t}"').fetchone()[0])
+            for t in ("entrada", "saida", "movimentacoes_bancarias", "contas_a_pagar_mov",
+                      "fatura_cartao_itens", "depositos_bancarios", "emprestimos_financiamentos",
+                      "saldos_caixas", "saldos_bancos", "saldos_bancos_acumulado")
+        }
+    logger.info("banco de benchmark gerado em %s: %s", destino, contagem)
+    return contagem
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Gera um banco FlowDash com histórico sintético.")
+    parser.add_argument("destino", help="Caminho do banco a criar")
+    parser.add_argument("--anos", type=float, default=3.0)
+    parser.add_argument("--vendas-dia", type=int, default=35)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--sobrescrever", action="store_true")
+    args = parser.parse_args(argv)
+
+    contagem = gerar_banco(
+        args.destino,
+        anos=args.anos,
+        vendas_dia=args.vendas_dia,
+        semente=args.semente,
+        sobrescrever=args.sobrescrever,
+    )
+    for tabela, n in contagem.items():
+        print(f"{tabela:<28} {n:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -0,0 +1,185 @@
+"""
+Módulo Importação (Benchmarks)
+==============================
+
+Relatório do custo de importação (partida a frio) do app e de cada página,
+para acompanhar o tempo de cold start do Streamlit e achar módulos pesados.
+
+Funcionalidades principais
+--------------------------
+- `medir_importacao(modulo)`: importa o módulo num **processo novo** com
+  `python -X importtime` e devolve o tempo total e os módulos mais caros
+  (tempo próprio e acumulado, em ms).
+- `alvos_padrao()`: imports de partida do `main.py` + todos os módulos de
+  página de `ROTAS` (lidos do código, sem executar o script do Streamlit).
+- `relatorio(...)`: mede cada alvo (melhor de N execuções) e agrega o custo
+  próprio por pacote de topo (pandas, streamlit, repository, ...).
+
+Detalhes técnicos
+-----------------
+- Cada alvo roda isolado: o número é o custo de ser o **primeiro** a importar
+  o módulo (dependências compartilhadas entram em todos).
+- O Python já carrega alguns módulos antes do `-c` (`site`, `encodings`):
+  eles ficam de fora da soma.
+
+Linha de comando
+----------------
+    python -m benchmarks.importacao [--modulo M ...] [--repeticoes 3]
+                                    [--top 15] [--saida importacao.json]
+
+Dependências
+------------
+- subprocess / sys.executable (mesmo interpretador do chamador)
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "PARTIDA",
+    "alvos_padrao",
+    "medir_importacao",
+    "relatorio",
+]
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+# Imports feitos pelo main.py antes de renderizar qualquer página
+PARTIDA = (
+    "streamlit",
+    "auth.auth",
+    "utils.utils",
+    "shared.schema",
+    "shared.instrumentacao",
+    "flowdash_pages.registro",
+)
+
+_RE_LINHA = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+
+def _importtime(codigo: str) -> Tuple[subprocess.CompletedProcess, List[Tuple[str, float, float]]]:
+    """Roda `codigo` num processo novo; devolve (processo, [(módulo, próprio_ms, acumulado_ms)])."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", codigo],
+        cwd=str(RAIZ),
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"),
+        capture_output=True,
+        text=True,
+    )
+    linhas = []
+    for ln in proc.stderr.splitlines():
+        m = _RE_LINHA.match(ln)
+        if m:
+            linhas.append((m.group(3), int(m.group(1)) / 1000.0, int(m.group(2)) / 1000.0))
+    return proc, linhas
+
+
+@lru_cache(maxsize=1)
+def _carga_interpretador() -> FrozenSet[str]:
+    """Módulos que o Python importa antes do `-c` (ficam fora das somas)."""
+    return frozenset(nome for nome, _p, _a in _importtime("pass")[1])
+
+
+def alvos_padrao(main_py: Optional[Path] = None) -> List[str]:
+    """Imports de partida + módulos de página de `ROTAS` (sem duplicatas, em ordem)."""
+    arvore = ast.parse((main_py or RAIZ / "main.py").read_text(encoding="utf-8"))
+    paginas: List[str] = []
+    for no in ast.walk(arvore):
+        if isinstance(no, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "ROTAS" for t in no.targets):
+            paginas = [v for v in ast.literal_eval(no.value).values()]
+            break
+    return list(dict.fromkeys([*PARTIDA, *paginas]))
+
+
+def medir_importacao(modulo: str, *, top: int = 15) -> Dict[str, Any]:
+    """
+    Importa `modulo` num processo novo com `-X importtime`.
+
+    Returns:
+        dict: `{modulo, ok, total_ms, modulos, top: [{modulo, proprio_ms,
+        acumulado_ms}], por_pacote: {pacote: proprio_ms}, erro?}`.
+    """
+    proc, linhas = _importtime(f"import {modulo}")
+    base = _carga_interpretador()
+    doalvo = [ln for ln in linhas if ln[0] not in base]
+    total = sum(p for _n, p, _a in doalvo)
+
+    por_pacote: Dict[str, float] = defaultdict(float)
+    for nome, proprio, _a in doalvo:
+        por_pacote[nome.split(".")[0]] += proprio
+    caros = sorted(doalvo, key=lambda r: r[1], reverse=True)[:top]
+
+    out: Dict[str, Any] = {
+        "modulo": modulo,
+        "ok": proc.returncode == 0,
+        "total_ms": round(total, 2),
+        "modulos": len(doalvo),
+        "top": [{"modulo": n, "proprio_ms": round(p, 2), "acumulado_ms": round(a, 2)} for n, p, a in caros],
+        "por_pacote": {k: round(v, 2) for k, v in sorted(por_pacote.items(), key=lambda kv: kv[1], reverse=True)},
+    }
+    if proc.returncode != 0:
+        out["erro"] = (proc.stderr.strip().splitlines() or ["?"])[-1]
+    return out
+
+
+def relatorio(alvos: Optional[Iterable[str]] = None, *, repeticoes: int = 3, top: int = 15) -> Dict[str, Any]:
+    """Mede cada alvo (melhor de `repeticoes` pelo `total_ms`)."""
+    itens: List[Dict[str, Any]] = []
+    for modulo in list(alvos or alvos_padrao()):
+        logger.info("importacao: %s", modulo)
+        medidas = [medir_importacao(modulo, top=top) for _ in range(max(1, repeticoes))]
+        itens.append(min(medidas, key=lambda r: r["total_ms"]))
+    return {"python": sys.version.split()[0], "repeticoes": repeticoes, "alvos": itens}
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _imprimir(rel: Dict[str, Any], top: int) -> None:
+    print(f"{'módulo':<52} {'total (ms)':>11} {'módulos':>8}  maiores pacotes (próprio, ms)")
+    for it in rel["alvos"]:
+        pacotes = ", ".join(f"{k} {v:.0f}" for k, v in list(it["por_pacote"].items())[:4])
+        erro = f"  [ERRO: {it['erro']}]" if not it["ok"] else ""
+        print(f"{it['modulo']:<52} {it['total_ms']:>11.1f} {it['modulos']:>8}  {pacotes}{erro}")
+    agregados: Dict[str, Dict[str, float]] = {}
+    for it in rel["alvos"]:
+        for t in it["top"]:
+            atual = agregados.get(t["modulo"])
+            if atual is None or t["proprio_ms"] > atual["proprio_ms"]:
+                agregados[t["modulo"]] = t
+    print(f"\nmódulos mais caros (tempo próprio, top {top}):")
+    for t in sorted(agregados.values(), key=lambda r: r["proprio_ms"], reverse=True)[:top]:
+        print(f"  {t['modulo']:<60} {t['proprio_ms']:>8.1f}")
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Custo de importação (cold start) do FlowDash.")
+    parser.add_argument("--modulo", action="append", dest="modulos", help="Medir só este módulo (repetível)")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--saida", help="Arquivo JSON do relatório")
+    args = parser.parse_args(argv)
+
+    rel = relatorio(args.modulos, repeticoes=args.repeticoes, top=args.top)
+    if args.saida:
+        Path(args.saida).write_text(json.dumps(rel, ensure_ascii=False, indent=2), encoding="utf-8")
+    _imprimir(rel, args.top)
+    return 0 if all(it["ok"] for it in rel["alvos"]) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -0,0 +1,636 @@
+"""
+Módulo Suite (Benchmarks)
+=========================
+
+Mede os caminhos quentes do FlowDash num banco com histórico sintético e
+produz um relatório JSON com percentis, comparável entre versões para pegar
+regressões antes do deploy.
+
+Funcionalidades principais
+--------------------------
+- Cenários registrados em `CENARIOS` (escrita e leitura):
+  `VendasService.registrar_venda`, `LedgerService.registrar_saida_*`,
+  `registrar_saida_credito`, `pagar_fatura_cartao`, `pagar_em_lote`,
+  `programar_emprestimo`, `carregar_resumo_dia`,
+  consultas do fechamento e listagens do CAP (além da construção do
+  `LedgerService` e do custo por clique do container de serviços).
+- `executar(...)`: roda os cenários N vezes (após aquecimento) e devolve
+  `{meta, cenarios: {nome: {n, erros, ms: {min, p50, p90, p95, p99, max, media}}}}`.
+- `comparar(atual, base)`: lista os cenários cujo percentil piorou além da
+  tolerância em relação a um relatório de referência.
+- `perfil_sql=True` (`--perfil-sql ARQ`): roda os cenários com o perfil de SQL
+  (`shared.perfil_sql`) ligado e anexa os comandos/planos ao relatório — os
+  tempos dos cenários ficam inflados pelo perfil, não compare com a base.
+
+Detalhes técnicos
+-----------------
+- Sempre roda sobre uma **cópia** do banco (gerado por `benchmarks.gerador`
+  ou informado com `--banco`): os cenários de escrita alteram os dados.
+- Cada cenário tem um `preparar(caminho) -> passo(i)`; só `passo` é cronometrado
+  (`time.perf_counter`), então a montagem de entradas fica fora da medição.
+- Entradas de escrita variam por iteração (valor/descrição), para não cair nos
+  atalhos de idempotência por `trans_uid`.
+- Percentis por interpolação linear entre ordens (mesmo critério do numpy).
+
+Linha de comando
+----------------
+    python -m benchmarks.suite list
+    python -m benchmarks.suite run [--banco B.db | --anos 3 --vendas-dia 35]
+                                   [--repeticoes 50] [--cenario NOME ...]
+                                   [--saida bench.json] [--base baseline.json]
+                                   [--tolerancia 0.25] [--metrica p95]
+                                   [--perfil-sql perfil_sql.json]
+
+    Com `--base`, sai com código 1 se houver regressão.
+
+Dependências
+------------
+- benchmarks.gerador
+- services (vendas, ledger), repository (CAP, fechamento)
+- flowdash_pages.lancamentos.pagina.actions_pagina (resumo do dia)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from benchmarks.gerador import BANCOS, CARTOES, MAQUINETAS, VENDEDORES, gerar_banco
+from shared import perfil_sql as perfil_mod
+from shared.db import close_pooled_conns, get_conn
+
+logger = logging.getLogger(__name__)
+
+PERCENTIS = (50, 90, 95, 99)
+FORMATO = 1  # versão do layout do relatório JSON
+
+__all__ = [
+    "Cenario",
+    "CENARIOS",
+    "PERCENTIS",
+    "percentis",
+    "executar",
+    "comparar",
+]
+
+
+# -----------------------------------------------------------------------------
+# Registro de cenários
+# -----------------------------------------------------------------------------
+Passo = Callable[[int], Any]
+
+
+@dataclass(frozen=True)
+class Cenario:
+    """Um caminho quente medido: `preparar(caminho)` devolve o passo cronometrado."""
+
+    nome: str
+    descricao: str
+    preparar: Callable[[str], Passo]
+    escrita: bool = False
+
+
+CENARIOS: Dict[str, Cenario] = {}
+
+
+def _cenario(nome: str, descricao: str, *, escrita: bool = False) -> Callable[[Callable[[str], Passo]], Callable[[str], Passo]]:
+    def deco(fn: Callable[[str], Passo]) -> Callable[[str], Passo]:
+        CENARIOS[nome] = Cenario(nome, descricao, fn, escrita)
+        return fn
+    return deco
+
+
+def _ultima_data(caminho: str) -> str:
+    """Último dia com venda no banco (as escritas acontecem "hoje" do histórico)."""
+    with get_conn(caminho) as conn:
+        row = conn.execute("SELECT MAX(Data) FROM entrada").fetchone()
+    return str(row[0] or date.today().isoformat())[:10]
+
+
+def _datas_historico(caminho: str, n: int = 64) -> List[str]:
+    """Amostra determinística de dias do histórico (leituras "frias")."""
+    with get_conn(caminho) as conn:
+        ini, fim = conn.execute("SELECT MIN(Data), MAX(Data) FROM entrada").fetchone()
+    d0 = date.fromisoformat(str(ini)[:10])
+    total = (date.fromisoformat(str(fim)[:10]) - d0).days
+    rnd = random.Random(7)
+    return [(d0 + timedelta(days=rnd.randint(0, total))).isoformat() for _ in range(n)]
+
+
+# ----------------------------- escrita -----------------------------
+@_cenario("vendas.registrar_venda", "VendasService.registrar_venda (formas/maquinetas alternadas)", escrita=True)
+def _venda(caminho: str) -> Passo:
+    from services.vendas import VendasService
+
+    svc = VendasService(caminho)
+    hoje = _ultima_data(caminho)
+    formas = ("DINHEIRO", "PIX", "DÉBITO", "CRÉDITO", "LINK_PAGAMENTO")
+
+    def passo(i: int) -> Any:
+        forma = formas[i % len(formas)]
+        cartao = forma in ("DÉBITO", "CRÉDITO", "LINK_PAGAMENTO")
+        maquineta = MAQUINETAS[i % len(MAQUINETAS)] if cartao else None
+        return svc.registrar_venda(
+            data=hoje,
+            data_liq=hoje,
+            valor=100.0 + i * 0.37,
+            forma=forma,
+            parcelas=(i % 6) + 1 if forma in ("CRÉDITO", "LINK_PAGAMENTO") else 1,
+            bandeira="VISA" if cartao else None,
+            maquineta=maquineta,
+            banco_destino=None if forma == "DINHEIRO" else (maquineta or BANCOS[0]),
+            usuario=VENDEDORES[i % len(VENDEDORES)],
+        )
+    return passo
+
+
+@_cenario("ledger.init", "Construção do LedgerService (feita a cada ação da UI)")
+def _ledger_init(caminho: str) -> Passo:
+    from services.ledger.service_ledger import LedgerService
+
+    return lambda i: LedgerService(caminho)
+
+
+@_cenario("ledger.container", "Serviços do container por clique (`services.ledger.container.obter`)")
+def _ledger_container(caminho: str) -> Passo:
+    from services.ledger import container
+
+    return lambda i: container.obter(caminho).ledger
+
+
+@_cenario("ledger.registrar_saida_dinheiro", "LedgerService.registrar_saida_dinheiro (Caixa)", escrita=True)
+def _saida_dinheiro(caminho: str) -> Passo:
+    from services.ledger.service_ledger import LedgerService
+
+    ledger = LedgerService(caminho)
+    hoje = _ultima_data(caminho)
+
+    def passo(i: int) -> Any:
+        return ledger.registrar_saida_dinheiro(
+            data=hoje,
+            valor=5.0 + i * 0.01,
+            origem_dinheiro="Caixa",
+            categoria="Operacional",
+            sub_categoria="Limpeza",
+            descricao=f"bench dinheiro {i}",
+            usuario="bench",
+        )
+    return passo
+
+
+@_cenario("ledger.registrar_saida_bancaria", "LedgerService.registrar_saida_bancaria (PIX)", escrita=True)
+def _saida_bancaria(caminho: str) -> Passo:
+    from services.ledger.service_ledger import LedgerService
+
+    ledger = LedgerService(caminho)
+    hoje = _ultima_data(caminho)
+
+    def passo(i: int) -> Any:
+        return ledger.registrar_saida_bancaria(
+            data=hoje,
+            valor=10.0 + i * 0.01,
+            banco_nome=BANCOS[i % 3],
+            forma="PIX",
+            categoria="Operacional",
+            sub_categoria="Manutenção",
+            descricao=f"bench pix {i}",
+            usuario="bench",
+        )
+    return passo
+
+
+@_cenario("ledger.registrar_saida_credito", "LedgerService.registrar_saida_credito (1–12 parcelas)", escrita=True)
+def _saida_credito(caminho: str) -> Passo:
+    from services.ledger.service_ledger import LedgerService
+
+    ledger = LedgerService(caminho)
+    hoje = _ultima_data(caminho)
+
+    def passo(i: int) -> Any:
+        nome, fechamento, vencimento = CARTOES[i % len(CARTOES)]
+        return ledger.registrar_saida_credito(
+            data_compra=hoje,
+            valor=120.0 + i * 0.01,
+            parcelas=(i % 12) + 1,
+            cartao_nome=nome,
+            categoria="Marketing",
+            sub_categoria="Anúncios",
+            descricao=f"bench credito {i}",
+            usuario="bench",
+            fechamento=fechamento,
+            vencimento=vencimento,
+        )
+    return passo
+
+
+@_cenario("ledger.pagar_fatura_cartao", "ServiceLedgerFatura.pagar_fatura_cartao (pagamento parcial)", escrita=True)
+def _pagar_fatura(caminho: str) -> Passo:
+    from services.ledger.service_ledger_fatura import ServiceLedgerFatura
+
+    svc = ServiceLedgerFatura(caminho)
+    hoje = _ultima_data(caminho)
+    with get_conn(caminho) as conn:
+        row = conn.execute(
+            """
+            SELECT obrigacao_id FROM contas_a_pagar_mov
+             WHERE categoria_evento = 'LANCAMENTO' AND tipo_obrigacao = 'FATURA_CARTAO'
+             ORDER BY valor_evento - COALESCE(principal_pago_acumulado, 0) DESC
+             LIMIT 1
+            """
+        ).fetchone()
+    if not row:
+        raise RuntimeError("nenhuma fatura em aberto no banco de benchmark")
+    obrigacao_id = int(row[0])
+
+    def passo(i: int) -> Any:
+        # Valor pequeno: a fatura continua em aberto durante todas as repetições
+        return svc.pagar_fatura_cartao(
+            obrigacao_id=obrigacao_id,
+            valor_base=1.0,
+            forma_pagamento="PIX",
+            origem=BANCOS[0],
+            data_evento=hoje,
+            usuario="bench",
+        )
+    return passo
+
+
+@_cenario("ledger.pagar_em_lote", "LedgerService.pagar_em_lote (20 boletos/empréstimos numa transação)", escrita=True)
+def _pagar_em_lote(caminho: str) -> Passo:
+    from services.ledger import container
+
+    ledger = container.obter(caminho).ledger
+    hoje = _ultima_data(caminho)
+    with get_conn(caminho) as conn:
+        obrigacoes = [
+            int(r[0]) for r in conn.execute(
+                """
+                SELECT obrigacao_id FROM contas_a_pagar_mov
+                 WHERE categoria_evento = 'LANCAMENTO'
+                   AND tipo_obrigacao IN ('BOLETO', 'EMPRESTIMO')
+                 GROUP BY obrigacao_id
+                 ORDER BY SUM(valor_evento - COALESCE(principal_pago_acumulado, 0)) DESC
+                 LIMIT 20
+                """
+            ).fetchall()
+        ]
+    if not obrigacoes:
+        raise RuntimeError("nenhum boleto/empréstimo em aberto no banco de benchmark")
+
+    def passo(i: int) -> Any:
+        # Principal varia com `i`: cada repetição gera trans_uids novos
+        itens = [
+            {
+                "obrigacao_id": ob,
+                "principal": 1.0 + i * 0.01,
+                "banco": ("Caixa" if k % 4 == 0 else BANCOS[k % 3]),
+                "data": hoje,
+            }
+            for k, ob in enumerate(obrigacoes)
+        ]
+        return ledger.pagar_em_lote(itens, usuario="bench")
+    return passo
+
+
+@_cenario("ledger.programar_emprestimo", "ServiceLedgerEmprestimo.programar_emprestimo (PRICE, 360 parcelas)", escrita=True)
+def _programar_emprestimo(caminho: str) -> Passo:
+    from services.ledger import container
+
+    svc = container.obter(caminho).emprestimo
+    hoje = _ultima_data(caminho)
+
+    def passo(i: int) -> Any:
+        return svc.programar_emprestimo(
+            credor=BANCOS[i % 3],
+            data_primeira_parcela=hoje,
+            parcelas_total=360,
+            usuario="bench",
+            sistema="PRICE",
+            principal=250000.0 + i,
+            taxa_juros_am=0.89,
+            descricao=f"bench financiamento {i}",
+        )
+    return passo
+
+
+# ----------------------------- leitura -----------------------------
+@_cenario("pagina.carregar_resumo_dia", "actions_pagina.carregar_resumo_dia (dias variados do histórico)")
+def _resumo_dia(caminho: str) -> Passo:
+    from flowdash_pages.lancamentos.pagina.actions_pagina import carregar_resumo_dia
+
+    datas = _datas_historico(caminho)
+    return lambda i: carregar_resumo_dia(caminho, datas[i % len(datas)])
+
+
+@_cenario("fechamento.dia", "fechamento_periodo + totais_por de um dia")
+def _fechamento_dia(caminho: str) -> Passo:
+    from repository.fechamento_repository import fechamento_periodo, totais_por
+
+    datas = _datas_historico(caminho)
+
+    def passo(i: int) -> Any:
+        d = datas[i % len(datas)]
+        with get_conn(caminho) as conn:
+            return fechamento_periodo(conn, d), totais_por(conn, d, d, "banco"), totais_por(conn, d, d, "origem")
+    return passo
+
+
+@_cenario("fechamento.mes", "fechamento_periodo de um mês inteiro + totais por origem")
+def _fechamento_mes(caminho: str) -> Passo:
+    from repository.fechamento_repository import fechamento_periodo, totais_por
+
+    meses = sorted({d[:7] for d in _datas_historico(caminho)})
+
+    def passo(i: int) -> Any:
+        ano, mes = map(int, meses[i % len(meses)].split("-"))
+        ini = date(ano, mes, 1)
+        fim = date(ano + (mes == 12), mes % 12 + 1, 1) - timedelta(days=1)
+        with get_conn(caminho) as conn:
+            return fechamento_periodo(conn, str(ini), str(fim)), totais_por(conn, str(ini), str(fim), "origem")
+    return passo
+
+
+def _cap(metodo: str, com_conn: bool = False) -> Callable[[str], Passo]:
+    def preparar(caminho: str) -> Passo:
+        from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
+
+        repo = ContasAPagarMovRepository(caminho)
+        fn = getattr(repo, metodo)
+        return (lambda i: fn(None)) if com_conn else (lambda i: fn())
+    return preparar
+
+
+for _metodo, _com_conn in (
+    ("listar_faturas_cartao_abertas", False),
+    ("listar_boletos_em_aberto", False),
+    ("listar_emprestimos_em_aberto", False),
+    ("obter_em_aberto", True),
+):
+    _cenario(f"cap.{_metodo}", f"ContasAPagarMovRepository.{_metodo}")(_cap(_metodo, _com_conn))
+
+
+@_cenario("cap.listar_parcelas_em_aberto_fifo", "FIFO de parcelas em aberto (empréstimos/boletos)")
+def _cap_fifo(caminho: str) -> Passo:
+    from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
+
+    repo = ContasAPagarMovRepository(caminho)
+    with get_conn(caminho) as conn:
+        ids = [
+            int(r[0])
+            for r in conn.execute(
+                "SELECT DISTINCT obrigacao_id FROM contas_a_pagar_mov "
+                "WHERE tipo_obrigacao IN ('EMPRESTIMO', 'BOLETO') ORDER BY obrigacao_id"
+            )
+        ] or [0]
+
+    def passo(i: int) -> Any:
+        with get_conn(caminho) as conn:
+            return repo.listar_parcelas_em_aberto_fifo(conn, ids[i % len(ids)])
+    return passo
+
+
+# -----------------------------------------------------------------------------
+# Estatística
+# -----------------------------------------------------------------------------
+def percentis(amostras: Sequence[float], ps: Iterable[int] = PERCENTIS) -> Dict[str, float]:
+    """Resumo das amostras (ms): min, pNN (interpolação linear), max e média."""
+    xs = sorted(float(x) for x in amostras)
+    if not xs:
+        return {}
+    out: Dict[str, float] = {"min": round(xs[0], 4)}
+    for p in ps:
+        pos = (len(xs) - 1) * p / 100.0
+        lo = int(pos)
+        hi = min(lo + 1, len(xs) - 1)
+        out[f"p{p}"] = round(xs[lo] + (xs[hi] - xs[lo]) * (pos - lo), 4)
+    out["max"] = round(xs[-1], 4)
+    out["media"] = round(sum(xs) / len(xs), 4)
+    return out
+
+
+# -----------------------------------------------------------------------------
+# Execução
+# -----------------------------------------------------------------------------
+def _medir(cenario: Cenario, caminho: str, repeticoes: int, aquecimento: int) -> Dict[str, Any]:
+    passo = cenario.preparar(caminho)
+    erros: List[str] = []
+    for i in range(aquecimento):
+        try:
+            passo(-1 - i)
+        except Exception as e:
+            erros.append(f"{type(e).__name__}: {e}")
+    amostras: List[float] = []
+    for i in range(repeticoes):
+        t0 = time.perf_counter()
+        try:
+            passo(i)
+        except Exception as e:
+            erros.append(f"{type(e).__name__}: {e}")
+            continue
+        amostras.append((time.perf_counter() - t0) * 1000.0)
+    res: Dict[str, Any] = {"n": len(amostras), "erros": len(erros), "ms": percentis(amostras)}
+    if erros:
+        res["primeiro_erro"] = erros[0]
+        logger.warning("benchmark %s: %d erro(s); primeiro: %s", cenario.nome, len(erros), erros[0])
+    return res
+
+
+def executar(
+    caminho_banco: Optional[str] = None,
+    *,
+    cenarios: Optional[Iterable[str]] = None,
+    repeticoes: int = 50,
+    aquecimento: int = 3,
+    anos: float = 3.0,
+    vendas_dia: int = 35,
+    semente: int = 42,
+    perfil_sql: bool = False,
+) -> Dict[str, Any]:
+    """
+    Roda os cenários e devolve o relatório.
+
+    Args:
+        caminho_banco: Banco de origem (copiado antes da execução). Se omitido,
+            um banco sintético é gerado com `anos`/`vendas_dia`/`semente`.
+        cenarios: Nomes a rodar (padrão: todos, na ordem de registro).
+        repeticoes: Amostras cronometradas por cenário.
+        aquecimento: Execuções não cronometradas antes das amostras
+            (caches de schema, conexões do pool, planos de consulta).
+        perfil_sql: Liga `shared.perfil_sql` durante os cenários e inclui o
+            relatório em `perfil_sql` (só a geração do banco fica de fora).
+
+    Returns:
+        dict: `{formato, meta, cenarios[, perfil_sql]}` serializável em JSON.
+
+    Raises:
+        KeyError: Nome de cenário desconhecido.
+    """
+    nomes = list(cenarios or CENARIOS)
+    desconhecidos = [n for n in nomes if n not in CENARIOS]
+    if desconhecidos:
+        raise KeyError(f"cenário(s) desconhecido(s): {', '.join(desconhecidos)}")
+
+    with tempfile.TemporaryDirectory(prefix="flowdash-bench-") as tmp:
+        caminho = str(Path(tmp) / "bench.db")
+        t0 = time.perf_counter()
+        if caminho_banco:
+            shutil.copyfile(caminho_banco, caminho)
+            contagem = None
+        else:
+            contagem = gerar_banco(caminho, anos=anos, vendas_dia=vendas_dia, semente=semente)
+        geracao_s = time.perf_counter() - t0
+
+        resultados: Dict[str, Any] = {}
+        perfil: Optional[Dict[str, Any]] = None
+        if perfil_sql:
+            perfil_mod.limpar()
+            perfil_mod.ativar()
+        try:
+            for nome in nomes:
+                logger.info("benchmark: %s", nome)
+                resultados[nome] = _medir(CENARIOS[nome], caminho, repeticoes, aquecimento)
+        finally:
+            if perfil_sql:
+                perfil_mod.desativar()
+                perfil = perfil_mod.exportar_json()
+            close_pooled_conns(caminho)
+
+    relatorio = {
+        "formato": FORMATO,
+        "meta": {
+            "quando": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "plataforma": platform.platform(),
+            "banco": str(caminho_banco) if caminho_banco else "sintetico",
+            "sintetico": (
+                {"anos": anos, "vendas_dia": vendas_dia, "semente": semente, "linhas": contagem}
+                if contagem is not None else None
+            ),
+            "preparo_s": round(geracao_s, 3),
+            "repeticoes": repeticoes,
+            "aquecimento": aquecimento,
+        },
+        "cenarios": resultados,
+    }
+    if perfil is not None:
+        relatorio["perfil_sql"] = perfil
+    return relatorio
+
+
+def comparar(
+    atual: Dict[str, Any],
+    base: Dict[str, Any],
+    *,
+    metrica: str = "p95",
+    tolerancia: float = 0.25,
+    piso_ms: float = 0.5,
+) -> List[Dict[str, Any]]:
+    """
+    Lista regressões de `atual` em relação a `base`.
+
+    Um cenário regride quando `atual[metrica] > base[metrica] × (1 + tolerancia)`
+    e a diferença passa de `piso_ms` (evita ruído em operações sub-milissegundo).
+    Cenários que passaram a falhar também contam.
+    """
+    regressoes: List[Dict[str, Any]] = []
+    for nome, ref in (base.get("cenarios") or {}).items():
+        cur = (atual.get("cenarios") or {}).get(nome)
+        if cur is None:
+            continue
+        if cur.get("erros") and not ref.get("erros"):
+            regressoes.append({"cenario": nome, "motivo": "erros", "atual": cur["erros"], "base": 0})
+            continue
+        a, b = cur.get("ms", {}).get(metrica), ref.get("ms", {}).get(metrica)
+        if a is None or b is None:
+            continue
+        if a > b * (1.0 + tolerancia) and a - b > piso_ms:
+            regressoes.append(
+                {"cenario": nome, "motivo": metrica, "atual": a, "base": b, "razao": round(a / b, 3) if b else None}
+            )
+    return regressoes
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _imprimir(relatorio: Dict[str, Any]) -> None:
+    print(f"{'cenário':<44} {'n':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}  (ms)")
+    for nome, r in relatorio["cenarios"].items():
+        ms = r.get("ms") or {}
+        cols = " ".join(f"{ms.get(k, float('nan')):>9.2f}" for k in ("p50", "p95", "p99", "max"))
+        erro = f"  [{r['erros']} erro(s)]" if r.get("erros") else ""
+        print(f"{nome:<44} {r['n']:>4} {cols}{erro}")
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos quentes do FlowDash.")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list", help="Lista os cenários")
+    p = sub.add_parser("run", help="Roda os cenários e gera o relatório JSON")
+    p.add_argument("--banco", help="Banco de origem (copiado; padrão: gera histórico sintético)")
+    p.add_argument("--anos", type=float, default=3.0)
+    p.add_argument("--vendas-dia", type=int, default=35)
+    p.add_argument("--semente", type=int, default=42)
+    p.add_argument("--repeticoes", type=int, default=50)
+    p.add_argument("--aquecimento", type=int, default=3)
+    p.add_argument("--cenario", action="append", dest="cenarios", help="Rodar só este cenário (repetível)")
+    p.add_argument("--saida", help="Arquivo JSON do relatório (padrão: stdout)")
+    p.add_argument("--base", help="Relatório de referência para detectar regressões")
+    p.add_argument("--metrica", default="p95")
+    p.add_argument("--tolerancia", type=float, default=0.25)
+    p.add_argument("--perfil-sql", help="Liga o perfil de SQL e grava comandos/planos neste JSON")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "list":
+        for c in CENARIOS.values():
+            print(f"{c.nome:<44} {'escrita' if c.escrita else 'leitura':<8} {c.descricao}")
+        return 0
+
+    relatorio = executar(
+        args.banco,
+        cenarios=args.cenarios,
+        repeticoes=args.repeticoes,
+        aquecimento=args.aquecimento,
+        anos=args.anos,
+        vendas_dia=args.vendas_dia,
+        semente=args.semente,
+        perfil_sql=bool(args.perfil_sql),
+    )
+    perfil = relatorio.pop("perfil_sql", None)
+    if perfil is not None:
+        Path(args.perfil_sql).write_text(json.dumps(perfil, ensure_ascii=False, indent=2), encoding="utf-8")
+        alertas = [i for i in perfil["itens"] if i["alerta"]]
+        print(f"perfil SQL: {perfil['comandos']} comando(s), {len(alertas)} com SCAN em tabela grande", file=sys.stderr)
+        print(perfil_mod.formatar(alertas, top=10), file=sys.stderr)
+    texto = json.dumps(relatorio, ensure_ascii=False, indent=2)
+    if args.saida:
+        Path(args.saida).write_text(texto, encoding="utf-8")
+        _imprimir(relatorio)
+    else:
+        print(texto)
+
+    if args.base:
+        base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+        regressoes = comparar(relatorio, base, metrica=args.metrica, tolerancia=args.tolerancia)
+        for r in regressoes:
+            print(f"REGRESSÃO {r['cenario']}: {r['motivo']} {r['base']} → {r['atual']}", file=sys.stderr)
+        if regressoes:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
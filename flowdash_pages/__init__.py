@@ -6,6 +6,7 @@ Contém as páginas principais do sistema FlowDash (baseadas em Streamlit).
 
 Subpacotes
 ----------
+- admin ........... ferramentas de administração (desempenho/instrumentação)
 - cadastros ....... telas de cadastro (categorias, usuários, etc.)
 - dashboard ....... visualizações principais do sistema
 - dataframes ...... utilitários de DataFrame para visualização
@@ -13,11 +14,19 @@ Subpacotes
 - fechamento ...... módulo de fechamento de caixa
 - lancamentos ..... páginas de lançamentos (entrada, saída, transferência, etc.)
 - metas ........... cadastro e acompanhamento de metas
+- registro ........ registro de páginas (entrada + plano de parâmetros) usado por main.py
+
+Os subpacotes são importados sob demanda (PEP 562): abrir uma página não
+importa as demais.
 """
 
-from . import cadastros, dashboard, dataframes, dre, fechamento, lancamentos, metas
+from __future__ import annotations
+
+import importlib
+from typing import Any
 
 __all__ = [
+    "admin",
     "cadastros",
     "dashboard",
     "dataframes",
@@ -25,4 +34,13 @@ __all__ = [
     "fechamento",
     "lancamentos",
     "metas",
+    "registro",
 ]
+
+
+def __getattr__(nome: str) -> Any:
+    """Importa o subpacote sob demanda (ex.: `flowdash_pages.dre`)."""
+    if nome in __all__:
+        return importlib.import_module(f"{__name__}.{nome}")
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
@@ -0,0 +1,10 @@
+"""
+Páginas de Administração
+========================
+
+Ferramentas de operação restritas ao perfil Administrador
+(ex.: desempenho de páginas e operações do ledger).
+"""
+from .desempenho import pagina_desempenho
+
+__all__ = ["pagina_desempenho"]
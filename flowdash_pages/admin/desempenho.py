@@ -0,0 +1,186 @@
+"""
+Página de Desempenho
+====================
+
+Painel da instrumentação (`shared.instrumentacao`): quais páginas e operações
+do ledger estão lentas em produção.
+
+Funcionalidades principais
+--------------------------
+- Liga/desliga a instrumentação do processo e zera as séries.
+- Tabelas por tipo (páginas / serviços): chamadas, p50/p95/p99, tempo total,
+  comandos SQL, linhas lidas/gravadas por chamada e conexões abertas.
+- Contadores do pool de conexões e download do resumo em JSON.
+- Perfil de SQL (`shared.perfil_sql`): liga/desliga, comandos com *full scan*
+  em tabelas grandes e tabela completa por tempo acumulado, com download.
+- Páginas carregadas (`flowdash_pages.registro`): tempo de importação e de
+  resolução da função de entrada de cada página já visitada no processo.
+
+Detalhes técnicos
+-----------------
+- Os dados são do processo do Streamlit (todas as sessões) e ficam só em
+  memória; reiniciar o app zera tudo.
+- O perfil de SQL encarece cada comando: deixe ligado só durante o diagnóstico.
+
+Dependências
+------------
+- streamlit
+- pandas
+- shared.instrumentacao
+- shared.perfil_sql
+- flowdash_pages.registro
+"""
+
+from __future__ import annotations
+
+import json
+
+import pandas as pd
+import streamlit as st
+
+from flowdash_pages import registro
+from shared import instrumentacao as instr
+from shared import perfil_sql
+
+_COLUNAS = {
+    "nome": "Nome",
+    "chamadas": "Chamadas",
+    "erros": "Erros",
+    "p50": "p50 (ms)",
+    "p95": "p95 (ms)",
+    "p99": "p99 (ms)",
+    "ms_max": "Máx (ms)",
+    "ms_total": "Total (ms)",
+    "sql_por_chamada": "SQL/chamada",
+    "lidas_por_chamada": "Linhas lidas/chamada",
+    "escritas_por_chamada": "Linhas gravadas/chamada",
+    "aberturas": "Conexões abertas",
+}
+
+_COLUNAS_SQL = {
+    "ms_total": "Total (ms)",
+    "pct_tempo": "% tempo",
+    "chamadas": "Chamadas",
+    "ms_medio": "Médio (ms)",
+    "linhas": "Linhas lidas",
+    "scans": "SCANs",
+    "origem": "Origem",
+    "sql": "SQL",
+}
+
+_COLUNAS_PAGINAS = {
+    "modulo": "Módulo",
+    "funcao": "Função",
+    "import_ms": "Importação (ms)",
+    "resolucao_ms": "Resolução (ms)",
+    "parametros": "Parâmetros",
+}
+
+
+def _tabela(tipo: str, titulo: str) -> None:
+    st.markdown(f"### {titulo}")
+    linhas = instr.resumo(tipo)
+    if not linhas:
+        st.caption("Sem medições ainda.")
+        return
+    df = pd.DataFrame(linhas)[list(_COLUNAS)].rename(columns=_COLUNAS)
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+
+def _perfil_sql() -> None:
+    st.markdown("### 🔎 Perfil de SQL")
+    c1, c2, c3, c4 = st.columns(4)
+    ligado = c1.toggle("Perfil ligado", value=perfil_sql.ativo(), key="perfil_sql_ativo")
+    if ligado != perfil_sql.ativo():
+        if ligado:
+            perfil_sql.ativar()
+        else:
+            perfil_sql.desativar()
+        st.rerun()
+    if c2.button("🧹 Zerar perfil", use_container_width=True):
+        perfil_sql.limpar()
+        st.rerun()
+    limiar = int(c3.number_input(
+        "Tabela grande (linhas)", min_value=1, value=perfil_sql.LIMIAR_LINHAS, step=500, key="perfil_sql_limiar"
+    ))
+    dados = perfil_sql.exportar_json(limiar_linhas=limiar)
+    c4.download_button(
+        "⬇️ Baixar perfil",
+        data=json.dumps(dados, ensure_ascii=False, indent=2),
+        file_name="flowdash_perfil_sql.json",
+        mime="application/json",
+        use_container_width=True,
+    )
+
+    itens = dados["itens"]
+    if not itens:
+        st.caption("Sem comandos capturados (ligue o perfil e navegue pelo app).")
+        return
+
+    df = pd.DataFrame(itens)
+    df["scans"] = df["scans"].map(
+        lambda ss: "; ".join(f"{s['detalhe']} ({s['linhas_tabela'] or '?'} linhas)" for s in ss)
+    )
+    alertas = df[df["alerta"]]
+    st.markdown(f"**{len(alertas)}** de {len(df)} comando(s) com SCAN em tabela com {limiar}+ linhas")
+    if not alertas.empty:
+        st.dataframe(alertas[list(_COLUNAS_SQL)].rename(columns=_COLUNAS_SQL), use_container_width=True, hide_index=True)
+    with st.expander("Todos os comandos"):
+        st.dataframe(df[list(_COLUNAS_SQL)].rename(columns=_COLUNAS_SQL), use_container_width=True, hide_index=True)
+
+
+def _paginas_carregadas() -> None:
+    with st.expander("📦 Páginas carregadas neste processo"):
+        itens = registro.paginas()
+        if not itens:
+            st.caption("Nenhuma página resolvida ainda.")
+            return
+        df = pd.DataFrame(itens)
+        df["parametros"] = df["parametros"].map(", ".join)
+        st.dataframe(df[list(_COLUNAS_PAGINAS)].rename(columns=_COLUNAS_PAGINAS), use_container_width=True, hide_index=True)
+        st.caption(
+            "Importação = primeira visita (só inclui o que outra página ainda não tinha carregado). "
+            "Custo a frio por página: `python -m benchmarks.importacao`."
+        )
+
+
+def pagina_desempenho(caminho_banco: str):
+    st.subheader("📈 Desempenho")
+
+    c1, c2, c3 = st.columns(3)
+    ligado = c1.toggle("Instrumentação ligada", value=instr.ativo(), key="instr_ativo")
+    if ligado != instr.ativo():
+        if ligado:
+            instr.ativar()
+        else:
+            instr.desativar()
+        st.rerun()
+    if c2.button("🧹 Zerar medições", use_container_width=True):
+        instr.limpar()
+        st.rerun()
+    dados = instr.exportar_json()
+    c3.download_button(
+        "⬇️ Baixar JSON",
+        data=json.dumps(dados, ensure_ascii=False, indent=2),
+        file_name="flowdash_desempenho.json",
+        mime="application/json",
+        use_container_width=True,
+    )
+
+    if not instr.ativo():
+        st.info("Instrumentação desligada: ligue acima (ou use FLOWDASH_INSTRUMENTAR=1) e navegue pelo app.")
+
+    _tabela("pagina", "🖥️ Páginas")
+    _tabela("servico", "⚙️ Serviços e operações do ledger")
+
+    with st.expander("Pool de conexões"):
+        st.json(dados["pool"])
+    _paginas_carregadas()
+    st.caption(
+        "Percentis sobre as últimas chamadas de cada série; linhas lidas = linhas entregues "
+        "ao Python; linhas gravadas incluem as alteradas por triggers."
+    )
+
+    st.divider()
+    _perfil_sql()
+
@@ -3,9 +3,9 @@ import pandas as pd
 from datetime import date
 from utils.utils import formatar_valor
 from .cadastro_classes import CorrecaoCaixaRepository
+from repository.bancos_cadastrados_repository import BancosCadastradosRepository
 from repository.movimentacoes_repository import MovimentacoesRepository
 from shared.ids import uid_correcao_caixa
-from shared.db import get_conn
 
 
 # ------------------------------------------------------------------------------------
@@ -67,10 +67,7 @@ def inserir_mov_bancaria_correcao(
 def carregar_opcoes_banco(caminho_banco: str) -> list[str]:
     opcoes = ["Caixa", "Caixa 2"]
     try:
-        with get_conn(caminho_banco) as conn:
-            df = pd.read_sql("SELECT nome FROM bancos_cadastrados ORDER BY nome", conn)
-        if not df.empty:
-            opcoes.extend(df["nome"].tolist())
+        opcoes.extend(BancosCadastradosRepository(caminho_banco).listar_nomes())
     except Exception:
         pass
     return opcoes
@@ -1,5 +1,4 @@
 import re
-import sqlite3
 from datetime import date, datetime
 from typing import Optional
 
@@ -7,8 +6,9 @@ import pandas as pd
 import streamlit as st
 
 from flowdash_pages.cadastros.cadastro_classes import EmprestimoRepository
-from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
 from repository.movimentacoes_repository import MovimentacoesRepository
+from services.ledger import container
+from shared.cache import cache_consulta
 from shared.db import get_conn
 from utils.utils import formatar_valor, limpar_valor_formatado
 
@@ -127,9 +127,10 @@ def _obs_deposito_padrao(valor: float, extra: str = "") -> str:
 
 
 # =============================== I/O banco ===============================
+@cache_consulta("bancos_cadastrados")
 def carregar_bancos_cadastrados(caminho_banco: str) -> pd.DataFrame:
-    """Lê tabela bancos_cadastrados (id, nome)."""
-    with sqlite3.connect(caminho_banco) as conn:
+    """Lê tabela bancos_cadastrados (id, nome) — em cache até a próxima escrita."""
+    with get_conn(caminho_banco) as conn:
         return pd.read_sql("SELECT id, nome FROM bancos_cadastrados ORDER BY nome", conn)
 
 
@@ -250,7 +251,7 @@ def pagina_emprestimos_financiamentos(caminho_banco: str):
                     st.success("✅ Empréstimo salvo com sucesso!")
 
                     # 2) Descobre o id recém-inserido e programa as parcelas no CAP (mesma conexão)
-                    cap_repo = ContasAPagarMovRepository(caminho_banco)
+                    servico_emprestimo = container.obter(caminho_banco).emprestimo
                     with get_conn(caminho_banco) as conn:
                         row = conn.execute(
                             "SELECT id FROM emprestimos_financiamentos ORDER BY id DESC LIMIT 1"
@@ -260,8 +261,8 @@ def pagina_emprestimos_financiamentos(caminho_banco: str):
                         else:
                             novo_id = int(row[0])
                             try:
-                                resultado = cap_repo.gerar_parcelas_emprestimo(
-                                    conn,
+                                resultado = servico_emprestimo.programar_emprestimo_cadastrado(
+                                    conn=conn,
                                     emprestimo_id=novo_id,
                                     usuario=usuario_cadastro
                                 )
@@ -1,6 +1,5 @@
 import streamlit as st
-import pandas as pd
-import sqlite3
+from repository.bancos_cadastrados_repository import BancosCadastradosRepository
 from services.taxas import TaxaMaquinetaManager
 
 # Página de Cadastro de Taxas por Maquineta =========================================================================
@@ -27,10 +26,8 @@ def pagina_taxas_maquinas(caminho_banco: str):
         else:
             maquineta = maquineta_selecionada
 
-        # Carregar bancos cadastrados
-        with sqlite3.connect(caminho_banco) as conn:
-            df_bancos = pd.read_sql("SELECT nome FROM bancos_cadastrados ORDER BY nome", conn)
-            opcoes_bancos = df_bancos["nome"].tolist()
+        # Carregar bancos cadastrados (cache até a próxima escrita na tabela)
+        opcoes_bancos = BancosCadastradosRepository(caminho_banco).listar_nomes()
 
         if not opcoes_bancos:
             st.warning("⚠️ Nenhum banco cadastrado ainda. Cadastre em 'Cadastro de Bancos'.")
@@ -8,7 +8,8 @@ entrada correspondente em `movimentacoes_bancarias` com observação padronizada
 usuário e timestamp.
 
 Comportamentos:
-- Garante colunas dinâmicas para todos os bancos cadastrados (ALTER TABLE se faltar).
+- Garante todos os bancos cadastrados no armazenamento de saldos (coluna wide ou
+  view da engine long — ver `repository.saldos_bancos_repository`).
 - Se já existir linha para a data, soma no campo do banco; senão cria a linha.
 - Registra a movimentação bancária (entrada) com:
   - observação: "Cadastro REGISTRO MANUAL DE SALDO BANCÁRIO | Valor R$ X"
@@ -24,16 +25,15 @@ import streamlit as st
 
 from repository.movimentacoes_repository import MovimentacoesRepository
 from flowdash_pages.cadastros.cadastro_classes import BancoRepository
+from repository.saldos_bancos_repository import ajustar_saldo_banco, garantir_banco
+from shared.db import get_conn
 
 
 # ------------------------- helpers internos -------------------------
 def _garantir_colunas_bancos(conn: sqlite3.Connection, bancos: list[str]) -> None:
-    """Garante colunas para todos os bancos na tabela `saldos_bancos` (DEFAULT 0.0)."""
-    cols_info = conn.execute("PRAGMA table_info(saldos_bancos)").fetchall()
-    existentes = {c[1] for c in cols_info}
-    faltantes = [b for b in bancos if b not in existentes]
-    for b in faltantes:
-        conn.execute(f'ALTER TABLE saldos_bancos ADD COLUMN "{b}" REAL DEFAULT 0.0')
+    """Garante todos os bancos no armazenamento de `saldos_bancos` (coluna wide / view long)."""
+    for b in bancos:
+        garantir_banco(conn, b)
 
 
 def _formatar_moeda_br(v: float) -> str:
@@ -224,47 +224,14 @@ def pagina_saldos_bancarios(caminho_banco: str) -> None:
 
     if st.button("💾 Lançar Saldo (somar na mesma data)", use_container_width=True, disabled=(not usuario_atual)):
         try:
-            with sqlite3.connect(caminho_banco) as conn:
-                cur = conn.cursor()
-
-                # Garante as colunas para todos os bancos
+            with get_conn(caminho_banco) as conn:
+                # Garante os bancos no armazenamento (colunas wide / view long)
                 _garantir_colunas_bancos(conn, bancos)
 
-                # Verifica se já existe linha para a data
-                row = cur.execute(
-                    "SELECT rowid FROM saldos_bancos WHERE data = ? LIMIT 1;",
-                    (data_str,)
-                ).fetchone()
-
-                if row:
-                    # UPDATE acumulando na coluna do banco
-                    cur.execute(
-                        f'UPDATE saldos_bancos '
-                        f'SET "{banco_selecionado}" = COALESCE("{banco_selecionado}", 0) + ? '
-                        f'WHERE data = ?;',
-                        (float(valor_digitado), data_str)
-                    )
-                    # Para referência, buscamos o rowid atualizado
-                    referencia_id = cur.execute(
-                        "SELECT rowid FROM saldos_bancos WHERE data = ? LIMIT 1;",
-                        (data_str,),
-                    ).fetchone()
-                    referencia_id = int(referencia_id[0]) if referencia_id else None
-                else:
-                    # INSERT de nova linha com a data; somente a coluna do banco recebe o valor
-                    colunas = ["data"] + bancos
-                    valores = [data_str] + [
-                        float(valor_digitado) if b == banco_selecionado else 0.0
-                        for b in bancos
-                    ]
-                    placeholders = ",".join(["?"] * len(colunas))
-                    colunas_sql = ",".join([f'"{c}"' for c in colunas])
-
-                    cur.execute(
-                        f'INSERT INTO saldos_bancos ({colunas_sql}) VALUES ({placeholders})',
-                        valores
-                    )
-                    referencia_id = int(cur.lastrowid)  # funciona mesmo sem coluna 'id'
+                # Soma na linha da data (cria se necessário) + saldo acumulado
+                referencia_id = ajustar_saldo_banco(
+                    conn, data_str, banco_selecionado, float(valor_digitado), retornar_id=True
+                )
 
                 conn.commit()
 
@@ -294,7 +261,7 @@ def pagina_saldos_bancarios(caminho_banco: str) -> None:
     st.markdown("### 📋 Últimos Lançamentos (saldos_bancos)")
 
     try:
-        with sqlite3.connect(caminho_banco) as conn:
+        with get_conn(caminho_banco) as conn:
             # ordena por id se existir; senão por data
             cols_info = conn.execute("PRAGMA table_info(saldos_bancos)").fetchall()
             cols_existentes = {c[1] for c in cols_info}
@@ -3,6 +3,7 @@ import sqlite3
 import pandas as pd
 from utils.utils import gerar_hash_senha, senha_forte
 from flowdash_pages.cadastros.cadastro_classes import Usuario
+from shared.db import get_conn
 
 # Página de Cadastro de Usuários =====================================================================================
 def pagina_usuarios(caminho_banco: str):
@@ -37,7 +38,7 @@ def pagina_usuarios(caminho_banco: str):
                 senha_hash = gerar_hash_senha(senha)
                 ativo_valor = 1 if ativo == "Sim" else 0
                 try:
-                    with sqlite3.connect(caminho_banco) as conn:
+                    with get_conn(caminho_banco) as conn:
                         conn.execute("""
                             INSERT INTO usuarios (nome, email, senha, perfil, ativo)
                             VALUES (?, ?, ?, ?, ?)
@@ -52,7 +53,7 @@ def pagina_usuarios(caminho_banco: str):
 
     st.markdown("### 📋 Usuários Cadastrados:")
 
-    with sqlite3.connect(caminho_banco) as conn:
+    with get_conn(caminho_banco) as conn:
         df = pd.read_sql("SELECT id, nome, email, perfil, ativo FROM usuarios", conn)
 
     if not df.empty:
@@ -1,5 +1,200 @@
+"""
+Página de Dashboard
+===================
+
+Indicadores e gráficos de vendas, saídas e saldos bancários.
+
+Funcionalidades principais
+--------------------------
+- KPIs do período (faturamento bruto/líquido, taxas, saídas, resultado, ticket).
+- Vendas por período, forma de pagamento, bandeira e vendedor.
+- Saídas por categoria/subcategoria.
+- Saldos por banco (fim de mês).
+- Download (CSV) das vendas e saídas do período.
+
+Detalhes técnicos
+-----------------
+- Lê **apenas** os fatos pré-agregados de `repository.fatos_repository`
+  (uma linha por dia × dimensões) e o índice `saldos_bancos_acumulado`; nenhuma
+  tabela de lançamentos é carregada inteira.
+- Ao abrir, os fatos são atualizados só nas datas pendentes (`atualizar_fatos`)
+  e um atualizador em segundo plano é iniciado (uma vez por processo).
+- O CSV do período só é montado a pedido, lendo os lançamentos em chunks
+  (`flowdash_pages.dataframes.exportar_csv`): memória limitada mesmo em
+  períodos longos.
+
+Dependências
+------------
+- streamlit
+- pandas
+- repository.fatos_repository
+- repository.saldos_bancos_repository.saldos_bancos_fim_de_mes
+- flowdash_pages.dataframes.exportar_csv
+"""
+
+from __future__ import annotations
+
+import calendar
+import io
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
 import streamlit as st
 
+from flowdash_pages.dataframes import exportar_csv
+from repository.fatos_repository import agregar, atualizar_fatos, iniciar_atualizador
+from repository.saldos_bancos_repository import saldos_bancos_fim_de_mes
+from shared.db import get_conn
+from utils.utils import formatar_valor
+
+logger = logging.getLogger(__name__)
+
+_MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+
+# Download do período: {tabela: (colunas, coluna de data)}
+_CSV_PERIODO: Dict[str, Tuple[Tuple[str, ...], str]] = {
+    "entrada": (
+        ("Data", "Valor", "valor_liquido", "Forma_de_Pagamento", "Parcelas", "Bandeira", "maquineta", "Usuario"),
+        "Data",
+    ),
+    "saida": (
+        ("Data", "Valor", "Categoria", "Sub_Categoria", "Descricao", "Forma_de_Pagamento", "Usuario"),
+        "Data",
+    ),
+}
+
+
+# ----------------------------------------------------------------------------
+# Dados (fatos agregados)
+# ----------------------------------------------------------------------------
+def _periodo(ano: int, mes: Optional[int]) -> Tuple[str, str]:
+    """Intervalo [inicio, fim] em 'YYYY-MM-DD' do ano ou do mês."""
+    if mes is None:
+        return f"{ano:04d}-01-01", f"{ano:04d}-12-31"
+    ultimo = calendar.monthrange(ano, mes)[1]
+    return f"{ano:04d}-{mes:02d}-01", f"{ano:04d}-{mes:02d}-{ultimo:02d}"
+
+
+def _df(
+    caminho_banco: str,
+    fato: str,
+    dims: Sequence[str],
+    inicio: str,
+    fim: str,
+    granularidade: Optional[str],
+    filtros: Optional[Dict[str, Any]] = None,
+) -> pd.DataFrame:
+    with get_conn(caminho_banco) as conn:
+        rows = agregar(
+            conn, fato, dims, inicio, fim, granularidade=granularidade, filtros=filtros
+        )
+    return pd.DataFrame(rows)
+
+
+def _anos_disponiveis(caminho_banco: str) -> List[int]:
+    with get_conn(caminho_banco) as conn:
+        anos = {
+            int(r["periodo"])
+            for fato in ("fato_vendas_dia", "fato_saidas_dia")
+            for r in agregar(conn, fato, granularidade="ano")
+            if str(r["periodo"]).isdigit()
+        }
+    anos.add(date.today().year)
+    return sorted(anos, reverse=True)
+
+
+def _atualizar(caminho_banco: str) -> None:
+    """Processa as datas pendentes e garante o atualizador em segundo plano."""
+    try:
+        with get_conn(caminho_banco) as conn:
+            atualizar_fatos(conn)
+        iniciar_atualizador(caminho_banco)
+    except Exception as e:
+        logger.warning("dashboard: falha ao atualizar fatos: %s", e)
+        st.warning(f"⚠️ Não foi possível atualizar os indicadores: {e}")
+
+
+# ----------------------------------------------------------------------------
+# UI
+# ----------------------------------------------------------------------------
+def _kpis(df_vendas: pd.DataFrame, df_saidas: pd.DataFrame) -> None:
+    bruto = float(df_vendas["valor_bruto"].sum()) if not df_vendas.empty else 0.0
+    liquido = float(df_vendas["valor_liquido"].sum()) if not df_vendas.empty else 0.0
+    qtd = int(df_vendas["qtd"].sum()) if not df_vendas.empty else 0
+    saidas = float(df_saidas["valor"].sum()) if not df_saidas.empty else 0.0
+
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("Faturamento", formatar_valor(bruto))
+    c2.metric("Líquido", formatar_valor(liquido))
+    c3.metric("Taxas", formatar_valor(bruto - liquido))
+    c4.metric("Saídas", formatar_valor(saidas))
+    c5.metric("Resultado", formatar_valor(liquido - saidas))
+    st.caption(
+        f"{qtd} venda(s) — ticket médio {formatar_valor(bruto / qtd if qtd else 0.0)}"
+    )
+
+
+def _grafico_barras(df: pd.DataFrame, indice: str, valor: str, titulo: str) -> None:
+    st.markdown(f"**{titulo}**")
+    if df.empty:
+        st.caption("Sem dados no período.")
+        return
+    serie = (
+        df.assign(**{indice: df[indice].replace("", "—")})
+        .groupby(indice)[valor]
+        .sum()
+        .sort_values(ascending=False)
+    )
+    st.bar_chart(serie)
+
+
+def _grafico_saldos(caminho_banco: str, ano: int) -> None:
+    st.markdown("**Saldos por banco (fim de mês)**")
+    with get_conn(caminho_banco) as conn:
+        rows = saldos_bancos_fim_de_mes(conn, fim=f"{ano:04d}-12-31")
+    if not rows:
+        st.caption("Sem saldos registrados.")
+        return
+    df = pd.DataFrame(rows, columns=["mes", "banco", "saldo"])
+    meses = [f"{ano:04d}-{m:02d}" for m in range(1, 13)]
+    pivot = (
+        df.pivot(index="mes", columns="banco", values="saldo")
+        .reindex(sorted(set(df["mes"]) | set(meses)))
+        .ffill()
+        .fillna(0.0)
+    )
+    st.line_chart(pivot.loc[pivot.index.isin(meses)])
+
+
+def _csv_periodo(caminho_banco: str, tabela: str, inicio: str, fim: str) -> str:
+    """Lançamentos de `tabela` no período em CSV (lidos em chunks)."""
+    colunas, coluna_data = _CSV_PERIODO[tabela]
+    buf = io.StringIO()
+    exportar_csv(
+        caminho_banco, tabela, colunas, buf,
+        coluna_data=coluna_data, inicio=inicio, fim=fim, order_by=f'"{coluna_data}"',
+    )
+    return buf.getvalue()
+
+
+def _download_periodo(caminho_banco: str, inicio: str, fim: str) -> None:
+    with st.expander("Lançamentos do período (CSV)"):
+        if not st.button("Gerar arquivos", key="dash_csv"):
+            return
+        c1, c2 = st.columns(2)
+        for col, tabela, rotulo in ((c1, "entrada", "Vendas"), (c2, "saida", "Saídas")):
+            try:
+                dados = _csv_periodo(caminho_banco, tabela, inicio, fim)
+            except ValueError as e:  # coluna ausente em banco antigo
+                col.caption(f"{rotulo}: {e}")
+                continue
+            col.download_button(
+                f"⬇️ {rotulo}", dados, file_name=f"{tabela}_{inicio}_{fim}.csv", mime="text/csv"
+            )
+
+
 def render_dashboard(caminho_banco: str):
     """
     Ponto de entrada do Dashboard.
@@ -8,4 +203,73 @@ def render_dashboard(caminho_banco: str):
         caminho_banco: Caminho para o banco SQLite.
     """
     st.subheader("📊 Dashboard")
-    st.info("🚧 Em desenvolvimento...")
+    _atualizar(caminho_banco)
+
+    anos = _anos_disponiveis(caminho_banco)
+    f1, f2 = st.columns(2)
+    ano = int(f1.selectbox("Ano", anos, index=0, key="dash_ano"))
+    mes_label = f2.selectbox("Mês", ["Todos"] + _MESES, index=0, key="dash_mes")
+    mes = None if mes_label == "Todos" else _MESES.index(mes_label) + 1
+    inicio, fim = _periodo(ano, mes)
+    granularidade = "mes" if mes is None else "dia"
+
+    df_vendas = _df(caminho_banco, "fato_vendas_dia", [], inicio, fim, granularidade)
+    df_saidas = _df(caminho_banco, "fato_saidas_dia", [], inicio, fim, granularidade)
+    _kpis(df_vendas, df_saidas)
+
+    # Evolução (vendas x saídas)
+    st.markdown("**Vendas x Saídas**")
+    if df_vendas.empty and df_saidas.empty:
+        st.caption("Sem dados no período.")
+    else:
+        evol = pd.concat(
+            [
+                df_vendas.set_index("periodo")["valor_bruto"].rename("Vendas")
+                if not df_vendas.empty else pd.Series(name="Vendas", dtype=float),
+                df_saidas.set_index("periodo")["valor"].rename("Saídas")
+                if not df_saidas.empty else pd.Series(name="Saídas", dtype=float),
+            ],
+            axis=1,
+        ).fillna(0.0).sort_index()
+        st.bar_chart(evol)
+
+    # Vendas por dimensão (uma consulta por dimensão, sem coluna de período)
+    c1, c2 = st.columns(2)
+    with c1:
+        _grafico_barras(
+            _df(caminho_banco, "fato_vendas_dia", ["forma"], inicio, fim, None),
+            "forma", "valor_bruto", "Vendas por forma de pagamento",
+        )
+    with c2:
+        _grafico_barras(
+            _df(caminho_banco, "fato_vendas_dia", ["bandeira"], inicio, fim, None),
+            "bandeira", "valor_bruto", "Vendas por bandeira",
+        )
+
+    c3, c4 = st.columns(2)
+    with c3:
+        _grafico_barras(
+            _df(caminho_banco, "fato_vendas_dia", ["usuario"], inicio, fim, None),
+            "usuario", "valor_bruto", "Vendas por vendedor",
+        )
+    with c4:
+        _grafico_barras(
+            _df(caminho_banco, "fato_saidas_dia", ["categoria"], inicio, fim, None),
+            "categoria", "valor", "Saídas por categoria",
+        )
+
+    with st.expander("Saídas por subcategoria"):
+        df_sub = _df(caminho_banco, "fato_saidas_dia", ["categoria", "subcategoria"], inicio, fim, None)
+        if df_sub.empty:
+            st.caption("Sem dados no período.")
+        else:
+            df_sub = df_sub.sort_values("valor", ascending=False)
+            df_sub["valor"] = df_sub["valor"].map(formatar_valor)
+            st.dataframe(
+                df_sub[["categoria", "subcategoria", "qtd", "valor"]],
+                use_container_width=True,
+                hide_index=True,
+            )
+
+    _grafico_saldos(caminho_banco, ano)
+    _download_periodo(caminho_banco, inicio, fim)
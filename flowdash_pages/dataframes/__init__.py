@@ -5,6 +5,6 @@ Módulo de DataFrames
 Centraliza carregamento e transformação de DataFrames
 para uso nas páginas do FlowDash.
 """
-from .dataframes import get_dataframe  # ajuste para a função principal que você usa
+from .dataframes import exportar_csv, get_dataframe, ler_tabela  # ajuste para a função principal que você usa
 
-__all__ = ["get_dataframe"]
+__all__ = ["get_dataframe", "ler_tabela", "exportar_csv"]
@@ -1,10 +1,24 @@
 # flowdash_pages/dataframes/dataframes.py
 from __future__ import annotations
+import re
 import sqlite3
-from typing import Iterable, Optional, Sequence
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, Mapping, Optional, Sequence, Union
 
 import pandas as pd
 
+from shared.db import get_conn
+from shared.schema import colunas_ordenadas
+from utils.utils import resolve_db_path
+
+# Colunas de baixa cardinalidade convertidas para `category` em `ler_tabela`
+# (comparação sem diferenciar maiúsculas).
+COLUNAS_CATEGORIA = frozenset({
+    "banco", "forma", "forma_de_pagamento", "bandeira", "maquineta",
+    "tipo", "origem", "categoria", "sub_categoria", "usuario", "status",
+})
+
 
 def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
     cur = conn.execute(
@@ -57,11 +71,261 @@ def get_dataframe(
     final_sql = " ".join(sql_parts)
     params = tuple(params) if params is not None else ()
 
-    with sqlite3.connect(caminho_banco, timeout=30) as conn:
-        conn.execute("PRAGMA foreign_keys=ON;")
+    with get_conn(caminho_banco) as conn:
         if not _table_exists(conn, table.strip()):
             # retorna DF vazio (com colunas pedidas, se houver)
             return pd.DataFrame(columns=list(columns) if columns else [])
         df = pd.read_sql(final_sql, conn, params=params)
 
     return df
+
+
+# ---------------------------------------------------------------------------
+# Leitor estendido (projeção obrigatória, faixa de datas, dtypes, chunks)
+# ---------------------------------------------------------------------------
+DataLike = Union[str, date, datetime]
+
+
+def _iso(d: DataLike) -> str:
+    """Normaliza date/datetime/str para 'YYYY-MM-DD'."""
+    if isinstance(d, datetime):
+        return d.date().isoformat()
+    if isinstance(d, date):
+        return d.isoformat()
+    s = str(d).strip()[:10]
+    try:
+        return date.fromisoformat(s).isoformat()
+    except ValueError:
+        raise ValueError(f"Data inválida (esperado 'YYYY-MM-DD'): {d!r}") from None
+
+
+def _tem_indice_date(conn: sqlite3.Connection, table: str, col: str) -> bool:
+    """True se existir índice de expressão `DATE(col)` na tabela."""
+    alvo = re.compile(rf'date\(\s*"?{re.escape(col.lower())}"?\s*\)')
+    for (sql,) in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    ):
+        if alvo.search(str(sql).lower()):
+            return True
+    return False
+
+
+def _filtro_datas(
+    conn: sqlite3.Connection, table: str, col: str, inicio: Optional[DataLike], fim: Optional[DataLike]
+) -> tuple[list[str], list[str]]:
+    """
+    Cláusulas da faixa [inicio, fim] (inclusive) sobre `col`.
+
+    Com índice `DATE(col)` filtra por `DATE(col)` (usa o índice); senão compara o
+    texto ISO (`col >= inicio AND col < fim + 1 dia`), o que usa um índice
+    simples da coluna e também cobre valores com hora.
+    """
+    where: list[str] = []
+    params: list[str] = []
+    usar_date = _tem_indice_date(conn, table, col)
+    if inicio is not None:
+        where.append(f'DATE("{col}") >= ?' if usar_date else f'"{col}" >= ?')
+        params.append(_iso(inicio))
+    if fim is not None:
+        fim_iso = _iso(fim)
+        if usar_date:
+            where.append(f'DATE("{col}") <= ?')
+            params.append(fim_iso)
+        else:
+            where.append(f'"{col}" < ?')
+            params.append((date.fromisoformat(fim_iso) + timedelta(days=1)).isoformat())
+    return where, params
+
+
+def _aplicar_dtypes(
+    df: pd.DataFrame,
+    dtypes: Mapping[str, Any],
+    categorias: bool,
+    float32: bool,
+    parse_dates: Sequence[str],
+) -> pd.DataFrame:
+    for c in parse_dates:
+        if c in df.columns:
+            df[c] = pd.to_datetime(df[c], errors="coerce")
+    if categorias:
+        for c in df.columns:
+            if c.lower() in COLUNAS_CATEGORIA and c not in dtypes and df[c].dtype == object:
+                df[c] = df[c].astype("category")
+    if float32:
+        for c in df.select_dtypes(include="float64").columns:
+            if c not in dtypes:
+                df[c] = df[c].astype("float32")
+    if dtypes:
+        df = df.astype({c: t for c, t in dtypes.items() if c in df.columns})
+    return df
+
+
+def _conexao_leitura(caminho_banco: Any) -> sqlite3.Connection:
+    """Conexão somente leitura **fora do pool** (dona do gerador de chunks)."""
+    caminho = Path(resolve_db_path(caminho_banco)).resolve()
+    conn = sqlite3.connect(f"{caminho.as_uri()}?mode=ro", uri=True, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA busy_timeout=30000;")
+    return conn
+
+
+def _iterar_chunks(
+    caminho_banco: str,
+    sql: str,
+    params: tuple,
+    chunksize: int,
+    opcoes: Dict[str, Any],
+) -> Iterator[pd.DataFrame]:
+    # Conexão própria (não a do pool): um `with get_conn` aberto entre os `yield`
+    # prenderia a transação da thread enquanto o gerador não terminasse.
+    # Fechada no `finally` — também quando o consumidor abandona o gerador.
+    conn = _conexao_leitura(caminho_banco)
+    try:
+        for chunk in pd.read_sql(sql, conn, params=params, chunksize=chunksize):
+            yield _aplicar_dtypes(chunk, **opcoes)
+    finally:
+        conn.close()
+
+
+def ler_tabela(
+    caminho_banco: str,
+    table: str,
+    columns: Sequence[str],
+    *,
+    coluna_data: Optional[str] = None,
+    inicio: Optional[DataLike] = None,
+    fim: Optional[DataLike] = None,
+    where: Optional[str] = None,
+    params: Optional[Iterable] = None,
+    order_by: Optional[str] = None,
+    dtypes: Optional[Mapping[str, Any]] = None,
+    categorias: bool = True,
+    float32: bool = False,
+    parse_dates: Optional[Sequence[str]] = None,
+    chunksize: Optional[int] = None,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """
+    Lê colunas de uma tabela com filtro de datas e tipos controlados.
+
+    Diferente de `get_dataframe`, a projeção é obrigatória (nada de `SELECT *`)
+    e as colunas são validadas contra o schema (sem diferenciar maiúsculas; o
+    DataFrame usa o nome real da coluna).
+
+    Args:
+        caminho_banco: caminho do arquivo .db (SQLite).
+        table: nome da tabela/view.
+        columns: colunas a selecionar (obrigatório, não vazio).
+        coluna_data: coluna usada em `inicio`/`fim`; também é convertida para
+            datetime, salvo se `parse_dates` for informado.
+        inicio/fim: faixa inclusiva (date, datetime ou 'YYYY-MM-DD').
+        where/params: filtro adicional (sem a palavra WHERE) e seus parâmetros.
+        order_by: cláusula ORDER BY (sem a palavra ORDER BY).
+        dtypes: tipos explícitos por coluna (aplicados por último).
+        categorias: converte colunas de `COLUNAS_CATEGORIA` para `category`.
+        float32: reduz colunas float64 para float32.
+        parse_dates: colunas convertidas com `pd.to_datetime` (inválidas → NaT).
+        chunksize: se informado, retorna um gerador de DataFrames com até
+            `chunksize` linhas (memória limitada em históricos grandes). O
+            gerador lê por uma conexão somente leitura própria, fora do pool,
+            fechada ao terminar (ou ao ser descartado).
+
+    Returns:
+        DataFrame, ou `Iterator[DataFrame]` quando `chunksize` é informado.
+        Tabela inexistente → DataFrame vazio (ou gerador vazio) com `columns`.
+
+    Raises:
+        ValueError: `columns` vazio, coluna inexistente, datas sem `coluna_data`
+            ou data inválida.
+    """
+    if not isinstance(table, str) or not table.strip():
+        raise ValueError("ler_tabela: 'table' deve ser uma string não vazia.")
+    table = table.strip()
+    pedidas = [c.strip() for c in (columns or []) if isinstance(c, str) and c.strip()]
+    if not pedidas:
+        raise ValueError("ler_tabela: informe as colunas (projeção obrigatória).")
+    if (inicio is not None or fim is not None) and not coluna_data:
+        raise ValueError("ler_tabela: 'inicio'/'fim' exigem 'coluna_data'.")
+    if chunksize is not None and (not isinstance(chunksize, int) or chunksize <= 0):
+        raise ValueError("ler_tabela: 'chunksize' deve ser um inteiro positivo.")
+
+    with get_conn(caminho_banco) as conn:
+        reais = {c.lower(): c for c in colunas_ordenadas(conn, table)}
+        if not reais:
+            vazio = pd.DataFrame(columns=pedidas)
+            return iter(()) if chunksize else vazio
+
+        def _real(c: str) -> str:
+            if c.lower() not in reais:
+                raise ValueError(f"ler_tabela: coluna inexistente em {table!r}: {c!r}")
+            return reais[c.lower()]
+
+        cols = [_real(c) for c in pedidas]
+        clausulas: list[str] = []
+        valores: list[Any] = []
+        col_data = None
+        if coluna_data:
+            col_data = _real(coluna_data)
+            clausulas, valores = _filtro_datas(conn, table, col_data, inicio, fim)
+        if where and where.strip():
+            clausulas.append(f"({where.strip()})")
+            valores.extend(params or ())
+
+        cols_sql = ", ".join(f'"{c}"' for c in cols)
+        sql = f'SELECT {cols_sql} FROM "{table}"'
+        if clausulas:
+            sql += " WHERE " + " AND ".join(clausulas)
+        if order_by and order_by.strip():
+            sql += f" ORDER BY {order_by.strip()}"
+
+        if parse_dates is None:
+            datas = [col_data] if col_data and col_data in cols else []
+        else:
+            datas = [_real(c) for c in parse_dates]
+        opcoes = {
+            "dtypes": dict(dtypes or {}),
+            "categorias": categorias,
+            "float32": float32,
+            "parse_dates": datas,
+        }
+        if chunksize:
+            return _iterar_chunks(caminho_banco, sql, tuple(valores), chunksize, opcoes)
+        df = pd.read_sql(sql, conn, params=tuple(valores))
+    return _aplicar_dtypes(df, **opcoes)
+
+
+def exportar_csv(
+    caminho_banco: str,
+    table: str,
+    columns: Sequence[str],
+    destino: Union[str, Path, IO[str]],
+    *,
+    chunksize: int = 20_000,
+    **opcoes: Any,
+) -> int:
+    """
+    Grava em CSV as linhas de `ler_tabela(...)` em chunks (memória limitada).
+
+    Args:
+        destino: caminho do arquivo ou texto aberto (ex.: `io.StringIO`).
+        chunksize: linhas por chunk.
+        opcoes: demais filtros de `ler_tabela` (`coluna_data`, `inicio`, `fim`,
+            `where`, `params`, `order_by`...).
+
+    Returns:
+        int: linhas gravadas (só o cabeçalho quando não há linhas).
+    """
+    opcoes.setdefault("categorias", False)
+    chunks = ler_tabela(caminho_banco, table, columns, chunksize=chunksize, **opcoes)
+    fechar = not hasattr(destino, "write")
+    arq: IO[str] = open(destino, "w", encoding="utf-8", newline="") if fechar else destino  # type: ignore[arg-type]
+    total = 0
+    try:
+        for chunk in chunks:
+            chunk.to_csv(arq, index=False, header=total == 0)
+            total += len(chunk)
+        if total == 0:
+            pd.DataFrame(columns=list(columns)).to_csv(arq, index=False)
+    finally:
+        if fechar:
+            arq.close()
+    return total
@@ -1,9 +1,205 @@
+"""
+Página DRE (Demonstrativo de Resultados)
+========================================
+
+DRE mensal: receitas, taxas de cartão, CMV, despesas operacionais por
+categoria/subcategoria, despesas financeiras e resultado.
+
+Detalhes técnicos
+-----------------
+- Lê a consolidação mensal `dre_mensal` (`repository.dre_repository`); ao abrir,
+  apenas as competências alteradas desde a última visita são recalculadas —
+  abrir 24 meses não varre as tabelas de lançamentos.
+- O detalhe das saídas do período (CSV) só é montado a pedido, lido em chunks
+  (`flowdash_pages.dataframes.exportar_csv`).
+
+Dependências
+------------
+- streamlit
+- pandas
+- repository.dre_repository
+- flowdash_pages.dataframes.exportar_csv
+"""
+
+from __future__ import annotations
+
+import calendar
+import io
+import logging
+from datetime import date
+from typing import Dict, List, Tuple
+
+import pandas as pd
 import streamlit as st
 
+from flowdash_pages.dataframes import exportar_csv
+from repository.dre_repository import (
+    CMV,
+    DESCONTOS,
+    DESPESA,
+    JUROS,
+    MULTAS,
+    PAGAMENTO_OBRIGACOES,
+    RECEITA_BRUTA,
+    TAXAS_CARTAO,
+    atualizar_dre,
+    dre_periodo,
+)
+from shared.db import get_conn
+from utils.utils import formatar_valor
+
+logger = logging.getLogger(__name__)
+
+_MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+_COLUNAS_SAIDA = ("Data", "Valor", "Categoria", "Sub_Categoria", "Descricao", "Forma_de_Pagamento", "Usuario")
+
+
+# ----------------------------------------------------------------------------
+# Montagem do demonstrativo
+# ----------------------------------------------------------------------------
+def _competencias(fim: date, meses: int) -> List[str]:
+    """Lista 'YYYY-MM' dos `meses` que terminam na competência de `fim`."""
+    ano, mes = fim.year, fim.month
+    out: List[str] = []
+    for _ in range(meses):
+        out.append(f"{ano:04d}-{mes:02d}")
+        ano, mes = (ano - 1, 12) if mes == 1 else (ano, mes - 1)
+    return out[::-1]
+
+
+def montar_dre(linhas: List[Dict], comps: List[str]) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Monta o demonstrativo (linhas × competências + Total) a partir de `dre_periodo`.
+
+    Returns:
+        (dre, despesas): DataFrame do demonstrativo e detalhamento das despesas
+        operacionais por categoria/subcategoria.
+    """
+    df = pd.DataFrame(linhas, columns=["competencia", "linha", "categoria", "subcategoria", "valor"])
+
+    def _serie(linha: str) -> pd.Series:
+        s = df[df["linha"] == linha].groupby("competencia")["valor"].sum()
+        return s.reindex(comps, fill_value=0.0)
+
+    receita = _serie(RECEITA_BRUTA)
+    taxas = _serie(TAXAS_CARTAO)
+    cmv = _serie(CMV)
+    despesas = _serie(DESPESA)
+    juros, multas, descontos = _serie(JUROS), _serie(MULTAS), _serie(DESCONTOS)
+
+    receita_liq = receita - taxas
+    lucro_bruto = receita_liq - cmv
+    resultado_oper = lucro_bruto - despesas
+    resultado = resultado_oper - juros - multas + descontos
+
+    dre = pd.DataFrame(
+        {
+            "Receita bruta": receita,
+            "(−) Taxas de cartão": -taxas,
+            "= Receita líquida": receita_liq,
+            "(−) CMV (compras de mercadorias)": -cmv,
+            "= Lucro bruto": lucro_bruto,
+            "(−) Despesas operacionais": -despesas,
+            "= Resultado operacional": resultado_oper,
+            "(−) Juros": -juros,
+            "(−) Multas": -multas,
+            "(+) Descontos obtidos": descontos,
+            "= Resultado líquido": resultado,
+            "Pagamentos de obrigações (caixa, fora do resultado)": _serie(PAGAMENTO_OBRIGACOES),
+        }
+    ).T
+    dre["Total"] = dre.sum(axis=1)
+
+    det = df[df["linha"] == DESPESA]
+    if det.empty:
+        desp = pd.DataFrame(columns=["Categoria", "Subcategoria"] + comps + ["Total"])
+    else:
+        desp = (
+            det.pivot_table(
+                index=["categoria", "subcategoria"],
+                columns="competencia",
+                values="valor",
+                aggfunc="sum",
+                fill_value=0.0,
+            )
+            .reindex(columns=comps, fill_value=0.0)
+        )
+        desp["Total"] = desp.sum(axis=1)
+        desp = (
+            desp.sort_values("Total", ascending=False)
+            .reset_index()
+            .rename(columns={"categoria": "Categoria", "subcategoria": "Subcategoria"})
+        )
+    return dre, desp
+
+
+def _csv_saidas(caminho_banco: str, comps: List[str]) -> str:
+    """Saídas das competências `comps` em CSV (lidas em chunks)."""
+    ano, mes = int(comps[-1][:4]), int(comps[-1][5:7])
+    fim = f"{comps[-1]}-{calendar.monthrange(ano, mes)[1]:02d}"
+    buf = io.StringIO()
+    exportar_csv(
+        caminho_banco, "saida", _COLUNAS_SAIDA, buf,
+        coluna_data="Data", inicio=f"{comps[0]}-01", fim=fim, order_by='"Data"',
+    )
+    return buf.getvalue()
+
+
+# ----------------------------------------------------------------------------
+# Página
+# ----------------------------------------------------------------------------
 def render_dre(caminho_banco: str):
     """Ponto de entrada padrão da página DRE."""
     st.subheader("📉 DRE")
-    st.info("🚧 Em desenvolvimento...")
+
+    hoje = date.today()
+    c1, c2, c3 = st.columns(3)
+    ano = int(c1.number_input("Ano final", min_value=2000, max_value=2100, value=hoje.year, step=1))
+    mes = _MESES.index(c2.selectbox("Mês final", _MESES, index=hoje.month - 1)) + 1
+    meses = int(c3.selectbox("Período", [3, 6, 12, 24], index=2, format_func=lambda n: f"{n} meses"))
+    comps = _competencias(date(ano, mes, 1), meses)
+
+    try:
+        with get_conn(caminho_banco) as conn:
+            atualizar_dre(conn)
+            linhas = dre_periodo(conn, comps[0], comps[-1])
+    except Exception as e:
+        logger.warning("dre: falha ao consolidar: %s", e)
+        st.error(f"❌ Não foi possível montar o DRE: {e}")
+        return
+
+    if not linhas:
+        st.info("Sem lançamentos no período.")
+        return
+
+    dre, desp = montar_dre(linhas, comps)
+    st.dataframe(dre.apply(lambda col: col.map(formatar_valor)), use_container_width=True)
+
+    with st.expander("Despesas operacionais por categoria/subcategoria"):
+        if desp.empty:
+            st.caption("Sem despesas operacionais no período.")
+        else:
+            cols_valor = comps + ["Total"]
+            st.dataframe(
+                desp.assign(**{c: desp[c].map(formatar_valor) for c in cols_valor}),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+    with st.expander("Saídas do período (CSV)"):
+        if st.button("Gerar arquivo", key="dre_csv"):
+            st.download_button(
+                "⬇️ Saídas",
+                _csv_saidas(caminho_banco, comps),
+                file_name=f"saidas_{comps[0]}_{comps[-1]}.csv",
+                mime="text/csv",
+            )
+
+    st.caption(
+        "Receita e taxas: vendas (entrada). CMV: compras de mercadorias no mês da compra. "
+        "Juros/multas/descontos: encargos de contas a pagar no mês do pagamento."
+    )
+
 
 # Alias para retrocompatibilidade
 pagina_dre = render_dre
@@ -1,139 +1,231 @@
-import streamlit as st
-import sqlite3
+"""
+Página de Fechamento de Caixa
+=============================
+
+Fechamento de Caixa / Caixa 2 (v2): abertura (último snapshot anterior),
+movimentos do dia, saldo esperado, saldo registrado e diferença.
+
+Funcionalidades principais
+--------------------------
+- **Dia**: resumo e conciliação do dia, totais por banco/origem e lançamentos.
+- **Período**: conciliação de todos os dias de um mês (ou intervalo) numa
+  tabela, com os dias divergentes destacados.
+
+Detalhes técnicos
+-----------------
+- Todos os números vêm de consultas agregadas de
+  `repository.fechamento_repository` (um período inteiro = uma consulta);
+  a página não pivota linhas brutas.
+
+Dependências
+------------
+- streamlit
+- pandas
+- repository.fechamento_repository
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
 import pandas as pd
-from datetime import date
+import streamlit as st
+
+from repository.fechamento_repository import fechamento_periodo, lancamentos_caixa, totais_por
+from shared.db import get_conn
 from utils.utils import formatar_valor
 
+logger = logging.getLogger(__name__)
+
+_TOLERANCIA = 0.005  # diferenças abaixo de meio centavo = conciliado
+_MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+
+
 # ------------------ helpers ------------------
-def _get_saldo_caixas(caminho_banco: str, data_ref: str):
-    """Retorna (caixa, caixa_2) cadastrados em saldos_caixas para a data."""
-    with sqlite3.connect(caminho_banco) as conn:
-        row = conn.execute(
-            "SELECT caixa, caixa_2 FROM saldos_caixas WHERE data = ? LIMIT 1",
-            (data_ref,)
-        ).fetchone()
-    if row:
-        return float(row[0] or 0.0), float(row[1] or 0.0)
-    return 0.0, 0.0
-
-def _get_movimentos_caixa(caminho_banco: str, data_ref: str):
-    """Movimentações do dia (Caixa / Caixa 2) em movimentacoes_bancarias."""
-    like_pat = f"{data_ref}%"
-    with sqlite3.connect(caminho_banco) as conn:
-        df = pd.read_sql(
-            """
-            SELECT id, data, banco, tipo, origem, valor, observacao,
-                   referencia_tabela, referencia_id
-            FROM movimentacoes_bancarias
-            WHERE data LIKE ?
-              AND banco IN ('Caixa','Caixa 2')
-            ORDER BY id
-            """,
-            conn,
-            params=(like_pat,)
-        )
-    # normaliza tipos
-    if not df.empty:
-        df["tipo"] = df["tipo"].str.lower().str.strip()
-        df["origem"] = df["origem"].astype(str).str.strip()
-        df["valor"] = pd.to_numeric(df["valor"], errors="coerce").fillna(0.0)
-    return df
+def _fmt_dif(v: Optional[float]) -> str:
+    return "sem snapshot" if v is None else formatar_valor(v)
 
-# ------------------ página ------------------
-def pagina_fechamento_caixa(caminho_banco: str):
-    st.subheader("🧾 Fechamento de Caixa — v1")
 
-    data_sel = st.date_input("📅 Data do fechamento", value=date.today())
-    data_ref = str(data_sel)
+def _fmt_opc(v: Optional[float]) -> str:
+    return "—" if v is None or pd.isna(v) else formatar_valor(v)
+
 
-    # Saldos cadastrados (operacionais)
-    caixa, caixa2 = _get_saldo_caixas(caminho_banco, data_ref)
+def _status(r: Dict[str, Any]) -> str:
+    if r["sem_abertura"]:
+        return "⚪ sem abertura"
+    difs = [r["diferenca_caixa"], r["diferenca_caixa2"]]
+    if all(d is None for d in difs):
+        return "⚪ sem snapshot"
+    if any(d is not None and abs(d) > _TOLERANCIA for d in difs):
+        return "🔴 divergente"
+    return "🟢 conciliado"
 
-    # Movimentações do dia (Caixa/Caixa 2)
-    df_mov = _get_movimentos_caixa(caminho_banco, data_ref)
 
-    # Totais do dia
-    if not df_mov.empty:
-        entradas_total = df_mov.loc[df_mov["tipo"] == "entrada", "valor"].sum()
-        saidas_total = df_mov.loc[df_mov["tipo"] == "saida", "valor"].sum()
+def _tabela_totais(linhas: List[Dict[str, Any]], grupo: str, titulo: str) -> None:
+    st.markdown(f"**{titulo}:**")
+    if not linhas:
+        st.caption("Sem movimentações.")
+        return
+    df = pd.DataFrame(linhas)
+    df["liquido"] = df["entrada"] - df["saida"]
+    for c in ("entrada", "saida", "liquido"):
+        df[c] = df[c].map(formatar_valor)
+    st.dataframe(
+        df[[grupo, "qtd", "entrada", "saida", "liquido"]].rename(
+            columns={grupo: grupo.capitalize(), "qtd": "Qtd", "entrada": "Entrada",
+                     "saida": "Saída", "liquido": "Líquido"}
+        ),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+
+# ------------------ modo: dia ------------------
+def _render_dia(caminho_banco: str) -> None:
+    data_sel = st.date_input("📅 Data do fechamento", value=date.today())
+    data_ref = str(data_sel)
 
-        # Correções de caixa no dia (entrada/saída)
-        df_corr = df_mov[df_mov["origem"] == "correcao_caixa"]
-        corr_ent = df_corr.loc[df_corr["tipo"] == "entrada", "valor"].sum() if not df_corr.empty else 0.0
-        corr_sai = df_corr.loc[df_corr["tipo"] == "saida", "valor"].sum() if not df_corr.empty else 0.0
-        corr_liq = corr_ent - corr_sai
-    else:
-        entradas_total = saidas_total = corr_ent = corr_sai = corr_liq = 0.0
+    with get_conn(caminho_banco) as conn:
+        linhas = fechamento_periodo(conn, data_ref)
+        por_banco = totais_por(conn, data_ref, data_ref, "banco")
+        por_origem = totais_por(conn, data_ref, data_ref, "origem")
+        lancamentos = lancamentos_caixa(conn, data_ref, data_ref)
+    if not linhas:
+        st.warning("Tabelas de saldos/movimentações não encontradas.")
+        return
+    r = linhas[0]
 
-    # UI — Resumo
+    # Resumo
     st.markdown("#### 📌 Resumo do Dia")
+    entradas = r["entradas_caixa"] + r["entradas_caixa2"]
+    saidas = r["saidas_caixa"] + r["saidas_caixa2"]
     col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Entradas do dia", formatar_valor(entradas_total))
-    with col2:
-        st.metric("Saídas do dia", formatar_valor(saidas_total))
-    with col3:
-        st.metric("Correções (líquido)", formatar_valor(corr_liq))
-    with col4:
-        st.metric("Mov. líquido do dia", formatar_valor(entradas_total - saidas_total))
-
-    st.markdown("#### 🧮 Saldos Cadastrados (saldos_caixas)")
-    colA, colB = st.columns(2)
-    with colA:
-        st.info(f"**Caixa (loja)** em {pd.to_datetime(data_ref).strftime('%d/%m/%Y')}: {formatar_valor(caixa)}")
-    with colB:
-        st.info(f"**Caixa 2 (casa)** em {pd.to_datetime(data_ref).strftime('%d/%m/%Y')}: {formatar_valor(caixa2)}")
+    col1.metric("Entradas do dia", formatar_valor(entradas))
+    col2.metric("Saídas do dia", formatar_valor(saidas))
+    col3.metric("Correções (líquido)", formatar_valor(r["correcoes_entrada"] - r["correcoes_saida"]))
+    col4.metric("Mov. líquido do dia", formatar_valor(entradas - saidas))
 
-    st.caption("Obs.: este v1 não recalcula abertura/fechamento; mostra saldos operacionais e os movimentos do dia. No v2 incluiremos abertura (dia anterior) e reconciliação completa.")
+    # Conciliação
+    st.markdown(f"#### 🧮 Conciliação — {_status(r)}")
+    colA, colB = st.columns(2)
+    for col, titulo, s in ((colA, "Caixa (loja)", "caixa"), (colB, "Caixa 2 (casa)", "caixa2")):
+        with col:
+            st.markdown(f"**{titulo}**")
+            if r["sem_abertura"]:
+                st.write("Abertura: sem snapshot anterior (primeiro fechamento)")
+            else:
+                st.write(f"Abertura (último snapshot anterior): {formatar_valor(r[f'abertura_{s}'])}")
+            st.write(f"+ Entradas: {formatar_valor(r[f'entradas_{s}'])}")
+            st.write(f"− Saídas: {formatar_valor(r[f'saidas_{s}'])}")
+            st.info(f"Esperado: {_fmt_opc(r[f'esperado_{s}'])}")
+            registrado = r[f"registrado_{s}"]
+            st.write(
+                "Registrado (saldos_caixas): "
+                + ("—" if registrado is None else formatar_valor(registrado))
+            )
+            dif = r[f"diferenca_{s}"]
+            if r["sem_abertura"]:
+                st.info("Diferença: — (sem abertura)")
+            elif dif is not None and abs(dif) > _TOLERANCIA:
+                st.error(f"Diferença: {_fmt_dif(dif)}")
+            else:
+                st.success(f"Diferença: {_fmt_dif(dif)}")
 
-    # Detalhe por origem/banco
+    # Detalhe por banco/origem
     st.markdown("---")
     st.markdown("### 🔎 Detalhe de Movimentações (Caixa / Caixa 2)")
-    if df_mov.empty:
+    if not lancamentos:
         st.info("Sem movimentações para este dia em Caixa/Caixa 2.")
         return
+    _tabela_totais(por_banco, "banco", "Por banco")
+    _tabela_totais(por_origem, "origem", "Por origem")
 
-    # Tabela resumo por banco e tipo
-    df_res = (
-        df_mov
-        .groupby(["banco", "tipo"], as_index=False)["valor"]
-        .sum()
-        .pivot(index="banco", columns="tipo", values="valor")
-        .fillna(0.0)
-        .reset_index()
-    )
-    # formata
-    for c in [c for c in df_res.columns if c != "banco"]:
-        df_res[c] = df_res[c].apply(formatar_valor)
-    st.markdown("**Por banco e tipo:**")
-    st.dataframe(df_res, use_container_width=True, hide_index=True)
-
-    # Tabela resumo por origem
-    df_origem = (
-        df_mov
-        .groupby(["origem", "tipo"], as_index=False)["valor"]
-        .sum()
-        .pivot(index="origem", columns="tipo", values="valor")
-        .fillna(0.0)
-        .reset_index()
-    )
-    for c in [c for c in df_origem.columns if c != "origem"]:
-        df_origem[c] = df_origem[c].apply(formatar_valor)
-    st.markdown("**Por origem:**")
-    st.dataframe(df_origem, use_container_width=True, hide_index=True)
-
-    # Detalhado (linhas)
     with st.expander("🗂️ Ver lançamentos (linhas)"):
-        df_show = df_mov.copy()
-        # formata
-        df_show["data"] = pd.to_datetime(df_show["data"], errors="coerce")
-        df_show["Data"] = df_show["data"].dt.strftime("%d/%m/%Y %H:%M").fillna("")
-        df_show["Valor (R$)"] = df_show["valor"].apply(formatar_valor)
+        df_show = pd.DataFrame(lancamentos)
+        df_show["Data"] = pd.to_datetime(df_show["data"], errors="coerce").dt.strftime("%d/%m/%Y %H:%M").fillna("")
+        df_show["Valor (R$)"] = df_show["valor"].map(formatar_valor)
         df_show = df_show.rename(columns={
             "banco": "Banco", "tipo": "Tipo", "origem": "Origem",
             "observacao": "Observação", "referencia_tabela": "Ref. Tabela",
             "referencia_id": "Ref. ID"
         })
         cols = ["id", "Data", "Banco", "Tipo", "Origem", "Valor (R$)", "Observação", "Ref. Tabela", "Ref. ID"]
-        cols = [c for c in cols if c in df_show.columns]
-        st.dataframe(df_show[cols], use_container_width=True, hide_index=True)
\ No newline at end of file
+        st.dataframe(df_show[cols], use_container_width=True, hide_index=True)
+
+
+# ------------------ modo: período ------------------
+def _render_periodo(caminho_banco: str) -> None:
+    hoje = date.today()
+    c1, c2 = st.columns(2)
+    ano = int(c1.number_input("Ano", min_value=2000, max_value=2100, value=hoje.year, step=1))
+    mes = _MESES.index(c2.selectbox("Mês", _MESES, index=hoje.month - 1)) + 1
+    inicio = date(ano, mes, 1)
+    fim = (date(ano + (mes == 12), mes % 12 + 1, 1) - timedelta(days=1))
+    fim = min(fim, hoje) if inicio <= hoje else fim
+
+    with get_conn(caminho_banco) as conn:
+        linhas = fechamento_periodo(conn, str(inicio), str(fim))
+        por_origem = totais_por(conn, str(inicio), str(fim), "origem")
+    if not linhas:
+        st.warning("Tabelas de saldos/movimentações não encontradas.")
+        return
+
+    df = pd.DataFrame(linhas)
+    df["status"] = [_status(r) for r in linhas]
+
+    n_div = int((df["status"] == "🔴 divergente").sum())
+    n_sem = int((df["status"] == "⚪ sem snapshot").sum())
+    k1, k2, k3, k4 = st.columns(4)
+    k1.metric("Abertura (Caixa)", _fmt_opc(df["abertura_caixa"].iloc[0]))
+    k2.metric("Esperado no fim (Caixa)", _fmt_opc(df["esperado_caixa"].iloc[-1]))
+    k3.metric("Dias divergentes", n_div)
+    k4.metric("Dias sem snapshot", n_sem)
+
+    so_div = st.checkbox("Mostrar só dias divergentes", value=False)
+    if so_div:
+        df = df[df["status"] == "🔴 divergente"]
+
+    tabela = pd.DataFrame(
+        {
+            "Data": pd.to_datetime(df["data"]).dt.strftime("%d/%m/%Y"),
+            "Status": df["status"],
+            "Abertura Caixa": df["abertura_caixa"].map(_fmt_opc),
+            "Entradas Caixa": df["entradas_caixa"].map(formatar_valor),
+            "Saídas Caixa": df["saidas_caixa"].map(formatar_valor),
+            "Esperado Caixa": df["esperado_caixa"].map(_fmt_opc),
+            "Registrado Caixa": df["registrado_caixa"].map(lambda v: "—" if pd.isna(v) else formatar_valor(v)),
+            "Dif. Caixa": df["diferenca_caixa"].map(lambda v: "—" if pd.isna(v) else formatar_valor(v)),
+            "Abertura Caixa 2": df["abertura_caixa2"].map(_fmt_opc),
+            "Esperado Caixa 2": df["esperado_caixa2"].map(_fmt_opc),
+            "Dif. Caixa 2": df["diferenca_caixa2"].map(lambda v: "—" if pd.isna(v) else formatar_valor(v)),
+            "Correções": (df["correcoes_entrada"] - df["correcoes_saida"]).map(formatar_valor),
+        }
+    )
+    st.dataframe(tabela, use_container_width=True, hide_index=True)
+
+    with st.expander("Totais do período por origem"):
+        _tabela_totais(por_origem, "origem", "Por origem")
+
+
+# ------------------ página ------------------
+def pagina_fechamento_caixa(caminho_banco: str):
+    st.subheader("🧾 Fechamento de Caixa")
+
+    modo = st.radio("Modo", ["Dia", "Período (mês)"], horizontal=True, key="fechamento_modo")
+    try:
+        if modo == "Dia":
+            _render_dia(caminho_banco)
+        else:
+            _render_periodo(caminho_banco)
+    except Exception as e:
+        logger.warning("fechamento: falha ao conciliar: %s", e)
+        st.error(f"❌ Não foi possível montar o fechamento: {e}")
+        return
+
+    st.caption(
+        "Abertura = último snapshot de saldos_caixas anterior ao dia; esperado = abertura + "
+        "entradas − saídas (movimentações de Caixa/Caixa 2, incluindo transferências para o "
+        "Caixa 2 e depósitos); diferença = registrado − esperado."
+    )
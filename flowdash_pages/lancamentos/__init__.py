@@ -1,3 +1,22 @@
-from . import venda, saida, transferencia, pagina, mercadorias, deposito, caixa2
+"""
+Pacote Lançamentos
+==================
+
+Subpáginas de lançamentos (venda, saída, transferência, mercadorias, depósito,
+Caixa 2) e a página agregadora (`pagina`). Os subpacotes são importados sob
+demanda (PEP 562) — a agregadora carrega cada subpágina com `importlib`.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import Any
 
 __all__ = ["venda", "saida", "transferencia", "pagina", "mercadorias", "deposito", "caixa2"]
+
+
+def __getattr__(nome: str) -> Any:
+    """Importa o subpacote sob demanda (ex.: `flowdash_pages.lancamentos.venda`)."""
+    if nome in __all__:
+        return importlib.import_module(f"{__name__}.{nome}")
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -85,7 +85,11 @@ def _bases_para_data(df: pd.DataFrame, data_str: str) -> Tuple[Optional[int], fl
         return None, 0.0, 0.0, 0.0, 0.0
 
     df = df.copy()
-    df["data"] = pd.to_datetime(df["data"], errors="coerce", dayfirst=True)
+    # ISO primeiro: com dayfirst, '2025-01-10' viraria 01/10 (dias 1..12)
+    bruto = df["data"].astype(str)
+    df["data"] = pd.to_datetime(bruto.str[:10], format="%Y-%m-%d", errors="coerce").fillna(
+        pd.to_datetime(bruto, errors="coerce", dayfirst=True)
+    )
     alvo = pd.to_datetime(data_str)
 
     same_day = df[df["data"].dt.date == alvo.date()]
@@ -16,6 +16,7 @@ from typing import Any, Dict, List, Optional, Final
 import sqlite3
 
 from shared.db import get_conn  # helper de conexão do projeto
+from shared.schema import garantir_colunas
 
 __all__ = ["salvar_compra", "carregar_compras", "salvar_recebimento"]
 
@@ -52,14 +53,8 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
     """
     conn.execute(f'CREATE TABLE IF NOT EXISTS {TBL_MERCADORIAS} (id INTEGER PRIMARY KEY AUTOINCREMENT);')
 
-    # Colunas atuais da tabela
-    cur = conn.execute(f"PRAGMA table_info({TBL_MERCADORIAS});")
-    cols = {row["name"] if isinstance(row, dict) else row[1] for row in cur.fetchall()}
-
-    # Adiciona colunas que faltarem
-    for col, ctype in _COLS:
-        if col not in cols:
-            conn.execute(f'ALTER TABLE {TBL_MERCADORIAS} ADD COLUMN "{col}" {ctype};')
+    # Adiciona colunas que faltarem (registro de schema em cache)
+    garantir_colunas(conn, TBL_MERCADORIAS, dict(_COLS))
 
 
 # ---------------- Utilitários ----------------
@@ -17,6 +17,15 @@ Decisões/Convenções
     3) fallback `trans_uid`;
     4) fallback final: `id` (não pareia, mas não quebra).
 
+Cache
+-----
+O resultado é materializado por data em `resumo_diario`
+(`repository.resumo_diario_repository`): reruns do Streamlit fazem uma única
+leitura pela PK (e uma conferência no registro de datas alteradas,
+`shared.alteracoes`) e não escrevem nada enquanto a data não for alterada
+(vendas, saídas, caixa 2, depósitos, transferências, mercadorias, saldos).
+A gravação só acontece quando a data ainda não tem resumo válido.
+
 Retorno
 -------
 Dict com:
@@ -27,14 +36,30 @@ Dict com:
 
 from __future__ import annotations
 
+import logging
+import sqlite3
 from typing import Any, Dict, List, Tuple
 
 import pandas as pd
 
+from repository.resumo_diario_repository import (
+    geracao_resumo_diario,
+    gravar_resumo_diario,
+    ler_resumo_diario,
+)
+from repository.saldos_bancos_repository import saldos_bancos_em
 from shared.db import get_conn
+from shared.instrumentacao import medido
+from shared.schema import colunas
+
+logger = logging.getLogger(__name__)
+
+# Chaves do resumo que são listas de tuplas (o JSON as devolve como listas)
+_CHAVES_LISTAS = ("depositos_list", "transf_bancos_list", "compras_list", "receb_list")
 
 
 # ===================== API =====================
+@medido("pagina.carregar_resumo_dia")
 def carregar_resumo_dia(caminho_banco: str, data_lanc) -> Dict[str, Any]:
     """
     Carrega totais e listas do dia selecionado.
@@ -43,7 +68,8 @@ def carregar_resumo_dia(caminho_banco: str, data_lanc) -> Dict[str, Any]:
       - total_vendas: soma de `entrada.Valor` (DATE(Data) = DATE(data_lanc))
       - total_saidas: soma de `saida.valor` (DATE(data) = DATE(data_lanc))
       - caixa_total/caixa2_total: **último snapshot** <= data (tabela `saldos_caixas`)
-      - saldos_bancos: soma acumulada por banco <= data (tabela `saldos_bancos`)
+      - saldos_bancos: saldo acumulado por banco <= data (`saldos_bancos_acumulado`;
+        bancos cadastrados sem movimento aparecem com 0)
       - listas do dia: depósitos, transferências, mercadorias (compras/recebimentos)
 
     Args:
@@ -53,6 +79,34 @@ def carregar_resumo_dia(caminho_banco: str, data_lanc) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: métricas e listas para o resumo do dia.
     """
+    data_str = str(data_lanc)
+
+    # Leitura da materialização (uma busca pela PK)
+    geracao = None
+    try:
+        with get_conn(caminho_banco) as conn:
+            cache = ler_resumo_diario(conn, data_str)
+            if cache is not None:
+                for k in _CHAVES_LISTAS:
+                    cache[k] = [tuple(x) for x in (cache.get(k) or [])]
+                return cache
+            geracao = geracao_resumo_diario(conn)
+    except sqlite3.Error as e:
+        logger.warning("resumo_diario indisponível (%s); calculando sem cache.", e)
+
+    resumo = _calcular_resumo_dia(caminho_banco, data_str)
+
+    if geracao is not None:
+        try:
+            with get_conn(caminho_banco) as conn:
+                gravar_resumo_diario(conn, data_str, resumo, geracao)
+        except sqlite3.Error as e:
+            logger.warning("Falha ao gravar resumo_diario de %s: %s", data_str, e)
+    return resumo
+
+
+def _calcular_resumo_dia(caminho_banco: str, data_str: str) -> Dict[str, Any]:
+    """Calcula o resumo do dia direto das tabelas de origem (sem cache)."""
     total_vendas, total_saidas = 0.0, 0.0
     caixa_total = 0.0
     caixa2_total = 0.0
@@ -63,8 +117,7 @@ def carregar_resumo_dia(caminho_banco: str, data_lanc) -> Dict[str, Any]:
     receb_list: List[Tuple[str, str, float]] = []
     saldos_bancos: Dict[str, float] = {}
 
-    # Normaliza a data para string (SQL) e date (filtro local)
-    data_str = str(data_lanc)
+    # Normaliza a data para date (filtro local)
     try:
         data_ref_date = pd.to_datetime(data_str, errors="coerce").date()
     except Exception:
@@ -119,6 +172,8 @@ def carregar_resumo_dia(caminho_banco: str, data_lanc) -> Dict[str, Any]:
             pass
 
         # ===== Transferência p/ Caixa 2 (dia) — dedupe por trans_uid/id =====
+        # Filtro por `data_dia` (indexado); `+origem` impede o planner de
+        # preferir idx_mov_origem (que varreria todo o histórico da origem).
         transf_caixa2_total = float(
             cur.execute(
                 """
@@ -127,8 +182,8 @@ def carregar_resumo_dia(caminho_banco: str, data_lanc) -> Dict[str, Any]:
                   JOIN (
                         SELECT MAX(id) AS id
                           FROM movimentacoes_bancarias
-                         WHERE DATE(data)=DATE(?)
-                           AND origem='transferencia_caixa'
+                         WHERE data_dia = DATE(?)
+                           AND +origem='transferencia_caixa'
                          GROUP BY COALESCE(trans_uid, CAST(id AS TEXT))
                        ) d ON d.id = m.id
                 """,
@@ -137,21 +192,21 @@ def carregar_resumo_dia(caminho_banco: str, data_lanc) -> Dict[str, Any]:
         )
 
         # ===== Depósitos do dia — dedupe por trans_uid/id =====
-        depositos_list = cur.execute(
+        depositos_list = [(str(r[0] or ""), float(r[1] or 0.0)) for r in cur.execute(
             """
             SELECT m.banco, m.valor
               FROM movimentacoes_bancarias m
               JOIN (
                     SELECT MAX(id) AS id
                       FROM movimentacoes_bancarias
-                     WHERE DATE(data)=DATE(?)
-                       AND origem='deposito'
+                     WHERE data_dia = DATE(?)
+                       AND +origem='deposito'
                      GROUP BY COALESCE(trans_uid, CAST(id AS TEXT))
                    ) d ON d.id = m.id
              ORDER BY m.id
             """,
             (data_str,),
-        ).fetchall()
+        ).fetchall()]
 
         # ===== Transferências banco→banco do dia (pareadas) =====
         pares = listar_transferencias_bancos_do_dia(caminho_banco, data_str)
@@ -159,87 +214,61 @@ def carregar_resumo_dia(caminho_banco: str, data_lanc) -> Dict[str, Any]:
             (p["origem"], p["destino"], float(p["valor"] or 0.0)) for p in pares
         ]
 
-        # ===== Mercadorias do dia (compras) =====
-        try:
-            df_compras = pd.read_sql(
-                "SELECT * FROM mercadorias WHERE DATE(Data)=DATE(?)",
-                conn,
-                params=(data_str,),
-            )
-        except Exception:
-            df_compras = pd.DataFrame()
-
-        if not df_compras.empty:
-            cols = {c.lower(): c for c in df_compras.columns}
-            col_col = cols.get("colecao") or cols.get("coleção")
-            col_forn = cols.get("fornecedor")
-            col_val = cols.get("valor_mercadoria")
-            for _, r in df_compras.iterrows():
-                compras_list.append(
-                    (
-                        str(r.get(col_col, "") if col_col else ""),
-                        str(r.get(col_forn, "") if col_forn else ""),
-                        float(r.get(col_val, 0) or 0.0) if col_val else 0.0,
-                    )
-                )
-
-        # ===== Mercadorias do dia (recebimentos) =====
-        try:
-            df_receb = pd.read_sql(
-                """
-                SELECT * FROM mercadorias
-                 WHERE Recebimento IS NOT NULL
-                   AND TRIM(Recebimento) <> ''
-                   AND DATE(Recebimento) = DATE(?)
-                """,
-                conn,
-                params=(data_str,),
-            )
-        except Exception:
-            df_receb = pd.DataFrame()
-
-        if not df_receb.empty:
-            cols = {c.lower(): c for c in df_receb.columns}
+        # ===== Mercadorias do dia (compras / recebimentos) =====
+        cols = {c.lower(): c for c in colunas(conn, "mercadorias")}
+        if cols:
             col_col = cols.get("colecao") or cols.get("coleção")
             col_forn = cols.get("fornecedor")
-            col_vr = cols.get("valor_recebido")
             col_vm = cols.get("valor_mercadoria")
-            for _, r in df_receb.iterrows():
-                valor = (
-                    float(r.get(col_vr))
-                    if (col_vr and pd.notna(r.get(col_vr)))
-                    else float(r.get(col_vm, 0) or 0.0)
-                )
-                receb_list.append(
-                    (
-                        str(r.get(col_col, "") if col_col else ""),
-                        str(r.get(col_forn, "") if col_forn else ""),
-                        valor,
-                    )
-                )
+            col_vr = cols.get("valor_recebido")
 
-        # ===== Saldos bancos (ACUMULADO <= data) =====
-        try:
-            df_bk = pd.read_sql("SELECT * FROM saldos_bancos", conn)
-        except Exception:
-            df_bk = pd.DataFrame()
-
-        if not df_bk.empty:
-            date_col_name = next((c for c in df_bk.columns if c.lower() == "data"), None)
-            if date_col_name:
-                df_bk[date_col_name] = pd.to_datetime(df_bk[date_col_name], errors="coerce")
-                if data_ref_date is not None:
-                    df_bk = df_bk[df_bk[date_col_name].dt.date <= data_ref_date]
-
-            for c in df_bk.columns:
-                if c.lower() == "data":
-                    continue
-                soma = (
-                    pd.to_numeric(df_bk[c], errors="coerce")
-                    .fillna(0.0)
-                    .sum()
+            def _expr(col: str | None, padrao: str) -> str:
+                return f'"{col}"' if col else padrao
+
+            sel = (
+                f"COALESCE({_expr(col_col, 'NULL')}, ''), "
+                f"COALESCE({_expr(col_forn, 'NULL')}, ''), "
+                f"COALESCE({_expr(col_vm, 'NULL')}, 0.0)"
+            )
+            try:
+                compras_list = [
+                    (str(r[0]), str(r[1]), float(r[2] or 0.0))
+                    for r in cur.execute(
+                        f"SELECT {sel} FROM mercadorias WHERE DATE(Data)=DATE(?)",
+                        (data_str,),
+                    ).fetchall()
+                ]
+            except sqlite3.Error:
+                compras_list = []
+
+            if "recebimento" in cols:
+                sel_receb = (
+                    f"COALESCE({_expr(col_col, 'NULL')}, ''), "
+                    f"COALESCE({_expr(col_forn, 'NULL')}, ''), "
+                    f"COALESCE({_expr(col_vr, 'NULL')}, {_expr(col_vm, 'NULL')}, 0.0)"
                 )
-                saldos_bancos[str(c)] = float(soma)
+                try:
+                    receb_list = [
+                        (str(r[0]), str(r[1]), float(r[2] or 0.0))
+                        for r in cur.execute(
+                            f"""
+                            SELECT {sel_receb} FROM mercadorias
+                             WHERE Recebimento IS NOT NULL
+                               AND TRIM(Recebimento) <> ''
+                               AND DATE(Recebimento) = DATE(?)
+                            """,
+                            (data_str,),
+                        ).fetchall()
+                    ]
+                except sqlite3.Error:
+                    receb_list = []
+
+        # ===== Saldos bancos (ACUMULADO <= data) — índice saldos_bancos_acumulado =====
+        if data_ref_date is not None:
+            try:
+                saldos_bancos = saldos_bancos_em(conn, data_ref_date)
+            except Exception:
+                saldos_bancos = {}
 
     return {
         "total_vendas": total_vendas,
@@ -296,8 +325,8 @@ def listar_transferencias_bancos_do_dia(caminho_banco: str, data_ref) -> List[Di
                 CAST(id AS TEXT)
             END AS tx
         FROM movimentacoes_bancarias
-        WHERE origem = 'transferencia'
-          AND DATE(data) = DATE(?)
+        WHERE data_dia = DATE(?)
+          AND +origem = 'transferencia'
     )
     SELECT
       MAX(CASE WHEN tipo='saida'   THEN banco END) AS banco_origem,
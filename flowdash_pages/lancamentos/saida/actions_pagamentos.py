@@ -9,6 +9,8 @@ Objetivo
 - Preferir a API dos serviços de alto nível (pagar_*). Quando não usar o service,
   cair para os registradores de saída (registrar_saida_*), sempre informando
   `tipo_obrigacao` + `obrigacao_id` e os encargos.
+- `pagar_em_lote_action`: várias obrigações numa única transação
+  (`LedgerService.pagar_em_lote`), com resultado por item.
 
 Regras Financeiras (padrão vigente)
 -----------------------------------
@@ -18,6 +20,8 @@ Regras Financeiras (padrão vigente)
 
 Reduções de redundância
 -----------------------
+- Serviços e repositórios vêm de `services.ledger.container` (construídos uma
+  vez por banco; sem custo de inicialização por clique).
 - Listagens delegadas ao ContasAPagarMovRepository.
 - Cálculos de “faltante/status” delegados ao repository.
 
@@ -28,14 +32,12 @@ Compat
 
 from __future__ import annotations
 
-from typing import Optional, Tuple, Dict, Any
+from typing import Optional, Tuple, Dict, Any, List
 from datetime import datetime
 
 # Ledger / Services / Repository
+from services.ledger import container
 from services.ledger.service_ledger import LedgerService
-from services.ledger.service_ledger_boleto import ServiceLedgerBoleto
-from services.ledger.service_ledger_emprestimo import ServiceLedgerEmprestimo
-from services.ledger.service_ledger_fatura import ServiceLedgerFatura
 from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
 
 
@@ -43,8 +45,9 @@ from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
 # Helpers internos (sem SQL direto)
 # =============================================================================
 def _get_services(caminho_banco: str) -> Tuple[LedgerService, ContasAPagarMovRepository]:
-    """Factory simples para obter Ledger e Repository."""
-    return LedgerService(caminho_banco), ContasAPagarMovRepository(caminho_banco)
+    """Ledger e Repository do banco (instâncias compartilhadas do container)."""
+    servicos = container.obter(caminho_banco)
+    return servicos.ledger, servicos.cap_repo
 
 
 def _canonicalizar_banco_safe(_: str, banco: Optional[str]) -> Optional[str]:
@@ -188,7 +191,7 @@ def pagar_fatura_cartao_action(
     )
 
     # 1) Service direto (garante log idempotente quando não há ledger_id)
-    svc = ServiceLedgerFatura(caminho_banco)
+    svc = container.obter(caminho_banco).fatura
     res = svc.pagar_fatura_cartao(
         obrigacao_id=int(obrigacao_id_fatura),
         valor_base=float(principal_cash),           # <- usar alias aceito
@@ -262,7 +265,7 @@ def pagar_boleto_action(
         cap_repo, int(obrigacao_id_boleto), float(valor_principal), float(desconto)
     )
 
-    svc = ServiceLedgerBoleto(caminho_banco)
+    svc = container.obter(caminho_banco).boleto
     res = svc.pagar_boleto(
         obrigacao_id=int(obrigacao_id_boleto),
         principal=float(principal_cash),
@@ -335,7 +338,7 @@ def pagar_emprestimo_action(
         cap_repo, int(obrigacao_id_emprestimo), float(valor_principal), float(desconto)
     )
 
-    svc = ServiceLedgerEmprestimo(caminho_banco)
+    svc = container.obter(caminho_banco).emprestimo
     res = svc.pagar_emprestimo(
         obrigacao_id=int(obrigacao_id_emprestimo),
         principal=float(principal_cash),
@@ -382,6 +385,36 @@ def pagar_emprestimo_action(
     }
 
 
+# =============================================================================
+# Pagamento em lote (fechamento do mês)
+# =============================================================================
+def pagar_em_lote_action(
+    *,
+    caminho_banco: str,
+    itens: List[Dict[str, Any]],
+    usuario: str = "-",
+    tudo_ou_nada: bool = True,
+) -> Dict[str, Any]:
+    """
+    Paga várias obrigações (boletos, empréstimos, faturas) numa transação.
+
+    Cada item: `obrigacao_id`, `principal`, `juros`, `multa`, `desconto`,
+    `banco` ('Caixa'/'Caixa 2' ⇒ DINHEIRO; demais ⇒ PIX/DÉBITO) e `data`.
+    Resultado por item em `itens` (ver `LedgerService.pagar_em_lote`).
+    Por padrão um item rejeitado cancela o lote inteiro; `tudo_ou_nada=False`
+    grava só os itens válidos.
+    """
+    ledger, _ = _get_services(caminho_banco)
+    normalizados = []
+    for it in itens:
+        it = dict(it)
+        it["data"] = _norm_data(it.get("data"))
+        if it.get("banco") and not str(it["banco"]).strip().lower().startswith("caixa"):
+            it["banco"] = _canonicalizar_banco_safe(caminho_banco, it["banco"]) or it["banco"]
+        normalizados.append(it)
+    return ledger.pagar_em_lote(normalizados, usuario=usuario, tudo_ou_nada=tudo_ou_nada)
+
+
 # =============================================================================
 # Listagens simplificadas (sem duplicação de SQL)
 # =============================================================================
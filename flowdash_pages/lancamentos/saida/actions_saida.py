@@ -25,7 +25,10 @@ try:
 except Exception:  # pragma: no cover
     sqlite3 = None  # permite rodar sem sqlite em ambientes de teste
 
-from services.ledger.service_ledger import LedgerService
+from services.ledger import container
+from shared.cache import cache_consulta
+from shared.db import get_conn
+from shared.schema import colunas_ordenadas
 
 
 # =============================================================================
@@ -36,6 +39,15 @@ DEFAULT_ORIGENS = ["Caixa", "Caixa 2"]
 DEFAULT_BANDEIRAS = ["VISA", "MASTERCARD", "ELO", "HIPERCARD", "AMEX"]
 DEFAULT_BANCOS = ["Banco 1", "Banco 2", "Banco 3", "Banco 4"]
 
+# Tabelas lidas por `carregar_listas_para_form` (inclui as candidatas de fallback)
+_TABELAS_LISTAS_FORM = (
+    "cadastro_bancos", "bancos", "saldos_bancos",
+    "cartoes_credito", "cartoes",
+    "bandeiras_cartao", "cartoes_bandeiras", "bandeiras",
+    "categorias_saida", "categorias", "cadastro_categorias_saida",
+    "subcategorias_saida", "subcategorias", "cadastro_subcategorias_saida",
+)
+
 
 # =============================================================================
 # Helpers de normalização
@@ -174,13 +186,8 @@ def _resolve_obrigacao(
 # Persistência auxiliar (fix-up em tabela `saida`)
 # =============================================================================
 def _open_sqlite(db_path: str):
-    """Abre conexão SQLite com pragmas seguros."""
-    conn = sqlite3.connect(db_path, timeout=30)
-    with contextlib.suppress(Exception):
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute("PRAGMA busy_timeout=30000;")
-        conn.execute("PRAGMA foreign_keys=ON;")
-    return conn
+    """Obtém a conexão SQLite do pool (pragmas seguros já aplicados)."""
+    return get_conn(db_path)
 
 
 def _fixup_saida_row(
@@ -280,7 +287,7 @@ def registrar_saida_action(
     desc_user = _str_or_empty(descricao if _norm_str(descricao) else descricao_final)
 
     try:
-        ledger = LedgerService(caminho_banco)
+        ledger = container.obter(caminho_banco).ledger
         usuario_s = _norm_str(usuario) or "-"
 
         # ---------------------- Fluxo CRÉDITO (compra) ----------------------
@@ -544,8 +551,7 @@ def _try_get_bancos(conn) -> List[str]:
     if lst:
         return lst
     with contextlib.suppress(Exception):
-        cur = conn.execute("PRAGMA table_info('saldos_bancos')")
-        colunas = [c[1] for c in cur.fetchall()]
+        colunas = colunas_ordenadas(conn, "saldos_bancos")
         ignorar = {"id", "data", "created_at", "updated_at"}
         candidatos = [c for c in colunas if c not in ignorar]
         if candidatos:
@@ -621,6 +627,15 @@ def carregar_listas_para_form(db_path: str | None = None, *_: Any, **__: Any) ->
     if not sqlite3 or not valid_path:
         return _defaults()
 
+    try:
+        return _carregar_listas_db(str(db_path))
+    except Exception:
+        return _defaults()
+
+
+@cache_consulta(*_TABELAS_LISTAS_FORM)
+def _carregar_listas_db(db_path: str) -> Dict[str, Any]:
+    """Listas do formulário lidas do banco (em cache até escrita nas tabelas de origem)."""
     conn = None
     try:
         conn = _open_sqlite(str(db_path))
@@ -653,8 +668,6 @@ def carregar_listas_para_form(db_path: str | None = None, *_: Any, **__: Any) ->
             "bandeiras": bandeiras or DEFAULT_BANDEIRAS[:],
             "listar_subcategorias_por_categoria": _provider_subs_por_categoria,
         }
-    except Exception:
-        return _defaults()
     finally:
         with contextlib.suppress(Exception):
             if conn:
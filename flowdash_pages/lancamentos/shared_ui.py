@@ -36,7 +36,9 @@ except Exception:
 
 from shared.db import get_conn
 from shared.ids import uid_venda_liquidacao
+from repository.bancos_cadastrados_repository import BancosCadastradosRepository
 from repository.movimentacoes_repository import MovimentacoesRepository
+from repository.saldos_bancos_repository import ajustar_saldo_banco
 
 
 # ===========================
@@ -320,12 +322,7 @@ def canonicalizar_banco(caminho_banco: str, nome_banco: str) -> Optional[str]:
     Evita criar colunas erradas em `saldos_bancos`.
     """
     alvo = _normalize_bank(nome_banco)
-    with get_conn(caminho_banco) as conn:
-        try:
-            df = pd.read_sql("SELECT nome FROM bancos_cadastrados", conn)
-            nomes = df["nome"].dropna().astype(str).tolist()
-        except Exception:
-            nomes = []
+    nomes = BancosCadastradosRepository(caminho_banco).listar_nomes()
     for n in nomes:
         if _normalize_bank(n) == alvo:
             return n
@@ -341,66 +338,25 @@ def canonicalizar_banco(caminho_banco: str, nome_banco: str) -> Optional[str]:
         return aliases[alvo]
     return None
 
-def _date_col_name(conn: sqlite3.Connection, table: str) -> str:
-    """Descobre o nome da coluna de data ('data' ou 'Data') em uma tabela (com validação do nome)."""
-    table_safe = _validate_table_name(table)
-    cols = [r[1] for r in conn.execute(f'PRAGMA table_info("{table_safe}");').fetchall()]
-    for cand in ("data", "Data"):
-        if cand in cols:
-            return cand
-    return "data"  # fallback
-
 def upsert_saldos_bancos(caminho_banco: str, data_str: str, banco_nome: str, valor: float) -> None:
     """
     Soma `valor` na coluna do banco `banco_nome` na linha da data `data_str`.
 
     Regras:
-        - Garante que a coluna exista (`REAL NOT NULL DEFAULT 0.0`).
-        - Cria a linha da data se necessário (ou soma se já existir).
-        - Usa COALESCE para evitar `NULL`.
-        - Funciona com coluna `data` OU `Data`.
+        - O banco precisa estar em `bancos_cadastrados`.
+        - Grava via `ajustar_saldo_banco` (engine wide ou long): garante o banco
+          no armazenamento, cria/soma a linha da data e mantém
+          `saldos_bancos_acumulado` em sincronia (mesma transação).
     """
     if not valor or valor <= 0:
         return
 
-    with get_conn(caminho_banco) as conn:
-        cur = conn.cursor()
+    nomes_cadastrados = BancosCadastradosRepository(caminho_banco).listar_nomes()
+    if banco_nome not in nomes_cadastrados:
+        raise ValueError(f"Banco '{banco_nome}' não está registrado em bancos_cadastrados.")
 
-        try:
-            nomes_cadastrados = pd.read_sql("SELECT nome FROM bancos_cadastrados", conn)["nome"].astype(str).tolist()
-        except Exception:
-            nomes_cadastrados = []
-        if banco_nome not in nomes_cadastrados:
-            raise ValueError(f"Banco '{banco_nome}' não está registrado em bancos_cadastrados.")
-
-        cols_info = cur.execute('PRAGMA table_info("saldos_bancos");').fetchall()
-        existentes = {c[1] for c in cols_info}
-        if banco_nome not in existentes:
-            cur.execute(f'ALTER TABLE saldos_bancos ADD COLUMN "{banco_nome}" REAL NOT NULL DEFAULT 0.0')
-            conn.commit()
-            cols_info = cur.execute('PRAGMA table_info("saldos_bancos");').fetchall()
-            existentes = {c[1] for c in cols_info}
-
-        date_col = _date_col_name(conn, "saldos_bancos")
-
-        row = cur.execute(f'SELECT rowid FROM saldos_bancos WHERE "{date_col}"=? LIMIT 1;', (data_str,)).fetchone()
-        if row:
-            cur.execute(
-                f'UPDATE saldos_bancos SET "{banco_nome}" = COALESCE("{banco_nome}", 0.0) + ? '
-                f'WHERE "{date_col}" = ?;',
-                (float(valor), data_str)
-            )
-        else:
-            colnames = [c[1] for c in cols_info]
-            outras = [c for c in colnames if c != date_col]
-            placeholders = ",".join(["?"] * (1 + len(outras)))
-            cols_sql = f'"{date_col}",' + ",".join(f'"{c}"' for c in outras)
-            valores = [data_str] + [0.0] * len(outras)
-            if banco_nome in outras:
-                valores[1 + outras.index(banco_nome)] = float(valor)
-            else:
-                raise RuntimeError(f"Coluna '{banco_nome}' não encontrada após criação em saldos_bancos.")
-            cur.execute(f'INSERT INTO saldos_bancos ({cols_sql}) VALUES ({placeholders});', valores)
+    with get_conn(caminho_banco) as conn:
+        ajustar_saldo_banco(conn, data_str, banco_nome, float(valor))
 
         conn.commit()
 
@@ -26,7 +26,9 @@ from typing import List, Optional, TypedDict
 import pandas as pd
 
 from repository.movimentacoes_repository import MovimentacoesRepository
+from repository.saldos_bancos_repository import ajustar_saldo_banco, saldo_banco_em
 from shared.db import get_conn
+from shared.schema import colunas, garantir_colunas
 from utils.utils import coerce_data, formatar_moeda
 from flowdash_pages.cadastros.cadastro_classes import BancoRepository
 from flowdash_pages.lancamentos.shared_ui import canonicalizar_banco, upsert_saldos_bancos
@@ -58,10 +60,11 @@ def carregar_nomes_bancos(caminho_banco: str) -> List[str]:
 
 
 def _try_saldo_banco(caminho_banco: str, banco_nome: str, data_str: str) -> Optional[float]:
-    """Calcula o saldo acumulado (≤ data) de um banco em `saldos_bancos`.
+    """Obtém o saldo acumulado (≤ data) de um banco.
 
-    Usa a tabela wide `saldos_bancos`, somando os valores da coluna do banco
-    até a data informada (inclusive). Se algo falhar, retorna `None`.
+    Lê o índice `saldos_bancos_acumulado` (uma busca indexada por banco/data),
+    mantido em sincronia com a tabela wide `saldos_bancos`. Se o banco não tiver
+    histórico nem coluna em `saldos_bancos`, ou algo falhar, retorna `None`.
 
     Args:
         caminho_banco: Caminho do arquivo SQLite.
@@ -73,24 +76,12 @@ def _try_saldo_banco(caminho_banco: str, banco_nome: str, data_str: str) -> Opti
     """
     try:
         with get_conn(caminho_banco) as conn:
-            df = pd.read_sql("SELECT * FROM saldos_bancos", conn)
-        if df is None or df.empty:
-            return None
-
-        # Detecta coluna de data
-        date_col = next((c for c in df.columns if c.lower() in ("data", "date")), None)
-        if date_col:
-            df[date_col] = pd.to_datetime(df[date_col], errors="coerce")
-            limite = pd.to_datetime(data_str, errors="coerce")
-            if pd.isna(limte := limite):
-                return None
-            df = df[df[date_col] <= limte]
-
-        if banco_nome in df.columns:
-            return float(pd.to_numeric(df[banco_nome], errors="coerce").fillna(0.0).sum())
+            saldo = saldo_banco_em(conn, banco_nome, data_str, default=None)
+            if saldo is not None:
+                return saldo
+            return 0.0 if banco_nome in colunas(conn, "saldos_bancos") else None
     except Exception:
         return None
-    return None
 
 
 def _ensure_cols_movs(caminho_banco: str) -> None:
@@ -102,22 +93,19 @@ def _ensure_cols_movs(caminho_banco: str) -> None:
         - `referencia_id` (INTEGER NULL)
     """
     with get_conn(caminho_banco) as conn:
-        cur = conn.cursor()
-        info = cur.execute("PRAGMA table_info(movimentacoes_bancarias);").fetchall()
-        cols = {r[1] for r in info}
-
-        if "usuario" not in cols:
-            cur.execute('ALTER TABLE movimentacoes_bancarias ADD COLUMN "usuario" TEXT;')
-        if "data_hora" not in cols:
-            cur.execute('ALTER TABLE movimentacoes_bancarias ADD COLUMN "data_hora" TEXT;')
-        if "referencia_id" not in cols:
-            cur.execute('ALTER TABLE movimentacoes_bancarias ADD COLUMN "referencia_id" INTEGER;')
+        garantir_colunas(
+            conn,
+            "movimentacoes_bancarias",
+            {"usuario": "TEXT", "data_hora": "TEXT", "referencia_id": "INTEGER"},
+        )
         conn.commit()
 
 
 def _decrementar_saldos_bancos(caminho_banco: str, data_str: str, banco_nome: str, valor: float) -> None:
     """Decrementa `valor` no banco `banco_nome` em `saldos_bancos` na data `data_str`.
 
+    Grava via `ajustar_saldo_banco` (engine wide/long + saldo acumulado).
+
     Args:
         caminho_banco: Caminho do arquivo SQLite.
         data_str: Data em "YYYY-MM-DD".
@@ -128,44 +116,7 @@ def _decrementar_saldos_bancos(caminho_banco: str, data_str: str, banco_nome: st
         return
 
     with get_conn(caminho_banco) as conn:
-        cur = conn.cursor()
-
-        # Garante coluna do banco
-        cols_info = cur.execute("PRAGMA table_info(saldos_bancos);").fetchall()
-        existentes = {c[1] for c in cols_info}
-        if banco_nome not in existentes:
-            cur.execute(f'ALTER TABLE saldos_bancos ADD COLUMN "{banco_nome}" REAL NOT NULL DEFAULT 0.0')
-            conn.commit()
-            cols_info = cur.execute("PRAGMA table_info(saldos_bancos);").fetchall()
-
-        # Coluna de data
-        cols = [r[1] for r in cols_info]
-        date_col = "data" if "data" in cols else ("Data" if "Data" in cols else "data")
-
-        # Atualiza a linha do dia ou insere nova
-        row = cur.execute(
-            f'SELECT rowid FROM saldos_bancos WHERE "{date_col}"=? LIMIT 1;',
-            (data_str,),
-        ).fetchone()
-
-        if row:
-            cur.execute(
-                f'UPDATE saldos_bancos '
-                f'SET "{banco_nome}" = COALESCE("{banco_nome}", 0.0) - ? '
-                f'WHERE "{date_col}" = ?;',
-                (float(valor), data_str),
-            )
-        else:
-            colnames = [c[1] for c in cols_info]
-            outras = [c for c in colnames if c != date_col]
-            placeholders = ",".join(["?"] * (1 + len(outras)))
-            cols_sql = f'"{date_col}",' + ",".join(f'"{c}"' for c in outras)
-            valores = [data_str] + [0.0] * len(outras)
-            if banco_nome in outras:
-                idx = 1 + outras.index(banco_nome)
-                valores[idx] = -float(valor)
-            cur.execute(f'INSERT INTO saldos_bancos ({cols_sql}) VALUES ({placeholders});', valores)
-
+        ajustar_saldo_banco(conn, data_str, banco_nome, -float(valor))
         conn.commit()
 
 
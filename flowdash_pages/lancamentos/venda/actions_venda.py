@@ -14,6 +14,7 @@ from typing import Optional, Tuple, Any
 import pandas as pd
 
 from shared.db import get_conn
+from repository.taxas_maquinas_repository import tabela_taxas
 from flowdash_pages.lancamentos.shared_ui import (
     DIAS_COMPENSACAO,
     proximo_dia_util_br,
@@ -58,7 +59,7 @@ def _descobrir_taxa_e_banco(
 ) -> Tuple[float, Optional[str]]:
     """
     Mesma lógica do módulo original para determinar taxa% e banco_destino.
-    Usa a tabela taxas_maquinas (colunas: forma_pagamento, maquineta, bandeira, parcelas, taxa_percentual, banco_destino).
+    Usa a tabela taxas_maquinas compilada em memória (`tabela_taxas`, match exato).
     """
     taxa, banco_destino = 0.0, None
     forma_up = (forma or "").upper()
@@ -66,18 +67,13 @@ def _descobrir_taxa_e_banco(
     if forma_up in ["DÉBITO", "CREDITO", "CRÉDITO", "LINK_PAGAMENTO"]:
         # normaliza 'CREDITO' -> 'CRÉDITO' se vier sem acento
         forma_norm = "CRÉDITO" if forma_up in ("CREDITO", "CRÉDITO") else forma_up
-        formas = _formas_equivalentes(forma_norm)
-        placeholders = ",".join(["?"] * len(formas))
         with get_conn(db_like) as conn:
-            row = conn.execute(
-                f"""
-                SELECT taxa_percentual, banco_destino FROM taxas_maquinas
-                WHERE UPPER(forma_pagamento) IN ({placeholders})
-                  AND maquineta=? AND bandeira=? AND parcelas=?
-                LIMIT 1
-                """,
-                [f.upper() for f in formas] + [maquineta, bandeira, int(parcelas or 1)],
-            ).fetchone()
+            tabela = tabela_taxas(conn)
+        row = None
+        for f in _formas_equivalentes(forma_norm):
+            row = tabela.exato(f, maquineta, bandeira, parcelas)
+            if row:
+                break
         if row:
             taxa = float(row[0] or 0.0)
             banco_destino = row[1] or None
@@ -87,15 +83,7 @@ def _descobrir_taxa_e_banco(
     elif forma_up == "PIX":
         if (modo_pix or "") == "Via maquineta":
             with get_conn(db_like) as conn:
-                row = conn.execute(
-                    """
-                    SELECT taxa_percentual, banco_destino FROM taxas_maquinas
-                    WHERE UPPER(forma_pagamento)='PIX'
-                      AND maquineta=? AND bandeira='' AND parcelas=1
-                    LIMIT 1
-                    """,
-                    (maquineta,),
-                ).fetchone()
+                row = tabela_taxas(conn).exato("PIX", maquineta, "", 1)
             taxa = float(row[0] or 0.0) if row else 0.0
             banco_destino = (row[1] if row and row[1] else None) or obter_banco_destino(
                 db_like, "PIX", maquineta, "", 1
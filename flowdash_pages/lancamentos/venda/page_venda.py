@@ -76,11 +76,10 @@ def render_venda(state) -> None:
             st.success(res.get("msg", "Venda registrada com sucesso."))
 
             # 🔄 força recarregar o Resumo do Dia / cards
+            # (resumo_diario e caches de consulta são invalidados pelo registro
+            # de datas alteradas — não é preciso limpar caches aqui)
             st.session_state["_resumo_dirty"] = time.time()
 
-            # ✅ limpa caches de @st.cache_data para garantir recomputo do resumo
-            st.cache_data.clear()  # [no-behavior-change]
-
             st.rerun()
         else:
             st.error(res.get("msg") or "Erro ao salvar a venda.")
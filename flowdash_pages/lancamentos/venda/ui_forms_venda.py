@@ -2,6 +2,10 @@
 """
 Componentes de UI para Venda. Apenas interface – sem regra/SQL.
 Mantém os mesmos campos/fluxos do módulo original.
+
+As listas dos selects (bancos, maquinetas, bandeiras, parcelas) vêm do cache
+por versão de tabela (`shared.cache`): reruns não reconsultam o banco até uma
+escrita em `bancos_cadastrados`/`taxas_maquinas`.
 """
 
 from __future__ import annotations
@@ -10,7 +14,8 @@ import streamlit as st
 import pandas as pd
 from typing import Optional, List
 
-from shared.db import get_conn
+from repository.bancos_cadastrados_repository import BancosCadastradosRepository
+from shared.cache import consultar
 from utils.utils import formatar_moeda   # [unifica moeda]
 from .state_venda import invalidate_confirm
 
@@ -22,6 +27,25 @@ def _formas_equivalentes(forma: str) -> List[str]:
     return [forma]
 
 
+def _opcoes_taxas(caminho_banco: str, coluna: str, formas: List[str], **filtros: str) -> list:
+    """Valores distintos de `coluna` em `taxas_maquinas` para as formas (e filtros) dados."""
+    placeholders = ",".join(["?"] * len(formas))
+    where = "".join(f" AND {c}=?" for c in filtros)
+    rows = consultar(
+        caminho_banco,
+        f"""
+        SELECT DISTINCT {coluna}
+          FROM taxas_maquinas
+         WHERE UPPER(forma_pagamento) IN ({placeholders}){where}
+           AND {coluna} IS NOT NULL
+         ORDER BY {coluna}
+        """,
+        [f.upper() for f in formas] + list(filtros.values()),
+        tabelas=("taxas_maquinas",),
+    )
+    return [r[0] for r in rows]
+
+
 def render_form_venda(caminho_banco: str, data_lanc):
     """
     Desenha o formulário de venda e retorna os dados preenchidos (sem persistir).
@@ -68,16 +92,7 @@ def render_form_venda(caminho_banco: str, data_lanc):
 
         if modo_pix == "Via maquineta":
             try:
-                with get_conn(caminho_banco) as conn:
-                    maq_pix = pd.read_sql(
-                        """
-                        SELECT DISTINCT maquineta
-                          FROM taxas_maquinas
-                         WHERE UPPER(forma_pagamento)='PIX'
-                         ORDER BY maquineta
-                        """,
-                        conn,
-                    )["maquineta"].dropna().astype(str).tolist()
+                maq_pix = [str(m) for m in _opcoes_taxas(caminho_banco, "maquineta", ["PIX"])]
             except Exception:
                 maq_pix = []
 
@@ -94,11 +109,7 @@ def render_form_venda(caminho_banco: str, data_lanc):
 
         else:  # Direto para banco
             try:
-                with get_conn(caminho_banco) as conn:
-                    bancos = pd.read_sql(
-                        "SELECT nome FROM bancos_cadastrados ORDER BY nome",
-                        conn,
-                    )["nome"].dropna().astype(str).tolist()
+                bancos = BancosCadastradosRepository(caminho_banco).listar_nomes()
             except Exception:
                 bancos = []
 
@@ -118,19 +129,8 @@ def render_form_venda(caminho_banco: str, data_lanc):
     # ============ Cartões e Link de Pagamento ============
     elif forma in ["DÉBITO", "CRÉDITO", "LINK_PAGAMENTO"]:
         formas = _formas_equivalentes(forma)
-        placeholders = ",".join(["?"] * len(formas))
         try:
-            with get_conn(caminho_banco) as conn:
-                maq_por_forma = pd.read_sql(
-                    f"""
-                    SELECT DISTINCT maquineta
-                      FROM taxas_maquinas
-                     WHERE UPPER(forma_pagamento) IN ({placeholders})
-                     ORDER BY maquineta
-                    """,
-                    conn,
-                    params=[f.upper() for f in formas],
-                )["maquineta"].dropna().astype(str).tolist()
+            maq_por_forma = [str(m) for m in _opcoes_taxas(caminho_banco, "maquineta", formas)]
         except Exception:
             maq_por_forma = []
 
@@ -146,18 +146,9 @@ def render_form_venda(caminho_banco: str, data_lanc):
         )
 
         try:
-            with get_conn(caminho_banco) as conn:
-                bandeiras = pd.read_sql(
-                    f"""
-                    SELECT DISTINCT bandeira
-                      FROM taxas_maquinas
-                     WHERE UPPER(forma_pagamento) IN ({placeholders})
-                       AND maquineta=?
-                     ORDER BY bandeira
-                    """,
-                    conn,
-                    params=[f.upper() for f in formas] + [maquineta],
-                )["bandeira"].dropna().astype(str).tolist()
+            bandeiras = [
+                str(b) for b in _opcoes_taxas(caminho_banco, "bandeira", formas, maquineta=maquineta)
+            ]
         except Exception:
             bandeiras = []
 
@@ -176,19 +167,12 @@ def render_form_venda(caminho_banco: str, data_lanc):
         )
 
         try:
-            with get_conn(caminho_banco) as conn:
-                pars = pd.read_sql(
-                    f"""
-                    SELECT DISTINCT parcelas
-                      FROM taxas_maquinas
-                     WHERE UPPER(forma_pagamento) IN ({placeholders})
-                       AND maquineta=?
-                       AND bandeira=?
-                     ORDER BY parcelas
-                    """,
-                    conn,
-                    params=[f.upper() for f in formas] + [maquineta, bandeira],
-                )["parcelas"].dropna().astype(int).tolist()
+            pars = [
+                int(p)
+                for p in _opcoes_taxas(
+                    caminho_banco, "parcelas", formas, maquineta=maquineta, bandeira=bandeira
+                )
+            ]
         except Exception:
             pars = []
 
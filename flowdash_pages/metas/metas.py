@@ -1,6 +1,157 @@
-''' Página de Metas (Dashboard) '''
+"""
+Página de Metas
+===============
+
+Acompanhamento das metas de venda da LOJA e de cada vendedor: dia, semana e
+mês, nível atingido (Bronze/Prata/Ouro) e evolução acumulada no mês.
+
+Detalhes técnicos
+-----------------
+- Dados de `repository.metas_repository.progresso_mes`: uma consulta com
+  janelas sobre o fato diário de vendas, em cache por mês (reaproveitado entre
+  reruns até uma venda ou meta nova). A página só formata o resultado.
+
+Dependências
+------------
+- streamlit
+- pandas
+- repository.metas_repository
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import streamlit as st
+
+from repository.metas_repository import LOJA, progresso_mes, resumo_metas
+from utils.utils import formatar_valor
+
+logger = logging.getLogger(__name__)
+
+_MESES = ["Jan", "Fev", "Mar", "Abr", "Mai", "Jun", "Jul", "Ago", "Set", "Out", "Nov", "Dez"]
+_MEDALHAS = {"Ouro": "🥇 Ouro", "Prata": "🥈 Prata", "Bronze": "🥉 Bronze", "": "—"}
+
+
+# ----------------------------------------------------------------------------
+# Formatação
+# ----------------------------------------------------------------------------
+def _fmt_perc(p: Optional[float]) -> str:
+    return "—" if p is None else f"{p:,.1f}%".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _barra(p: Optional[float]) -> float:
+    """Valor de `st.progress` (0–1) para um percentual."""
+    return 0.0 if p is None else max(0.0, min(p / 100.0, 1.0))
+
+
+def _ultimo_dia(ano: int, mes: int) -> date:
+    prox = date(ano + 1, 1, 1) if mes == 12 else date(ano, mes + 1, 1)
+    return prox - timedelta(days=1)
+
+
+# ----------------------------------------------------------------------------
+# UI
+# ----------------------------------------------------------------------------
+def _card_loja(r: Dict[str, Any]) -> None:
+    st.markdown(f"### 🏬 {LOJA} — {_MEDALHAS[r['nivel']]}")
+    c1, c2, c3 = st.columns(3)
+    for col, titulo, vendido, meta, perc in (
+        (c1, "Dia", r["vendido_dia"], r["meta_dia"], r["perc_dia"]),
+        (c2, "Semana", r["vendido_semana"], r["meta_semanal"], r["perc_semana"]),
+        (c3, "Mês", r["vendido_mes"], r["meta_mensal"], r["perc_mes"]),
+    ):
+        with col:
+            st.metric(titulo, formatar_valor(vendido), _fmt_perc(perc), delta_color="off")
+            st.progress(_barra(perc))
+            st.caption(f"Meta: {formatar_valor(meta)}")
+    if r["meta_mensal"] > 0:
+        st.caption(
+            f"Meta proporcional até a data: {formatar_valor(r['meta_ate_hoje'])} "
+            f"(ritmo {_fmt_perc(r['perc_ritmo'])})"
+            + (f" — faltam {formatar_valor(r['falta_proximo'])} para o próximo nível."
+               if r["falta_proximo"] > 0 else "")
+        )
+
+
+def _tabela_vendedores(resumo: List[Dict[str, Any]]) -> None:
+    st.markdown("### 👥 Vendedores")
+    if not resumo:
+        st.info("Nenhum vendedor com meta ou venda no mês.")
+        return
+    df = pd.DataFrame(resumo).sort_values("vendido_mes", ascending=False)
+    tabela = pd.DataFrame(
+        {
+            "Vendedor": df["vendedor"],
+            "Dia": df["vendido_dia"].map(formatar_valor),
+            "% Dia": df["perc_dia"].map(_fmt_perc),
+            "Semana": df["vendido_semana"].map(formatar_valor),
+            "% Semana": df["perc_semana"].map(_fmt_perc),
+            "Mês": df["vendido_mes"].map(formatar_valor),
+            "Meta Mês": df["meta_mensal"].map(formatar_valor),
+            "% Mês": df["perc_mes"].map(_fmt_perc),
+            "Nível": df["nivel"].map(_MEDALHAS),
+            "Falta p/ próximo": df["falta_proximo"].map(formatar_valor),
+        }
+    )
+    st.dataframe(tabela, use_container_width=True, hide_index=True)
+
+
+def _grafico_evolucao(linhas: List[Dict[str, Any]], vendedores: List[str], referencia: str) -> None:
+    st.markdown("### 📈 Evolução no mês")
+    escolhido = st.selectbox("Vendedor", vendedores, index=0, key="metas_vendedor")
+    df = pd.DataFrame([r for r in linhas if r["vendedor"] == escolhido and r["data"] <= referencia])
+    if df.empty:
+        st.caption("Sem dados até a data.")
+        return
+    st.line_chart(
+        df.set_index("data")[["acum_mes", "meta_acum_mes"]].rename(
+            columns={"acum_mes": "Vendido (acumulado)", "meta_acum_mes": "Meta (acumulada)"}
+        )
+    )
+
 
 def pagina_metas(caminho_banco: str):
-    import streamlit as st
+    """
+    Ponto de entrada da página de Metas.
+
+    Args:
+        caminho_banco: Caminho para o banco SQLite.
+    """
     st.subheader("🎯 Metas")
-    st.info("🚧 Em desenvolvimento...")
\ No newline at end of file
+
+    hoje = date.today()
+    c1, c2, c3 = st.columns(3)
+    ano = int(c1.number_input("Ano", min_value=2000, max_value=2100, value=hoje.year, step=1))
+    mes = _MESES.index(c2.selectbox("Mês", _MESES, index=hoje.month - 1)) + 1
+    inicio, fim = date(ano, mes, 1), _ultimo_dia(ano, mes)
+    referencia = c3.date_input(
+        "Data de referência",
+        value=min(max(hoje, inicio), fim),
+        min_value=inicio,
+        max_value=fim,
+        format="DD/MM/YYYY",
+    )
+    ref = str(referencia)[:10]
+
+    try:
+        linhas = progresso_mes(caminho_banco, f"{ano:04d}-{mes:02d}")
+    except Exception as e:
+        logger.warning("metas: falha ao calcular progresso: %s", e)
+        st.error(f"❌ Não foi possível calcular as metas: {e}")
+        return
+
+    resumo = resumo_metas(linhas, ref)
+    if not resumo:
+        st.info("Sem metas cadastradas nem vendas no mês.")
+        return
+
+    loja = next((r for r in resumo if r["vendedor"] == LOJA), None)
+    if loja is not None:
+        _card_loja(loja)
+
+    _tabela_vendedores([r for r in resumo if r["vendedor"] != LOJA])
+    _grafico_evolucao(linhas, [r["vendedor"] for r in resumo], ref)
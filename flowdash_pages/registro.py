@@ -0,0 +1,230 @@
+"""
+Registro de Páginas
+===================
+
+Resolve, uma vez por processo, a função de entrada de cada módulo de página e
+o plano de passagem de parâmetros usado por `main.py` a cada render.
+
+Funcionalidades principais
+--------------------------
+- `resolver(modulo)`: importa o módulo (sob demanda, na primeira visita),
+  escolhe a função de entrada e monta o plano de parâmetros a partir de
+  `inspect.signature` — tudo em cache; os reruns seguintes custam uma consulta
+  a dicionário.
+- `chamar(pagina, contexto, estado)`: executa o plano (sem `inspect` no
+  caminho do clique).
+- `paginas()`: tempo de importação/resolução de cada página já visitada
+  (exibido em 📈 Desempenho).
+
+Detalhes técnicos
+-----------------
+- Ordem de busca da função (a mesma do roteador antigo):
+  genéricas `render, page, main, pagina, show, pagina_fechamento_caixa`;
+  derivadas do nome do arquivo `render_<tail>, render_page, render_<seg>,
+  render_<parent>, page_<tail>, show_<tail>, <seg>`; por fim a 1ª função que
+  comece com `pagina_` ou `render_`.
+- Plano de parâmetros: nomes de `CONTEXTO` vêm do contexto do app
+  (`caminho_banco`, usuário, página atual...); outros obrigatórios vêm do
+  `session_state` (ou None); opcionais só são passados se estiverem no
+  `session_state`. Depois do primeiro opcional, os demais vão por nome (nada
+  é deslocado quando um opcional é omitido). `*args`/`**kwargs` são ignorados.
+- Recarga a quente do Streamlit: se o módulo em `sys.modules` não é mais o do
+  cache (arquivo editado), a entrada é resolvida de novo.
+- Falhas de importação não ficam em cache (a próxima visita tenta de novo).
+
+Dependências
+------------
+- importlib / inspect (apenas na resolução)
+"""
+
+from __future__ import annotations
+
+import importlib
+import inspect
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+__all__ = [
+    "CONTEXTO",
+    "Pagina",
+    "EntradaNaoEncontrada",
+    "resolver",
+    "chamar",
+    "paginas",
+    "limpar",
+]
+
+# Parâmetros preenchidos pelo contexto do app (não pelo session_state)
+CONTEXTO = ("caminho_banco", "usuario", "usuario_logado", "perfil", "pagina_atual", "ir_para_formulario")
+
+_GENERICAS = ("render", "page", "main", "pagina", "show", "pagina_fechamento_caixa")
+_PREFIXOS_FALLBACK = ("pagina_", "render_")
+
+# Fontes do plano de parâmetros
+_DO_CONTEXTO = 0
+_DO_ESTADO = 1      # obrigatório: session_state ou None
+_OPCIONAL = 2       # com default: só se estiver no session_state
+
+
+class EntradaNaoEncontrada(LookupError):
+    """O módulo não tem função de entrada compatível."""
+
+
+@dataclass(frozen=True)
+class Pagina:
+    """Página resolvida: módulo, função de entrada e plano de parâmetros."""
+
+    modulo: str
+    funcao: str
+    fn: Callable[..., Any]
+    plano: Tuple[Tuple[str, int, bool], ...]  # (nome, fonte, posicional)
+    mod: ModuleType
+    import_ms: float
+    resolucao_ms: float
+
+
+_paginas: Dict[str, Pagina] = {}
+_lock = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+# Resolução
+# -----------------------------------------------------------------------------
+def _candidatos(modulo: str) -> List[str]:
+    seg = modulo.rsplit(".", 1)[-1]                      # ex.: 'page_venda'
+    parent = modulo.rsplit(".", 2)[-2] if "." in modulo else ""
+    tail = seg.split("_", 1)[1] if "_" in seg else seg    # ex.: 'venda'
+    derivadas = [
+        f"render_{tail}",
+        "render_page",
+        f"render_{seg}",
+        f"render_{parent}",
+        f"page_{tail}",
+        f"show_{tail}",
+        seg,  # função com o mesmo nome do módulo (ex.: page_venda)
+    ]
+    return list(dict.fromkeys([*_GENERICAS, *derivadas]))
+
+
+def _entrada(mod: ModuleType, modulo: str) -> Tuple[str, Callable[..., Any]]:
+    for nome in _candidatos(modulo):
+        fn = getattr(mod, nome, None)
+        if fn is not None and callable(fn):
+            return nome, fn
+    for prefixo in _PREFIXOS_FALLBACK:
+        for nome, obj in vars(mod).items():
+            if callable(obj) and nome.startswith(prefixo):
+                return nome, obj
+    encontradas = [n for n, o in vars(mod).items() if callable(o)]
+    raise EntradaNaoEncontrada(
+        f"O módulo '{modulo}' não possui função compatível "
+        f"(esperado: render/page/main/pagina*/show). "
+        f"Funções encontradas: {', '.join(encontradas) or 'nenhuma'}."
+    )
+
+
+def _plano(fn: Callable[..., Any]) -> Tuple[Tuple[str, int, bool], ...]:
+    plano: List[Tuple[str, int, bool]] = []
+    por_nome = False  # vira True após o primeiro opcional (evita deslocar posicionais)
+    for p in inspect.signature(fn).parameters.values():
+        if p.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+            continue
+        if p.name in CONTEXTO:
+            fonte = _DO_CONTEXTO
+        elif p.default is inspect.Parameter.empty:
+            fonte = _DO_ESTADO
+        else:
+            fonte = _OPCIONAL
+        posicional = p.kind == inspect.Parameter.POSITIONAL_ONLY or (
+            p.kind == inspect.Parameter.POSITIONAL_OR_KEYWORD and not por_nome
+        )
+        plano.append((p.name, fonte, posicional))
+        if fonte == _OPCIONAL:
+            por_nome = True
+    return tuple(plano)
+
+
+def resolver(modulo: str) -> Pagina:
+    """
+    Página em cache (importa e resolve na primeira chamada).
+
+    Raises:
+        EntradaNaoEncontrada: Módulo sem função de entrada compatível.
+        Exception: Erros de importação do módulo (não ficam em cache).
+    """
+    pagina = _paginas.get(modulo)
+    if pagina is not None and sys.modules.get(modulo) is pagina.mod:
+        return pagina
+
+    t0 = time.perf_counter()
+    mod = importlib.import_module(modulo)
+    t1 = time.perf_counter()
+    nome, fn = _entrada(mod, modulo)
+    plano = _plano(fn)
+    t2 = time.perf_counter()
+
+    pagina = Pagina(
+        modulo=modulo,
+        funcao=nome,
+        fn=fn,
+        plano=plano,
+        mod=mod,
+        import_ms=round((t1 - t0) * 1000.0, 3),
+        resolucao_ms=round((t2 - t1) * 1000.0, 3),
+    )
+    with _lock:
+        _paginas[modulo] = pagina
+    return pagina
+
+
+# -----------------------------------------------------------------------------
+# Execução
+# -----------------------------------------------------------------------------
+def chamar(pagina: Pagina, contexto: Mapping[str, Any], estado: Mapping[str, Any]) -> Any:
+    """Chama a função de entrada aplicando o plano de parâmetros."""
+    args: List[Any] = []
+    kwargs: Dict[str, Any] = {}
+    for nome, fonte, posicional in pagina.plano:
+        if fonte == _DO_CONTEXTO:
+            valor = contexto.get(nome)
+        elif fonte == _DO_ESTADO:
+            valor = estado.get(nome)
+        elif nome in estado:
+            valor = estado[nome]
+        else:
+            continue
+        if posicional:
+            args.append(valor)
+        else:
+            kwargs[nome] = valor
+    return pagina.fn(*args, **kwargs)
+
+
+# -----------------------------------------------------------------------------
+# Relatório
+# -----------------------------------------------------------------------------
+def paginas() -> List[Dict[str, Any]]:
+    """Páginas resolvidas neste processo, da importação mais cara para a mais barata."""
+    with _lock:
+        itens = [
+            {
+                "modulo": p.modulo,
+                "funcao": p.funcao,
+                "import_ms": p.import_ms,
+                "resolucao_ms": p.resolucao_ms,
+                "parametros": [nome for nome, _f, _p in p.plano],
+            }
+            for p in _paginas.values()
+        ]
+    itens.sort(key=lambda r: r["import_ms"], reverse=True)
+    return itens
+
+
+def limpar() -> None:
+    """Esquece as páginas resolvidas (a próxima visita resolve de novo)."""
+    with _lock:
+        _paginas.clear()
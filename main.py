@@ -7,9 +7,6 @@ Ponto de entrada do aplicativo Streamlit do FlowDash.
 
 from __future__ import annotations
 import os
-import importlib
-import inspect
-import traceback
 import streamlit as st
 
 from auth.auth import (
@@ -19,6 +16,9 @@ from auth.auth import (
     limpar_todas_as_paginas,
 )
 from utils.utils import garantir_trigger_totais_saldos_caixas
+from shared.schema import executar_migracoes
+from shared.instrumentacao import medir
+from flowdash_pages import registro
 
 
 # ======================================================================================
@@ -43,6 +43,14 @@ except Exception as e:
     else:
         st.warning(f"Trigger de totais não criada: {e}")
 
+try:
+    executar_migracoes(caminho_banco)
+except Exception as e:
+    if DEBUG:
+        st.exception(e)
+    else:
+        st.warning(f"Migrações de schema não aplicadas: {e}")
+
 
 # ======================================================================================
 # Estado de sessão
@@ -54,25 +62,25 @@ if "pagina_atual" not in st.session_state:
 
 
 # ======================================================================================
-# Helper de roteamento — importa módulo e chama render/page/main (+ fallbacks)
+# Helper de roteamento — resolve a página pelo registro (cache por processo)
 # ======================================================================================
 def _call_page(module_path: str):
     """
-    Importa o módulo indicado e tenta chamar, nesta ordem, a função:
-
-    - genéricas: render, page, main, pagina, show, pagina_fechamento_caixa
-    - derivadas do nome do arquivo: render_<tail>, render_page, render_<seg>, render_<parent>,
-      page_<tail>, show_<tail>, <seg> (se for callable)
-    - fallbacks: 1ª função que comece com 'pagina_' ou 'render_'
-
-    Provedor de parâmetros:
-      - sempre fornece 'caminho_banco' se a função aceitar;
-      - para outros parâmetros OBRIGATÓRIOS, usa valores do session_state se existirem;
-        caso contrário preenche com None. Se o parâmetro for posicional/aceitar posicional,
-        passamos como posicional para evitar “missing required positional argument”.
+    Renderiza a página do módulo indicado via `flowdash_pages.registro`.
+
+    Na primeira visita o registro importa o módulo, escolhe a função de entrada
+    (render/page/main/pagina/show, derivadas do nome do arquivo e fallbacks
+    `pagina_*`/`render_*`) e monta o plano de parâmetros; nos reruns seguintes
+    só executa o plano:
+      - 'caminho_banco', usuário, perfil e página atual vêm do contexto do app;
+      - outros parâmetros OBRIGATÓRIOS vêm do session_state (ou None);
+      - opcionais só são passados se existirem no session_state.
     """
     try:
-        mod = importlib.import_module(module_path)
+        pagina = registro.resolver(module_path)
+    except registro.EntradaNaoEncontrada as e:
+        st.warning(str(e))
+        return
     except Exception as e:
         if DEBUG:
             st.error(f"Falha ao importar módulo '{module_path}':")
@@ -81,114 +89,24 @@ def _call_page(module_path: str):
             st.error(f"Falha ao importar módulo '{module_path}': {e}")
         return
 
-    def _invoke(fn):
-        sig = inspect.signature(fn)
-        args = []
-        kwargs = {}
-
-        ss = st.session_state
-        usuario_logado = ss.get("usuario_logado")
-        known = {
-            "usuario": usuario_logado,
-            "usuario_logado": usuario_logado,
-            "perfil": (usuario_logado or {}).get("perfil") if usuario_logado else None,
-            "pagina_atual": ss.get("pagina_atual"),
-            "ir_para_formulario": ss.get("ir_para_formulario"),
-            "caminho_banco": caminho_banco,
-        }
-
-        # Construção obedecendo a ordem dos parâmetros
-        for p in sig.parameters.values():
-            name = p.name
-            kind = p.kind
-            has_default = (p.default is not inspect._empty)
-
-            # 1) caminho_banco sempre fornecido (como posicional se possível)
-            if name == "caminho_banco":
-                args.append(caminho_banco)
-                continue
-
-            # 2) valor conhecido/estado?
-            if name in known:
-                val = known[name]
-                if kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD):
-                    args.append(val)
-                else:
-                    kwargs[name] = val
-                continue
-            if name in ss:
-                val = ss[name]
-                if kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD):
-                    args.append(val)
-                else:
-                    kwargs[name] = val
-                continue
-
-            # 3) obrigatório sem default -> preencher com None
-            if not has_default:
-                if kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD):
-                    args.append(None)
-                else:  # KEYWORD_ONLY
-                    kwargs[name] = None
-            # se tiver default e não veio de lugar nenhum, não passamos nada
-
-        return fn(*args, **kwargs)
-
-    seg = module_path.rsplit(".", 1)[-1]                 # ex.: 'page_venda'
-    parent = module_path.rsplit(".", 2)[-2] if "." in module_path else ""
-    tail = seg.split("_", 1)[1] if "_" in seg else seg   # ex.: 'venda'
-
-    base = ["render", "page", "main", "pagina", "show", "pagina_fechamento_caixa"]
-    derived = [
-        f"render_{tail}",
-        "render_page",
-        f"render_{seg}",
-        f"render_{parent}",
-        f"page_{tail}",
-        f"show_{tail}",
-        seg,  # função com o mesmo nome do módulo (ex.: page_venda)
-    ]
-
-    tried = set()
-    for fn_name in base + derived:
-        if fn_name in tried or not hasattr(mod, fn_name):
-            tried.add(fn_name)
-            continue
-        tried.add(fn_name)
-        fn = getattr(mod, fn_name)
-        if callable(fn):
-            try:
-                return _invoke(fn)
-            except Exception as e:
-                if DEBUG:
-                    st.error(f"Erro ao executar {module_path}.{fn_name}:")
-                    st.exception(e)
-                else:
-                    st.error(f"Erro ao executar {module_path}.{fn_name}: {e}")
-                return
-
-    # fallbacks: primeira função começando com 'pagina_' ou 'render_'
-    for prefix in ("pagina_", "render_"):
-        for name, obj in vars(mod).items():
-            if callable(obj) and name.startswith(prefix):
-                try:
-                    return _invoke(obj)
-                except Exception as e:
-                    if DEBUG:
-                        st.error(f"Erro ao executar {module_path}.{name}:")
-                        st.exception(e)
-                    else:
-                        st.error(f"Erro ao executar {module_path}.{name}: {e}")
-                    return
-
-    # Loga de forma mais informativa quando não há entrypoint compatível
-    candidatos = [n for n, o in vars(mod).items() if callable(o)]
-    msg = (
-        f"O módulo '{module_path}' não possui função compatível "
-        f"(esperado: render/page/main/pagina*/show). "
-        f"Funções encontradas: {', '.join(candidatos) or 'nenhuma'}."
-    )
-    st.warning(msg)
+    ss = st.session_state
+    usuario_logado = ss.get("usuario_logado")
+    contexto = {
+        "usuario": usuario_logado,
+        "usuario_logado": usuario_logado,
+        "perfil": (usuario_logado or {}).get("perfil") if usuario_logado else None,
+        "pagina_atual": ss.get("pagina_atual"),
+        "ir_para_formulario": ss.get("ir_para_formulario"),
+        "caminho_banco": caminho_banco,
+    }
+    try:
+        return registro.chamar(pagina, contexto, ss)
+    except Exception as e:
+        if DEBUG:
+            st.error(f"Erro ao executar {module_path}.{pagina.funcao}:")
+            st.exception(e)
+        else:
+            st.error(f"Erro ao executar {module_path}.{pagina.funcao}: {e}")
 
 
 # ======================================================================================
@@ -332,6 +250,9 @@ if perfil == "Administrador":
         if st.button("📂 Cadastro de Saídas", use_container_width=True):
             st.session_state.pagina_atual = "📂 Cadastro de Saídas"
             st.rerun()
+        if st.button("📈 Desempenho", use_container_width=True):
+            st.session_state.pagina_atual = "📈 Desempenho"
+            st.rerun()
 
 
 # ======================================================================================
@@ -370,6 +291,9 @@ ROTAS = {
     "🏛️ Cadastro de Empréstimos": "flowdash_pages.cadastros.pagina_emprestimos",
     "🏦 Cadastro de Bancos": "flowdash_pages.cadastros.pagina_bancos_cadastrados",
     "📂 Cadastro de Saídas": "flowdash_pages.cadastros.cadastro_categorias",
+
+    # administração
+    "📈 Desempenho": "flowdash_pages.admin.desempenho",
 }
 
 # (opcional) controle simples de acesso por página
@@ -397,6 +321,7 @@ PERMISSOES = {
     "🏛️ Cadastro de Empréstimos": {"Administrador"},
     "🏦 Cadastro de Bancos": {"Administrador"},
     "📂 Cadastro de Saídas": {"Administrador"},
+    "📈 Desempenho": {"Administrador"},
 }
 
 pagina = st.session_state.get("pagina_atual", "📊 Dashboard")
@@ -406,6 +331,8 @@ if pagina in ROTAS:
     if pagina in PERMISSOES and perfil_atual not in PERMISSOES[pagina]:
         st.error("Acesso negado para o seu perfil.")
     else:
-        _call_page(ROTAS[pagina])
+        # Render medido por página (no-op com a instrumentação desligada)
+        with medir(pagina, tipo="pagina"):
+            _call_page(ROTAS[pagina])
 else:
     st.warning("Página não encontrada.")
@@ -15,23 +15,44 @@ Repositórios principais
 - BancosCadastradosRepository .......... bancos cadastrados no sistema
 - EmprestimosFinanciamentosRepository .. empréstimos e financiamentos
 - TaxasMaquinasRepository .............. taxas de máquinas de cartão
+- SaldosBancosRepository ............... saldos bancários acumulados (índice por banco/data)
+- resumo_diario_repository ............. resumo do dia materializado (invalidado pelo registro shared.alteracoes)
+- fatos_repository ..................... fatos diários pré-agregados (Dashboard/DRE/Metas)
+- dre_repository ....................... consolidação mensal do DRE (recalcula competências tocadas)
+- metas_repository ..................... progresso das metas de venda (dia/semana/mês) por vendedor
+- fechamento_repository ................ conciliação diária de Caixa/Caixa 2 (dia ou período)
 - contas_a_pagar_mov_repository ........ subpacote especializado em contas a pagar
+
+Os repositórios são importados sob demanda (PEP 562): importar um deles não
+carrega os demais (nem o pandas, usado só por alguns).
 """
 
-from repository.movimentacoes_repository import MovimentacoesRepository
-from repository.categorias_repository import CategoriasRepository
-from repository.cartoes_repository import CartoesRepository
-from repository.bancos_cadastrados_repository import BancosCadastradosRepository
-from repository.emprestimos_financiamentos_repository import EmprestimosFinanciamentosRepository
-from repository.taxas_maquinas_repository import TaxasMaquinasRepository
-from repository import contas_a_pagar_mov_repository
-
-__all__ = [
-    "MovimentacoesRepository",
-    "CategoriasRepository",
-    "CartoesRepository",
-    "BancosCadastradosRepository",
-    "EmprestimosFinanciamentosRepository",
-    "TaxasMaquinasRepository",
-    "contas_a_pagar_mov_repository",
-]
+from __future__ import annotations
+
+import importlib
+from typing import Any, Dict
+
+# Reexportações resolvidas sob demanda (PEP 562): {nome: módulo}
+_EXPORTS: Dict[str, str] = {
+    "MovimentacoesRepository": "repository.movimentacoes_repository",
+    "CategoriasRepository": "repository.categorias_repository",
+    "CartoesRepository": "repository.cartoes_repository",
+    "BancosCadastradosRepository": "repository.bancos_cadastrados_repository",
+    "EmprestimosFinanciamentosRepository": "repository.emprestimos_financiamentos_repository",
+    "TaxasMaquinasRepository": "repository.taxas_maquinas_repository",
+    "SaldosBancosRepository": "repository.saldos_bancos_repository",
+    "contas_a_pagar_mov_repository": "repository.contas_a_pagar_mov_repository",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(nome: str) -> Any:
+    """Importa o repositório na primeira referência (`from repository import X`)."""
+    modulo = _EXPORTS.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    mod = importlib.import_module(modulo)
+    valor = mod if mod.__name__.endswith("." + nome) else getattr(mod, nome)
+    globals()[nome] = valor
+    return valor
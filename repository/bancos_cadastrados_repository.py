@@ -16,20 +16,34 @@ Detalhes técnicos
 - Conexão SQLite via helper `get_conn` (shared.db).
 - Operações seguras contra falhas: se a tabela não existir, retorna lista vazia.
 - Case-insensitive para verificar existência.
+- `listar_nomes` usa o cache por versão de tabela (`shared.cache`): reruns
+  reutilizam a lista até uma escrita em `bancos_cadastrados`.
 
 Dependências
 ------------
 - pandas
 - typing (List)
 - shared.db.get_conn
+- shared.cache.cache_consulta
 """
 
 from typing import List
 import pandas as pd
 
+from shared.cache import cache_consulta
 from shared.db import get_conn
 
 
+@cache_consulta("bancos_cadastrados")
+def _listar_nomes(caminho_banco: str) -> List[str]:
+    with get_conn(caminho_banco) as conn:
+        try:
+            df = pd.read_sql("SELECT nome FROM bancos_cadastrados ORDER BY nome", conn)
+            return df["nome"].dropna().astype(str).tolist() if not df.empty else []
+        except Exception:
+            return []
+
+
 class BancosCadastradosRepository:
     """Consultas simples à tabela `bancos_cadastrados`."""
 
@@ -43,12 +57,7 @@ class BancosCadastradosRepository:
         Retorno:
             list[str]: Lista de nomes ou lista vazia se tabela não existir.
         """
-        with get_conn(self.caminho_banco) as conn:
-            try:
-                df = pd.read_sql("SELECT nome FROM bancos_cadastrados ORDER BY nome", conn)
-                return df["nome"].dropna().astype(str).tolist() if not df.empty else []
-            except Exception:
-                return []
+        return _listar_nomes(self.caminho_banco)
 
     def existe(self, nome: str) -> bool:
         """
@@ -33,6 +33,8 @@ from __future__ import annotations
 import sqlite3
 from typing import Optional, Tuple, List, Dict
 
+from shared.db import get_conn
+
 
 class CartoesRepository:
     """
@@ -51,14 +53,10 @@ class CartoesRepository:
     # -------------------------
     def _get_conn(self) -> sqlite3.Connection:
         """
-        Abre conexão SQLite com PRAGMAs de confiabilidade/performance
-        adequados ao app (WAL, busy_timeout, foreign_keys).
+        Obtém a conexão SQLite do pool (`shared.db.get_conn`) com PRAGMAs de
+        confiabilidade/performance adequados ao app (WAL, busy_timeout, foreign_keys).
         """
-        conn = sqlite3.connect(self.db_path, timeout=30)
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute("PRAGMA busy_timeout=30000;")
-        conn.execute("PRAGMA foreign_keys=ON;")
-        return conn
+        return get_conn(self.db_path)
 
     # -------------------------
     # Validações de configuração
@@ -190,13 +188,8 @@ def listar_destinos_fatura_em_aberto(db_path: str):
     if not db_path or not isinstance(db_path, str):
         raise ValueError("db_path inválido em listar_destinos_fatura_em_aberto")
 
-    conn = sqlite3.connect(db_path, timeout=30)
+    conn = get_conn(db_path)
     try:
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute("PRAGMA busy_timeout=30000;")
-        conn.execute("PRAGMA foreign_keys=ON;")
-        conn.row_factory = sqlite3.Row
-
         rows = conn.execute(
             """
             WITH lanc AS (
@@ -14,6 +14,9 @@ Modelo (Lei do Sistema)
                                    O caixa efetivo — dinheiro que sai — é registrado em movimentacoes_bancarias.)
 - status/faltante ............... dependem APENAS de principal_pago_acumulado.
 - Não criamos linhas 'PAGAMENTO' no CAP (auditoria fica em movimentacoes_bancarias).
+- cap_encargos_eventos .......... juros/multa/desconto de CADA pagamento, na
+                                  data do evento (`registrar_encargos_eventos`;
+                                  base das linhas financeiras do DRE).
 
 Refatoração (2025-09-04)
 ------------------------
@@ -21,20 +24,518 @@ Refatoração (2025-09-04)
     • obter_parcela_lancamento_por_obrigacao(obrigacao_id)
     • obter_restante_e_status(obrigacao_id)
     • aplicar_pagamento_por_obrigacao(...)  (atalho usando aplicar_pagamento_parcela)
+
+Motor de status (set-based)
+---------------------------
+- `recalcular_status_cap(conn, obrigacao_ids=..., parcela_ids=...)`: recalcula o
+  `status` de todas as linhas LANCAMENTO selecionadas (ou de todas) em **um**
+  `UPDATE` (regra sobre as colunas da própria linha; qualquer versão do
+  SQLite), gravando apenas as que mudaram.
+- `status_parcela(valor_evento, principal_pago)`: a regra de status (única);
+  o UPDATE do motor usa a mesma regra em SQL.
+- `status_agregado_cap(conn, obrigacao_ids)`: status consolidado por obrigação.
+- Os caminhos de escrita chamam o motor uma vez por transação; reparo completo:
+  `python -m repository.contas_a_pagar_mov_repository rebuild-status <db>`.
+
+Pagamento em lote
+-----------------
+- `calcular_pagamento_parcela(parcela, ...)`: a regra de
+  `aplicar_pagamento_parcela` sem I/O (o método a usa).
+- `listar_parcelas_em_aberto_lote(conn, ids)` + `gravar_acumulados(conn, ...)`:
+  uma leitura FIFO para várias obrigações e um `executemany` com os
+  acumuladores calculados em memória (`services.ledger.service_ledger_lote`).
+
+Empréstimos (cronograma)
+------------------------
+- `registrar_lancamentos_lote(conn, lancamentos)`: várias parcelas num
+  `executemany` (mesmo INSERT de `registrar_lancamento`).
+- `listar_parcelas_emprestimo` / `atualizar_parcelas_programadas` /
+  `excluir_parcelas_programadas`: base da reprogramação por diff em
+  `ServiceLedgerEmprestimo.reprogramar_emprestimo`; só parcelas sem nenhum
+  pagamento são reescritas ou removidas.
+
+Itens em aberto (índices parciais)
+----------------------------------
+- Colunas derivadas (`garantir_indices_em_aberto`): `principal_faltante`
+  (valor_evento − principal_pago_acumulado), `status_norm`, `tipo_norm` e
+  `vencimento_dia` — geradas VIRTUAL no SQLite >= 3.31; antes, colunas comuns
+  mantidas por triggers.
+- Índices parciais `WHERE categoria_evento = 'LANCAMENTO' AND
+  principal_faltante > 0.005`: as listagens de faturas/boletos/empréstimos,
+  `obter_em_aberto` e o FIFO custam O(itens em aberto), não O(histórico).
+  As consultas repetem o predicado do índice **literalmente** (`_SQL_EM_ABERTO`),
+  senão o planner não consegue usá-lo.
 """
 
 from __future__ import annotations
 
+import json
 import sqlite3
+import threading
 from contextlib import contextmanager
 from datetime import datetime
-from typing import Any, Dict, Iterator, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from shared.db import get_conn
+from shared.schema import colunas, db_key, schema_version
 
 STATUS_ABERTO = "EM ABERTO"
 STATUS_PARCIAL = "PARCIAL"
 STATUS_QUITADO = "QUITADO"
 
 _EPS = 0.005  # Tolerância para considerar “faltante > 0” em filtros/relatórios
+_EPS_QUITADO = 1e-9  # Folga numérica de “principal cobre o documento”
+
+
+# Status da parcela pelo PRINCIPAL — regra única (Python e SQL abaixo)
+def status_parcela(
+    valor_evento: float,
+    principal_pago: float,
+    status_atual: Optional[str] = None,
+) -> str:
+    """
+    Status de uma parcela LANCAMENTO só pelo principal amortizado.
+
+    QUITADO se o principal cobre o documento; PARCIAL se há principal pago
+    (> `_EPS`); senão `status_atual` quando informado (ex.: rateio manual), ou
+    EM ABERTO.
+    """
+    principal = float(principal_pago or 0.0)
+    if principal + _EPS_QUITADO >= float(valor_evento or 0.0):
+        return STATUS_QUITADO
+    if principal > _EPS:
+        return STATUS_PARCIAL
+    return (status_atual or "").strip() or STATUS_ABERTO
+
+
+def _sql_status(manter_status: bool = False) -> str:
+    """Expressão SQL equivalente a `status_parcela` (colunas da própria linha)."""
+    senao = f"COALESCE(NULLIF(TRIM(status),''), '{STATUS_ABERTO}')" if manter_status else f"'{STATUS_ABERTO}'"
+    return f"""
+    CASE
+      WHEN COALESCE(principal_pago_acumulado,0) + {_EPS_QUITADO} >= COALESCE(valor_evento,0) THEN '{STATUS_QUITADO}'
+      WHEN COALESCE(principal_pago_acumulado,0) > {_EPS} THEN '{STATUS_PARCIAL}'
+      ELSE {senao}
+    END
+"""
+
+# Predicado dos índices parciais de itens em aberto (repetir igual nas consultas)
+_SQL_EM_ABERTO = f"categoria_evento = 'LANCAMENTO' AND principal_faltante > {_EPS}"
+
+# Colunas derivadas: {coluna: (tipo, expressão)}
+_COLUNAS_DERIVADAS: Dict[str, Tuple[str, str]] = {
+    "principal_faltante": ("REAL", "COALESCE(valor_evento,0) - COALESCE(principal_pago_acumulado,0)"),
+    "status_norm": ("TEXT", f"UPPER(COALESCE(status,'{STATUS_ABERTO}'))"),
+    "tipo_norm": ("TEXT", "UPPER(TRIM(COALESCE(tipo_obrigacao,'')))"),
+    "vencimento_dia": ("TEXT", "DATE(vencimento)"),
+}
+
+# Índices parciais sobre os itens em aberto: {nome: colunas}
+_INDICES_EM_ABERTO: Dict[str, str] = {
+    # categoria_evento na frente: empata com idx de categoria e vence pelo ORDER BY
+    "idx_cap_aberto_venc": "categoria_evento, vencimento_dia, id",
+    "idx_cap_aberto_tipo": "tipo_norm, vencimento_dia, parcela_num, id",
+    "idx_cap_aberto_obrigacao": "obrigacao_id, vencimento_dia, id",
+}
+
+# {db_key: schema_version em que colunas/índices de itens em aberto foram conferidos}
+_garantidos: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+# ---------------------------------------------------------------------
+# Schema: itens em aberto
+# ---------------------------------------------------------------------
+def garantir_indices_em_aberto(conn: sqlite3.Connection) -> None:
+    """
+    Garante as colunas derivadas e os índices parciais de itens em aberto
+    (uma vez por schema). Idempotente; não faz commit.
+
+    - SQLite >= 3.31: colunas geradas VIRTUAL (não ocupam espaço; indexáveis).
+    - Versões antigas: colunas comuns + backfill + triggers de INSERT/UPDATE.
+    """
+    key = db_key(conn)
+    sv = schema_version(conn)
+    with _lock:
+        if _garantidos.get(key) == sv:
+            return
+    cols = colunas(conn, "contas_a_pagar_mov")
+    if not cols:
+        return
+    comuns: List[str] = []
+    for nome, (tipo, expr) in _COLUNAS_DERIVADAS.items():
+        if nome in cols:
+            continue
+        try:
+            conn.execute(
+                f"ALTER TABLE contas_a_pagar_mov ADD COLUMN {nome} {tipo} GENERATED ALWAYS AS ({expr}) VIRTUAL;"
+            )
+        except sqlite3.OperationalError:
+            conn.execute(f'ALTER TABLE contas_a_pagar_mov ADD COLUMN "{nome}" {tipo};')
+            comuns.append(nome)
+    if comuns:
+        sets = ", ".join(f"{nome} = {_COLUNAS_DERIVADAS[nome][1]}" for nome in comuns)
+        conn.execute(f"UPDATE contas_a_pagar_mov SET {sets};")
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_cap_derivadas_ins
+            AFTER INSERT ON contas_a_pagar_mov
+            BEGIN
+                UPDATE contas_a_pagar_mov SET {sets} WHERE id = NEW.id;
+            END;
+            """
+        )
+        conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_cap_derivadas_upd
+            AFTER UPDATE OF valor_evento, principal_pago_acumulado, status, tipo_obrigacao, vencimento
+            ON contas_a_pagar_mov
+            BEGIN
+                UPDATE contas_a_pagar_mov SET {sets} WHERE id = NEW.id;
+            END;
+            """
+        )
+    for nome, idx_cols in _INDICES_EM_ABERTO.items():
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {nome} ON contas_a_pagar_mov ({idx_cols}) WHERE {_SQL_EM_ABERTO};"
+        )
+    with _lock:
+        _garantidos[key] = schema_version(conn)
+
+
+# ---------------------------------------------------------------------
+# Encargos por evento de pagamento
+# ---------------------------------------------------------------------
+_ENCARGOS = "cap_encargos_eventos"
+
+# {db_key: schema_version em que a tabela de encargos foi conferida}
+_encargos_garantidos: Dict[str, int] = {}
+
+
+def garantir_encargos_eventos(conn: sqlite3.Connection) -> None:
+    """
+    Cria `cap_encargos_eventos` (uma vez por schema). Idempotente; não faz commit.
+
+    Na criação, o histórico vira um evento por parcela com encargos, datado do
+    último `data_pagamento` (o detalhe por pagamento anterior não existe). Os
+    caminhos de escrita chamam esta função **antes** de gravar acumuladores:
+    senão o backfill contaria o pagamento em curso junto com o seu evento.
+    """
+    key = db_key(conn)
+    with _lock:
+        if _encargos_garantidos.get(key) == schema_version(conn):
+            return
+    cols = colunas(conn, "contas_a_pagar_mov")
+    if not cols:
+        return
+    nova = not colunas(conn, _ENCARGOS)
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {_ENCARGOS} (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            parcela_id  INTEGER NOT NULL,
+            data_evento TEXT    NOT NULL,
+            juros       REAL    NOT NULL DEFAULT 0,
+            multa       REAL    NOT NULL DEFAULT 0,
+            desconto    REAL    NOT NULL DEFAULT 0,
+            created_at  TEXT    DEFAULT (datetime('now'))
+        )
+        """
+    )
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{_ENCARGOS}_data_dia ON {_ENCARGOS} (DATE(data_evento))"
+    )
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{_ENCARGOS}_parcela ON {_ENCARGOS} (parcela_id)")
+    if nova and "data_pagamento" in cols:
+        conn.execute(
+            f"""
+            INSERT INTO {_ENCARGOS} (parcela_id, data_evento, juros, multa, desconto)
+            SELECT id, data_pagamento,
+                   COALESCE(juros_pago_acumulado, 0),
+                   COALESCE(multa_paga_acumulada, 0),
+                   COALESCE(desconto_aplicado_acumulado, 0)
+              FROM contas_a_pagar_mov
+             WHERE categoria_evento = 'LANCAMENTO'
+               AND data_pagamento IS NOT NULL
+               AND (COALESCE(juros_pago_acumulado, 0) > 0
+                    OR COALESCE(multa_paga_acumulada, 0) > 0
+                    OR COALESCE(desconto_aplicado_acumulado, 0) > 0)
+            """
+        )
+    with _lock:
+        _encargos_garantidos[key] = schema_version(conn)
+
+
+def registrar_encargos_eventos(
+    conn: sqlite3.Connection,
+    eventos: Iterable[Tuple[int, str, float, float, float]],
+) -> int:
+    """
+    Grava `(parcela_id, data_evento, juros, multa, desconto)` de cada pagamento
+    num `executemany` (eventos sem encargo são ignorados). Não faz commit.
+    """
+    params = [
+        (int(pid), str(data), float(j or 0.0), float(m or 0.0), float(d or 0.0))
+        for pid, data, j, m, d in eventos
+        if (j or 0.0) > 0 or (m or 0.0) > 0 or (d or 0.0) > 0
+    ]
+    if not params:
+        return 0
+    garantir_encargos_eventos(conn)
+    conn.executemany(
+        f"INSERT INTO {_ENCARGOS} (parcela_id, data_evento, juros, multa, desconto) VALUES (?, ?, ?, ?, ?)",
+        params,
+    )
+    return len(params)
+
+
+# ---------------------------------------------------------------------
+# Motor de status (set-based)
+# ---------------------------------------------------------------------
+def _filtro_ids(
+    obrigacao_ids: Optional[Iterable[int]],
+    parcela_ids: Optional[Iterable[int]],
+) -> Optional[Tuple[str, List[Any]]]:
+    """Monta o filtro de LANCAMENTOs; None quando uma lista vazia foi pedida."""
+    where = ["categoria_evento = 'LANCAMENTO'"]
+    params: List[Any] = []
+    for col, ids in (("obrigacao_id", obrigacao_ids), ("id", parcela_ids)):
+        if ids is None:
+            continue
+        lista = sorted({int(i) for i in ids})
+        if not lista:
+            return None
+        where.append(f"{col} IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(lista))
+    return " AND ".join(where), params
+
+
+def recalcular_status_cap(
+    conn: sqlite3.Connection,
+    *,
+    obrigacao_ids: Optional[Iterable[int]] = None,
+    parcela_ids: Optional[Iterable[int]] = None,
+    manter_status: bool = False,
+) -> int:
+    """
+    Recalcula `status` das parcelas LANCAMENTO em um único UPDATE (regra de
+    `status_parcela`).
+
+    Sem filtros, processa a tabela inteira (reparo). Não faz commit.
+    `manter_status=True` preserva o status gravado das parcelas sem principal
+    pago (em vez de voltar para EM ABERTO) — regra do rateio manual.
+
+    Returns:
+        Quantidade de linhas cujo status mudou.
+    """
+    filtro = _filtro_ids(obrigacao_ids, parcela_ids)
+    if filtro is None:
+        return 0
+    where, params = filtro
+    # A regra só usa colunas da própria linha: UPDATE simples (sem `UPDATE ...
+    # FROM`, que exigiria SQLite >= 3.33)
+    novo = _sql_status(manter_status)
+    cur = conn.execute(
+        f"""
+        UPDATE contas_a_pagar_mov
+           SET status = {novo}
+         WHERE {where}
+           AND status IS NOT ({novo})
+        """,
+        params,
+    )
+    return int(cur.rowcount or 0)
+
+
+def status_agregado_cap(conn: sqlite3.Connection, obrigacao_ids: Iterable[int]) -> Dict[int, str]:
+    """
+    Status consolidado por obrigação (a partir do `status` gravado):
+    QUITADO se todas quitadas, EM ABERTO se todas em aberto, senão PARCIAL.
+    """
+    filtro = _filtro_ids(obrigacao_ids, None)
+    if filtro is None:
+        return {}
+    where, params = filtro
+    out: Dict[int, str] = {}
+    for obrig, total, quitadas, abertas in conn.execute(
+        f"""
+        SELECT obrigacao_id,
+               COUNT(*),
+               SUM(status = '{STATUS_QUITADO}'),
+               SUM(COALESCE(status, '{STATUS_ABERTO}') = '{STATUS_ABERTO}')
+          FROM contas_a_pagar_mov
+         WHERE {where}
+         GROUP BY obrigacao_id
+        """,
+        params,
+    ).fetchall():
+        if quitadas == total:
+            out[int(obrig)] = STATUS_QUITADO
+        elif abertas == total:
+            out[int(obrig)] = STATUS_ABERTO
+        else:
+            out[int(obrig)] = STATUS_PARCIAL
+    return out
+
+
+# ---------------------------------------------------------------------
+# Lançamentos (INSERT compartilhado por unitário e lote)
+# ---------------------------------------------------------------------
+_SQL_INSERIR_LANCAMENTO = f"""
+    INSERT INTO contas_a_pagar_mov
+        (obrigacao_id, tipo_obrigacao, categoria_evento, data_evento, vencimento,
+         valor_evento, descricao, credor, competencia, parcela_num, parcelas_total,
+         forma_pagamento, origem, ledger_id, usuario, created_at,
+         tipo_origem, cartao_id, emprestimo_id, status,
+         valor_pago_acumulado,                -- BRUTO (principal+desconto+juros+multa)
+         juros_pago_acumulado, multa_paga_acumulada, desconto_aplicado_acumulado,
+         valor, data_pagamento,
+         principal_pago_acumulado)
+    VALUES (?, ?, 'LANCAMENTO', ?, ?, ?, ?, ?, ?, ?, ?,
+            NULL, NULL, NULL, ?, datetime('now','localtime'),
+            ?, ?, ?, '{STATUS_ABERTO}',
+            0, 0, 0, 0,
+            NULL, NULL,
+            0)
+"""
+
+
+def _params_lancamento(
+    *,
+    obrigacao_id: int,
+    tipo_obrigacao: str,
+    valor_total: float,
+    data_evento: str,
+    vencimento: Optional[str],
+    descricao: Optional[str],
+    credor: Optional[str],
+    competencia: Optional[str],
+    parcela_num: Optional[int],
+    parcelas_total: Optional[int],
+    usuario: str,
+    tipo_origem: Optional[str] = None,
+    cartao_id: Optional[int] = None,
+    emprestimo_id: Optional[int] = None,
+) -> Tuple[Any, ...]:
+    """Parâmetros de `_SQL_INSERIR_LANCAMENTO` (mesmas conversões do INSERT unitário)."""
+    return (
+        int(obrigacao_id),
+        str(tipo_obrigacao),
+        str(data_evento),
+        (str(vencimento) if vencimento else None),
+        float(valor_total),
+        (descricao or None),
+        (credor or None),
+        (competencia or None),
+        (int(parcela_num) if parcela_num else None),
+        (int(parcelas_total) if parcelas_total else None),
+        str(usuario),
+        (tipo_origem or None),
+        (int(cartao_id) if cartao_id is not None else None),
+        (int(emprestimo_id) if emprestimo_id is not None else None),
+    )
+
+
+# ---------------------------------------------------------------------
+# Pagamento de parcela (cálculo sem I/O)
+# ---------------------------------------------------------------------
+_SQL_GRAVAR_ACUMULADOS = """
+    UPDATE contas_a_pagar_mov
+    SET principal_pago_acumulado     = ?,
+        juros_pago_acumulado         = ?,
+        multa_paga_acumulada         = ?,
+        desconto_aplicado_acumulado  = ?,
+        valor_pago_acumulado         = ?, -- BRUTO (principal+desconto+juros+multa)
+        data_pagamento               = ?
+    WHERE id = ?
+"""
+
+
+def _params_acumulados(estado: Mapping[str, Any], data_evento: str, parcela_id: int) -> Tuple[Any, ...]:
+    return (
+        estado["principal_pago_acumulado"],
+        estado["juros_pago_acumulado"],
+        estado["multa_paga_acumulada"],
+        estado["desconto_aplicado_acumulado"],
+        estado["valor_pago_acumulado"],
+        data_evento,
+        int(parcela_id),
+    )
+
+
+def calcular_pagamento_parcela(
+    parcela: Mapping[str, Any],
+    *,
+    principal: float,
+    juros: float = 0.0,
+    multa: float = 0.0,
+    desconto: float = 0.0,
+) -> Dict[str, Any]:
+    """
+    Efeito de um pagamento na parcela, sem tocar no banco.
+
+    Regras de `aplicar_pagamento_parcela` (desconto primeiro no principal
+    faltante; encargos em dinheiro; status só pelo principal).
+
+    Args:
+        parcela: Acumuladores atuais (`valor_evento`, `principal_pago_acumulado`,
+            `juros_pago_acumulado`, `multa_paga_acumulada`,
+            `desconto_aplicado_acumulado`, `valor_pago_acumulado`).
+
+    Returns:
+        Novos acumuladores (mesmas chaves), valores aplicados
+        (`principal_aplicado`, `juros_aplicado`, `multa_aplicada`,
+        `desconto_aplicado`), `saida_total`, `restante` e `status`.
+    """
+    valor_evento = float(parcela["valor_evento"] or 0.0)
+    principal_atual = float(parcela["principal_pago_acumulado"] or 0.0)
+    juros_atual = float(parcela["juros_pago_acumulado"] or 0.0)
+    multa_atual = float(parcela["multa_paga_acumulada"] or 0.0)
+    desc_atual = float(parcela["desconto_aplicado_acumulado"] or 0.0)
+    valor_pago_atual = float(parcela["valor_pago_acumulado"] or 0.0)
+
+    # faltante de principal
+    faltante = max(0.0, round(valor_evento - principal_atual, 2))
+
+    # 1) aplica desconto primeiro ao principal faltante
+    desconto_efetivo = min(max(0.0, float(desconto or 0.0)), faltante)
+    faltante_pos = max(0.0, round(faltante - desconto_efetivo, 2))
+
+    # 2) aplica principal em dinheiro no restante
+    principal_aplicado = min(max(0.0, float(principal or 0.0)), faltante_pos)
+
+    # encargos em dinheiro
+    juros_aplicado = max(0.0, float(juros or 0.0))
+    multa_aplicada = max(0.0, float(multa or 0.0))
+
+    # caixa real do evento (dinheiro que sai): principal_aplicado + juros + multa
+    caixa_evento = round(principal_aplicado + juros_aplicado + multa_aplicada, 2)
+
+    # acumuladores (CAP)
+    novo_principal = round(principal_atual + principal_aplicado + desconto_efetivo, 2)
+
+    novo_status = status_parcela(valor_evento, novo_principal)
+    if novo_status == STATUS_QUITADO:
+        novo_principal = valor_evento  # clamp para evitar exceder por arredondamento
+
+    return {
+        "valor_evento": valor_evento,
+        "principal_pago_acumulado": novo_principal,
+        "juros_pago_acumulado": round(juros_atual + juros_aplicado, 2),
+        "multa_paga_acumulada": round(multa_atual + multa_aplicada, 2),
+        "desconto_aplicado_acumulado": round(desc_atual + desconto_efetivo, 2),
+        # BRUTO (para CAP.valor_pago_acumulado) = principal + desconto + juros + multa
+        "valor_pago_acumulado": round(
+            valor_pago_atual + principal_aplicado + desconto_efetivo + juros_aplicado + multa_aplicada, 2
+        ),
+        "principal_aplicado": float(principal_aplicado),
+        "juros_aplicado": float(juros_aplicado),
+        "multa_aplicada": float(multa_aplicada),
+        "desconto_aplicado": float(desconto_efetivo),
+        "saida_total": float(caixa_evento),
+        "restante": float(max(0.0, round(valor_evento - novo_principal, 2))),
+        "status": novo_status,
+    }
 
 
 class ContasAPagarMovRepository:
@@ -62,13 +563,8 @@ class ContasAPagarMovRepository:
             finally:
                 conn.row_factory = old_rf
         else:
-            c = sqlite3.connect(self.db_path)
-            c.row_factory = sqlite3.Row
-            try:
+            with get_conn(self.db_path) as c:
                 yield c
-            finally:
-                c.commit()
-                c.close()
 
     def _get_row(self, cur: sqlite3.Cursor, row_id: int) -> Optional[sqlite3.Row]:
         """Busca linha por ID (tabela `contas_a_pagar_mov`)."""
@@ -142,13 +638,9 @@ class ContasAPagarMovRepository:
             restante = round(max(valor_evento - principal_acum, 0.0), 2)
 
             # Status depende SOMENTE do principal acumulado vs valor_evento
-            if principal_acum + 1e-9 >= valor_evento:
-                status = STATUS_QUITADO
-            elif principal_acum > _EPS:
-                status = STATUS_PARCIAL
-            else:
-                # principal zero (ou ~zero): se há valor_evento, está EM ABERTO
-                status = STATUS_ABERTO if valor_evento > _EPS else STATUS_QUITADO
+            status = status_parcela(valor_evento, principal_acum)
+            if status == STATUS_ABERTO and valor_evento <= _EPS:
+                status = STATUS_QUITADO  # documento de valor ~zero não fica em aberto
 
             return restante, status
 
@@ -206,43 +698,50 @@ class ContasAPagarMovRepository:
         with self._conn_ctx(conn) as c:
             cur = c.cursor()
             cur.execute(
-                """
-                INSERT INTO contas_a_pagar_mov
-                    (obrigacao_id, tipo_obrigacao, categoria_evento, data_evento, vencimento,
-                     valor_evento, descricao, credor, competencia, parcela_num, parcelas_total,
-                     forma_pagamento, origem, ledger_id, usuario, created_at,
-                     tipo_origem, cartao_id, emprestimo_id, status,
-                     valor_pago_acumulado,                -- BRUTO (principal+desconto+juros+multa)
-                     juros_pago_acumulado, multa_paga_acumulada, desconto_aplicado_acumulado,
-                     valor, data_pagamento,
-                     principal_pago_acumulado)
-                VALUES (?, ?, 'LANCAMENTO', ?, ?, ?, ?, ?, ?, ?, ?,
-                        NULL, NULL, NULL, ?, datetime('now','localtime'),
-                        ?, ?, ?, ?,
-                        0, 0, 0, 0,
-                        NULL, NULL,
-                        0)
-                """,
-                (
-                    int(obrigacao_id),
-                    str(tipo_obrigacao),
-                    str(data_evento),
-                    (str(vencimento) if vencimento else None),
-                    float(valor_total),
-                    (descricao or None),
-                    (credor or None),
-                    (competencia or None),
-                    (int(parcela_num) if parcela_num else None),
-                    (int(parcelas_total) if parcelas_total else None),
-                    str(usuario),
-                    (tipo_origem or None),
-                    (int(cartao_id) if cartao_id is not None else None),
-                    (int(emprestimo_id) if emprestimo_id is not None else None),
-                    STATUS_ABERTO,
+                _SQL_INSERIR_LANCAMENTO,
+                _params_lancamento(
+                    obrigacao_id=obrigacao_id,
+                    tipo_obrigacao=tipo_obrigacao,
+                    valor_total=valor_total,
+                    data_evento=data_evento,
+                    vencimento=vencimento,
+                    descricao=descricao,
+                    credor=credor,
+                    competencia=competencia,
+                    parcela_num=parcela_num,
+                    parcelas_total=parcelas_total,
+                    usuario=usuario,
+                    tipo_origem=tipo_origem,
+                    cartao_id=cartao_id,
+                    emprestimo_id=emprestimo_id,
                 ),
             )
             return int(cur.lastrowid)
 
+    def registrar_lancamentos_lote(
+        self,
+        conn: sqlite3.Connection,
+        lancamentos: Iterable[Mapping[str, Any]],
+    ) -> List[int]:
+        """
+        Insere vários LANCAMENTOs num único `executemany` (mesmas chaves de
+        `registrar_lancamento`). Devolve os IDs na ordem de entrada.
+
+        Os IDs saem de `id > MAX(id)` lido antes do INSERT: exige estar dentro
+        da transação de escrita (o chamador abre; sem commit aqui).
+        """
+        params = [_params_lancamento(**dict(l)) for l in lancamentos]
+        if not params:
+            return []
+        ultimo = int(conn.execute("SELECT COALESCE(MAX(id), 0) FROM contas_a_pagar_mov").fetchone()[0])
+        conn.executemany(_SQL_INSERIR_LANCAMENTO, params)
+        ids = [int(r[0]) for r in conn.execute(
+            "SELECT id FROM contas_a_pagar_mov WHERE id > ? ORDER BY id", (ultimo,)
+        ).fetchall()]
+        if len(ids) != len(params):
+            raise RuntimeError("registrar_lancamentos_lote: IDs inseridos não conferem (escrita concorrente?).")
+        return ids
+
     # (LEGADO) Mantido para reprocessos antigos – NÃO usado na lógica atual.
     def registrar_pagamento(
         self,
@@ -325,6 +824,8 @@ class ContasAPagarMovRepository:
 
         data_evt = str(d.get("data_evento", d.get("data_pagamento", datetime.now().strftime("%Y-%m-%d"))))
         _ = d.get("usuario", "-")  # compat
+        # False: o chamador roda `recalcular_status_cap` uma vez ao fim da transação
+        recalcular = bool(d.get("recalcular_status", True))
 
         with self._conn_ctx(conn) as c:
             cur = c.cursor()
@@ -336,85 +837,30 @@ class ContasAPagarMovRepository:
             obrigacao_id = int(row["obrigacao_id"])
             valor_evento = float(row["valor_evento"] or 0.0)
 
-            principal_atual = float(row["principal_pago_acumulado"] or 0.0)
-            juros_atual = float(row["juros_pago_acumulado"] or 0.0)
-            multa_atual = float(row["multa_paga_acumulada"] or 0.0)
-            desc_atual = float(row["desconto_aplicado_acumulado"] or 0.0)
-            valor_pago_atual = float(row["valor_pago_acumulado"] or 0.0)
-
-            # faltante de principal
-            faltante = max(0.0, round(valor_evento - principal_atual, 2))
-
-            # 1) aplica desconto primeiro ao principal faltante
-            desconto_efetivo = min(max(0.0, desc_in), faltante)
-            faltante_pos = max(0.0, round(faltante - desconto_efetivo, 2))
-
-            # 2) aplica principal em dinheiro no restante
-            principal_aplicado = min(max(0.0, principal_in), faltante_pos)
-
-            # encargos em dinheiro
-            juros_aplicado = max(0.0, juros_in)
-            multa_aplicada = max(0.0, multa_in)
-
-            # caixa real do evento (dinheiro que sai): principal_aplicado + juros + multa
-            caixa_evento = round(principal_aplicado + juros_aplicado + multa_aplicada, 2)
-
-            # acumuladores (CAP)
-            novo_principal = round(principal_atual + principal_aplicado + desconto_efetivo, 2)
-            novo_juros = round(juros_atual + juros_aplicado, 2)
-            novo_multa = round(multa_atual + multa_aplicada, 2)
-            novo_desc = round(desc_atual + desconto_efetivo, 2)
-
-            # BRUTO (para CAP.valor_pago_acumulado) = principal + desconto + juros + multa
-            novo_valor_pago = round(
-                valor_pago_atual + principal_aplicado + desconto_efetivo + juros_aplicado + multa_aplicada, 2
+            calc = calcular_pagamento_parcela(
+                row, principal=principal_in, juros=juros_in, multa=multa_in, desconto=desc_in
             )
-
-            if novo_principal + 1e-9 >= valor_evento:
-                novo_principal = valor_evento  # clamp para evitar exceder por arredondamento
-                novo_status = STATUS_QUITADO
-            elif novo_principal > _EPS:
-                novo_status = STATUS_PARCIAL
-            else:
-                novo_status = STATUS_ABERTO
-
-            cur.execute(
-                """
-                UPDATE contas_a_pagar_mov
-                SET principal_pago_acumulado     = ?,
-                    juros_pago_acumulado         = ?,
-                    multa_paga_acumulada         = ?,
-                    desconto_aplicado_acumulado  = ?,
-                    valor_pago_acumulado         = ?, -- BRUTO (principal+desconto+juros+multa)
-                    status                       = ?,
-                    data_pagamento               = ?
-                WHERE id = ?
-                """,
-                (
-                    novo_principal,
-                    novo_juros,
-                    novo_multa,
-                    novo_desc,
-                    novo_valor_pago,
-                    novo_status,
-                    data_evt,
-                    parcela_id,
-                ),
+            garantir_encargos_eventos(c)  # antes da escrita: o backfill não pode ver este pagamento
+            cur.execute(_SQL_GRAVAR_ACUMULADOS, _params_acumulados(calc, data_evt, parcela_id))
+            registrar_encargos_eventos(
+                c,
+                [(parcela_id, data_evt, calc["juros_aplicado"], calc["multa_aplicada"], calc["desconto_aplicado"])],
             )
+            if recalcular:
+                recalcular_status_cap(c, parcela_ids=[parcela_id])
 
-            restante_depois = max(0.0, round(valor_evento - novo_principal, 2))
             return {
                 "parcela_id": parcela_id,
                 "obrigacao_id": obrigacao_id,
-                "principal_aplicado": float(principal_aplicado),
-                "juros_aplicado": float(juros_aplicado),
-                "multa_aplicada": float(multa_aplicada),
-                "desconto_aplicado": float(desconto_efetivo),
-                "saida_total": float(caixa_evento),             # dinheiro que saiu
+                "principal_aplicado": calc["principal_aplicado"],
+                "juros_aplicado": calc["juros_aplicado"],
+                "multa_aplicada": calc["multa_aplicada"],
+                "desconto_aplicado": calc["desconto_aplicado"],
+                "saida_total": calc["saida_total"],                    # dinheiro que saiu
                 "valor_evento": float(valor_evento),
-                "valor_pago_acumulado": float(novo_valor_pago), # BRUTO acumulado no CAP
-                "restante": float(restante_depois),
-                "status": novo_status,
+                "valor_pago_acumulado": calc["valor_pago_acumulado"],  # BRUTO acumulado no CAP
+                "restante": calc["restante"],
+                "status": calc["status"],
                 "data_pagamento": data_evt,
                 "id_evento_cap": -1,  # sem linha 'PAGAMENTO'
             }
@@ -483,6 +929,7 @@ class ContasAPagarMovRepository:
                 valor_pago_atual + principal_aplicado + desconto_efetivo + juros_aplicado + multa_aplicada, 2
             )
 
+            garantir_encargos_eventos(c)  # antes da escrita (ver aplicar_pagamento_parcela)
             cur.execute(
                 """
                 UPDATE contas_a_pagar_mov
@@ -506,6 +953,9 @@ class ContasAPagarMovRepository:
                     int(parcela_id),
                 ),
             )
+            registrar_encargos_eventos(
+                c, [(int(parcela_id), str(data_evento), juros_aplicado, multa_aplicada, desconto_efetivo)]
+            )
 
             return {
                 "parcela_id": int(parcela_id),
@@ -538,13 +988,16 @@ class ContasAPagarMovRepository:
         desconto_delta: float = 0.0,
         caixa_gasto_delta: Optional[float] = None,
         data_pagamento: Optional[str] = None,
+        recalcular_status: bool = True,
     ) -> Dict[str, Any]:
         """Atualiza acumuladores da parcela a partir de deltas (sem FIFO).
 
         Regras:
             - Se `caixa_gasto_delta` for None, acumula em `valor_pago_acumulado` o **BRUTO**:
               (principal_delta + desconto_delta + juros_delta + multa_delta).
-            - Clampa principal em [0, valor_evento] e recalcula status por principal.
+            - Clampa principal em [0, valor_evento] e recalcula status por principal
+              (`recalcular_status=False` deixa o recálculo para o fim da transação).
+            - Sem principal pago, o status gravado é mantido (não volta a EM ABERTO).
         """
         if caixa_gasto_delta is None:
             caixa_gasto_delta = (
@@ -567,6 +1020,7 @@ class ContasAPagarMovRepository:
             if not row:
                 raise ValueError(f"Parcela {parcela_id} não encontrada")
 
+            garantir_encargos_eventos(c)  # antes da escrita (ver aplicar_pagamento_parcela)
             cur.execute(
                 """
                 UPDATE contas_a_pagar_mov
@@ -588,6 +1042,7 @@ class ContasAPagarMovRepository:
                     parcela_id,
                 ),
             )
+            registrar_encargos_eventos(c, [(parcela_id, data_pagamento, juros_delta, multa_delta, desconto_delta)])
 
             # clamp e status por principal
             cur.execute(
@@ -603,18 +1058,8 @@ class ContasAPagarMovRepository:
                 """,
                 (parcela_id,),
             )
-            cur.execute(
-                """
-                UPDATE contas_a_pagar_mov
-                   SET status = CASE
-                                  WHEN COALESCE(principal_pago_acumulado,0) >= COALESCE(valor_evento,0) THEN 'QUITADO'
-                                  WHEN COALESCE(principal_pago_acumulado,0) > 0 THEN 'PARCIAL'
-                                  ELSE COALESCE(status,'EM ABERTO')
-                                END
-                 WHERE id = ?;
-                """,
-                (parcela_id,),
-            )
+            if recalcular_status:
+                recalcular_status_cap(c, parcela_ids=[parcela_id], manter_status=True)
 
             snap = self.obter_por_id(c, parcela_id)
             return snap or {"parcela_id": parcela_id}
@@ -625,6 +1070,7 @@ class ContasAPagarMovRepository:
     def listar_faturas_cartao_abertas(self, conn: Optional[sqlite3.Connection] = None) -> List[dict]:
         """Lista faturas em aberto com faltante de PRINCIPAL > 0."""
         with self._conn_ctx(conn) as c:
+            garantir_indices_em_aberto(c)
             cur = c.cursor()
             rows = cur.execute(
                 f"""
@@ -637,29 +1083,23 @@ class ContasAPagarMovRepository:
                     COALESCE(competencia, '')            AS competencia,
                     COALESCE(valor_evento, 0.0)          AS valor_total,
                     COALESCE(principal_pago_acumulado,0) AS principal_pago_acumulado,
-                    ROUND(
-                        CASE
-                          WHEN (COALESCE(valor_evento,0) - COALESCE(principal_pago_acumulado,0)) < 0
-                          THEN 0
-                          ELSE (COALESCE(valor_evento,0) - COALESCE(principal_pago_acumulado,0))
-                        END, 2
-                    ) AS saldo_restante,
+                    ROUND(principal_faltante, 2)         AS saldo_restante,
                     COALESCE(status, 'EM ABERTO')        AS status
                 FROM contas_a_pagar_mov
-                WHERE categoria_evento = 'LANCAMENTO'
-                  AND (tipo_obrigacao = 'FATURA_CARTAO' OR tipo_origem = 'FATURA_CARTAO')
-                  AND (COALESCE(valor_evento,0) - COALESCE(principal_pago_acumulado,0)) > {_EPS}
+                WHERE {_SQL_EM_ABERTO}
+                  AND (tipo_norm = 'FATURA_CARTAO' OR tipo_origem = 'FATURA_CARTAO')
                 ORDER BY DATE(COALESCE(data_evento,'1970-01-01')) DESC, id DESC
                 """
             ).fetchall()
             return [dict(r) for r in rows]
 
-    def listar_boletos_em_aberto(self, conn: Optional[sqlite3.Connection] = None) -> List[dict]:
-        """Lista boletos em aberto/parcial (faltante de PRINCIPAL)."""
+    def _listar_tipo_em_aberto(self, conn: Optional[sqlite3.Connection], tipo: str) -> List[dict]:
+        """Parcelas em aberto/parcial de um tipo (índice `idx_cap_aberto_tipo`)."""
         with self._conn_ctx(conn) as c:
+            garantir_indices_em_aberto(c)
             cur = c.cursor()
             rows = cur.execute(
-                """
+                f"""
                 SELECT
                     id                                   AS parcela_id,
                     COALESCE(obrigacao_id, 0)            AS obrigacao_id,
@@ -667,69 +1107,40 @@ class ContasAPagarMovRepository:
                     TRIM(COALESCE(descricao, ''))        AS descricao,
                     COALESCE(parcela_num, 1)             AS parcela_num,
                     COALESCE(parcelas_total, 1)          AS parcelas_total,
-                    DATE(vencimento)                     AS vencimento,
+                    vencimento_dia                       AS vencimento,
                     COALESCE(valor_evento, 0.0)          AS valor_evento,
                     COALESCE(principal_pago_acumulado,0) AS principal_pago_acumulado,
-                    ROUND(
-                        CASE
-                          WHEN (COALESCE(valor_evento,0) - COALESCE(principal_pago_acumulado,0)) < 0
-                          THEN 0
-                          ELSE (COALESCE(valor_evento,0) - COALESCE(principal_pago_acumulado,0))
-                        END, 2
-                    ) AS em_aberto,
+                    ROUND(principal_faltante, 2)         AS em_aberto,
                     COALESCE(status, 'EM ABERTO')         AS status
                 FROM contas_a_pagar_mov
-                WHERE categoria_evento = 'LANCAMENTO'
-                  AND UPPER(COALESCE(status,'EM ABERTO')) IN ('EM ABERTO','PARCIAL')
-                  AND UPPER(COALESCE(tipo_obrigacao,'')) = 'BOLETO'
-                ORDER BY DATE(vencimento) ASC, parcela_num ASC, id ASC
-                """
+                WHERE {_SQL_EM_ABERTO}
+                  AND tipo_norm = ?
+                  AND status_norm IN ('EM ABERTO','PARCIAL')
+                ORDER BY vencimento_dia ASC, parcela_num ASC, id ASC
+                """,
+                (tipo,),
             ).fetchall()
-            return [dict(r) for r in rows if float(r["em_aberto"]) > _EPS]
+            return [dict(r) for r in rows]
+
+    def listar_boletos_em_aberto(self, conn: Optional[sqlite3.Connection] = None) -> List[dict]:
+        """Lista boletos em aberto/parcial (faltante de PRINCIPAL)."""
+        return self._listar_tipo_em_aberto(conn, "BOLETO")
 
     def listar_emprestimos_em_aberto(self, conn: Optional[sqlite3.Connection] = None) -> List[dict]:
         """Lista empréstimos em aberto/parcial (faltante de PRINCIPAL)."""
-        with self._conn_ctx(conn) as c:
-            cur = c.cursor()
-            rows = cur.execute(
-                """
-                SELECT
-                    id                                   AS parcela_id,
-                    COALESCE(obrigacao_id, 0)            AS obrigacao_id,
-                    TRIM(COALESCE(credor, ''))           AS credor,
-                    TRIM(COALESCE(descricao, ''))        AS descricao,
-                    COALESCE(parcela_num, 1)             AS parcela_num,
-                    COALESCE(parcelas_total, 1)          AS parcelas_total,
-                    DATE(vencimento)                     AS vencimento,
-                    COALESCE(valor_evento, 0.0)          AS valor_evento,
-                    COALESCE(principal_pago_acumulado,0) AS principal_pago_acumulado,
-                    ROUND(
-                        CASE
-                          WHEN (COALESCE(valor_evento,0) - COALESCE(principal_pago_acumulado,0)) < 0
-                          THEN 0
-                          ELSE (COALESCE(valor_evento,0) - COALESCE(principal_pago_acumulado,0))
-                        END, 2
-                    ) AS em_aberto,
-                    COALESCE(status, 'EM ABERTO')         AS status
-                FROM contas_a_pagar_mov
-                WHERE categoria_evento = 'LANCAMENTO'
-                  AND UPPER(COALESCE(status,'EM ABERTO')) IN ('EM ABERTO','PARCIAL')
-                  AND UPPER(COALESCE(tipo_obrigacao,'')) = 'EMPRESTIMO'
-                ORDER BY DATE(vencimento) ASC, parcela_num ASC, id ASC
-                """
-            ).fetchall()
-            return [dict(r) for r in rows if float(r["em_aberto"]) > _EPS]
+        return self._listar_tipo_em_aberto(conn, "EMPRESTIMO")
 
     def obter_em_aberto(
         self, conn: Optional[sqlite3.Connection], tipo_obrigacao: Optional[str] = None
     ) -> List[dict]:
-        """Lista LANCAMENTOS em aberto/parcial (qualquer tipo)."""
+        """Lista LANCAMENTOS em aberto/parcial (qualquer tipo) com faltante de PRINCIPAL > 0."""
         with self._conn_ctx(conn) as c:
+            garantir_indices_em_aberto(c)
             cur = c.cursor()
             filtro = ""
             params: List[Any] = []
             if tipo_obrigacao:
-                filtro = "AND UPPER(tipo_obrigacao)=UPPER(?)"
+                filtro = "AND tipo_norm = UPPER(TRIM(?))"
                 params.append(tipo_obrigacao)
             rows = cur.execute(
                 f"""
@@ -737,13 +1148,13 @@ class ContasAPagarMovRepository:
                     id, obrigacao_id, tipo_obrigacao, credor, descricao, vencimento,
                     valor_evento,
                     COALESCE(principal_pago_acumulado,0) AS principal_pago_acumulado,
-                    (COALESCE(valor_evento,0) - COALESCE(principal_pago_acumulado,0)) AS em_aberto,
+                    principal_faltante                   AS em_aberto,
                     COALESCE(status, 'EM ABERTO')        AS status
                 FROM contas_a_pagar_mov
-                WHERE categoria_evento = 'LANCAMENTO'
-                  AND UPPER(COALESCE(status,'EM ABERTO')) IN ('EM ABERTO','PARCIAL')
+                WHERE {_SQL_EM_ABERTO}
+                  AND status_norm IN ('EM ABERTO','PARCIAL')
                   {filtro}
-                ORDER BY DATE(vencimento) ASC, id ASC
+                ORDER BY vencimento_dia ASC, id ASC
                 """,
                 params,
             ).fetchall()
@@ -762,15 +1173,14 @@ class ContasAPagarMovRepository:
         sql = f"""
             SELECT
                 id AS parcela_id,
-                DATE(vencimento) AS vencimento,
+                vencimento_dia                          AS vencimento,
                 COALESCE(valor_evento,0)                AS valor_evento,
                 COALESCE(principal_pago_acumulado,0)    AS principal_pago_acumulado,
-                (COALESCE(valor_evento,0) - COALESCE(principal_pago_acumulado,0)) AS principal_faltante
+                principal_faltante
             FROM contas_a_pagar_mov
             WHERE obrigacao_id = ?
-              AND categoria_evento = 'LANCAMENTO'
-              AND (COALESCE(valor_evento,0) - COALESCE(principal_pago_acumulado,0)) > {_EPS}
-            ORDER BY DATE(vencimento), id
+              AND {_SQL_EM_ABERTO}
+            ORDER BY vencimento_dia, id
         """
         params: List[Any] = [obrigacao_id]
         if limite is not None and int(limite) > 0:
@@ -778,7 +1188,199 @@ class ContasAPagarMovRepository:
             params.append(int(limite))
 
         with self._conn_ctx(conn) as c:
+            garantir_indices_em_aberto(c)
             cur = c.cursor()
             rows = cur.execute(sql, params).fetchall()
             out: List[Dict[str, Any]] = [dict(r) for r in rows]
             return out
+
+    def listar_parcelas_em_aberto_lote(
+        self,
+        conn: Optional[sqlite3.Connection],
+        obrigacao_ids: Iterable[int],
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Parcelas em aberto (FIFO) de várias obrigações numa consulta, com os
+        acumuladores de `calcular_pagamento_parcela`: `{obrigacao_id: [parcelas]}`.
+        """
+        ids = sorted({int(i) for i in obrigacao_ids})
+        out: Dict[int, List[Dict[str, Any]]] = {i: [] for i in ids}
+        if not ids:
+            return out
+        sql = f"""
+            SELECT
+                id AS parcela_id,
+                obrigacao_id,
+                tipo_norm                                 AS tipo_obrigacao,
+                vencimento_dia                            AS vencimento,
+                COALESCE(valor_evento,0)                  AS valor_evento,
+                COALESCE(principal_pago_acumulado,0)      AS principal_pago_acumulado,
+                COALESCE(juros_pago_acumulado,0)          AS juros_pago_acumulado,
+                COALESCE(multa_paga_acumulada,0)          AS multa_paga_acumulada,
+                COALESCE(desconto_aplicado_acumulado,0)   AS desconto_aplicado_acumulado,
+                COALESCE(valor_pago_acumulado,0)          AS valor_pago_acumulado,
+                principal_faltante
+            FROM contas_a_pagar_mov
+            WHERE obrigacao_id IN (SELECT value FROM json_each(?))
+              AND {_SQL_EM_ABERTO}
+            ORDER BY obrigacao_id, vencimento_dia, id
+        """
+        with self._conn_ctx(conn) as c:
+            garantir_indices_em_aberto(c)
+            for r in c.execute(sql, (json.dumps(ids),)).fetchall():
+                out[int(r["obrigacao_id"])].append(dict(r))
+        return out
+
+    def gravar_acumulados(
+        self,
+        conn: sqlite3.Connection,
+        estados: Iterable[Tuple[int, Mapping[str, Any], str]],
+    ) -> int:
+        """
+        Grava os acumuladores calculados em memória: `(parcela_id, estado,
+        data_evento)` por parcela, num único `executemany`. Não recalcula
+        status nem faz commit.
+        """
+        params = [_params_acumulados(estado, data_evt, pid) for pid, estado, data_evt in estados]
+        if params:
+            garantir_encargos_eventos(conn)  # antes da escrita (backfill só do histórico)
+            conn.executemany(_SQL_GRAVAR_ACUMULADOS, params)
+        return len(params)
+
+    # ---------------------------------------------------------------------
+    # Empréstimos: cronograma programado (reprogramação por diff)
+    # ---------------------------------------------------------------------
+    def listar_parcelas_emprestimo(
+        self,
+        conn: Optional[sqlite3.Connection],
+        emprestimo_id: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Todas as parcelas (LANCAMENTO) de um empréstimo, por vencimento, com os
+        acumuladores e `intocada = 1` quando nenhum pagamento/encargo/desconto
+        foi aplicado.
+        """
+        sql = f"""
+            SELECT
+                id, obrigacao_id, vencimento, data_evento, competencia,
+                COALESCE(valor_evento,0)              AS valor_evento,
+                parcela_num, parcelas_total, descricao, credor,
+                COALESCE(principal_pago_acumulado,0)     AS principal_pago_acumulado,
+                COALESCE(juros_pago_acumulado,0)         AS juros_pago_acumulado,
+                COALESCE(multa_paga_acumulada,0)         AS multa_paga_acumulada,
+                COALESCE(desconto_aplicado_acumulado,0)  AS desconto_aplicado_acumulado,
+                COALESCE(valor_pago_acumulado,0)         AS valor_pago_acumulado,
+                principal_faltante,
+                COALESCE(status, '{STATUS_ABERTO}')       AS status,
+                (COALESCE(principal_pago_acumulado,0) = 0
+                 AND COALESCE(valor_pago_acumulado,0) = 0
+                 AND COALESCE(juros_pago_acumulado,0) = 0
+                 AND COALESCE(multa_paga_acumulada,0) = 0
+                 AND COALESCE(desconto_aplicado_acumulado,0) = 0) AS intocada
+            FROM contas_a_pagar_mov
+            WHERE emprestimo_id = ?
+              AND categoria_evento = 'LANCAMENTO'
+            ORDER BY vencimento_dia, id
+        """
+        with self._conn_ctx(conn) as c:
+            garantir_indices_em_aberto(c)
+            return [dict(r) for r in c.execute(sql, (int(emprestimo_id),)).fetchall()]
+
+    def atualizar_parcelas_programadas(
+        self,
+        conn: sqlite3.Connection,
+        alteracoes: Iterable[Mapping[str, Any]],
+    ) -> int:
+        """
+        Reescreve vencimento/valor/numeração de parcelas **intocadas**
+        (`id, vencimento, competencia, valor_evento, parcela_num,
+        parcelas_total, descricao`) num `executemany`. Parcelas com pagamento
+        não são alteradas (guarda no WHERE). Sem commit.
+        """
+        params = [
+            (
+                str(a["vencimento"]), str(a["competencia"]), float(a["valor_evento"]),
+                int(a["parcela_num"]), int(a["parcelas_total"]), (a.get("descricao") or None),
+                int(a["id"]),
+            )
+            for a in alteracoes
+        ]
+        if not params:
+            return 0
+        cur = conn.executemany(
+            """
+            UPDATE contas_a_pagar_mov
+               SET vencimento = ?, competencia = ?, valor_evento = ?,
+                   parcela_num = ?, parcelas_total = ?, descricao = COALESCE(?, descricao)
+             WHERE id = ?
+               AND categoria_evento = 'LANCAMENTO'
+               AND COALESCE(valor_pago_acumulado,0) = 0
+               AND COALESCE(principal_pago_acumulado,0) = 0
+            """,
+            params,
+        )
+        return int(cur.rowcount)
+
+    def excluir_parcelas_programadas(self, conn: sqlite3.Connection, parcela_ids: Iterable[int]) -> int:
+        """Remove parcelas **intocadas** (sobras de uma reprogramação). Sem commit."""
+        ids = [int(i) for i in parcela_ids]
+        if not ids:
+            return 0
+        cur = conn.execute(
+            """
+            DELETE FROM contas_a_pagar_mov
+             WHERE id IN (SELECT value FROM json_each(?))
+               AND categoria_evento = 'LANCAMENTO'
+               AND COALESCE(valor_pago_acumulado,0) = 0
+               AND COALESCE(principal_pago_acumulado,0) = 0
+            """,
+            (json.dumps(ids),),
+        )
+        return int(cur.rowcount)
+
+    # ---------------------------------------------------------------------
+    # Status (motor set-based)
+    # ---------------------------------------------------------------------
+    def recalcular_status(
+        self,
+        conn: Optional[sqlite3.Connection] = None,
+        *,
+        obrigacao_ids: Optional[Iterable[int]] = None,
+        parcela_ids: Optional[Iterable[int]] = None,
+    ) -> int:
+        """Atalho para `recalcular_status_cap` (sem filtros = tabela inteira)."""
+        with self._conn_ctx(conn) as c:
+            return recalcular_status_cap(c, obrigacao_ids=obrigacao_ids, parcela_ids=parcela_ids)
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manutenção de Contas a Pagar (CAP).")
+    parser.add_argument("comando", choices=["rebuild-status"])
+    parser.add_argument("caminho_banco")
+    args = parser.parse_args(argv)
+
+    with get_conn(args.caminho_banco) as conn:
+        alteradas = recalcular_status_cap(conn)
+    print(f"{alteradas} parcela(s) com status corrigido.")
+    return 0
+
+
+__all__ = [
+    "ContasAPagarMovRepository",
+    "calcular_pagamento_parcela",
+    "garantir_encargos_eventos",
+    "garantir_indices_em_aberto",
+    "recalcular_status_cap",
+    "registrar_encargos_eventos",
+    "status_agregado_cap",
+    "status_parcela",
+    "STATUS_ABERTO",
+    "STATUS_PARCIAL",
+    "STATUS_QUITADO",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -0,0 +1,354 @@
+"""
+Módulo DRE (Repositório)
+========================
+
+Consolidação mensal do DRE (Demonstrativo de Resultado) em `dre_mensal`, com
+recálculo **apenas** das competências tocadas desde a última atualização.
+
+Linhas (`linha`)
+----------------
+- `RECEITA_BRUTA` ........ soma de `entrada.Valor`.
+- `TAXAS_CARTAO` ......... soma de `entrada.Valor - valor_liquido`.
+- `CMV` .................. compras de mercadorias (`Valor_Mercadoria + Frete`)
+  na competência da compra (`mercadorias.Data`).
+- `DESPESA` .............. `saida.Valor` por categoria/subcategoria, exceto as
+  categorias não operacionais (ver abaixo).
+- `PAGAMENTO_OBRIGACOES` . saídas da categoria "Pagamentos" (quitação de
+  faturas/boletos/empréstimos): informativo, fora do resultado — o principal
+  não é despesa e os encargos já entram nas linhas financeiras.
+- `JUROS` / `MULTAS` / `DESCONTOS` . encargos de cada pagamento do CAP
+  (`cap_encargos_eventos`) na competência da data do pagamento — parcela paga
+  em meses diferentes lança cada parte no seu mês.
+
+Funcionalidades principais
+--------------------------
+- `garantir_dre(conn)`: tabela `dre_mensal` e índices de data nas origens.
+- `atualizar_dre(conn)`: atualiza os fatos diários e recalcula só as
+  competências (`YYYY-MM`) com datas alteradas desde a última consolidação.
+  Sem pendências não escreve nada.
+- `dre_periodo(conn, comp_inicio, comp_fim)`: linhas consolidadas do período.
+
+Detalhes técnicos
+-----------------
+- Vendas e saídas vêm dos fatos diários (`repository.fatos_repository`);
+  mercadorias e encargos do CAP são lidos por faixa de data com índices de
+  expressão (`DATE(Data)` / `DATE(data_evento)`).
+- As competências pendentes vêm do registro compartilhado `shared.alteracoes`
+  (consumidor `dre`): cada data alterada em `entrada`, `saida`, `mercadorias`
+  ou `cap_encargos_eventos` marca o seu mês. Não há triggers próprios — os
+  antigos `trg_dre_*` e `dre_pendentes` são removidos. Data `TUDO` (ou cursor
+  ausente) marca todo o histórico da tabela.
+
+Linha de comando
+----------------
+    python -m repository.dre_repository rebuild <caminho_banco>
+    python -m repository.dre_repository refresh <caminho_banco>
+
+Dependências
+------------
+- sqlite3
+- shared.db.get_conn
+- shared.alteracoes (registro de datas alteradas)
+- shared.schema (colunas, db_key, schema_version, tabela_existe)
+- repository.fatos_repository
+- repository.contas_a_pagar_mov_repository (garantir_encargos_eventos)
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from repository.contas_a_pagar_mov_repository import garantir_encargos_eventos
+from repository.fatos_repository import atualizar_fatos
+from shared.alteracoes import (
+    TUDO,
+    consumir,
+    garantir_alteracoes,
+    geracao_atual,
+    pendencias,
+    remover_triggers_legados,
+)
+from shared.db import get_conn
+from shared.schema import colunas, db_key, schema_version, tabela_existe
+
+logger = logging.getLogger(__name__)
+
+_TABELA = "dre_mensal"
+_CONSUMIDOR = "dre"
+_PENDENTES_LEGADO = "dre_pendentes"
+_PREFIXO_LEGADO = "trg_dre_"
+
+RECEITA_BRUTA = "RECEITA_BRUTA"
+TAXAS_CARTAO = "TAXAS_CARTAO"
+CMV = "CMV"
+DESPESA = "DESPESA"
+PAGAMENTO_OBRIGACOES = "PAGAMENTO_OBRIGACOES"
+JUROS = "JUROS"
+MULTAS = "MULTAS"
+DESCONTOS = "DESCONTOS"
+
+# Categorias de `saida` que não são despesa operacional (comparação em minúsculas)
+CATEGORIAS_NAO_OPERACIONAIS = ("pagamentos",)
+
+# Origens: (tabela, coluna de data do histórico, índice)
+_ORIGENS: Tuple[Tuple[str, str, Optional[str]], ...] = (
+    ("entrada", "Data", None),
+    ("saida", "Data", None),
+    (
+        "mercadorias",
+        "Data",
+        "CREATE INDEX IF NOT EXISTS idx_mercadorias_data_dia ON mercadorias (DATE(Data))",
+    ),
+    # índice criado por `garantir_encargos_eventos`
+    ("cap_encargos_eventos", "data_evento", None),
+)
+
+# {db_key: schema_version em que tabelas/índices foram conferidos}
+_garantidos: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+# Schema
+# -----------------------------------------------------------------------------
+def _competencias_historico(conn: sqlite3.Connection, tabela: str, col: str) -> Set[str]:
+    """Todas as competências com lançamentos na origem."""
+    if col.lower() not in {c.lower() for c in colunas(conn, tabela)}:
+        return set()
+    return {
+        str(r[0])
+        for r in conn.execute(
+            f"""
+            SELECT DISTINCT strftime('%Y-%m', "{col}") FROM "{tabela}"
+             WHERE strftime('%Y-%m', "{col}") IS NOT NULL
+            """
+        ).fetchall()
+    }
+
+
+def garantir_dre(conn: sqlite3.Connection) -> None:
+    """
+    Cria `dre_mensal` e os índices das origens (uma vez por schema).
+
+    Não faz commit.
+    """
+    key = db_key(conn)
+    with _lock:
+        if _garantidos.get(key) == schema_version(conn):
+            return
+
+    garantir_encargos_eventos(conn)
+    garantir_alteracoes(conn)
+    if remover_triggers_legados(conn, _PREFIXO_LEGADO):
+        conn.execute(f"DROP TABLE IF EXISTS {_PENDENTES_LEGADO}")
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {_TABELA} (
+            competencia  TEXT NOT NULL,
+            linha        TEXT NOT NULL,
+            categoria    TEXT NOT NULL DEFAULT '',
+            subcategoria TEXT NOT NULL DEFAULT '',
+            valor        REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (competencia, linha, categoria, subcategoria)
+        ) WITHOUT ROWID
+        """
+    )
+    for tabela, col, indice in _ORIGENS:
+        if indice and col.lower() in {c.lower() for c in colunas(conn, tabela)}:
+            conn.execute(indice)
+
+    with _lock:
+        _garantidos[key] = schema_version(conn)
+
+
+# -----------------------------------------------------------------------------
+# Consolidação
+# -----------------------------------------------------------------------------
+def _linhas_competencia(conn: sqlite3.Connection, comp: str) -> List[Tuple[str, str, str, float]]:
+    """Calcula as linhas `(linha, categoria, subcategoria, valor)` de uma competência."""
+    ini, fim = f"{comp}-01", f"{comp}-31"
+    out: List[Tuple[str, str, str, float]] = []
+
+    if tabela_existe(conn, "fato_vendas_dia"):
+        row = conn.execute(
+            """
+            SELECT COALESCE(SUM(valor_bruto), 0), COALESCE(SUM(valor_bruto - valor_liquido), 0)
+              FROM fato_vendas_dia WHERE data BETWEEN ? AND ?
+            """,
+            (ini, fim),
+        ).fetchone()
+        out += [(RECEITA_BRUTA, "", "", float(row[0])), (TAXAS_CARTAO, "", "", float(row[1]))]
+
+    if tabela_existe(conn, "fato_saidas_dia"):
+        nao_oper = ",".join("?" * len(CATEGORIAS_NAO_OPERACIONAIS))
+        for cat, sub, valor, nao_operacional in conn.execute(
+            f"""
+            SELECT categoria, subcategoria, SUM(valor),
+                   LOWER(categoria) IN ({nao_oper})
+              FROM fato_saidas_dia WHERE data BETWEEN ? AND ?
+             GROUP BY categoria, subcategoria
+            """,
+            (*CATEGORIAS_NAO_OPERACIONAIS, ini, fim),
+        ).fetchall():
+            linha = PAGAMENTO_OBRIGACOES if nao_operacional else DESPESA
+            out.append((linha, str(cat), str(sub), float(valor or 0.0)))
+
+    cols_merc = {c.lower() for c in colunas(conn, "mercadorias")}
+    if {"data", "valor_mercadoria"} <= cols_merc:
+        frete = "COALESCE(Frete, 0)" if "frete" in cols_merc else "0"
+        row = conn.execute(
+            f"""
+            SELECT COALESCE(SUM(COALESCE(Valor_Mercadoria, 0) + {frete}), 0)
+              FROM mercadorias WHERE DATE(Data) BETWEEN ? AND ?
+            """,
+            (ini, fim),
+        ).fetchone()
+        out.append((CMV, "", "", float(row[0])))
+
+    if tabela_existe(conn, "cap_encargos_eventos"):
+        row = conn.execute(
+            """
+            SELECT COALESCE(SUM(juros), 0), COALESCE(SUM(multa), 0), COALESCE(SUM(desconto), 0)
+              FROM cap_encargos_eventos
+             WHERE DATE(data_evento) BETWEEN ? AND ?
+            """,
+            (ini, fim),
+        ).fetchone()
+        out += [
+            (JUROS, "", "", float(row[0])),
+            (MULTAS, "", "", float(row[1])),
+            (DESCONTOS, "", "", float(row[2])),
+        ]
+
+    return [r for r in out if abs(r[3]) > 1e-9]
+
+
+def _recalcular(conn: sqlite3.Connection, comps: List[str]) -> None:
+    for comp in comps:
+        conn.execute(f"DELETE FROM {_TABELA} WHERE competencia = ?", (comp,))
+        conn.executemany(
+            f"INSERT INTO {_TABELA} (competencia, linha, categoria, subcategoria, valor) "
+            f"VALUES (?, ?, ?, ?, ?)",
+            [(comp, *r) for r in _linhas_competencia(conn, comp)],
+        )
+
+
+def atualizar_dre(conn: sqlite3.Connection) -> List[str]:
+    """
+    Atualiza os fatos diários e recalcula as competências pendentes.
+
+    Returns:
+        list[str]: competências recalculadas. Não faz commit.
+    """
+    garantir_dre(conn)
+    atualizar_fatos(conn)
+    tabelas = [t for t, _, _ in _ORIGENS]
+    pend, _ = pendencias(conn, _CONSUMIDOR, tabelas)
+    if not pend:
+        return []
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    pend, geracao = pendencias(conn, _CONSUMIDOR, tabelas)  # relido sob o lock
+    comps: Set[str] = set()
+    for tabela, col, _ in _ORIGENS:
+        datas = pend.get(tabela) or set()
+        if TUDO in datas:
+            comps |= _competencias_historico(conn, tabela, col)
+        comps |= {d[:7] for d in datas if len(d) >= 7}
+    ordem = sorted(comps)
+    _recalcular(conn, ordem)
+    consumir(conn, _CONSUMIDOR, geracao)
+    return ordem
+
+
+def reconstruir_dre(conn: sqlite3.Connection) -> List[str]:
+    """Reconsolida todo o histórico. Não faz commit."""
+    garantir_dre(conn)
+    atualizar_fatos(conn)
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    geracao = geracao_atual(conn)
+    comps: Set[str] = set()
+    for tabela, col, _ in _ORIGENS:
+        comps |= _competencias_historico(conn, tabela, col)
+    conn.execute(f"DELETE FROM {_TABELA}")
+    ordem = sorted(comps)
+    _recalcular(conn, ordem)
+    consumir(conn, _CONSUMIDOR, geracao)
+    return ordem
+
+
+# -----------------------------------------------------------------------------
+# Leitura
+# -----------------------------------------------------------------------------
+def dre_periodo(conn: sqlite3.Connection, comp_inicio: str, comp_fim: str) -> List[Dict[str, Any]]:
+    """
+    Linhas consolidadas entre as competências 'YYYY-MM' (inclusive).
+
+    Returns:
+        list[dict]: `competencia, linha, categoria, subcategoria, valor`.
+    """
+    garantir_dre(conn)
+    rows = conn.execute(
+        f"""
+        SELECT competencia, linha, categoria, subcategoria, valor
+          FROM {_TABELA}
+         WHERE competencia BETWEEN ? AND ?
+         ORDER BY competencia, linha, categoria, subcategoria
+        """,
+        (str(comp_inicio)[:7], str(comp_fim)[:7]),
+    ).fetchall()
+    return [
+        {
+            "competencia": r[0],
+            "linha": r[1],
+            "categoria": r[2],
+            "subcategoria": r[3],
+            "valor": float(r[4] or 0.0),
+        }
+        for r in rows
+    ]
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m repository.dre_repository",
+        description="Consolidação mensal do DRE.",
+    )
+    parser.add_argument("comando", choices=["rebuild", "refresh"])
+    parser.add_argument("caminho_banco")
+    args = parser.parse_args(argv)
+
+    with get_conn(args.caminho_banco) as conn:
+        comps = reconstruir_dre(conn) if args.comando == "rebuild" else atualizar_dre(conn)
+    print(f"dre_mensal: {len(comps)} competência(s) recalculada(s).")
+    return 0
+
+
+__all__ = [
+    "RECEITA_BRUTA",
+    "TAXAS_CARTAO",
+    "CMV",
+    "DESPESA",
+    "PAGAMENTO_OBRIGACOES",
+    "JUROS",
+    "MULTAS",
+    "DESCONTOS",
+    "CATEGORIAS_NAO_OPERACIONAIS",
+    "garantir_dre",
+    "atualizar_dre",
+    "reconstruir_dre",
+    "dre_periodo",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
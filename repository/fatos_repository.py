@@ -0,0 +1,470 @@
+"""
+Módulo Fatos (Repositório)
+==========================
+
+Tabelas de fatos pré-agregadas por dia para Dashboard/DRE/Metas, mantidas de
+forma incremental a partir de `entrada`, `saida` e `movimentacoes_bancarias`.
+
+Fatos
+-----
+- `fato_vendas_dia (data, forma, bandeira, usuario, maquineta)`:
+  `qtd`, `valor_bruto` (entrada.Valor), `valor_liquido` (entrada.valor_liquido).
+- `fato_saidas_dia (data, categoria, subcategoria, forma)`: `qtd`, `valor`.
+- `fato_bancos_dia (data, banco, tipo, origem)`: `qtd`, `valor`.
+
+Agregações mensais/anuais são feitas sobre os fatos diários
+(`agregar(..., granularidade="mes")`) — poucas linhas por dia, então o custo é
+proporcional ao período consultado e não ao histórico de lançamentos.
+
+Funcionalidades principais
+--------------------------
+- `garantir_fatos(conn)`: cria fatos e índices de data nas tabelas de origem.
+  Fato novo é construído na hora.
+- `atualizar_fatos(conn)`: reprocessa **só** as datas alteradas desde a última
+  atualização (DELETE + INSERT ... SELECT ... GROUP BY por data). Sem
+  pendências custa duas leituras pontuais e não escreve nada.
+- `reconstruir_fatos(conn)`: recalcula tudo.
+- `agregar(conn, fato, dims, inicio, fim, granularidade)`: leitura dos fatos.
+- `iniciar_atualizador(db, intervalo_s)`: *thread* daemon que chama
+  `atualizar_fatos` periodicamente (opcional; o Dashboard também atualiza ao
+  abrir).
+
+Detalhes técnicos
+-----------------
+- As datas alteradas vêm do registro compartilhado `shared.alteracoes`
+  (consumidor `fatos`, com cursor de geração); não há triggers próprios — os
+  antigos `trg_fatos_*` e `fatos_pendentes` são removidos. Data `TUDO`
+  (trigger recriado, cursor ausente) reconstrói o fato.
+- Índices de expressão `DATE(Data)` em `entrada`/`saida` (e `data_dia` em
+  `movimentacoes_bancarias`) tornam o reprocessamento de uma data pontual.
+- `atualizar_fatos` roda em `BEGIN IMMEDIATE` (quando não há transação aberta)
+  só se houver pendências: nenhuma escrita concorrente entre ler as datas e
+  avançar o cursor.
+- Dimensões normalizadas: forma em maiúsculas; textos com TRIM; NULL → ''.
+
+Linha de comando
+----------------
+    python -m repository.fatos_repository rebuild <caminho_banco>
+    python -m repository.fatos_repository refresh <caminho_banco>
+
+Dependências
+------------
+- sqlite3
+- shared.db.get_conn
+- shared.alteracoes (registro de datas alteradas)
+- shared.schema (colunas, db_key, schema_version, tabela_existe)
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from shared.alteracoes import (
+    TUDO,
+    consumir,
+    cursor_consumidor,
+    garantir_alteracoes,
+    geracao_atual,
+    pendencias,
+    remover_triggers_legados,
+)
+from shared.db import get_conn
+from shared.schema import colunas, db_key, schema_version, tabela_existe
+
+logger = logging.getLogger(__name__)
+
+_CONSUMIDOR = "fatos"
+_PENDENTES_LEGADO = "fatos_pendentes"
+_PREFIXO_LEGADO = "trg_fatos_"
+_LOTE_DATAS = 500  # datas por comando (limite de parâmetros do SQLite)
+
+GRANULARIDADES = {"dia": "data", "mes": "substr(data, 1, 7)", "ano": "substr(data, 1, 4)"}
+
+
+# -----------------------------------------------------------------------------
+# Definição dos fatos
+# -----------------------------------------------------------------------------
+class _Fato:
+    """Definição de um fato: origem, dimensões (expressões SQL) e medidas."""
+
+    def __init__(
+        self,
+        nome: str,
+        origem: str,
+        col_data: str,
+        dims: Sequence[Tuple[str, str]],
+        medidas: Sequence[Tuple[str, str]],
+        filtro_data: str,
+        indice: Optional[str],
+    ) -> None:
+        self.nome = nome
+        self.origem = origem
+        self.col_data = col_data
+        self.dims = tuple(dims)
+        self.medidas = tuple(medidas)
+        self.filtro_data = filtro_data  # expressão indexada com o dia da linha de origem
+        self.indice = indice            # DDL do índice na origem (ou None)
+
+    @property
+    def nomes_dims(self) -> Tuple[str, ...]:
+        return tuple(d for d, _ in self.dims)
+
+    @property
+    def nomes_medidas(self) -> Tuple[str, ...]:
+        return tuple(m for m, _ in self.medidas)
+
+    def ddl(self) -> str:
+        cols = ", ".join(
+            ["data TEXT NOT NULL"]
+            + [f"{d} TEXT NOT NULL DEFAULT ''" for d in self.nomes_dims]
+            + [f"{m} {'INTEGER' if m == 'qtd' else 'REAL'} NOT NULL DEFAULT 0" for m in self.nomes_medidas]
+        )
+        pk = ", ".join(("data",) + self.nomes_dims)
+        return f"CREATE TABLE IF NOT EXISTS {self.nome} ({cols}, PRIMARY KEY ({pk})) WITHOUT ROWID"
+
+    def sql_carga(self, filtro_data: str, onde: str) -> str:
+        """INSERT ... SELECT ... GROUP BY para as linhas de origem que satisfazem `onde`."""
+        alvo = ", ".join(("data",) + self.nomes_dims + self.nomes_medidas)
+        sel = ", ".join(
+            [filtro_data]
+            + [expr for _, expr in self.dims]
+            + [expr for _, expr in self.medidas]
+        )
+        grupos = ", ".join(str(i) for i in range(1, len(self.dims) + 2))
+        return (
+            f"INSERT INTO {self.nome} ({alvo}) "
+            f'SELECT {sel} FROM "{self.origem}" '
+            f"WHERE {filtro_data} IS NOT NULL AND ({onde}) "
+            f"GROUP BY {grupos}"
+        )
+
+
+def _txt(col: str, upper: bool = False) -> str:
+    expr = f"TRIM(COALESCE(CAST({col} AS TEXT), ''))"
+    return f"UPPER({expr})" if upper else expr
+
+
+FATOS: Dict[str, _Fato] = {
+    f.nome: f
+    for f in (
+        _Fato(
+            "fato_vendas_dia",
+            "entrada",
+            "Data",
+            dims=(
+                ("forma", _txt("Forma_de_Pagamento", upper=True)),
+                ("bandeira", _txt("Bandeira")),
+                ("usuario", _txt("Usuario")),
+                ("maquineta", _txt("maquineta")),
+            ),
+            medidas=(
+                ("qtd", "COUNT(*)"),
+                ("valor_bruto", "SUM(COALESCE(Valor, 0))"),
+                ("valor_liquido", "SUM(COALESCE(valor_liquido, Valor, 0))"),
+            ),
+            filtro_data="DATE(Data)",
+            indice="CREATE INDEX IF NOT EXISTS idx_entrada_data_dia ON entrada (DATE(Data))",
+        ),
+        _Fato(
+            "fato_saidas_dia",
+            "saida",
+            "Data",
+            dims=(
+                ("categoria", _txt("Categoria")),
+                ("subcategoria", _txt("Sub_Categoria")),
+                ("forma", _txt("Forma_de_Pagamento", upper=True)),
+            ),
+            medidas=(
+                ("qtd", "COUNT(*)"),
+                ("valor", "SUM(COALESCE(Valor, 0))"),
+            ),
+            filtro_data="DATE(Data)",
+            indice="CREATE INDEX IF NOT EXISTS idx_saida_data_dia ON saida (DATE(Data))",
+        ),
+        _Fato(
+            "fato_bancos_dia",
+            "movimentacoes_bancarias",
+            "data",
+            dims=(
+                ("banco", _txt("banco")),
+                ("tipo", "LOWER(TRIM(COALESCE(tipo, '')))"),
+                ("origem", _txt("origem")),
+            ),
+            medidas=(
+                ("qtd", "COUNT(*)"),
+                ("valor", "SUM(COALESCE(valor, 0))"),
+            ),
+            # coluna gerada indexada (repository.movimentacoes_repository)
+            filtro_data="data_dia",
+            indice=None,
+        ),
+    )
+}
+
+# {db_key: schema_version em que fatos/índices foram conferidos}
+_garantidos: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+# Schema
+# -----------------------------------------------------------------------------
+def _filtro_data(conn: sqlite3.Connection, fato: _Fato) -> str:
+    """Expressão do dia na origem (data_dia é garantida por executar_migracoes)."""
+    if fato.filtro_data == "data_dia" and "data_dia" not in colunas(conn, fato.origem):
+        return f"DATE({fato.col_data})"
+    return fato.filtro_data
+
+
+def _origens() -> List[str]:
+    return [f.origem for f in FATOS.values()]
+
+
+def garantir_fatos(conn: sqlite3.Connection) -> None:
+    """
+    Cria fatos e índices (uma vez por versão de schema).
+
+    Fatos novos são construídos na hora; se todos foram construídos agora, o
+    cursor do consumidor começa na geração atual. Não faz commit.
+    """
+    key = db_key(conn)
+    with _lock:
+        if _garantidos.get(key) == schema_version(conn):
+            return
+
+    garantir_alteracoes(conn)
+    if remover_triggers_legados(conn, _PREFIXO_LEGADO):
+        conn.execute(f"DROP TABLE IF EXISTS {_PENDENTES_LEGADO}")
+    geracao = geracao_atual(conn)
+    novos, existentes = 0, 0
+    for fato in FATOS.values():
+        if not tabela_existe(conn, fato.origem):
+            continue
+        if tabela_existe(conn, fato.nome):
+            existentes += 1
+        else:
+            conn.execute(fato.ddl())
+            n = _reconstruir_fato(conn, fato)
+            novos += 1
+            logger.info("fatos: %s construído (%d linhas)", fato.nome, n)
+        if fato.indice:
+            conn.execute(fato.indice)
+    if novos and not existentes and cursor_consumidor(conn, _CONSUMIDOR) is None:
+        consumir(conn, _CONSUMIDOR, geracao)
+
+    with _lock:
+        _garantidos[key] = schema_version(conn)
+
+
+# -----------------------------------------------------------------------------
+# Carga
+# -----------------------------------------------------------------------------
+def _reconstruir_fato(conn: sqlite3.Connection, fato: _Fato) -> int:
+    conn.execute(f"DELETE FROM {fato.nome}")
+    cur = conn.execute(fato.sql_carga(_filtro_data(conn, fato), "1=1"))
+    return int(cur.rowcount or 0)
+
+
+def _atualizar_fato(conn: sqlite3.Connection, fato: _Fato, datas: List[str]) -> int:
+    filtro = _filtro_data(conn, fato)
+    total = 0
+    # IN com lista literal: o planner usa o índice do dia (com subconsulta, varre a origem)
+    for i in range(0, len(datas), _LOTE_DATAS):
+        lote = datas[i : i + _LOTE_DATAS]
+        ph = ",".join("?" * len(lote))
+        conn.execute(f"DELETE FROM {fato.nome} WHERE data IN ({ph})", lote)
+        cur = conn.execute(fato.sql_carga(filtro, f"{filtro} IN ({ph})"), lote)
+        total += int(cur.rowcount or 0)
+    return total
+
+
+def atualizar_fatos(conn: sqlite3.Connection) -> Dict[str, int]:
+    """
+    Reprocessa as datas alteradas de cada fato.
+
+    Sem pendências não abre transação de escrita nem grava nada.
+
+    Returns:
+        dict: `{fato: linhas de fato gravadas}` (só fatos com pendências).
+        Não faz commit (o bloco `with` do chamador confirma).
+    """
+    garantir_fatos(conn)
+    pend, _ = pendencias(conn, _CONSUMIDOR, _origens())
+    if not pend:
+        return {}
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    pend, geracao = pendencias(conn, _CONSUMIDOR, _origens())  # relido sob o lock
+    out: Dict[str, int] = {}
+    for fato in FATOS.values():
+        datas = pend.get(fato.origem)
+        if not datas or not tabela_existe(conn, fato.nome):
+            continue
+        if TUDO in datas:
+            out[fato.nome] = _reconstruir_fato(conn, fato)
+        else:
+            out[fato.nome] = _atualizar_fato(conn, fato, sorted(d for d in datas if d))
+    consumir(conn, _CONSUMIDOR, geracao)
+    return out
+
+
+def reconstruir_fatos(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Recalcula todos os fatos a partir das origens. Não faz commit."""
+    garantir_fatos(conn)
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    geracao = geracao_atual(conn)
+    out = {
+        fato.nome: _reconstruir_fato(conn, fato)
+        for fato in FATOS.values()
+        if tabela_existe(conn, fato.nome)
+    }
+    consumir(conn, _CONSUMIDOR, geracao)
+    return out
+
+
+# -----------------------------------------------------------------------------
+# Leitura
+# -----------------------------------------------------------------------------
+def agregar(
+    conn: sqlite3.Connection,
+    fato: str,
+    dims: Sequence[str] = (),
+    inicio: Optional[str] = None,
+    fim: Optional[str] = None,
+    *,
+    granularidade: Optional[str] = "dia",
+    filtros: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Soma as medidas do fato por período e dimensões.
+
+    Args:
+        fato: nome do fato (`fato_vendas_dia`, `fato_saidas_dia`, `fato_bancos_dia`).
+        dims: dimensões do agrupamento (subconjunto das dimensões do fato).
+        inicio/fim: datas 'YYYY-MM-DD' (inclusive); None = sem limite.
+        granularidade: 'dia', 'mes', 'ano' ou None (sem coluna de período).
+        filtros: igualdade por dimensão (`{"tipo": "entrada"}`).
+
+    Returns:
+        list[dict]: uma linha por (período, dims...) com as medidas somadas.
+    """
+    f = FATOS.get(fato)
+    if f is None:
+        raise ValueError(f"Fato desconhecido: {fato!r}")
+    dims = list(dims)
+    filtros = dict(filtros or {})
+    invalidas = [d for d in dims + list(filtros) if d not in f.nomes_dims]
+    if invalidas:
+        raise ValueError(f"Dimensões inválidas para {fato}: {invalidas}")
+    if granularidade is not None and granularidade not in GRANULARIDADES:
+        raise ValueError(f"Granularidade inválida: {granularidade!r}")
+
+    sel: List[str] = []
+    if granularidade is not None:
+        sel.append(f"{GRANULARIDADES[granularidade]} AS periodo")
+    sel += dims
+    grupos = ([GRANULARIDADES[granularidade]] if granularidade else []) + dims
+    sel += [f"SUM({m}) AS {m}" for m in f.nomes_medidas]
+
+    where, params = [], []
+    if inicio:
+        where.append("data >= ?")
+        params.append(str(inicio)[:10])
+    if fim:
+        where.append("data <= ?")
+        params.append(str(fim)[:10])
+    for d, v in filtros.items():
+        where.append(f"{d} = ?")
+        params.append(v)
+
+    sql = f"SELECT {', '.join(sel)} FROM {f.nome}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if grupos:
+        sql += f" GROUP BY {', '.join(grupos)} ORDER BY {', '.join(grupos)}"
+
+    garantir_fatos(conn)
+    if not tabela_existe(conn, f.nome):
+        return []
+    cur = conn.execute(sql, params)
+    nomes = [c[0] for c in cur.description]
+    return [dict(zip(nomes, r)) for r in cur.fetchall()]
+
+
+# -----------------------------------------------------------------------------
+# Atualizador em segundo plano
+# -----------------------------------------------------------------------------
+_atualizadores: Dict[str, threading.Thread] = {}
+
+
+def iniciar_atualizador(db_path_like: Any, intervalo_s: float = 60.0) -> threading.Thread:
+    """
+    Inicia (uma vez por banco e processo) uma *thread* daemon que mantém os
+    fatos em dia a cada `intervalo_s` segundos.
+    """
+    with get_conn(db_path_like) as conn:
+        key = db_key(conn)
+    with _lock:
+        t = _atualizadores.get(key)
+        if t is not None and t.is_alive():
+            return t
+
+        def _loop() -> None:
+            while True:
+                time.sleep(intervalo_s)
+                try:
+                    with get_conn(db_path_like) as conn:
+                        atualizar_fatos(conn)
+                except Exception as e:  # mantém a thread viva
+                    logger.warning("fatos: falha na atualização em segundo plano: %s", e)
+
+        t = threading.Thread(target=_loop, name=f"fatos-{key}", daemon=True)
+        _atualizadores[key] = t
+    t.start()
+    return t
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m repository.fatos_repository",
+        description="Manutenção das tabelas de fatos (Dashboard/DRE/Metas).",
+    )
+    parser.add_argument("comando", choices=["rebuild", "refresh"])
+    parser.add_argument("caminho_banco")
+    args = parser.parse_args(argv)
+
+    with get_conn(args.caminho_banco) as conn:
+        if args.comando == "rebuild":
+            res = reconstruir_fatos(conn)
+        else:
+            res = atualizar_fatos(conn)
+    for nome, n in res.items():
+        print(f"{nome}: {n} linha(s)")
+    if not res:
+        print("Nada a atualizar.")
+    return 0
+
+
+__all__ = [
+    "FATOS",
+    "GRANULARIDADES",
+    "garantir_fatos",
+    "atualizar_fatos",
+    "reconstruir_fatos",
+    "agregar",
+    "iniciar_atualizador",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
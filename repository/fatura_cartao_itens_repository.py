@@ -1,10 +1,18 @@
 # repository/fatura_cartao_itens_repository.py
 from __future__ import annotations
 import sqlite3
-from typing import Any, Optional
+import threading
+from typing import Any, Dict, Optional
 from datetime import datetime
 from hashlib import sha256
 
+from shared.db import get_conn
+from shared.schema import db_key, schema_version
+
+# {db_key: schema_version em que os índices de fatura_cartao_itens foram conferidos}
+_garantidos: Dict[str, int] = {}
+_lock = threading.Lock()
+
 def _normalize_valor(v: Any) -> float:
     if v is None:
         raise ValueError("valor_parcela não pode ser None.")
@@ -34,14 +42,16 @@ class FaturaCartaoItensRepository:
         self._garantir_indices()
 
     def _conn(self) -> sqlite3.Connection:
-        con = sqlite3.connect(self.db_path, timeout=30)
-        con.row_factory = sqlite3.Row
-        con.execute("PRAGMA foreign_keys=ON;")
-        con.execute("PRAGMA busy_timeout=30000;")
-        return con
+        # Pool por thread (PRAGMAs e row_factory=Row aplicados em get_conn)
+        return get_conn(self.db_path)
 
     def _garantir_indices(self):
+        # Uma vez por banco/versão de schema (não a cada instância)
         with self._conn() as con:
+            key = db_key(con)
+            with _lock:
+                if _garantidos.get(key) == schema_version(con):
+                    return
             con.execute("""
                 CREATE UNIQUE INDEX IF NOT EXISTS ux_fatura_itens_uid_parc
                 ON fatura_cartao_itens(purchase_uid, parcela_num);
@@ -55,6 +65,8 @@ class FaturaCartaoItensRepository:
                 ON fatura_cartao_itens(cartao, competencia);
             """)
             con.commit()
+            with _lock:
+                _garantidos[key] = schema_version(con)
 
     def inserir_item(
         self,
@@ -107,3 +119,64 @@ class FaturaCartaoItensRepository:
             ))
             con.commit()
             return int(con.execute("SELECT last_insert_rowid()").fetchone()[0])
+
+    def inserir_itens(
+        self,
+        *,
+        data_compra: str,
+        cartao: str,
+        descricao_compra: str,
+        valores_parcelas: list,
+        categoria: Optional[str] = None,
+        purchase_uid: Optional[str] = None,
+        usuario: Optional[str] = None,
+        created_at: Optional[str] = None,
+    ) -> list:
+        """
+        Insere todas as parcelas de uma compra de uma vez (idempotente por
+        (purchase_uid, parcela_num)). Retorna os ids na ordem das parcelas.
+
+        Equivale a chamar `inserir_item` para cada parcela, mas com 1 SELECT de
+        existentes + 1 `executemany` + 1 SELECT de ids, numa única transação.
+        """
+        valores = [_normalize_valor(v) for v in valores_parcelas]
+        if not valores:
+            return []
+        if any(v <= 0 for v in valores):
+            raise ValueError("valor_parcela deve ser > 0.")
+
+        parcelas = len(valores)
+        uid = _det_uid_if_needed(purchase_uid, cartao, data_compra, descricao_compra, parcelas)
+
+        with self._conn() as con:
+            existentes = {
+                int(r["parcela_num"])
+                for r in con.execute(
+                    "SELECT parcela_num FROM fatura_cartao_itens WHERE purchase_uid=?", (uid,)
+                ).fetchall()
+            }
+            con.executemany("""
+                INSERT INTO fatura_cartao_itens
+                    (purchase_uid, cartao, competencia, data_compra,
+                     descricao_compra, categoria,
+                     parcela_num, parcelas, valor_parcela,
+                     usuario, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    uid, cartao, _competencia_from_data_parcela(data_compra, p), data_compra,
+                    descricao_compra, categoria,
+                    p, parcelas, float(v),
+                    usuario, created_at,
+                )
+                for p, v in enumerate(valores, start=1)
+                if p not in existentes
+            ])
+            ids = {
+                int(r["parcela_num"]): int(r["id"])
+                for r in con.execute(
+                    "SELECT id, parcela_num FROM fatura_cartao_itens WHERE purchase_uid=?", (uid,)
+                ).fetchall()
+            }
+            con.commit()
+        return [ids[p] for p in range(1, parcelas + 1)]
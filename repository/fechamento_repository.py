@@ -0,0 +1,334 @@
+"""
+Módulo Fechamento de Caixa (Repositório)
+========================================
+
+Consultas agregadas do Fechamento de Caixa (Caixa / Caixa 2): abertura,
+movimentos, saldo esperado, saldo registrado e diferença — de um dia ou de um
+período inteiro em **uma** consulta.
+
+Regras
+------
+- Abertura do dia D: `caixa_total` / `caixa2_total` do último snapshot de
+  `saldos_caixas` com data < D (no mesmo dia vale a linha mais recente).
+- Movimentos: `movimentacoes_bancarias` dos bancos "Caixa" e "Caixa 2"
+  (entradas, saídas e, destacadas, as correções `origem = 'correcao_caixa'`).
+  As vendas em dinheiro são lançadas no banco "Caixa_Vendas" e somam no
+  `saldos_caixas.caixa_vendas`, que faz parte do `caixa_total`: entram no
+  movimento do Caixa (e aparecem destacadas em `vendas_dinheiro`).
+- Transferência Caixa → Caixa 2 (`origem = 'transferencia_caixa'`) e depósito
+  Caixa 2 → banco (`origem = 'deposito'`) só lançam a entrada no destino: a
+  mesma linha conta como saída do Caixa / do Caixa 2 (destacadas em
+  `transferencias_caixa2` e `depositos`).
+- Esperado = abertura + entradas − saídas. Registrado = snapshot do próprio
+  dia (None se não houver). Diferença = registrado − esperado.
+- Sem snapshot anterior (primeiro fechamento) não há abertura: `abertura_*`,
+  `esperado_*` e `diferenca_*` ficam None e `sem_abertura` = True.
+
+Funcionalidades principais
+--------------------------
+- `fechamento_periodo(conn, inicio, fim)`: uma linha por dia do período.
+- `totais_por(conn, inicio, fim, grupo)`: entradas/saídas por banco ou origem
+  (agrupadas no SQL).
+- `lancamentos_caixa(conn, inicio, fim)`: linhas de movimentação (detalhe).
+
+Detalhes técnicos
+-----------------
+- `garantir_indices_fechamento` cria `idx_saldos_caixas_data_dia` (expressão
+  `DATE(data)`): a abertura é uma busca no índice (`ORDER BY DATE(data) DESC
+  LIMIT 1`), não uma varredura dos snapshots.
+- Movimentos filtrados por `data_dia` (índice `idx_mov_data_dia_banco_tipo`,
+  `repository.movimentacoes_repository`) e somados com `SUM(CASE ...)`;
+  `+banco`/`+origem` impedem o planner de preferir `idx_mov_banco` ou
+  `idx_mov_origem` (histórico inteiro).
+- O período usa calendário via CTE recursiva; a abertura de cada dia é o
+  último snapshot anterior (janela `MAX() OVER (... 1 PRECEDING)`), então um
+  mês inteiro é conciliado numa única consulta.
+
+Linha de comando
+----------------
+    python -m repository.fechamento_repository <caminho_banco> <inicio> [fim]
+
+Dependências
+------------
+- sqlite3
+- shared.db.get_conn
+- shared.schema (db_key, schema_version, tabela_existe)
+- repository.movimentacoes_repository.garantir_coluna_data_dia
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+from repository.movimentacoes_repository import garantir_coluna_data_dia
+from shared.db import get_conn
+from shared.schema import db_key, schema_version, tabela_existe
+
+logger = logging.getLogger(__name__)
+
+BANCO_CAIXA_VENDAS = "Caixa_Vendas"  # vendas em DINHEIRO (parte do caixa_total)
+BANCOS_CAIXA = ("Caixa", "Caixa 2", BANCO_CAIXA_VENDAS)
+ORIGEM_CORRECAO = "correcao_caixa"
+ORIGEM_TRANSFERENCIA_CAIXA2 = "transferencia_caixa"  # Caixa/Caixa_Vendas → Caixa 2
+ORIGEM_DEPOSITO = "deposito"  # Caixa 2 → banco
+GRUPOS = ("banco", "origem")
+
+# {db_key: schema_version em que os índices foram conferidos}
+_garantidos: Dict[str, int] = {}
+_lock = threading.Lock()
+
+_SQL_PERIODO = """
+WITH RECURSIVE
+dias(d) AS (
+    SELECT DATE(:ini)
+    UNION ALL
+    SELECT DATE(d, '+1 day') FROM dias WHERE d < DATE(:fim)
+),
+anterior AS (
+    SELECT COALESCE(caixa_total, 0.0) AS cx, COALESCE(caixa2_total, 0.0) AS cx2
+      FROM saldos_caixas
+     WHERE DATE(data) < DATE(:ini)
+     ORDER BY DATE(data) DESC, rowid DESC
+     LIMIT 1
+),
+snaps AS (
+    SELECT d, cx, cx2
+      FROM (
+            SELECT DATE(data) AS d,
+                   COALESCE(caixa_total, 0.0) AS cx,
+                   COALESCE(caixa2_total, 0.0) AS cx2,
+                   ROW_NUMBER() OVER (PARTITION BY DATE(data) ORDER BY rowid DESC) AS rn
+              FROM saldos_caixas
+             WHERE DATE(data) BETWEEN DATE(:ini) AND DATE(:fim)
+           )
+     WHERE rn = 1
+),
+mov AS (
+    SELECT data_dia AS d,
+           SUM(CASE WHEN banco IN (:caixa, :vendas) AND tipo = 'entrada' THEN valor ELSE 0 END) AS cx_ent,
+           SUM(CASE WHEN banco IN (:caixa, :vendas) AND tipo = 'saida'   THEN valor ELSE 0 END) AS cx_sai,
+           SUM(CASE WHEN banco = :vendas AND tipo = 'entrada' THEN valor ELSE 0 END) AS vd_ent,
+           SUM(CASE WHEN banco = :caixa2 AND tipo = 'entrada' THEN valor ELSE 0 END) AS cx2_ent,
+           SUM(CASE WHEN banco = :caixa2 AND tipo = 'saida'   THEN valor ELSE 0 END) AS cx2_sai,
+           -- só a entrada no destino é lançada: a saída da origem vem daqui
+           SUM(CASE WHEN origem = :transf AND banco = :caixa2 AND tipo = 'entrada'
+                    THEN valor ELSE 0 END) AS transf,
+           SUM(CASE WHEN origem = :deposito AND tipo = 'entrada'
+                     AND banco NOT IN (:caixa, :caixa2, :vendas) THEN valor ELSE 0 END) AS dep,
+           SUM(CASE WHEN origem = :correcao AND tipo = 'entrada' THEN valor ELSE 0 END) AS corr_ent,
+           SUM(CASE WHEN origem = :correcao AND tipo = 'saida'   THEN valor ELSE 0 END) AS corr_sai,
+           COUNT(*) AS qtd
+      FROM movimentacoes_bancarias
+     WHERE data_dia BETWEEN DATE(:ini) AND DATE(:fim)
+       AND (+banco IN (:caixa, :caixa2, :vendas) OR +origem = :deposito)
+     GROUP BY data_dia
+),
+base AS (
+    SELECT dias.d,
+           s.d AS snap_d, s.cx, s.cx2,
+           COALESCE(m.cx_ent, 0.0) AS cx_ent, COALESCE(m.cx_sai, 0.0) AS cx_sai,
+           COALESCE(m.vd_ent, 0.0) AS vd_ent,
+           COALESCE(m.cx2_ent, 0.0) AS cx2_ent, COALESCE(m.cx2_sai, 0.0) AS cx2_sai,
+           COALESCE(m.transf, 0.0) AS transf, COALESCE(m.dep, 0.0) AS dep,
+           COALESCE(m.corr_ent, 0.0) AS corr_ent, COALESCE(m.corr_sai, 0.0) AS corr_sai,
+           COALESCE(m.qtd, 0) AS qtd,
+           MAX(s.d) OVER (ORDER BY dias.d ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS ant_d
+      FROM dias
+      LEFT JOIN snaps s ON s.d = dias.d
+      LEFT JOIN mov m ON m.d = dias.d
+)
+SELECT b.d AS data,
+       COALESCE(sa.cx, an.cx) AS abertura_caixa,
+       b.cx_ent AS entradas_caixa,
+       b.cx_sai + b.transf AS saidas_caixa,
+       b.cx AS registrado_caixa,
+       b.vd_ent AS vendas_dinheiro,
+       COALESCE(sa.cx2, an.cx2) AS abertura_caixa2,
+       b.cx2_ent AS entradas_caixa2,
+       b.cx2_sai + b.dep AS saidas_caixa2,
+       b.cx2 AS registrado_caixa2,
+       b.transf AS transferencias_caixa2,
+       b.dep AS depositos,
+       b.corr_ent AS correcoes_entrada,
+       b.corr_sai AS correcoes_saida,
+       b.qtd AS qtd_movimentos
+  FROM base b
+  LEFT JOIN snaps sa ON sa.d = b.ant_d
+  LEFT JOIN anterior an ON 1
+ ORDER BY b.d
+"""
+
+
+# -----------------------------------------------------------------------------
+# Schema
+# -----------------------------------------------------------------------------
+def garantir_indices_fechamento(conn: sqlite3.Connection) -> None:
+    """Cria o índice de data de `saldos_caixas` e a coluna `data_dia` (uma vez por schema)."""
+    key = db_key(conn)
+    sv = schema_version(conn)
+    with _lock:
+        if _garantidos.get(key) == sv:
+            return
+    if tabela_existe(conn, "saldos_caixas"):
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_saldos_caixas_data_dia ON saldos_caixas (DATE(data))"
+        )
+    garantir_coluna_data_dia(conn)
+    with _lock:
+        _garantidos[key] = schema_version(conn)
+
+
+def _tabelas_ok(conn: sqlite3.Connection) -> bool:
+    garantir_indices_fechamento(conn)
+    return tabela_existe(conn, "saldos_caixas") and tabela_existe(conn, "movimentacoes_bancarias")
+
+
+# -----------------------------------------------------------------------------
+# Consultas
+# -----------------------------------------------------------------------------
+def fechamento_periodo(conn: sqlite3.Connection, inicio: str, fim: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Conciliação diária de Caixa e Caixa 2 de `inicio` a `fim` (inclusive).
+
+    Args:
+        inicio/fim: datas 'YYYY-MM-DD'; `fim` None = só `inicio`.
+
+    Returns:
+        list[dict]: uma linha por dia com `abertura_*`/`esperado_*` (None sem
+        snapshot anterior, ver `sem_abertura`), `entradas_*`, `saidas_*`,
+        `registrado_*` (None sem snapshot no dia), `diferenca_*` (None se
+        faltar abertura ou snapshot) para `caixa`/`caixa2`, mais
+        `vendas_dinheiro` (parte de `entradas_caixa`), `transferencias_caixa2`
+        (parte de `saidas_caixa`), `depositos` (parte de `saidas_caixa2`),
+        `correcoes_entrada`, `correcoes_saida` e `qtd_movimentos`.
+    """
+    inicio = str(inicio)[:10]
+    fim = str(fim)[:10] if fim else inicio
+    if fim < inicio:
+        raise ValueError(f"Período inválido: {inicio} > {fim}")
+    if not _tabelas_ok(conn):
+        return []
+
+    cur = conn.execute(
+        _SQL_PERIODO,
+        {
+            "ini": inicio,
+            "fim": fim,
+            "caixa": BANCOS_CAIXA[0],
+            "caixa2": BANCOS_CAIXA[1],
+            "vendas": BANCO_CAIXA_VENDAS,
+            "correcao": ORIGEM_CORRECAO,
+            "transf": ORIGEM_TRANSFERENCIA_CAIXA2,
+            "deposito": ORIGEM_DEPOSITO,
+        },
+    )
+    nomes = [c[0] for c in cur.description]
+    out: List[Dict[str, Any]] = []
+    for row in cur.fetchall():
+        r = {
+            k: (v if k in ("data", "qtd_movimentos") or v is None else float(v))
+            for k, v in zip(nomes, row)
+        }
+        r["sem_abertura"] = r["abertura_caixa"] is None
+        for sufixo in ("caixa", "caixa2"):
+            abertura = r[f"abertura_{sufixo}"]
+            registrado = r[f"registrado_{sufixo}"]
+            esperado = None if abertura is None else abertura + r[f"entradas_{sufixo}"] - r[f"saidas_{sufixo}"]
+            r[f"esperado_{sufixo}"] = esperado
+            r[f"diferenca_{sufixo}"] = None if registrado is None or esperado is None else registrado - esperado
+        out.append(r)
+    return out
+
+
+def totais_por(conn: sqlite3.Connection, inicio: str, fim: str, grupo: str = "banco") -> List[Dict[str, Any]]:
+    """Entradas/saídas de Caixa/Caixa 2/vendas em dinheiro no período agrupadas por `banco` ou `origem`."""
+    if grupo not in GRUPOS:
+        raise ValueError(f"Grupo inválido: {grupo!r} (use {GRUPOS})")
+    if not _tabelas_ok(conn):
+        return []
+    cur = conn.execute(
+        f"""
+        SELECT COALESCE(TRIM({grupo}), '') AS {grupo},
+               SUM(CASE WHEN tipo = 'entrada' THEN valor ELSE 0 END) AS entrada,
+               SUM(CASE WHEN tipo = 'saida'   THEN valor ELSE 0 END) AS saida,
+               COUNT(*) AS qtd
+          FROM movimentacoes_bancarias
+         WHERE data_dia BETWEEN DATE(?) AND DATE(?)
+           AND +banco IN (?, ?, ?)
+         GROUP BY 1
+         ORDER BY 1
+        """,
+        (str(inicio)[:10], str(fim)[:10], *BANCOS_CAIXA),
+    )
+    nomes = [c[0] for c in cur.description]
+    return [dict(zip(nomes, r)) for r in cur.fetchall()]
+
+
+def lancamentos_caixa(conn: sqlite3.Connection, inicio: str, fim: str) -> List[Dict[str, Any]]:
+    """Movimentações de Caixa/Caixa 2/vendas em dinheiro no período (ordem de lançamento)."""
+    if not _tabelas_ok(conn):
+        return []
+    cur = conn.execute(
+        """
+        SELECT id, data, banco, tipo, origem, valor, observacao,
+               referencia_tabela, referencia_id
+          FROM movimentacoes_bancarias
+         WHERE data_dia BETWEEN DATE(?) AND DATE(?)
+           AND +banco IN (?, ?, ?)
+         ORDER BY data_dia, id
+        """,
+        (str(inicio)[:10], str(fim)[:10], *BANCOS_CAIXA),
+    )
+    nomes = [c[0] for c in cur.description]
+    return [dict(zip(nomes, r)) for r in cur.fetchall()]
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m repository.fechamento_repository",
+        description="Conciliação diária de Caixa / Caixa 2.",
+    )
+    parser.add_argument("caminho_banco")
+    parser.add_argument("inicio")
+    parser.add_argument("fim", nargs="?", default=None)
+    args = parser.parse_args(argv)
+
+    with get_conn(args.caminho_banco) as conn:
+        linhas = fechamento_periodo(conn, args.inicio, args.fim)
+    def _fmt(v: Optional[float], largura: int = 12) -> str:
+        return f"{'-':>{largura}}" if v is None else f"{v:>{largura}.2f}"
+
+    for r in linhas:
+        print(
+            f"{r['data']}  abertura {_fmt(r['abertura_caixa'])}  "
+            f"+{r['entradas_caixa']:>10.2f}  -{r['saidas_caixa']:>10.2f}  "
+            f"esperado {_fmt(r['esperado_caixa'])}  "
+            f"diferença {_fmt(r['diferenca_caixa'], 0)}"
+        )
+    return 0
+
+
+__all__ = [
+    "BANCO_CAIXA_VENDAS",
+    "BANCOS_CAIXA",
+    "ORIGEM_CORRECAO",
+    "ORIGEM_TRANSFERENCIA_CAIXA2",
+    "ORIGEM_DEPOSITO",
+    "GRUPOS",
+    "garantir_indices_fechamento",
+    "fechamento_periodo",
+    "totais_por",
+    "lancamentos_caixa",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
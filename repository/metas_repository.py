@@ -0,0 +1,313 @@
+"""
+Módulo Metas (Repositório)
+==========================
+
+Progresso das metas de venda (dia, semana e mês) de todos os vendedores e da
+LOJA, calculado em **uma** consulta SQL sobre o fato diário de vendas.
+
+Regras das metas (tabela `metas`, cadastradas em "Cadastro de Metas")
+---------------------------------------------------------------------
+- Meta vigente de um mês: a linha do próprio mês ou, se não houver, a mais
+  recente anterior (mesmo critério de `MetaManager.salvar_meta`).
+- `meta_semanal = meta_mensal × perc_semanal / 100`.
+- `meta_dia = meta_semanal × perc_<dia da semana> / 100`.
+- Níveis: Ouro = 100% da meta mensal; Prata/Bronze = `perc_prata`/`perc_bronze`.
+- `id_usuario = 0` é a LOJA (todas as vendas); os demais casam com
+  `entrada.Usuario` pelo nome do usuário (sem diferenciar maiúsculas).
+
+Funcionalidades principais
+--------------------------
+- `calcular_progresso(conn, mes)`: uma linha por (vendedor, dia do mês) com a
+  venda do dia, os acumulados da semana e do mês e as metas correspondentes.
+- `progresso_mes(db, mes)`: o mesmo, com cache por mês (ver abaixo).
+- `resumo_metas(linhas, referencia)`: situação de cada vendedor em uma data
+  (percentuais, nível atingido e quanto falta para o próximo).
+
+Detalhes técnicos
+-----------------
+- Lê `fato_vendas_dia` (vendas por dia × usuário, mantido de forma incremental
+  por `repository.fatos_repository`), nunca a tabela `entrada` inteira.
+- Grade calendário × vendedores via CTE recursiva: dias sem venda aparecem com
+  zero e os acumulados são janelas (`SUM() OVER (PARTITION BY vendedor,
+  semana ORDER BY data)`). A semana começa na segunda-feira; a primeira semana
+  do mês inclui os dias do mês anterior que pertencem a ela.
+- Cache por mês em `shared.cache`, etiquetado pelas versões de
+  `fato_vendas_dia`, `metas` e `usuarios`: registrar uma venda marca só a data
+  como pendente; `progresso_mes` reprocessa essa data no fato e recalcula o mês
+  a partir de ~31 × vendedores linhas pré-agregadas.
+
+Linha de comando
+----------------
+    python -m repository.metas_repository <caminho_banco> [YYYY-MM] [YYYY-MM-DD]
+
+Dependências
+------------
+- sqlite3
+- shared.db.get_conn
+- shared.cache.cache_consulta
+- shared.schema.tabela_existe
+- repository.fatos_repository (atualizar_fatos, garantir_fatos)
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+from repository.fatos_repository import atualizar_fatos, garantir_fatos
+from shared.cache import cache_consulta
+from shared.db import get_conn
+from shared.schema import tabela_existe
+
+logger = logging.getLogger(__name__)
+
+LOJA = "LOJA"
+OURO, PRATA, BRONZE = "Ouro", "Prata", "Bronze"
+
+_RE_MES = re.compile(r"^\d{4}-\d{2}$")
+
+# Uma passada: fato do mês (+ início da 1ª semana) → grade → janelas.
+_SQL_PROGRESSO = """
+WITH RECURSIVE
+limites(ini, fim, ini_semana) AS (
+    SELECT :ini, DATE(:ini, '+1 month', '-1 day'), DATE(:ini, '-6 days', 'weekday 1')
+),
+dias(data) AS (
+    SELECT ini_semana FROM limites
+    UNION ALL
+    SELECT DATE(data, '+1 day') FROM dias, limites WHERE data < limites.fim
+),
+vendas(vendedor, data, valor) AS (
+    SELECT UPPER(usuario), data, SUM(valor_bruto)
+      FROM fato_vendas_dia, limites
+     WHERE data BETWEEN limites.ini_semana AND limites.fim AND usuario <> ''
+     GROUP BY UPPER(usuario), data
+    UNION ALL
+    SELECT :loja, data, SUM(valor_bruto)
+      FROM fato_vendas_dia, limites
+     WHERE data BETWEEN limites.ini_semana AND limites.fim
+     GROUP BY data
+),
+metas_vigentes AS (
+    SELECT CASE WHEN COALESCE(m.id_usuario, 0) = 0 THEN :loja
+                ELSE UPPER(TRIM(COALESCE(u.nome, m.vendedor, ''))) END AS vendedor,
+           COALESCE(m.meta_mensal, 0) AS meta_mensal,
+           COALESCE(m.meta_mensal, 0) * COALESCE(m.perc_semanal, 0) / 100.0 AS meta_semanal,
+           m.perc_segunda, m.perc_terca, m.perc_quarta, m.perc_quinta,
+           m.perc_sexta, m.perc_sabado, m.perc_domingo,
+           COALESCE(m.perc_prata, 0) AS perc_prata,
+           COALESCE(m.perc_bronze, 0) AS perc_bronze,
+           ROW_NUMBER() OVER (
+               PARTITION BY COALESCE(m.id_usuario, 0) ORDER BY m.mes DESC, m.id DESC
+           ) AS rn
+      FROM metas m
+      LEFT JOIN usuarios u ON u.id = m.id_usuario
+     WHERE m.mes <= :mes
+),
+vendedores(vendedor) AS (
+    SELECT vendedor FROM vendas
+    UNION
+    SELECT vendedor FROM metas_vigentes WHERE rn = 1 AND vendedor <> ''
+),
+grade AS (
+    SELECT v.vendedor,
+           d.data,
+           DATE(d.data, '-6 days', 'weekday 1') AS semana,
+           COALESCE(x.valor, 0) AS valor,
+           COALESCE(mv.meta_mensal, 0) AS meta_mensal,
+           COALESCE(mv.meta_semanal, 0) AS meta_semanal,
+           COALESCE(mv.meta_semanal, 0) * COALESCE(
+               CASE strftime('%w', d.data)
+                   WHEN '1' THEN mv.perc_segunda WHEN '2' THEN mv.perc_terca
+                   WHEN '3' THEN mv.perc_quarta  WHEN '4' THEN mv.perc_quinta
+                   WHEN '5' THEN mv.perc_sexta   WHEN '6' THEN mv.perc_sabado
+                   ELSE mv.perc_domingo
+               END, 0) / 100.0 AS meta_dia,
+           COALESCE(mv.perc_prata, 0) AS perc_prata,
+           COALESCE(mv.perc_bronze, 0) AS perc_bronze
+      FROM vendedores v
+     CROSS JOIN dias d
+      LEFT JOIN (
+            SELECT vendedor, data, SUM(valor) AS valor FROM vendas GROUP BY vendedor, data
+           ) x ON x.vendedor = v.vendedor AND x.data = d.data
+      LEFT JOIN metas_vigentes mv ON mv.vendedor = v.vendedor AND mv.rn = 1
+),
+acumulado AS (
+    SELECT vendedor, data, semana, valor,
+           SUM(valor) OVER w_semana AS acum_semana,
+           SUM(valor) OVER w_mes AS acum_mes,
+           meta_dia,
+           SUM(meta_dia) OVER w_mes AS meta_acum_mes,
+           meta_semanal, meta_mensal, perc_prata, perc_bronze
+      FROM grade
+    WINDOW w_semana AS (PARTITION BY vendedor, semana ORDER BY data),
+           w_mes AS (PARTITION BY vendedor, substr(data, 1, 7) ORDER BY data)
+)
+SELECT a.*
+  FROM acumulado a, limites
+ WHERE a.data >= limites.ini
+ ORDER BY a.vendedor <> :loja, a.vendedor, a.data
+"""
+
+
+# -----------------------------------------------------------------------------
+# Cálculo
+# -----------------------------------------------------------------------------
+def _validar_mes(mes: str) -> str:
+    mes = str(mes).strip()[:7]
+    if not _RE_MES.match(mes):
+        raise ValueError(f"Mês inválido (esperado 'YYYY-MM'): {mes!r}")
+    return mes
+
+
+def calcular_progresso(conn: sqlite3.Connection, mes: str) -> List[Dict[str, Any]]:
+    """
+    Progresso diário das metas de todos os vendedores (e da LOJA) no mês.
+
+    Não atualiza o fato de vendas (ver `progresso_mes`). Não faz commit.
+
+    Args:
+        mes: competência 'YYYY-MM'.
+
+    Returns:
+        list[dict]: uma linha por (vendedor, dia do mês), LOJA primeiro, com
+        `valor`, `acum_semana`, `acum_mes`, `meta_dia`, `meta_acum_mes`,
+        `meta_semanal`, `meta_mensal`, `perc_prata`, `perc_bronze` e `semana`
+        (segunda-feira da semana).
+    """
+    mes = _validar_mes(mes)
+    garantir_fatos(conn)
+    if not tabela_existe(conn, "metas") or not tabela_existe(conn, "usuarios"):
+        logger.debug("metas: tabelas 'metas'/'usuarios' ausentes.")
+        return []
+    cur = conn.execute(_SQL_PROGRESSO, {"ini": f"{mes}-01", "mes": mes, "loja": LOJA})
+    nomes = [c[0] for c in cur.description]
+    return [dict(zip(nomes, r)) for r in cur.fetchall()]
+
+
+@cache_consulta("fato_vendas_dia", "metas", "usuarios")
+def _progresso_cacheado(db_path_like: Any, mes: str) -> List[Dict[str, Any]]:
+    with get_conn(db_path_like) as conn:
+        return calcular_progresso(conn, mes)
+
+
+def progresso_mes(db_path_like: Any, mes: str) -> List[Dict[str, Any]]:
+    """
+    `calcular_progresso` com as vendas pendentes já consolidadas e cache por mês.
+
+    O resultado de um mês é reaproveitado enquanto `fato_vendas_dia`, `metas` e
+    `usuarios` não mudarem; uma venda nova reprocessa só a sua data no fato.
+    """
+    mes = _validar_mes(mes)
+    with get_conn(db_path_like) as conn:
+        atualizar_fatos(conn)
+    return [dict(r) for r in _progresso_cacheado(db_path_like, mes)]
+
+
+# -----------------------------------------------------------------------------
+# Resumo
+# -----------------------------------------------------------------------------
+def _perc(valor: float, meta: float) -> Optional[float]:
+    return (valor / meta * 100.0) if meta > 0 else None
+
+
+def nivel_atingido(vendido: float, meta_mensal: float, perc_prata: float, perc_bronze: float) -> str:
+    """'Ouro', 'Prata', 'Bronze' ou '' conforme o vendido no mês."""
+    if meta_mensal <= 0:
+        return ""
+    if vendido >= meta_mensal:
+        return OURO
+    if perc_prata > 0 and vendido >= meta_mensal * perc_prata / 100.0:
+        return PRATA
+    if perc_bronze > 0 and vendido >= meta_mensal * perc_bronze / 100.0:
+        return BRONZE
+    return ""
+
+
+def resumo_metas(linhas: List[Dict[str, Any]], referencia: date | str) -> List[Dict[str, Any]]:
+    """
+    Situação de cada vendedor na data `referencia` a partir de `calcular_progresso`.
+
+    Returns:
+        list[dict] com `vendedor`, `vendido_dia`/`meta_dia`/`perc_dia`,
+        `vendido_semana`/`meta_semanal`/`perc_semana`, `vendido_mes`/`meta_mensal`/
+        `perc_mes`, `meta_ate_hoje`/`perc_ritmo` (meta diária acumulada no mês),
+        `nivel` e `falta_proximo` (valor até o próximo nível; 0 no Ouro).
+    """
+    ref = str(referencia)[:10]
+    out: List[Dict[str, Any]] = []
+    for r in linhas:
+        if r["data"] != ref:
+            continue
+        meta_mes = float(r["meta_mensal"] or 0.0)
+        vendido_mes = float(r["acum_mes"] or 0.0)
+        nivel = nivel_atingido(vendido_mes, meta_mes, float(r["perc_prata"]), float(r["perc_bronze"]))
+
+        alvos = [meta_mes * p / 100.0 for p in (r["perc_bronze"], r["perc_prata"]) if p] + [meta_mes]
+        falta = next((a - vendido_mes for a in sorted(alvos) if a > vendido_mes), 0.0)
+
+        out.append(
+            {
+                "vendedor": r["vendedor"],
+                "vendido_dia": float(r["valor"]),
+                "meta_dia": float(r["meta_dia"]),
+                "perc_dia": _perc(float(r["valor"]), float(r["meta_dia"])),
+                "vendido_semana": float(r["acum_semana"]),
+                "meta_semanal": float(r["meta_semanal"]),
+                "perc_semana": _perc(float(r["acum_semana"]), float(r["meta_semanal"])),
+                "vendido_mes": vendido_mes,
+                "meta_mensal": meta_mes,
+                "perc_mes": _perc(vendido_mes, meta_mes),
+                "meta_ate_hoje": float(r["meta_acum_mes"]),
+                "perc_ritmo": _perc(vendido_mes, float(r["meta_acum_mes"])),
+                "nivel": nivel,
+                "falta_proximo": falta if meta_mes > 0 else 0.0,
+            }
+        )
+    return out
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m repository.metas_repository",
+        description="Progresso das metas de venda no mês.",
+    )
+    parser.add_argument("caminho_banco")
+    parser.add_argument("mes", nargs="?", default=date.today().strftime("%Y-%m"))
+    parser.add_argument("referencia", nargs="?", default=None)
+    args = parser.parse_args(argv)
+
+    linhas = progresso_mes(args.caminho_banco, args.mes)
+    ultimo_dia = max((r["data"] for r in linhas), default=f"{args.mes}-01")
+    ref = args.referencia or min(ultimo_dia, date.today().isoformat())
+    for r in resumo_metas(linhas, ref):
+        perc = "-" if r["perc_mes"] is None else f"{r['perc_mes']:.1f}%"
+        print(
+            f"{r['vendedor']:<20} mês {r['vendido_mes']:>12.2f} / {r['meta_mensal']:>12.2f} "
+            f"({perc}) semana {r['vendido_semana']:>10.2f} dia {r['vendido_dia']:>10.2f} {r['nivel']}"
+        )
+    return 0
+
+
+__all__ = [
+    "LOJA",
+    "OURO",
+    "PRATA",
+    "BRONZE",
+    "calcular_progresso",
+    "progresso_mes",
+    "nivel_atingido",
+    "resumo_metas",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -2,8 +2,65 @@ from __future__ import annotations
 
 import sqlite3
 import hashlib
+import threading
 from typing import Optional, Dict, Any
 from utils.utils import resolve_db_path
+from shared.db import get_conn
+from shared.schema import colunas, db_key, garantir_colunas, schema_version
+
+# {db_key: schema_version em que o schema de movimentacoes_bancarias foi conferido}
+_garantidos: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+# ---------------- migração: coluna de dia (sargável) ----------------
+
+def garantir_coluna_data_dia(conn: sqlite3.Connection) -> None:
+    """
+    Garante a coluna `data_dia` (= DATE(data)) e o índice
+    `idx_mov_data_dia_banco_tipo (data_dia, banco, tipo)`. Idempotente.
+
+    Consultas por dia/período devem filtrar por `data_dia = DATE(?)` ou
+    `data_dia BETWEEN DATE(?) AND DATE(?)` em vez de `DATE(data) = DATE(?)` /
+    `data LIKE 'YYYY-MM-DD%'`, que não usam índice.
+
+    - SQLite >= 3.31: coluna gerada VIRTUAL (não ocupa espaço; indexável).
+    - Versões antigas: coluna comum + backfill + triggers de INSERT/UPDATE.
+    """
+    cols = colunas(conn, "movimentacoes_bancarias")
+    if not cols:
+        return
+    if "data_dia" not in cols:
+        try:
+            conn.execute(
+                "ALTER TABLE movimentacoes_bancarias "
+                "ADD COLUMN data_dia TEXT GENERATED ALWAYS AS (DATE(data)) VIRTUAL;"
+            )
+        except sqlite3.OperationalError:
+            conn.execute('ALTER TABLE movimentacoes_bancarias ADD COLUMN "data_dia" TEXT;')
+            conn.execute("UPDATE movimentacoes_bancarias SET data_dia = DATE(data);")
+            conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_mov_data_dia_ins
+                AFTER INSERT ON movimentacoes_bancarias
+                BEGIN
+                    UPDATE movimentacoes_bancarias SET data_dia = DATE(NEW.data) WHERE id = NEW.id;
+                END;
+                """
+            )
+            conn.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS trg_mov_data_dia_upd
+                AFTER UPDATE OF data ON movimentacoes_bancarias
+                BEGIN
+                    UPDATE movimentacoes_bancarias SET data_dia = DATE(NEW.data) WHERE id = NEW.id;
+                END;
+                """
+            )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mov_data_dia_banco_tipo "
+        "ON movimentacoes_bancarias(data_dia, banco, tipo);"
+    )
 
 
 class MovimentacoesRepository:
@@ -15,6 +72,7 @@ class MovimentacoesRepository:
     - Aceita sinônimos para valor: valor, valor_mov, valor_total, valor_parcela, valor_bruto (prioridade nesta ordem).
     - Idempotência por `trans_uid` determinístico quando não informado.
     - Migrações idempotentes: cria tabela/índices/colunas ausentes e UNIQUE por índice em `trans_uid`.
+    - Coluna `data_dia` (DATE(data)) indexada para consultas por dia/período.
     - Tipos semânticos padronizados: "entrada" | "saida" | "transferencia" | "registro".
     """
 
@@ -25,18 +83,8 @@ class MovimentacoesRepository:
     # ---------------- conexões ----------------
 
     def _get_conn(self) -> sqlite3.Connection:
-        """Abre conexão SQLite com PRAGMAs padronizados do projeto."""
-        conn = sqlite3.connect(
-            self.db_path,
-            timeout=30,
-            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
-        )
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute("PRAGMA busy_timeout=30000;")
-        conn.execute("PRAGMA foreign_keys=ON;")
-        conn.execute("PRAGMA synchronous=NORMAL;")
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Obtém a conexão SQLite do pool, com PRAGMAs padronizados do projeto."""
+        return get_conn(self.db_path)
 
     # ---------------- utils: valor/trans_uid ----------------
 
@@ -87,20 +135,27 @@ class MovimentacoesRepository:
 
     # ---------------- schema / migração ----------------
 
-    def _colunas_existentes(self, conn: sqlite3.Connection) -> set:
-        rows = conn.execute("PRAGMA table_info(movimentacoes_bancarias);").fetchall()
-        return {str(r["name"]) if isinstance(r, sqlite3.Row) else str(r[1]) for r in rows}
+    def _colunas_existentes(self, conn: sqlite3.Connection) -> frozenset:
+        """Colunas da tabela (registro de schema em cache; sem PRAGMA por chamada)."""
+        return colunas(conn, "movimentacoes_bancarias")
 
     def _garantir_unique_trans_uid(self, conn: sqlite3.Connection) -> None:
         """Garante coluna/índice UNIQUE para `trans_uid` em bases legadas."""
-        existentes = self._colunas_existentes(conn)
-        if "trans_uid" not in existentes:
-            conn.execute('ALTER TABLE movimentacoes_bancarias ADD COLUMN "trans_uid" TEXT;')
+        garantir_colunas(conn, "movimentacoes_bancarias", {"trans_uid": "TEXT"})
         conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_mov_trans_uid ON movimentacoes_bancarias(trans_uid);")
 
     def garantir_schema(self) -> None:
-        """Cria a tabela/índices e garante colunas opcionais. Idempotente."""
+        """
+        Cria a tabela/índices e garante colunas opcionais. Idempotente.
+
+        Roda uma vez por banco e versão de schema: instanciar o repositório de
+        novo custa só a leitura de `PRAGMA schema_version`.
+        """
         with self._get_conn() as conn:
+            key = db_key(conn)
+            with _lock:
+                if _garantidos.get(key) == schema_version(conn):
+                    return
             conn.executescript(
                 """
                 CREATE TABLE IF NOT EXISTS movimentacoes_bancarias (
@@ -119,13 +174,12 @@ class MovimentacoesRepository:
                 CREATE INDEX IF NOT EXISTS idx_mov_banco ON movimentacoes_bancarias(banco);
                 """
             )
-            existentes = self._colunas_existentes(conn)
-            if "usuario" not in existentes:
-                conn.execute('ALTER TABLE movimentacoes_bancarias ADD COLUMN "usuario" TEXT;')
-            if "data_hora" not in existentes:
-                conn.execute('ALTER TABLE movimentacoes_bancarias ADD COLUMN "data_hora" TEXT;')
+            garantir_colunas(conn, "movimentacoes_bancarias", {"usuario": "TEXT", "data_hora": "TEXT"})
             self._garantir_unique_trans_uid(conn)
+            garantir_coluna_data_dia(conn)
             conn.commit()
+            with _lock:
+                _garantidos[key] = schema_version(conn)
 
     # ---------------- consultas / utilidades ----------------
 
@@ -178,15 +232,8 @@ class MovimentacoesRepository:
                 "Verifique o ponto de chamada (o valor pode estar vindo vazio ou no alias errado)."
             )
 
+        # Colunas usuario/data_hora/trans_uid já garantidas em `garantir_schema` (__init__)
         with self._get_conn() as conn:
-            # Migração defensiva em runtime
-            existentes = self._colunas_existentes(conn)
-            if "usuario" not in existentes:
-                conn.execute('ALTER TABLE movimentacoes_bancarias ADD COLUMN "usuario" TEXT;')
-            if "data_hora" not in existentes:
-                conn.execute('ALTER TABLE movimentacoes_bancarias ADD COLUMN "data_hora" TEXT;')
-            self._garantir_unique_trans_uid(conn)
-
             cur = conn.cursor()
             cur.execute(
                 """
@@ -386,4 +433,4 @@ class MovimentacoesRepository:
             conn.commit()
 
 
-__all__ = ["MovimentacoesRepository"]
+__all__ = ["MovimentacoesRepository", "garantir_coluna_data_dia"]
@@ -0,0 +1,210 @@
+"""
+Módulo Resumo Diário (Repositório)
+==================================
+
+Materialização do "Resumo do Dia" da página de Lançamentos: uma linha por data
+em `resumo_diario`, com os totais e listas já calculados (JSON).
+
+Funcionalidades principais
+--------------------------
+- `ler_resumo_diario(conn, data)`: leitura pontual pela PK (`data`).
+- `gravar_resumo_diario(conn, data, resumo, geracao)`: grava o resumo calculado
+  junto com a geração lida **antes** do cálculo.
+- Invalidação pelo registro de datas alteradas (`shared.alteracoes`) — todos os
+  caminhos de escrita (vendas, saídas, depósitos, transferências, caixa 2,
+  mercadorias, saldos) são cobertos sem alterar os serviços. Uma linha gravada
+  na geração `g` vale enquanto não houver alteração posterior a `g` em:
+    * tabelas "do dia" (`entrada`, `saida`, `movimentacoes_bancarias`,
+      `mercadorias`): na própria data;
+    * tabelas acumuladas (`saldos_caixas`, `saldos_bancos_acumulado`): em
+      qualquer data `<=` (o saldo exibido é o último ≤ data).
+
+Detalhes técnicos
+-----------------
+- A validade é conferida na leitura (PK + uma busca no índice do registro):
+  sem nada alterado, ler o resumo não escreve no banco. Uma escrita concorrente
+  durante o cálculo tem geração maior que a gravada e invalida a linha no
+  próximo rerun.
+- Não há triggers próprios: os antigos `trg_resumo_diario_*` e o contador
+  `resumo_diario_geracao` são removidos na primeira chamada.
+- `formato`: versão do layout do JSON; linhas de outro formato são ignoradas.
+
+Linha de comando
+----------------
+    python -m repository.resumo_diario_repository clear <caminho_banco>
+
+Dependências
+------------
+- sqlite3
+- shared.db.get_conn
+- shared.alteracoes (registro de datas alteradas)
+- shared.schema (colunas, db_key, schema_version, tabela_existe)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared.alteracoes import (
+    alterada_desde,
+    garantir_alteracoes,
+    geracao_atual,
+    remover_triggers_legados,
+)
+from shared.db import get_conn
+from shared.schema import colunas, db_key, schema_version, tabela_existe
+
+logger = logging.getLogger(__name__)
+
+_TABELA = "resumo_diario"
+_GERACAO_LEGADA = "resumo_diario_geracao"
+_PREFIXO_LEGADO = "trg_resumo_diario_"
+
+# Versão do layout do JSON gravado em `resumo_diario.payload`
+FORMATO = 1
+
+# Tabelas de origem ("do dia": só a data; acumuladas: qualquer data <=)
+_TABELAS_DIA: Tuple[str, ...] = ("entrada", "saida", "movimentacoes_bancarias", "mercadorias")
+_TABELAS_ACUMULADAS: Tuple[str, ...] = ("saldos_caixas", "saldos_bancos_acumulado")
+
+# {db_key: schema_version em que a tabela foi conferida}
+_garantidos: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+# Schema
+# -----------------------------------------------------------------------------
+def garantir_resumo_diario(conn: sqlite3.Connection) -> None:
+    """
+    Cria `resumo_diario` e o registro de datas alteradas.
+
+    Idempotente; custa só `PRAGMA schema_version` depois da primeira chamada
+    (por banco e versão de schema). Não faz commit.
+    """
+    key = db_key(conn)
+    with _lock:
+        if _garantidos.get(key) == schema_version(conn):
+            return
+
+    garantir_alteracoes(conn)
+    if remover_triggers_legados(conn, _PREFIXO_LEGADO):
+        conn.execute(f"DROP TABLE IF EXISTS {_GERACAO_LEGADA}")
+    if tabela_existe(conn, _TABELA) and "geracao" not in colunas(conn, _TABELA):
+        conn.execute(f"DROP TABLE {_TABELA}")  # layout antigo (sem geração)
+        logger.info("resumo_diario: tabela recriada no layout com geração")
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {_TABELA} (
+            data          TEXT PRIMARY KEY,
+            formato       INTEGER NOT NULL,
+            geracao       INTEGER NOT NULL,
+            payload       TEXT NOT NULL,
+            atualizado_em TEXT NOT NULL DEFAULT (datetime('now','localtime'))
+        ) WITHOUT ROWID
+        """
+    )
+
+    with _lock:
+        _garantidos[key] = schema_version(conn)
+
+
+# -----------------------------------------------------------------------------
+# Leitura / gravação
+# -----------------------------------------------------------------------------
+def geracao_resumo_diario(conn: sqlite3.Connection) -> int:
+    """Geração atual do registro de alterações (ler **antes** de calcular)."""
+    garantir_resumo_diario(conn)
+    return geracao_atual(conn)
+
+
+def ler_resumo_diario(conn: sqlite3.Connection, data: Any) -> Optional[Dict[str, Any]]:
+    """
+    Resumo materializado da data (None se ausente, desatualizado ou de outro
+    formato). Somente leitura.
+    """
+    garantir_resumo_diario(conn)
+    row = conn.execute(
+        f"SELECT data, formato, geracao, payload FROM {_TABELA} WHERE data = DATE(?)",
+        (str(data),),
+    ).fetchone()
+    if not row or int(row[1] or 0) != FORMATO:
+        return None
+    if alterada_desde(conn, str(row[0]), int(row[2]), _TABELAS_DIA, _TABELAS_ACUMULADAS):
+        return None
+    try:
+        return json.loads(row[3])
+    except (TypeError, ValueError):
+        return None
+
+
+def gravar_resumo_diario(
+    conn: sqlite3.Connection, data: Any, resumo: Dict[str, Any], geracao: int
+) -> bool:
+    """
+    Grava o resumo da data calculado a partir da geração `geracao`.
+
+    Escritas posteriores a `geracao` (inclusive durante o cálculo) invalidam a
+    linha na próxima leitura.
+
+    Returns:
+        bool: True se gravou (False: data inválida). Não faz commit.
+    """
+    garantir_resumo_diario(conn)
+    cur = conn.execute(
+        f"""
+        INSERT OR REPLACE INTO {_TABELA} (data, formato, geracao, payload, atualizado_em)
+        SELECT DATE(?), ?, ?, ?, datetime('now','localtime')
+         WHERE DATE(?) IS NOT NULL
+        """,
+        (str(data), FORMATO, int(geracao), json.dumps(resumo, ensure_ascii=False), str(data)),
+    )
+    return cur.rowcount > 0
+
+
+def invalidar_resumo_diario(conn: sqlite3.Connection, data: Any = None) -> int:
+    """Remove o resumo de uma data (ou todos). Não faz commit."""
+    garantir_resumo_diario(conn)
+    if data is None:
+        cur = conn.execute(f"DELETE FROM {_TABELA}")
+    else:
+        cur = conn.execute(f"DELETE FROM {_TABELA} WHERE data = DATE(?)", (str(data),))
+    return int(cur.rowcount or 0)
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m repository.resumo_diario_repository",
+        description="Manutenção da materialização resumo_diario.",
+    )
+    parser.add_argument("comando", choices=["clear"])
+    parser.add_argument("caminho_banco")
+    args = parser.parse_args(argv)
+
+    with get_conn(args.caminho_banco) as conn:
+        n = invalidar_resumo_diario(conn)
+    print(f"resumo_diario: {n} linha(s) removida(s).")
+    return 0
+
+
+__all__ = [
+    "FORMATO",
+    "garantir_resumo_diario",
+    "geracao_resumo_diario",
+    "ler_resumo_diario",
+    "gravar_resumo_diario",
+    "invalidar_resumo_diario",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
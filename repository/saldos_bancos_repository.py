@@ -0,0 +1,705 @@
+"""
+Módulo Saldos Bancos (Repositório)
+==================================
+
+Camada de armazenamento dos saldos bancários diários e do índice de saldos
+acumulados por banco/data.
+
+Engines de armazenamento
+------------------------
+- **wide** (padrão/legado): tabela `saldos_bancos` com uma coluna por banco.
+  Um banco novo exige `ALTER TABLE ... ADD COLUMN` (uma única vez).
+- **long** (opt-in): tabela `saldos_bancos_long (data, banco, valor)` com índice
+  único `(banco, data)`. Gravações viram *upserts* simples, sem DDL no caminho
+  quente. A migração (`migrar_saldos_bancos_para_long`) renomeia a tabela wide
+  para `saldos_bancos_wide_legacy` (backup) e cria a **view** `saldos_bancos`
+  com o formato wide antigo, para leitores legados. A view só é recriada quando
+  surge um banco novo.
+
+Toda gravação de delta deve passar por `ajustar_saldo_banco`, que escolhe a
+engine do banco de dados e mantém o índice acumulado.
+
+Funcionalidades principais
+--------------------------
+- Atualização incremental a cada delta gravado em `saldos_bancos`
+  (`registrar_delta_acumulado`), chamada pelos caminhos de escrita
+  (`_ajustar_banco_dynamic`, `upsert_saldos_bancos`, transferências, etc.).
+- Consulta do saldo acumulado (≤ data) por banco com **uma leitura indexada**
+  (`saldo_banco_em` / `saldos_bancos_em`), sem varrer `saldos_bancos`;
+  `saldos_bancos_em` inclui os bancos cadastrados ainda sem movimento (0).
+- Série mensal de saldos por banco (`saldos_bancos_fim_de_mes`) para gráficos.
+- Validação e citação dos nomes de banco usados como coluna
+  (`validar_nome_banco` / `citar_identificador`): nomes acentuados (Itaú)
+  são aceitos; aspas e caracteres de controle, recusados.
+- Reconstrução e verificação contra a tabela wide (`reconstruir_saldos_acumulados`
+  / `verificar_saldos_acumulados`) para bancos já existentes.
+
+Detalhes técnicos
+-----------------
+- Layout: `(banco, data, saldo_acumulado)` com PK `(banco, data)` (WITHOUT ROWID).
+  Cada linha guarda o saldo acumulado do banco **até aquela data (inclusive)**.
+- Um delta em `data` cria a linha do dia (herdando o saldo anterior) e soma o
+  delta em todas as linhas `>= data` do banco — em uso normal, só a linha do dia.
+- Na primeira utilização em um banco de dados existente, a tabela é criada e
+  reconstruída a partir de `saldos_bancos` (idempotente).
+- Datas normalizadas para `YYYY-MM-DD`.
+
+Linha de comando
+----------------
+    python -m repository.saldos_bancos_repository rebuild      <caminho_banco>
+    python -m repository.saldos_bancos_repository verify       <caminho_banco>
+    python -m repository.saldos_bancos_repository migrate-long <caminho_banco>
+
+Dependências
+------------
+- sqlite3
+- shared.db.get_conn
+- shared.schema (colunas_ordenadas, db_key, schema_version, tabela_existe)
+- utils.utils.coerce_data
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+from shared.db import get_conn
+from shared.schema import colunas_ordenadas, db_key as _db_key, schema_version, tabela_existe
+from utils.utils import coerce_data
+
+logger = logging.getLogger(__name__)
+
+_TABELA = "saldos_bancos_acumulado"
+_LONG = "saldos_bancos_long"
+_WIDE_BACKUP = "saldos_bancos_wide_legacy"
+_ISO_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+# Nome de banco vira identificador (coluna wide): aceita letras Unicode (Itaú,
+# Bradesco S.A.), recusa aspas, crase, colchetes e caracteres de controle
+_NOME_PROIBIDO_RE = re.compile(r"[\"'`\[\]\x00-\x1f\x7f]")
+_NOME_TEM_LETRA_RE = re.compile(r"\w", re.UNICODE)
+_EPS = 0.005
+
+ENGINE_WIDE = "wide"
+ENGINE_LONG = "long"
+
+# Bancos de dados (arquivo) em que a tabela já foi garantida neste processo
+_garantidos: set = set()
+
+# Estado da engine por banco de dados: {db_key: (schema_version, engine, date_col, bancos)}
+_estado_cache: Dict[str, tuple] = {}
+
+
+# -----------------------------------------------------------------------------
+# Helpers
+# -----------------------------------------------------------------------------
+def _data_iso(valor: Any) -> str:
+    """Normaliza a data para 'YYYY-MM-DD' (aceita date/datetime/str BR ou ISO)."""
+    txt = str(valor or "").strip()
+    if _ISO_RE.match(txt):
+        return txt[:10]
+    if not txt:
+        raise ValueError("Data não informada.")
+    return coerce_data(txt.split(" ")[0]).strftime("%Y-%m-%d")
+
+
+def _colunas_wide(conn: sqlite3.Connection) -> tuple[str, List[str]]:
+    """Retorna (coluna_de_data, colunas_de_banco) da tabela wide `saldos_bancos`."""
+    cols = colunas_ordenadas(conn, "saldos_bancos")
+    date_col = next((c for c in cols if c.lower() == "data"), "data")
+    bancos = [c for c in cols if c != date_col and c.lower() not in ("id", "rowid")]
+    return date_col, bancos
+
+
+def _valores_wide(conn: sqlite3.Connection, tabela: str = "saldos_bancos") -> tuple[List[str], Dict[str, List[float]]]:
+    """Lê a tabela wide agregando por data: (bancos, {data_iso: [valor por banco]})."""
+    cols = [r[1] for r in conn.execute(f'PRAGMA table_info("{tabela}")').fetchall()]
+    date_col = next((c for c in cols if c.lower() == "data"), "data")
+    bancos = [c for c in cols if c != date_col and c.lower() not in ("id", "rowid")]
+    if not bancos:
+        return [], {}
+
+    somas_sql = ", ".join(f"COALESCE(SUM(CAST({citar_identificador(b)} AS REAL)), 0.0)" for b in bancos)
+    rows = conn.execute(
+        f'SELECT "{date_col}", {somas_sql} FROM "{tabela}" GROUP BY "{date_col}"'
+    ).fetchall()
+
+    por_data: Dict[str, List[float]] = {}
+    for r in rows:
+        try:
+            d = _data_iso(r[0])
+        except ValueError:
+            logger.warning("%s: data inválida ignorada: %r", tabela, r[0])
+            continue
+        acc = por_data.setdefault(d, [0.0] * len(bancos))
+        for i in range(len(bancos)):
+            acc[i] += float(r[1 + i] or 0.0)
+    return bancos, por_data
+
+
+def _calcular_acumulados(conn: sqlite3.Connection) -> Dict[tuple, float]:
+    """Calcula {(banco, data): saldo_acumulado} a partir dos saldos diários (qualquer engine)."""
+    if engine_saldos_bancos(conn) == ENGINE_LONG:
+        out: Dict[tuple, float] = {}
+        corrente: Dict[str, float] = {}
+        for banco, d, v in conn.execute(
+            f"SELECT banco, data, SUM(valor) FROM {_LONG} GROUP BY banco, data ORDER BY banco, data"
+        ).fetchall():
+            if abs(float(v or 0.0)) < 1e-12:
+                continue
+            corrente[banco] = corrente.get(banco, 0.0) + float(v)
+            out[(str(banco), str(d))] = round(corrente[banco], 2)
+        return out
+
+    bancos, por_data = _valores_wide(conn)
+    if not bancos:
+        return {}
+
+    # só registra as datas em que o banco teve movimento (as demais herdam o saldo)
+    out: Dict[tuple, float] = {}
+    corrente = [0.0] * len(bancos)
+    for d in sorted(por_data):
+        for i, b in enumerate(bancos):
+            if abs(por_data[d][i]) < 1e-12:
+                continue
+            corrente[i] += por_data[d][i]
+            out[(b, d)] = round(corrente[i], 2)
+    return out
+
+
+# -----------------------------------------------------------------------------
+# Schema
+# -----------------------------------------------------------------------------
+def garantir_tabela_acumulado(conn: sqlite3.Connection) -> None:
+    """
+    Garante a tabela `saldos_bancos_acumulado` (idempotente, uma vez por processo).
+
+    Se a tabela ainda não existir, cria e reconstrói a partir de `saldos_bancos`.
+    Não faz commit; o chamador decide a transação.
+    """
+    key = _db_key(conn)
+    if key in _garantidos:
+        return
+
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=? LIMIT 1", (_TABELA,)
+    ).fetchone()
+    if not existe:
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {_TABELA} (
+                banco           TEXT NOT NULL,
+                data            TEXT NOT NULL,
+                saldo_acumulado REAL NOT NULL DEFAULT 0.0,
+                PRIMARY KEY (banco, data)
+            ) WITHOUT ROWID
+            """
+        )
+        tem_wide = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name='saldos_bancos' LIMIT 1"
+        ).fetchone()
+        if tem_wide:
+            reconstruir_saldos_acumulados(conn)
+    _garantidos.add(key)
+
+
+# -----------------------------------------------------------------------------
+# Engine de armazenamento (wide legado x long opt-in)
+# -----------------------------------------------------------------------------
+def _estado(conn: sqlite3.Connection) -> tuple:
+    """
+    Retorna `(engine, date_col, bancos)` do banco de dados, em cache por arquivo.
+
+    O cache é invalidado por `PRAGMA schema_version` (muda a cada DDL), então não
+    há `PRAGMA table_info` no caminho quente.
+    """
+    key = _db_key(conn)
+    sv = schema_version(conn)
+    cached = _estado_cache.get(key)
+    if cached and cached[0] == sv:
+        return cached[1:]
+
+    row = conn.execute(
+        "SELECT type FROM sqlite_master WHERE name='saldos_bancos' LIMIT 1"
+    ).fetchone()
+    engine = ENGINE_LONG if row and row[0] == "view" else ENGINE_WIDE
+    date_col, bancos = _colunas_wide(conn) if row else ("data", [])
+    _estado_cache[key] = (sv, engine, date_col, frozenset(bancos))
+    return engine, date_col, frozenset(bancos)
+
+
+def engine_saldos_bancos(conn: sqlite3.Connection) -> str:
+    """Engine ativa no banco de dados: `"wide"` (legado) ou `"long"`."""
+    return _estado(conn)[0]
+
+
+def validar_nome_banco(banco: str) -> str:
+    """
+    Valida o nome do banco (vira coluna na tabela/view wide) e o devolve sem
+    espaços nas pontas.
+
+    Aceita letras Unicode, números, espaço e pontuação comum (1–64 caracteres,
+    ao menos uma letra/número); recusa aspas, crase, colchetes e caracteres de
+    controle.
+
+    Raises:
+        ValueError: nome vazio, longo demais ou com caractere proibido.
+    """
+    banco = (banco or "").strip()
+    if (
+        not 1 <= len(banco) <= 64
+        or _NOME_PROIBIDO_RE.search(banco)
+        or not _NOME_TEM_LETRA_RE.search(banco)
+    ):
+        raise ValueError(f"Nome de banco/coluna inválido: {banco!r}")
+    return banco
+
+
+def citar_identificador(nome: str) -> str:
+    """Identificador SQL entre aspas duplas (aspas internas duplicadas)."""
+    return '"' + str(nome).replace('"', '""') + '"'
+
+
+
+def _criar_tabela_long(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {_LONG} (
+            id    INTEGER PRIMARY KEY AUTOINCREMENT,
+            data  TEXT NOT NULL,
+            banco TEXT NOT NULL,
+            valor REAL NOT NULL DEFAULT 0.0
+        )
+        """
+    )
+    conn.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{_LONG}_banco_data ON {_LONG} (banco, data)"
+    )
+
+
+def _recriar_view_wide(conn: sqlite3.Connection, bancos: Iterable[str]) -> None:
+    """(Re)cria a view `saldos_bancos` no formato wide a partir da tabela long."""
+    cols = []
+    for b in sorted({validar_nome_banco(x) for x in bancos}):
+        literal = b.replace("'", "''")
+        cols.append(
+            f"COALESCE(SUM(CASE WHEN banco = '{literal}' THEN valor END), 0.0) AS {citar_identificador(b)}"
+        )
+    select_cols = ",\n               ".join(["data"] + cols)
+    conn.execute("DROP VIEW IF EXISTS saldos_bancos")
+    conn.execute(
+        f"""
+        CREATE VIEW saldos_bancos AS
+        SELECT {select_cols}
+          FROM {_LONG}
+         GROUP BY data
+        """
+    )
+
+
+def garantir_banco(conn: sqlite3.Connection, banco: str) -> None:
+    """
+    Garante que `banco` exista no armazenamento de saldos (DDL só na 1ª vez).
+
+    - wide: cria a coluna do banco em `saldos_bancos` (DEFAULT 0.0).
+    - long: recria a view de compatibilidade incluindo o banco.
+    """
+    banco = validar_nome_banco(banco)
+    engine, _date_col, bancos = _estado(conn)
+    if banco in bancos:
+        return
+    if engine == ENGINE_LONG:
+        _recriar_view_wide(conn, set(bancos) | {banco})
+    else:
+        conn.execute(f"ALTER TABLE saldos_bancos ADD COLUMN {citar_identificador(banco)} REAL DEFAULT 0.0;")
+    logger.debug("Banco %s adicionado ao armazenamento de saldos (%s)", banco, engine)
+
+
+def garantir_linha_saldos_bancos(conn: sqlite3.Connection, data: Any) -> None:
+    """Garante a linha do dia em `saldos_bancos` (apenas engine wide; no-op na long)."""
+    engine, date_col, _bancos = _estado(conn)
+    if engine == ENGINE_LONG:
+        return
+    cur = conn.execute(f'SELECT 1 FROM saldos_bancos WHERE "{date_col}" = ? LIMIT 1', (data,))
+    if not cur.fetchone():
+        conn.execute(f'INSERT OR IGNORE INTO saldos_bancos ("{date_col}") VALUES (?)', (data,))
+
+
+def ajustar_saldo_banco(
+    conn: sqlite3.Connection,
+    data: Any,
+    banco: str,
+    delta: float,
+    *,
+    retornar_id: bool = False,
+) -> Optional[int]:
+    """
+    Soma `delta` no saldo diário de `banco` em `data` e atualiza o índice acumulado.
+
+    Caminho único de escrita para `saldos_bancos` (qualquer engine). Não faz commit.
+
+    Args:
+        conn: Conexão SQLite (transação do chamador).
+        data: Data do lançamento (date/str).
+        banco: Nome do banco (validado por whitelist).
+        delta: Valor a somar (negativo para débito).
+        retornar_id: Se True, retorna o rowid da linha afetada.
+
+    Returns:
+        Optional[int]: rowid da linha (wide) ou id (long) quando `retornar_id`.
+    """
+    banco = validar_nome_banco(banco)
+    d = _data_iso(data)
+    engine, date_col, bancos = _estado(conn)
+    if banco not in bancos:
+        garantir_banco(conn, banco)
+
+    registrar_delta_acumulado(conn, d, banco, delta)
+
+    if engine == ENGINE_LONG:
+        conn.execute(
+            f"""
+            INSERT INTO {_LONG} (data, banco, valor) VALUES (?, ?, ?)
+            ON CONFLICT(banco, data) DO UPDATE SET valor = valor + excluded.valor
+            """,
+            (d, banco, float(delta)),
+        )
+        if retornar_id:
+            row = conn.execute(
+                f"SELECT id FROM {_LONG} WHERE banco = ? AND data = ?", (banco, d)
+            ).fetchone()
+            return int(row[0]) if row else None
+        return None
+
+    col = citar_identificador(banco)
+    row = conn.execute(
+        f'SELECT rowid FROM saldos_bancos WHERE "{date_col}" = ? LIMIT 1', (d,)
+    ).fetchone()
+    if row:
+        conn.execute(
+            f"UPDATE saldos_bancos SET {col} = COALESCE({col}, 0.0) + ? WHERE rowid = ?",
+            (float(delta), int(row[0])),
+        )
+        return int(row[0]) if retornar_id else None
+    cur = conn.execute(
+        f'INSERT INTO saldos_bancos ("{date_col}", {col}) VALUES (?, ?)',
+        (d, float(delta)),
+    )
+    return int(cur.lastrowid) if retornar_id else None
+
+
+def migrar_saldos_bancos_para_long(conn: sqlite3.Connection) -> int:
+    """
+    Migração única (opt-in) de `saldos_bancos` wide para a engine long.
+
+    - Cria `saldos_bancos_long` + índice único `(banco, data)`.
+    - Copia os valores (agregados por data/banco, ignorando zeros).
+    - Renomeia a tabela wide para `saldos_bancos_wide_legacy` (backup).
+    - Cria a view `saldos_bancos` com o formato wide para leitores legados.
+
+    Idempotente: se a engine já for long, não faz nada.
+
+    Returns:
+        int: Quantidade de linhas gravadas na tabela long. Não faz commit.
+    """
+    if engine_saldos_bancos(conn) == ENGINE_LONG:
+        return 0
+
+    _criar_tabela_long(conn)
+    bancos, por_data = _valores_wide(conn)
+    linhas = [
+        (d, b, round(vals[i], 2))
+        for d, vals in sorted(por_data.items())
+        for i, b in enumerate(bancos)
+        if abs(vals[i]) >= 1e-12
+    ]
+    conn.executemany(
+        f"""
+        INSERT INTO {_LONG} (data, banco, valor) VALUES (?, ?, ?)
+        ON CONFLICT(banco, data) DO UPDATE SET valor = valor + excluded.valor
+        """,
+        linhas,
+    )
+    conn.execute(f'ALTER TABLE saldos_bancos RENAME TO "{_WIDE_BACKUP}"')
+    _recriar_view_wide(conn, bancos)
+    logger.info("saldos_bancos migrada para engine long: %d linhas", len(linhas))
+    return len(linhas)
+
+
+# -----------------------------------------------------------------------------
+# Escrita incremental
+# -----------------------------------------------------------------------------
+def registrar_delta_acumulado(conn: sqlite3.Connection, data: Any, banco: str, delta: float) -> None:
+    """
+    Aplica `delta` ao saldo acumulado de `banco` a partir de `data` (inclusive).
+
+    Deve ser chamada na mesma transação que grava o delta em `saldos_bancos`.
+    Não faz commit.
+    """
+    delta = float(delta or 0.0)
+    banco = (banco or "").strip()
+    if not banco or abs(delta) < 1e-12:
+        return
+    garantir_tabela_acumulado(conn)
+    d = _data_iso(data)
+
+    conn.execute(
+        f"""
+        INSERT OR IGNORE INTO {_TABELA} (banco, data, saldo_acumulado)
+        VALUES (?, ?, COALESCE((
+            SELECT saldo_acumulado FROM {_TABELA}
+             WHERE banco = ? AND data < ?
+             ORDER BY data DESC LIMIT 1
+        ), 0.0))
+        """,
+        (banco, d, banco, d),
+    )
+    conn.execute(
+        f"UPDATE {_TABELA} SET saldo_acumulado = saldo_acumulado + ? WHERE banco = ? AND data >= ?",
+        (delta, banco, d),
+    )
+
+
+# -----------------------------------------------------------------------------
+# Leitura
+# -----------------------------------------------------------------------------
+def saldo_banco_em(
+    conn: sqlite3.Connection, banco: str, data: Any, default: Optional[float] = 0.0
+) -> Optional[float]:
+    """Saldo acumulado de `banco` até `data` (inclusive). `default` se não houver registros."""
+    garantir_tabela_acumulado(conn)
+    row = conn.execute(
+        f"""
+        SELECT saldo_acumulado FROM {_TABELA}
+         WHERE banco = ? AND data <= ?
+         ORDER BY data DESC LIMIT 1
+        """,
+        ((banco or "").strip(), _data_iso(data)),
+    ).fetchone()
+    return float(row[0]) if row and row[0] is not None else default
+
+
+def saldos_bancos_em(conn: sqlite3.Connection, data: Any) -> Dict[str, float]:
+    """
+    Saldos acumulados (≤ data) de todos os bancos.
+
+    Percorre os bancos distintos pelo índice (skip-scan recursivo) e faz uma busca
+    pontual por banco — custo proporcional ao nº de bancos, não ao histórico.
+    Bancos de `bancos_cadastrados` ainda sem movimento entram com saldo 0.
+    """
+    garantir_tabela_acumulado(conn)
+    cadastrados = (
+        "UNION SELECT TRIM(nome) FROM bancos_cadastrados WHERE COALESCE(TRIM(nome), '') <> ''"
+        if tabela_existe(conn, "bancos_cadastrados")
+        else ""
+    )
+    rows = conn.execute(
+        f"""
+        WITH RECURSIVE bk(banco) AS (
+            SELECT MIN(banco) FROM {_TABELA}
+            UNION ALL
+            SELECT (SELECT MIN(banco) FROM {_TABELA} WHERE banco > bk.banco)
+              FROM bk WHERE bk.banco IS NOT NULL
+        ),
+        bancos(banco) AS (
+            SELECT banco FROM bk WHERE banco IS NOT NULL
+            {cadastrados}
+        )
+        SELECT b.banco,
+               COALESCE((SELECT a.saldo_acumulado FROM {_TABELA} a
+                          WHERE a.banco = b.banco AND a.data <= ?
+                          ORDER BY a.data DESC LIMIT 1), 0.0)
+          FROM bancos b
+         ORDER BY b.banco
+        """,
+        (_data_iso(data),),
+    ).fetchall()
+    return {str(r[0]): float(r[1] or 0.0) for r in rows}
+
+
+def saldos_bancos_fim_de_mes(
+    conn: sqlite3.Connection, inicio: Any = None, fim: Any = None
+) -> List[tuple]:
+    """
+    Saldo de cada banco no último dia com movimento de cada mês.
+
+    Returns:
+        list[tuple]: `(mes 'YYYY-MM', banco, saldo_acumulado)` ordenado por mês/banco.
+        Meses sem movimento do banco não aparecem (o saldo é o do mês anterior).
+    """
+    garantir_tabela_acumulado(conn)
+    filtros, params = [], []
+    if inicio is not None:
+        filtros.append("data >= ?")
+        params.append(_data_iso(inicio))
+    if fim is not None:
+        filtros.append("data <= ?")
+        params.append(_data_iso(fim))
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+    rows = conn.execute(
+        f"""
+        SELECT mes, banco, saldo_acumulado FROM (
+            SELECT substr(data, 1, 7) AS mes, banco, saldo_acumulado,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY banco, substr(data, 1, 7) ORDER BY data DESC
+                   ) AS rn
+              FROM {_TABELA} {where}
+        )
+         WHERE rn = 1
+         ORDER BY mes, banco
+        """,
+        params,
+    ).fetchall()
+    return [(str(r[0]), str(r[1]), float(r[2] or 0.0)) for r in rows]
+
+
+# -----------------------------------------------------------------------------
+# Reconstrução / verificação
+# -----------------------------------------------------------------------------
+def reconstruir_saldos_acumulados(conn: sqlite3.Connection) -> int:
+    """
+    Recria o conteúdo de `saldos_bancos_acumulado` a partir de `saldos_bancos`.
+
+    Returns:
+        int: Quantidade de linhas gravadas. Não faz commit.
+    """
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {_TABELA} (
+            banco           TEXT NOT NULL,
+            data            TEXT NOT NULL,
+            saldo_acumulado REAL NOT NULL DEFAULT 0.0,
+            PRIMARY KEY (banco, data)
+        ) WITHOUT ROWID
+        """
+    )
+    acumulados = _calcular_acumulados(conn)
+    conn.execute(f"DELETE FROM {_TABELA}")
+    conn.executemany(
+        f"INSERT INTO {_TABELA} (banco, data, saldo_acumulado) VALUES (?, ?, ?)",
+        [(b, d, v) for (b, d), v in acumulados.items()],
+    )
+    _garantidos.add(_db_key(conn))
+    logger.info("saldos_bancos_acumulado reconstruída: %d linhas", len(acumulados))
+    return len(acumulados)
+
+
+def verificar_saldos_acumulados(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+    """
+    Compara `saldos_bancos_acumulado` com o recálculo a partir de `saldos_bancos`.
+
+    Returns:
+        list[dict]: Divergências `{banco, data, esperado, gravado}` (vazia se ok).
+    """
+    garantir_tabela_acumulado(conn)
+    esperado = _calcular_acumulados(conn)
+    gravado = {
+        (str(r[0]), str(r[1])): float(r[2] or 0.0)
+        for r in conn.execute(f"SELECT banco, data, saldo_acumulado FROM {_TABELA}").fetchall()
+    }
+
+    # compara o saldo vigente de cada banco em todas as datas conhecidas
+    divergencias: List[Dict[str, Any]] = []
+    for banco in sorted({b for b, _ in esperado} | {b for b, _ in gravado}):
+        datas = sorted({d for b, d in esperado if b == banco} | {d for b, d in gravado if b == banco})
+        e_vig = g_vig = 0.0
+        for d in datas:
+            e_vig = esperado.get((banco, d), e_vig)
+            g_vig = gravado.get((banco, d), g_vig)
+            if abs(e_vig - g_vig) > _EPS:
+                divergencias.append(
+                    {"banco": banco, "data": d, "esperado": e_vig, "gravado": g_vig}
+                )
+    return divergencias
+
+
+class SaldosBancosRepository:
+    """Fachada por caminho de banco para os saldos bancários (engine + índice acumulado)."""
+
+    def __init__(self, db_path: Any):
+        self.db_path = db_path
+
+    def engine(self) -> str:
+        """Engine de armazenamento ativa (`"wide"` ou `"long"`)."""
+        with get_conn(self.db_path) as conn:
+            return engine_saldos_bancos(conn)
+
+    def ajustar(self, data: Any, banco: str, delta: float) -> None:
+        """Soma `delta` no saldo de `banco` em `data` (com commit)."""
+        with get_conn(self.db_path) as conn:
+            ajustar_saldo_banco(conn, data, banco, delta)
+
+    def migrar_para_long(self) -> int:
+        """Migra `saldos_bancos` para a engine long (com commit)."""
+        with get_conn(self.db_path) as conn:
+            return migrar_saldos_bancos_para_long(conn)
+
+    def saldo_em(self, banco: str, data: Any) -> float:
+        """Saldo acumulado de `banco` até `data` (inclusive)."""
+        with get_conn(self.db_path) as conn:
+            return saldo_banco_em(conn, banco, data)
+
+    def saldos_em(self, data: Any) -> Dict[str, float]:
+        """Saldos acumulados (≤ data) de todos os bancos."""
+        with get_conn(self.db_path) as conn:
+            return saldos_bancos_em(conn, data)
+
+    def reconstruir(self) -> int:
+        """Reconstrói o índice acumulado a partir de `saldos_bancos` (com commit)."""
+        with get_conn(self.db_path) as conn:
+            return reconstruir_saldos_acumulados(conn)
+
+    def verificar(self) -> List[Dict[str, Any]]:
+        """Lista divergências entre o índice acumulado e `saldos_bancos`."""
+        with get_conn(self.db_path) as conn:
+            return verificar_saldos_acumulados(conn)
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Índice de saldos bancários acumulados.")
+    parser.add_argument("comando", choices=["rebuild", "verify", "migrate-long"])
+    parser.add_argument("caminho_banco")
+    args = parser.parse_args(argv)
+
+    repo = SaldosBancosRepository(args.caminho_banco)
+    if args.comando == "migrate-long":
+        print(f"{repo.migrar_para_long()} linhas migradas para {_LONG}.")
+        return 0
+    if args.comando == "rebuild":
+        print(f"{repo.reconstruir()} linhas gravadas em {_TABELA}.")
+        return 0
+
+    divergencias = repo.verificar()
+    for d in divergencias:
+        print(f"{d['banco']} {d['data']}: esperado={d['esperado']} gravado={d['gravado']}")
+    print("OK" if not divergencias else f"{len(divergencias)} divergência(s).")
+    return 0 if not divergencias else 1
+
+
+# API pública explícita
+__all__ = [
+    "SaldosBancosRepository",
+    "ENGINE_WIDE",
+    "ENGINE_LONG",
+    "validar_nome_banco",
+    "citar_identificador",
+    "engine_saldos_bancos",
+    "garantir_banco",
+    "garantir_linha_saldos_bancos",
+    "ajustar_saldo_banco",
+    "migrar_saldos_bancos_para_long",
+    "garantir_tabela_acumulado",
+    "registrar_delta_acumulado",
+    "saldo_banco_em",
+    "saldos_bancos_em",
+    "saldos_bancos_fim_de_mes",
+    "reconstruir_saldos_acumulados",
+    "verificar_saldos_acumulados",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
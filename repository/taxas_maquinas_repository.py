@@ -13,6 +13,9 @@ Funcionalidades principais
 - Listagem de parcelas por (forma, maquineta, bandeira).
 - Consulta de taxa (%) e banco de destino da liquidação.
 - Heurística de fallback para descobrir `banco_destino`.
+- Tabela de taxas compilada em memória (`tabela_taxas`): resolução em
+  microssegundos, carregada uma vez por banco/versão e invalidada pelo
+  `TaxaMaquinetaManager` a cada escrita (`invalidar_tabela_taxas`).
 
 Detalhes técnicos
 -----------------
@@ -28,10 +31,119 @@ Dependências
 - shared.db.get_conn
 """
 
-from typing import Iterable, List, Optional, Tuple
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import pandas as pd
 
 from shared.db import get_conn
+from shared.schema import colunas, db_key, schema_version
+
+
+# ---------- tabela compilada (cache em memória) ----------
+
+class TabelaTaxas:
+    """
+    Snapshot de `taxas_maquinas` indexado por (FORMA, bandeira, parcelas, maquineta).
+
+    `forma` é comparada em maiúsculas (como `UPPER(forma_pagamento)` nas
+    consultas); os demais campos, exatamente como gravados. `None` numa chave
+    armazenada funciona como curinga em `resolver`.
+    """
+
+    __slots__ = ("_por_chave",)
+
+    def __init__(self, linhas: Iterable[Tuple[Any, Any, Any, Any, Any, Any]]):
+        self._por_chave: Dict[tuple, Tuple[float, Optional[str]]] = {}
+        for forma, bandeira, parcelas, maquineta, taxa, banco in linhas:
+            chave = (
+                str(forma or "").upper(),
+                bandeira,
+                int(parcelas) if parcelas is not None else None,
+                maquineta,
+            )
+            self._por_chave.setdefault(chave, (float(taxa or 0.0), banco or None))
+
+    def __len__(self) -> int:
+        return len(self._por_chave)
+
+    def exato(
+        self,
+        forma: str,
+        maquineta: Optional[str],
+        bandeira: Optional[str],
+        parcelas: Optional[int],
+    ) -> Optional[Tuple[float, Optional[str]]]:
+        """(taxa, banco_destino) do registro exato, ou None."""
+        return self._por_chave.get(((forma or "").upper(), bandeira, int(parcelas or 1), maquineta))
+
+    def resolver(
+        self,
+        forma: str,
+        bandeira: Optional[str],
+        parcelas: Optional[int],
+        maquineta: Optional[str],
+    ) -> float:
+        """
+        Taxa (%) com curingas: prefere bandeira, depois parcelas, depois maquineta
+        específicas (mesma ordem do antigo `ORDER BY CASE ... IS NULL`). 0.0 se nada casar.
+        """
+        forma_u = (forma or "").upper()
+        for b in (bandeira, None):
+            for p in (int(parcelas or 1), None):
+                for m in (maquineta, None):
+                    hit = self._por_chave.get((forma_u, b, p, m))
+                    if hit is not None:
+                        return hit[0]
+        return 0.0
+
+
+_tabelas: Dict[str, Tuple[int, TabelaTaxas]] = {}
+_tabelas_lock = threading.Lock()
+
+
+def tabela_taxas(conn: sqlite3.Connection) -> TabelaTaxas:
+    """
+    Retorna a `TabelaTaxas` do banco da conexão (carregada uma vez).
+
+    Recarrega quando o schema muda ou após `invalidar_tabela_taxas`.
+    """
+    key = db_key(conn)
+    sv = schema_version(conn)
+    cached = _tabelas.get(key)
+    if cached is not None and cached[0] == sv:
+        return cached[1]
+
+    cols = colunas(conn, "taxas_maquinas")
+    col_forma = "forma_pagamento" if "forma_pagamento" in cols else "forma"
+    if col_forma not in cols:
+        tabela = TabelaTaxas(())
+    else:
+        col_banco = "banco_destino" if "banco_destino" in cols else "NULL"
+        tabela = TabelaTaxas(
+            conn.execute(
+                f"""
+                SELECT {col_forma}, bandeira, parcelas, maquineta,
+                       COALESCE(taxa_percentual, 0), {col_banco}
+                  FROM taxas_maquinas
+                """
+            ).fetchall()
+        )
+    with _tabelas_lock:
+        _tabelas[key] = (sv, tabela)
+    return tabela
+
+
+def invalidar_tabela_taxas(db_path_like: Any = None) -> None:
+    """Descarta a tabela em cache (de um banco ou de todos)."""
+    with _tabelas_lock:
+        if db_path_like is None:
+            _tabelas.clear()
+            return
+    with get_conn(db_path_like) as conn:
+        key = db_key(conn)
+    with _tabelas_lock:
+        _tabelas.pop(key, None)
 
 
 class TaxasMaquinasRepository:
@@ -114,27 +226,13 @@ class TaxasMaquinasRepository:
         """
         Retorna (taxa_percentual, banco_destino) para um registro exato.
 
-        Caso não exista, retorna (0.0, None).
+        Caso não exista, retorna (0.0, None). Consulta a tabela em memória.
         """
         if not forma or not maquineta:
             return 0.0, None
-        forma_u = forma.upper()
         with get_conn(self.caminho_banco) as conn:
-            row = conn.execute(
-                """
-                SELECT taxa_percentual, banco_destino
-                  FROM taxas_maquinas
-                 WHERE UPPER(forma_pagamento)=?
-                   AND maquineta=?
-                   AND bandeira=?
-                   AND parcelas=?
-                 LIMIT 1
-                """,
-                (forma_u, maquineta, bandeira or "", int(parcelas or 1)),
-            ).fetchone()
-        if not row:
-            return 0.0, None
-        return float(row[0] or 0.0), (row[1] or None)
+            hit = tabela_taxas(conn).exato(forma, maquineta, bandeira or "", parcelas)
+        return hit if hit is not None else (0.0, None)
 
     def descobrir_banco_destino(
         self,
@@ -207,4 +305,4 @@ class TaxasMaquinasRepository:
 
 
 # API pública explícita
-__all__ = ["TaxasMaquinasRepository"]
+__all__ = ["TaxasMaquinasRepository", "TabelaTaxas", "tabela_taxas", "invalidar_tabela_taxas"]
@@ -6,6 +6,7 @@ Camada de serviços de domínio do FlowDash.
 
 Subpacotes e módulos
 --------------------
+- exportacao ... snapshots Parquet particionados (ano/mês) para relatórios.
 - ledger ....... regras de negócio para lançamentos financeiros (dividido em mixins).
 - taxas ........ consultas e regras relacionadas às taxas de maquinetas.
 - vendas ....... serviços utilitários para vendas.
@@ -13,10 +14,19 @@ Subpacotes e módulos
 Observação:
     - Módulos de backup (`ledger_backup.py`) existem apenas para referência
       e não fazem parte da API pública principal.
+    - Os submódulos são importados sob demanda (PEP 562).
 """
 
 from __future__ import annotations
 
-from . import ledger, taxas, vendas
+import importlib
+from typing import Any
 
-__all__ = ["ledger", "taxas", "vendas"]
+__all__ = ["exportacao", "ledger", "taxas", "vendas"]
+
+
+def __getattr__(nome: str) -> Any:
+    """Importa o submódulo sob demanda (ex.: `services.vendas`)."""
+    if nome in __all__:
+        return importlib.import_module(f"{__name__}.{nome}")
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
@@ -0,0 +1,795 @@
+"""
+Módulo Exportação Colunar (Serviço)
+===================================
+
+Exporta as tabelas de lançamentos e saldos para arquivos **Parquet**
+particionados por ano/mês, de forma incremental, e lê esses *snapshots* para
+relatórios pesados sem concorrer com as escritas do banco transacional.
+
+Tabelas exportadas (coluna de partição)
+---------------------------------------
+- `entrada` (Data), `saida` (Data), `movimentacoes_bancarias` (data)
+- `contas_a_pagar_mov` (data_evento)
+- `saldos_caixas`, `saldos_bancos`, `saldos_bancos_acumulado` (data)
+
+Layout
+------
+    <destino>/<tabela>/ano=YYYY/mes=MM/<arquivo>.parquet
+    <destino>/_estado.json
+
+Partições no formato *hive* (`ano=`/`mes=`): legíveis também por
+`pyarrow.dataset`, DuckDB, Polars, Spark. Datas não reconhecidas vão para
+`ano=0000/mes=00`.
+
+Funcionalidades principais
+--------------------------
+- `exportar(db, destino=None, tabelas=None)`: exportação incremental.
+- `ler_snapshot(destino, tabela, colunas, inicio, fim)`: leitura com poda de
+  partições (só os meses do período são abertos); retorna DataFrame ou
+  `pyarrow.Table`.
+- `destino_padrao(db)`: `<pasta do banco>/snapshots/<nome do banco>`.
+- `exportar_csv_tabela(db, tabela, arquivo, inicio, fim)`: CSV de um período
+  lido direto do banco em chunks (`flowdash_pages.dataframes.exportar_csv`;
+  não usa pyarrow nem os snapshots).
+
+Detalhes técnicos
+-----------------
+- **Inserções** por *high-water mark* da chave (`id`; `rowid` nas tabelas sem
+  `id`, como `entrada`): cada exportação acrescenta um arquivo
+  `part-<de>-<ate>.parquet` por mês com as linhas novas.
+- **UPDATE/DELETE**: as datas modificadas vêm do registro compartilhado
+  `shared.alteracoes` (tipo `M`, datas antiga e nova); as partições desses
+  meses são regravadas inteiras (`base-<chave>.parquet`, troca atômica do
+  diretório). Não há triggers próprios — os antigos `trg_export_*` e
+  `exportacao_pendentes` são removidos.
+- O cursor (geração do registro) fica no `_estado.json` de cada tabela: cada
+  destino acompanha o registro por conta própria e exportar não escreve no
+  banco.
+- Sem AUTOINCREMENT (ex.: `rowid` de `entrada`) o SQLite reutiliza a maior
+  chave depois que ela é apagada: havendo DELETE/UPDATE desde a última
+  exportação, a marca recua até a maior chave atual e as partições das
+  inserções também são regravadas, então a linha que reaproveitar a chave é
+  exportada.
+- Tabelas sem chave sequencial (`WITHOUT ROWID`, ex. `saldos_bancos_acumulado`)
+  regravam também as partições das inserções. Views são regravadas inteiras.
+- Mudança de colunas (ex.: banco novo em `saldos_bancos`), chave menor que a
+  marca sem DELETE registrado (ex.: VACUUM renumerou `rowid`) ou marca `TUDO`
+  no registro (trigger recriado) → exportação completa da tabela.
+- Leitura numa única transação de leitura (WAL: não bloqueia escritores); a
+  geração é lida no mesmo instante das linhas, então alterações feitas durante
+  a exportação ficam para a próxima. Uma exportação interrompida é refeita sem
+  duplicar linhas (cada arquivo registra até que chave cobre).
+- Tipos Arrow a partir do tipo declarado da coluna (INTEGER → int64, REAL →
+  float64, demais → string); valores fora do tipo viram nulo.
+
+Linha de comando
+----------------
+    python -m services.exportacao export <caminho_banco> [--destino DIR] [--tabelas t1 t2]
+    python -m services.exportacao status <caminho_banco> [--destino DIR]
+    python -m services.exportacao csv <caminho_banco> --tabelas t1 [--inicio D] [--fim D] [--destino DIR]
+
+Dependências
+------------
+- sqlite3
+- pyarrow (em requirements.txt; importado só ao exportar/ler)
+- pandas (opcional: só para `ler_snapshot(..., como="pandas")`)
+- shared.db.get_conn
+- shared.alteracoes (registro de datas alteradas)
+- shared.schema (colunas_ordenadas, db_key, schema_version)
+- flowdash_pages.dataframes.exportar_csv (só em `exportar_csv_tabela`)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from shared.alteracoes import (
+    INSERCAO,
+    TUDO,
+    alteracoes_desde,
+    garantir_alteracoes,
+    geracao_atual,
+    remover_triggers_legados,
+)
+from shared.db import get_conn
+from shared.schema import colunas_ordenadas, db_key, schema_version
+
+logger = logging.getLogger(__name__)
+
+FORMATO = 2  # 2: cursor do registro de alterações no estado
+TABELAS: Dict[str, str] = {
+    "entrada": "Data",
+    "saida": "Data",
+    "movimentacoes_bancarias": "data",
+    "contas_a_pagar_mov": "data_evento",
+    "saldos_caixas": "data",
+    "saldos_bancos": "data",
+    "saldos_bancos_acumulado": "data",
+}
+
+_PENDENTES_LEGADO = "exportacao_pendentes"
+_PREFIXO_LEGADO = "trg_export_"
+_ESTADO = "_estado.json"
+_SEM_DATA = "0000-00"
+_LOTE = 50_000  # linhas por leitura do cursor
+
+_RE_PARTE = re.compile(r"^(?:part-\d+-|base-)(\d+)\.parquet$")
+
+# {db_key: schema_version em que o registro foi conferido}
+_garantidos: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+# Dependência opcional
+# -----------------------------------------------------------------------------
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:  # pragma: no cover - depende do ambiente
+        raise RuntimeError(
+            "Exportação colunar requer o pacote 'pyarrow' (pip install pyarrow)."
+        ) from e
+    return pa, pq
+
+
+def pyarrow_disponivel() -> bool:
+    """True se `pyarrow` puder ser importado."""
+    try:
+        _pyarrow()
+        return True
+    except RuntimeError:
+        return False
+
+
+def destino_padrao(db_path_like: Any) -> Path:
+    """Pasta padrão dos snapshots: `<pasta do banco>/snapshots/<nome do banco>`."""
+    p = Path(str(db_path_like)).resolve()
+    return p.parent / "snapshots" / p.stem
+
+
+# -----------------------------------------------------------------------------
+# Schema
+# -----------------------------------------------------------------------------
+def _particao_sql(expr: str) -> str:
+    return f"COALESCE(strftime('%Y-%m', {expr}), '{_SEM_DATA}')"
+
+
+def _particao_data(data: str) -> str:
+    """Partição de uma data do registro de alterações ('' → sem data)."""
+    return data[:7] if len(data) >= 7 else _SEM_DATA
+
+
+def _info_tabela(conn: sqlite3.Connection, tabela: str) -> Tuple[str, Optional[str], bool]:
+    """
+    (tipo 'table'/'view'/'', chave sequencial 'id'/'rowid'/None, chave reutilizável).
+
+    Sem AUTOINCREMENT o SQLite reutiliza a maior chave depois que ela é apagada.
+    """
+    row = conn.execute(
+        "SELECT type, sql FROM sqlite_master WHERE name = ? AND type IN ('table','view')",
+        (tabela,),
+    ).fetchone()
+    if not row:
+        return "", None, False
+    tipo, sql = str(row[0]), str(row[1] or "")
+    if tipo != "table":
+        return tipo, None, False
+    reutiliza = not re.search(r"\bAUTOINCREMENT\b", sql, re.IGNORECASE)
+    pk = [
+        (str(r[1]), str(r[2] or "").upper())
+        for r in conn.execute(f'PRAGMA table_info("{tabela}")')
+        if int(r[5] or 0) > 0
+    ]
+    if len(pk) == 1 and pk[0][1] == "INTEGER":
+        return tipo, pk[0][0], reutiliza
+    if re.search(r"\bWITHOUT\s+ROWID\b", sql, re.IGNORECASE):
+        return tipo, None, False
+    return tipo, "rowid", True
+
+
+def garantir_exportacao(conn: sqlite3.Connection) -> None:
+    """
+    Garante o registro de datas alteradas e remove os triggers antigos da
+    exportação. Uma vez por schema. Não faz commit.
+    """
+    key = db_key(conn)
+    sv = schema_version(conn)
+    with _lock:
+        if _garantidos.get(key) == sv:
+            return
+
+    garantir_alteracoes(conn)
+    if remover_triggers_legados(conn, _PREFIXO_LEGADO):
+        conn.execute(f"DROP TABLE IF EXISTS {_PENDENTES_LEGADO}")
+
+    with _lock:
+        _garantidos[key] = schema_version(conn)
+
+
+# -----------------------------------------------------------------------------
+# Estado
+# -----------------------------------------------------------------------------
+def _ler_estado(destino: Path) -> Dict[str, Any]:
+    try:
+        estado = json.loads((destino / _ESTADO).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"formato": FORMATO, "tabelas": {}}
+    if estado.get("formato") != FORMATO:
+        return {"formato": FORMATO, "tabelas": {}}
+    return estado
+
+
+def _gravar_estado(destino: Path, estado: Dict[str, Any]) -> None:
+    tmp = destino / f"{_ESTADO}.tmp"
+    tmp.write_text(json.dumps(estado, indent=2, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, destino / _ESTADO)
+
+
+# -----------------------------------------------------------------------------
+# Escrita
+# -----------------------------------------------------------------------------
+def _dir_particao(base: Path, particao: str) -> Path:
+    ano, mes = particao.split("-")
+    return base / f"ano={ano}" / f"mes={mes}"
+
+
+def _schema_arrow(conn: sqlite3.Connection, tabela: str, cols: Sequence[str]):
+    pa, _ = _pyarrow()
+    declarados = {
+        str(r[1]): str(r[2] or "").upper() for r in conn.execute(f'PRAGMA table_xinfo("{tabela}")')
+    }
+    campos = []
+    for c in cols:
+        t = declarados.get(c, "")
+        if "INT" in t:
+            campos.append(pa.field(c, pa.int64()))
+        elif any(x in t for x in ("REAL", "FLOA", "DOUB", "NUMERIC", "DECIMAL")):
+            campos.append(pa.field(c, pa.float64()))
+        else:
+            campos.append(pa.field(c, pa.string()))
+    return pa.schema(campos)
+
+
+def _conversor(tipo) -> Any:
+    pa, _ = _pyarrow()
+
+    def _num(fn):
+        def conv(v):
+            if v is None or v == "":
+                return None
+            try:
+                return fn(v)
+            except (TypeError, ValueError):
+                return None
+        return conv
+
+    if pa.types.is_integer(tipo):
+        return _num(lambda v: int(float(v)) if isinstance(v, str) else int(v))
+    if pa.types.is_floating(tipo):
+        return _num(float)
+    return lambda v: None if v is None else str(v)
+
+
+class _EscritorParticoes:
+    """Grava linhas já ordenadas por partição, um arquivo por partição."""
+
+    def __init__(
+        self, base: Path, schema, nome_arquivo: str, diretorio_novo: bool, descartar_ultima: bool = False
+    ) -> None:
+        self.base = base
+        self.descartar_ultima = descartar_ultima  # chave auxiliar no fim da linha
+        self.schema = schema
+        self.nome_arquivo = nome_arquivo
+        self.diretorio_novo = diretorio_novo  # regrava a partição inteira
+        self.convs = [_conversor(f.type) for f in schema]
+        self.particoes: List[str] = []
+        self.linhas = 0
+        self._atual: Optional[str] = None
+        self._writer = None
+        self._dir_tmp: Optional[Path] = None
+
+    def _abrir(self, particao: str) -> None:
+        _, pq = _pyarrow()
+        destino = _dir_particao(self.base, particao)
+        if self.diretorio_novo:
+            self._dir_tmp = destino.with_name(f"{destino.name}.tmp-{os.getpid()}")
+            shutil.rmtree(self._dir_tmp, ignore_errors=True)
+            self._dir_tmp.mkdir(parents=True)
+            alvo = self._dir_tmp
+        else:
+            destino.mkdir(parents=True, exist_ok=True)
+            alvo = destino
+        self._writer = pq.ParquetWriter(str(alvo / self.nome_arquivo), self.schema)
+        self._atual = particao
+        self.particoes.append(particao)
+
+    def _fechar(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        if self.diretorio_novo and self._dir_tmp is not None:
+            destino = _dir_particao(self.base, self._atual or _SEM_DATA)
+            antigo = destino.with_name(f"{destino.name}.old-{os.getpid()}")
+            if destino.exists():
+                os.replace(destino, antigo)
+            os.replace(self._dir_tmp, destino)
+            shutil.rmtree(antigo, ignore_errors=True)
+            self._dir_tmp = None
+
+    def escrever(self, particao: str, linhas: List[Tuple[Any, ...]]) -> None:
+        pa, _ = _pyarrow()
+        if not linhas:
+            return
+        if self.descartar_ultima:
+            linhas = [r[:-1] for r in linhas]
+        if particao != self._atual:
+            self._fechar()
+            self._abrir(particao)
+        colunas = [
+            pa.array([conv(r[i]) for r in linhas], type=campo.type)
+            for i, (campo, conv) in enumerate(zip(self.schema, self.convs))
+        ]
+        self._writer.write_table(pa.Table.from_arrays(colunas, schema=self.schema))
+        self.linhas += len(linhas)
+
+    def fechar(self) -> None:
+        self._fechar()
+
+
+def _escrever_consulta(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: Sequence[Any],
+    escritor: _EscritorParticoes,
+    filtro: Optional[Any] = None,
+) -> None:
+    """Consome `sql` (1ª coluna = partição, ordenado por ela) em lotes."""
+    cur = conn.execute(sql, tuple(params))
+    try:
+        atual: Optional[str] = None
+        buffer: List[Tuple[Any, ...]] = []
+        while True:
+            lote = cur.fetchmany(_LOTE)
+            if not lote:
+                break
+            for r in lote:
+                if filtro is not None and not filtro(r):
+                    continue
+                if r[0] != atual and buffer:
+                    escritor.escrever(atual, buffer)
+                    buffer = []
+                atual = r[0]
+                buffer.append(tuple(r[1:]))
+                if len(buffer) >= _LOTE:
+                    escritor.escrever(atual, buffer)
+                    buffer = []
+        if buffer:
+            escritor.escrever(atual, buffer)
+    finally:
+        escritor.fechar()
+
+
+def _cobertura(dir_particao: Path) -> int:
+    """Maior chave já gravada na partição (pelos nomes dos arquivos)."""
+    maior = 0
+    if dir_particao.is_dir():
+        for f in dir_particao.iterdir():
+            m = _RE_PARTE.match(f.name)
+            if m:
+                maior = max(maior, int(m.group(1)))
+    return maior
+
+
+def _tem_indice_date(conn: sqlite3.Connection, tabela: str, col: str) -> bool:
+    alvo = re.compile(rf'date\(\s*"?{re.escape(col.lower())}"?\s*\)')
+    return any(
+        alvo.search(str(sql).lower())
+        for (sql,) in conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type='index' AND tbl_name = ? AND sql IS NOT NULL",
+            (tabela,),
+        )
+    )
+
+
+def _filtro_particao(conn: sqlite3.Connection, tabela: str, col: str, particao: str) -> Tuple[str, List[str]]:
+    """WHERE de uma partição: faixa indexável + conferência exata do mês."""
+    exato = _particao_sql(f'"{col}"') + " = ?"
+    if particao == _SEM_DATA:
+        return exato, [particao]
+    ini = date.fromisoformat(f"{particao}-01")
+    prox = (ini.replace(day=28) + timedelta(days=4)).replace(day=1)
+    if _tem_indice_date(conn, tabela, col):
+        faixa = f'DATE("{col}") BETWEEN ? AND ?'
+        params = [ini.isoformat(), (prox - timedelta(days=1)).isoformat()]
+    else:
+        faixa = f'"{col}" >= ? AND "{col}" < ?'
+        params = [ini.isoformat(), prox.isoformat()]
+    return f"{faixa} AND {exato}", params + [particao]
+
+
+# -----------------------------------------------------------------------------
+# Exportação
+# -----------------------------------------------------------------------------
+def _exportar_tabela(
+    conn: sqlite3.Connection, base: Path, tabela: str, est: Optional[Dict[str, Any]], geracao: int
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Exporta uma tabela (dentro da transação de leitura do chamador).
+
+    `geracao`: geração do registro de alterações lida na mesma transação; vira
+    o cursor da tabela no estado.
+
+    Returns:
+        (novo estado da tabela, resumo).
+    """
+    col = TABELAS[tabela]
+    tipo, chave, reutiliza = _info_tabela(conn, tabela)
+    cols = list(colunas_ordenadas(conn, tabela))
+    if not tipo or col not in cols:
+        return None, {"tabela": tabela, "status": "ausente"}
+
+    cursor = (est or {}).get("geracao")
+    tudo, modificou = False, False
+    particoes, inseridas = set(), set()
+    if tipo == "table" and cursor is not None:
+        for data, tipo_alt in alteracoes_desde(conn, tabela, int(cursor)):
+            if data == TUDO:
+                tudo = True
+            elif tipo_alt == INSERCAO:
+                inseridas.add(_particao_data(data))
+            else:
+                modificou = True
+                particoes.add(_particao_data(data))
+
+    # Marca anterior; com DELETE/UPDATE desde a última exportação, a maior chave
+    # pode ter sido apagada (e reutilizada): recua até a maior chave atual
+    hwm = int((est or {}).get("hwm") or 0) if chave else 0
+    hwm_novo = None
+    rebaixou = False
+    if chave:
+        hwm_novo = int(conn.execute(f'SELECT COALESCE(MAX({chave}), 0) FROM "{tabela}"').fetchone()[0])
+        if not reutiliza:
+            hwm_novo = max(hwm_novo, hwm)  # AUTOINCREMENT: a marca nunca recua
+        elif modificou:
+            rebaixou = hwm_novo < hwm
+            hwm = min(hwm, hwm_novo)
+    if chave is None or (reutiliza and modificou):
+        # Sem chave sequencial (ou chave possivelmente reutilizada): as
+        # inserções também só aparecem regravando a partição
+        particoes |= inseridas
+
+    completa = (
+        est is None
+        or cursor is None
+        or tipo != "table"
+        or est.get("colunas") != cols
+        or est.get("chave") != chave
+        or tudo
+        or (chave is not None and hwm_novo < hwm)  # ex.: VACUUM renumerou o rowid
+    )
+
+    schema = _schema_arrow(conn, tabela, cols)
+    cols_sql = ", ".join(f'"{c}"' for c in cols)
+    part_sql = _particao_sql(f'"{col}"')
+    sel_chave = f", {chave}" if chave else ""
+    ordem = f"ORDER BY 1, {chave}" if chave else "ORDER BY 1"
+    resumo: Dict[str, Any] = {"tabela": tabela, "linhas": 0, "particoes": []}
+
+    if completa:
+        tmp = base.with_name(f"{base.name}.tmp-{os.getpid()}")
+        shutil.rmtree(tmp, ignore_errors=True)
+        sufixo = f"{hwm_novo:012d}" if chave else time.strftime("%Y%m%d%H%M%S")
+        escritor = _EscritorParticoes(tmp, schema, f"base-{sufixo}.parquet", diretorio_novo=False)
+        limite = f"WHERE {chave} <= ?" if chave else ""
+        _escrever_consulta(
+            conn,
+            f'SELECT {part_sql}, {cols_sql} FROM "{tabela}" {limite} {ordem}',
+            [hwm_novo] if chave else [],
+            escritor,
+        )
+        antigo = base.with_name(f"{base.name}.old-{os.getpid()}")
+        if base.exists():
+            os.replace(base, antigo)
+        if tmp.exists():
+            os.replace(tmp, base)
+        else:
+            base.mkdir(parents=True, exist_ok=True)
+        shutil.rmtree(antigo, ignore_errors=True)
+        resumo.update(status="completa", linhas=escritor.linhas, particoes=escritor.particoes)
+    else:
+        # 1) partições alteradas (UPDATE/DELETE): regravadas inteiras
+        for particao in sorted(particoes):
+            onde, params = _filtro_particao(conn, tabela, col, particao)
+            if chave:
+                onde += f" AND {chave} <= ?"
+                params.append(hwm_novo)
+            sufixo = f"{hwm_novo:012d}" if chave else time.strftime("%Y%m%d%H%M%S")
+            escritor = _EscritorParticoes(base, schema, f"base-{sufixo}.parquet", diretorio_novo=True)
+            _escrever_consulta(
+                conn, f'SELECT {part_sql}, {cols_sql} FROM "{tabela}" WHERE {onde} {ordem}', params, escritor
+            )
+            if not escritor.particoes:  # partição ficou vazia
+                shutil.rmtree(_dir_particao(base, particao), ignore_errors=True)
+            resumo["linhas"] += escritor.linhas
+            resumo["particoes"].append(particao)
+
+        # 2) linhas novas (chave > marca) nas demais partições
+        if chave and hwm_novo > hwm:
+            coberturas: Dict[str, int] = {}
+
+            def _nova(r: Tuple[Any, ...]) -> bool:
+                p = r[0]
+                if p in particoes:
+                    return False
+                if p not in coberturas:
+                    # arquivos de uma exportação interrompida já cobrem parte das linhas
+                    coberturas[p] = hwm if rebaixou else max(hwm, _cobertura(_dir_particao(base, p)))
+                return int(r[-1]) > coberturas[p]
+
+            # a chave vai no fim da linha só para o filtro de cobertura
+            escritor = _EscritorParticoes(
+                base,
+                schema,
+                f"part-{hwm + 1:012d}-{hwm_novo:012d}.parquet",
+                diretorio_novo=False,
+                descartar_ultima=True,
+            )
+            _escrever_consulta(
+                conn,
+                f'SELECT {part_sql}, {cols_sql}{sel_chave} FROM "{tabela}" '
+                f"WHERE {chave} > ? AND {chave} <= ? {ordem}",
+                [hwm, hwm_novo],
+                escritor,
+                filtro=_nova,
+            )
+            resumo["linhas"] += escritor.linhas
+            resumo["particoes"] += [p for p in escritor.particoes if p not in resumo["particoes"]]
+        resumo["status"] = "incremental"
+
+    novo = {
+        "coluna_particao": col,
+        "chave": chave,
+        "hwm": hwm_novo,
+        "colunas": cols,
+        "geracao": int(geracao),
+        "exportado_em": datetime.now().isoformat(timespec="seconds"),
+    }
+    return novo, resumo
+
+
+def exportar(
+    db_path_like: Any,
+    destino: Optional[Any] = None,
+    tabelas: Optional[Iterable[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Exporta (incrementalmente) as tabelas para Parquet particionado.
+
+    Args:
+        destino: pasta dos snapshots (padrão: `destino_padrao(db)`).
+        tabelas: subconjunto de `TABELAS` (padrão: todas).
+
+    Returns:
+        list[dict]: por tabela, `status` ('completa'/'incremental'/'ausente'),
+        `linhas` gravadas e `particoes` tocadas.
+
+    Raises:
+        RuntimeError: `pyarrow` não instalado.
+        ValueError: tabela fora de `TABELAS`.
+    """
+    _pyarrow()
+    nomes = list(tabelas or TABELAS)
+    invalidas = [t for t in nomes if t not in TABELAS]
+    if invalidas:
+        raise ValueError(f"Tabelas não exportáveis: {invalidas}")
+
+    destino = Path(destino) if destino else destino_padrao(db_path_like)
+    destino.mkdir(parents=True, exist_ok=True)
+    estado = _ler_estado(destino)
+
+    with get_conn(db_path_like) as conn:
+        garantir_exportacao(conn)
+
+    resumos: List[Dict[str, Any]] = []
+    with get_conn(db_path_like) as conn:
+        # Uma transação de leitura: todas as tabelas (e a geração) no mesmo instante
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        geracao = geracao_atual(conn)
+        for tabela in nomes:
+            novo, resumo = _exportar_tabela(
+                conn, destino / tabela, tabela, estado["tabelas"].get(tabela), geracao
+            )
+            if novo is not None:
+                estado["tabelas"][tabela] = novo
+                _gravar_estado(destino, estado)
+            resumos.append(resumo)
+            logger.info("exportacao: %s %s (%s linhas)", tabela, resumo.get("status"), resumo.get("linhas", 0))
+    return resumos
+
+
+# -----------------------------------------------------------------------------
+# Leitura
+# -----------------------------------------------------------------------------
+def _arquivos(base: Path, inicio: Optional[str], fim: Optional[str]) -> List[str]:
+    """Arquivos Parquet das partições que intersectam [inicio, fim] (poda por mês)."""
+    m_ini = inicio[:7] if inicio else None
+    m_fim = fim[:7] if fim else None
+    out: List[str] = []
+    for dir_ano in sorted(base.glob("ano=*")):
+        for dir_mes in sorted(dir_ano.glob("mes=*")):
+            if not dir_mes.is_dir():
+                continue
+            mes = f"{dir_ano.name[4:]}-{dir_mes.name[4:]}"
+            if mes == _SEM_DATA and (m_ini or m_fim):
+                continue
+            if (m_ini and mes < m_ini) or (m_fim and mes > m_fim):
+                continue
+            out += [str(f) for f in sorted(dir_mes.glob("*.parquet"))]
+    return out
+
+
+def ler_snapshot(
+    destino: Any,
+    tabela: str,
+    colunas: Optional[Sequence[str]] = None,
+    inicio: Optional[Any] = None,
+    fim: Optional[Any] = None,
+    *,
+    como: str = "pandas",
+):
+    """
+    Lê um snapshot exportado, abrindo só os meses do período.
+
+    Args:
+        destino: pasta dos snapshots (a mesma de `exportar`).
+        tabela: tabela exportada.
+        colunas: projeção (padrão: todas).
+        inicio/fim: faixa inclusiva sobre a coluna de partição (date ou 'YYYY-MM-DD').
+        como: 'pandas' (DataFrame) ou 'arrow' (`pyarrow.Table`).
+
+    Returns:
+        DataFrame / `pyarrow.Table` (vazio se não houver arquivos).
+    """
+    pa, pq = _pyarrow()
+    import pyarrow.compute as pc
+
+    if como not in ("pandas", "arrow"):
+        raise ValueError(f"'como' inválido: {como!r}")
+    ini = str(inicio)[:10] if inicio else None
+    fim_ = str(fim)[:10] if fim else None
+    base = Path(destino) / tabela
+    estado = _ler_estado(Path(destino)).get("tabelas", {}).get(tabela, {})
+    col_data = estado.get("coluna_particao") or TABELAS.get(tabela)
+
+    arquivos = _arquivos(base, ini, fim_) if base.is_dir() else []
+    if not arquivos:
+        nomes = list(colunas or estado.get("colunas") or [])
+        vazio = pa.table({c: pa.array([], type=pa.string()) for c in nomes})
+        return vazio.to_pandas() if como == "pandas" else vazio
+
+    ler = list(colunas) if colunas else None
+    if ler is not None and (ini or fim_) and col_data not in ler:
+        ler.append(col_data)
+    t = pa.concat_tables(
+        [pq.read_table(f, columns=ler) for f in arquivos], promote_options="default"
+    )
+    if ini or fim_:
+        datas = pc.utf8_slice_codeunits(t[col_data], 0, 10)
+        mascara = None
+        if ini:
+            mascara = pc.greater_equal(datas, ini)
+        if fim_:
+            m = pc.less_equal(datas, fim_)
+            mascara = m if mascara is None else pc.and_(mascara, m)
+        t = t.filter(pc.fill_null(mascara, False))
+    if colunas:
+        t = t.select(list(colunas))
+    return t.to_pandas() if como == "pandas" else t
+
+
+def status_snapshot(destino: Any) -> Dict[str, Any]:
+    """Estado gravado (marca, colunas, data da última exportação) por tabela."""
+    return _ler_estado(Path(destino)).get("tabelas", {})
+
+
+def exportar_csv_tabela(
+    db_path_like: Any,
+    tabela: str,
+    arquivo: Any,
+    inicio: Optional[Any] = None,
+    fim: Optional[Any] = None,
+    colunas: Optional[Sequence[str]] = None,
+) -> int:
+    """
+    Grava `tabela` (de `TABELAS`) em CSV, filtrada pela coluna de partição.
+
+    Lê em chunks por uma conexão somente leitura própria: memória limitada
+    em históricos grandes. Retorna as linhas gravadas.
+    """
+    from flowdash_pages.dataframes import exportar_csv
+
+    if tabela not in TABELAS:
+        raise ValueError(f"Tabela não exportável: {tabela!r}")
+    if not colunas:
+        with get_conn(db_path_like) as conn:
+            colunas = colunas_ordenadas(conn, tabela)
+    if not colunas:
+        raise ValueError(f"Tabela inexistente: {tabela!r}")
+    col_data = TABELAS[tabela]
+    return exportar_csv(
+        db_path_like, tabela, colunas, arquivo,
+        coluna_data=col_data, inicio=inicio, fim=fim, order_by=f'"{col_data}"',
+    )
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="python -m services.exportacao",
+        description="Exportação incremental para Parquet particionado (ano/mês).",
+    )
+    parser.add_argument("comando", choices=["export", "status", "csv"])
+    parser.add_argument("caminho_banco")
+    parser.add_argument("--destino", default=None)
+    parser.add_argument("--tabelas", nargs="*", default=None)
+    parser.add_argument("--inicio", default=None)
+    parser.add_argument("--fim", default=None)
+    args = parser.parse_args(argv)
+
+    destino = Path(args.destino) if args.destino else destino_padrao(args.caminho_banco)
+    if args.comando == "csv":
+        destino.mkdir(parents=True, exist_ok=True)
+        for tabela in args.tabelas or TABELAS:
+            arquivo = destino / f"{tabela}.csv"
+            n = exportar_csv_tabela(args.caminho_banco, tabela, arquivo, args.inicio, args.fim)
+            print(f"{tabela:<26} {n:>8} linha(s) → {arquivo}")
+        return 0
+    if args.comando == "status":
+        for tabela, est in status_snapshot(destino).items():
+            print(f"{tabela:<26} chave={est.get('chave')} hwm={est.get('hwm')} em {est.get('exportado_em')}")
+        return 0
+
+    try:
+        resumos = exportar(args.caminho_banco, destino, args.tabelas)
+    except RuntimeError as e:
+        print(e)
+        return 1
+    for r in resumos:
+        print(f"{r['tabela']:<26} {r['status']:<12} {r.get('linhas', 0):>8} linha(s) {len(r.get('particoes', []))} partição(ões)")
+    print(f"Destino: {destino}")
+    return 0
+
+
+__all__ = [
+    "FORMATO",
+    "TABELAS",
+    "pyarrow_disponivel",
+    "destino_padrao",
+    "garantir_exportacao",
+    "exportar",
+    "exportar_csv_tabela",
+    "ler_snapshot",
+    "status_snapshot",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
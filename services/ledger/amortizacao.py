@@ -0,0 +1,222 @@
+# services/ledger/amortizacao.py
+"""
+Motor de Amortização (Empréstimos/Financiamentos)
+=================================================
+
+Gera o cronograma inteiro de um empréstimo — vencimentos, parcela,
+amortização, juros e saldo devedor — em operações vetorizadas (numpy), sem
+laço por parcela. Usado por `ServiceLedgerEmprestimo.programar_emprestimo` e
+`reprogramar_emprestimo`.
+
+Funcionalidades principais
+--------------------------
+- `gerar_cronograma(...)`: sistemas `PRICE` (parcela constante), `SAC`
+  (amortização constante) e `FIXO` (parcela informada, sem juros destacados —
+  o modelo antigo de `programar_emprestimo`).
+- `vencimentos_mensais(data, n, dia)`: datas mensais com o dia travado no fim
+  do mês quando ele não existe (mesma regra de `pd.DateOffset(months=k)`).
+- `Cronograma.linhas()`: uma dict por parcela, pronta para o repositório.
+
+Detalhes técnicos
+-----------------
+- Valores calculados em **centavos inteiros**: a soma das amortizações fecha
+  exatamente o principal (o resíduo de arredondamento vai para a última
+  parcela) e o saldo final é zero.
+- PRICE: saldo antes da parcela k em forma fechada,
+  `P·(1+i)^(k−1) − pmt·((1+i)^(k−1) − 1)/i`; taxa zero cai na divisão igual.
+- Um cronograma de 360 parcelas sai em ~0,1 ms.
+
+Dependências
+------------
+- numpy (dependência do pandas)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+__all__ = [
+    "SISTEMAS",
+    "Cronograma",
+    "gerar_cronograma",
+    "vencimentos_mensais",
+]
+
+SISTEMAS = ("PRICE", "SAC", "FIXO")
+
+DataLike = Union[str, date, datetime]
+
+
+@dataclass(frozen=True)
+class Cronograma:
+    """Cronograma de parcelas (arrays alinhados; valores em reais, 2 casas)."""
+
+    sistema: str
+    vencimento: np.ndarray      # datetime64[D]
+    valor_parcela: np.ndarray
+    amortizacao: np.ndarray
+    juros: np.ndarray
+    saldo_devedor: np.ndarray   # saldo após pagar a parcela
+
+    def __len__(self) -> int:
+        return int(self.vencimento.shape[0])
+
+    @property
+    def total(self) -> float:
+        """Soma das parcelas (o que o CAP vai cobrar)."""
+        return round(float(self.valor_parcela.sum()), 2)
+
+    def vencimentos_iso(self) -> List[str]:
+        """Vencimentos como 'YYYY-MM-DD'."""
+        return np.datetime_as_string(self.vencimento, unit="D").tolist()
+
+    def linhas(self, *, parcela_inicial: int = 1) -> List[Dict[str, Any]]:
+        """Uma dict por parcela: `parcela_num, vencimento, competencia, valor_parcela, amortizacao, juros, saldo_devedor`."""
+        vencs = self.vencimentos_iso()
+        return [
+            {
+                "parcela_num": parcela_inicial + k,
+                "vencimento": v,
+                "competencia": v[:7],
+                "valor_parcela": vp,
+                "amortizacao": am,
+                "juros": j,
+                "saldo_devedor": s,
+            }
+            for k, (v, vp, am, j, s) in enumerate(zip(
+                vencs,
+                self.valor_parcela.tolist(),
+                self.amortizacao.tolist(),
+                self.juros.tolist(),
+                self.saldo_devedor.tolist(),
+            ))
+        ]
+
+
+# -----------------------------------------------------------------------------
+# Datas
+# -----------------------------------------------------------------------------
+def _para_date(d: DataLike) -> date:
+    if isinstance(d, datetime):
+        return d.date()
+    if isinstance(d, date):
+        return d
+    return datetime.strptime(str(d).strip()[:10], "%Y-%m-%d").date()
+
+
+def vencimentos_mensais(data_primeira: DataLike, n: int, dia: Optional[int] = None) -> np.ndarray:
+    """
+    `n` vencimentos mensais a partir de `data_primeira` (datetime64[D]).
+
+    `dia` (1–31) fixa o dia do vencimento; padrão: o dia de `data_primeira`.
+    Meses sem esse dia usam o último dia do mês.
+    """
+    d0 = _para_date(data_primeira)
+    dia_eff = int(dia or d0.day)
+    if not 1 <= dia_eff <= 31:
+        raise ValueError("Dia de vencimento deve estar entre 1 e 31.")
+    meses = np.datetime64(d0, "M") + np.arange(int(n))
+    inicio = meses.astype("datetime64[D]")
+    dias_no_mes = ((meses + 1).astype("datetime64[D]") - inicio).astype(np.int64)
+    return inicio + (np.minimum(dia_eff, dias_no_mes) - 1)
+
+
+# -----------------------------------------------------------------------------
+# Valores (centavos inteiros)
+# -----------------------------------------------------------------------------
+def _divisao_igual(total_c: int, n: int) -> np.ndarray:
+    """`total_c` centavos em `n` partes iguais; o resto vai para a última."""
+    partes = np.full(n, total_c // n, dtype=np.int64)
+    partes[-1] += total_c - int(partes.sum())
+    return partes
+
+
+def _price(principal_c: int, n: int, i: float) -> tuple[np.ndarray, np.ndarray]:
+    """(amortização, juros) em centavos para parcela constante."""
+    fator = (1.0 + i) ** np.arange(n)                   # (1+i)^(k-1), k = 1..n
+    pmt = principal_c * i / (1.0 - (1.0 + i) ** -n)
+    saldo_antes = principal_c * fator - pmt * (fator - 1.0) / i
+    juros = np.rint(saldo_antes * i).astype(np.int64)
+    amort = np.int64(round(pmt)) - juros
+    amort[-1] = principal_c - int(amort[:-1].sum())
+    return amort, juros
+
+
+def _sac(principal_c: int, n: int, i: float) -> tuple[np.ndarray, np.ndarray]:
+    """(amortização, juros) em centavos para amortização constante."""
+    amort = _divisao_igual(principal_c, n)
+    saldo_antes = principal_c - np.concatenate(([0], np.cumsum(amort)[:-1]))
+    juros = np.rint(saldo_antes * i).astype(np.int64)
+    return amort, juros
+
+
+def gerar_cronograma(
+    *,
+    sistema: str = "PRICE",
+    parcelas: int,
+    data_primeira_parcela: DataLike,
+    principal: Optional[float] = None,
+    taxa_juros_am: float = 0.0,
+    valor_parcela: Optional[float] = None,
+    vencimento_dia: Optional[int] = None,
+) -> Cronograma:
+    """
+    Gera o cronograma completo.
+
+    Args:
+        sistema: 'PRICE', 'SAC' ou 'FIXO'.
+        parcelas: Quantidade de parcelas (>= 1).
+        data_primeira_parcela: Vencimento da 1ª parcela.
+        principal: Valor financiado (obrigatório em PRICE/SAC; em FIXO, usado
+            só quando `valor_parcela` não vem — divide o principal igualmente).
+        taxa_juros_am: Taxa mensal em % (ex.: 1.99).
+        valor_parcela: Parcela informada (FIXO).
+        vencimento_dia: Dia fixo do vencimento (padrão: o da 1ª parcela).
+
+    Returns:
+        Cronograma: arrays por parcela; `saldo_devedor[-1] == 0`.
+
+    Raises:
+        ValueError: sistema desconhecido ou valores inválidos.
+    """
+    sist = (sistema or "").strip().upper()
+    if sist not in SISTEMAS:
+        raise ValueError(f"Sistema de amortização inválido: {sistema!r} (use {', '.join(SISTEMAS)}).")
+    n = int(parcelas)
+    if n < 1:
+        raise ValueError("Quantidade de parcelas inválida.")
+    i = float(taxa_juros_am or 0.0) / 100.0
+    if i < 0:
+        raise ValueError("Taxa de juros não pode ser negativa.")
+
+    if sist == "FIXO" and valor_parcela is not None:
+        vp_c = int(round(float(valor_parcela) * 100))
+        if vp_c <= 0:
+            raise ValueError("Valor da parcela deve ser > 0.")
+        amort = np.full(n, vp_c, dtype=np.int64)
+        juros = np.zeros(n, dtype=np.int64)
+        principal_c = vp_c * n
+    else:
+        principal_c = int(round(float(principal or 0.0) * 100))
+        if principal_c <= 0:
+            raise ValueError("Principal deve ser > 0.")
+        if sist == "FIXO" or i <= 0:
+            amort, juros = _divisao_igual(principal_c, n), np.zeros(n, dtype=np.int64)
+        elif sist == "PRICE":
+            amort, juros = _price(principal_c, n, i)
+        else:
+            amort, juros = _sac(principal_c, n, i)
+
+    saldo = principal_c - np.cumsum(amort)
+    return Cronograma(
+        sistema=sist,
+        vencimento=vencimentos_mensais(data_primeira_parcela, n, vencimento_dia),
+        valor_parcela=(amort + juros) / 100.0,
+        amortizacao=amort / 100.0,
+        juros=juros / 100.0,
+        saldo_devedor=saldo / 100.0,
+    )
@@ -0,0 +1,153 @@
+# services/ledger/container.py
+"""
+Container de Serviços do Ledger
+===============================
+
+Monta **uma vez por processo e por banco** o grafo de serviços usado pelas
+ações de saída/pagamento (LedgerService, serviços de boleto/fatura/empréstimo e
+repositórios) e devolve o mesmo conjunto a cada clique.
+
+Funcionalidades principais
+--------------------------
+- `obter(db_path)`: `Servicos` do banco (constrói na 1ª chamada; depois é uma
+  consulta a dicionário).
+- `Servicos`: handles prontos — `ledger`, `cap_repo`, `mov_repo`,
+  `cartoes_repo`, `fatura_itens_repo`, `boleto`, `fatura`, `emprestimo`.
+- `estatisticas()` / `limpar()`: contadores de construção/reuso e descarte.
+
+Detalhes técnicos
+-----------------
+- Os serviços só guardam `db_path` e repositórios; as conexões vêm do pool por
+  thread (`shared.db.get_conn`), então as mesmas instâncias servem a todas as
+  sessões do Streamlit.
+- Todos compartilham os mesmos repositórios (um `ContasAPagarMovRepository`
+  por banco) e o `LedgerService` já vem com o serviço de boleto ligado.
+- As guardas de schema/índice dos repositórios rodam na construção e, de
+  qualquer forma, só uma vez por versão de schema.
+- Imports tardios: `LedgerService` importa este módulo pelos mixins.
+
+Dependências
+------------
+- services.ledger.service_ledger (LedgerService)
+- services.ledger.service_ledger_boleto / _fatura / _emprestimo
+- repository.* (CAP, movimentações, cartões, itens de fatura)
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from utils.utils import resolve_db_path
+
+if TYPE_CHECKING:  # pragma: no cover
+    from repository.cartoes_repository import CartoesRepository
+    from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
+    from repository.fatura_cartao_itens_repository import FaturaCartaoItensRepository
+    from repository.movimentacoes_repository import MovimentacoesRepository
+    from services.ledger.service_ledger import LedgerService
+    from services.ledger.service_ledger_boleto import ServiceLedgerBoleto
+    from services.ledger.service_ledger_emprestimo import ServiceLedgerEmprestimo
+    from services.ledger.service_ledger_fatura import ServiceLedgerFatura
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["Servicos", "obter", "estatisticas", "limpar"]
+
+
+@dataclass(frozen=True)
+class Servicos:
+    """Grafo de serviços de um banco (instâncias compartilhadas)."""
+
+    db_path: str
+    ledger: "LedgerService"
+    cap_repo: "ContasAPagarMovRepository"
+    mov_repo: "MovimentacoesRepository"
+    cartoes_repo: "CartoesRepository"
+    fatura_itens_repo: "FaturaCartaoItensRepository"
+    boleto: "ServiceLedgerBoleto"
+    fatura: "ServiceLedgerFatura"
+    emprestimo: "ServiceLedgerEmprestimo"
+    construcao_ms: float
+
+
+_servicos: Dict[str, Servicos] = {}
+_lock = threading.Lock()
+_stats = {"construcoes": 0, "reusos": 0}
+
+
+# -----------------------------------------------------------------------------
+# Construção
+# -----------------------------------------------------------------------------
+def _construir(db_path: str) -> Servicos:
+    # Import tardio: os mixins do LedgerService importam este módulo
+    from repository.fatura_cartao_itens_repository import FaturaCartaoItensRepository
+    from services.ledger.service_ledger import LedgerService
+    from services.ledger.service_ledger_boleto import ServiceLedgerBoleto
+    from services.ledger.service_ledger_emprestimo import ServiceLedgerEmprestimo
+    from services.ledger.service_ledger_fatura import ServiceLedgerFatura
+
+    t0 = time.perf_counter()
+    ledger = LedgerService(db_path)
+    cap_repo = ledger.cap_repo
+
+    boleto = ServiceLedgerBoleto(db_path)
+    fatura = ServiceLedgerFatura(db_path)
+    emprestimo = ServiceLedgerEmprestimo(db_path)
+    for svc in (boleto, fatura, emprestimo):
+        svc.cap_repo = cap_repo
+    ledger._boleto_svc = boleto
+
+    servicos = Servicos(
+        db_path=db_path,
+        ledger=ledger,
+        cap_repo=cap_repo,
+        mov_repo=ledger.mov_repo,
+        cartoes_repo=ledger.cartoes_repo,
+        fatura_itens_repo=FaturaCartaoItensRepository(db_path),
+        boleto=boleto,
+        fatura=fatura,
+        emprestimo=emprestimo,
+        construcao_ms=round((time.perf_counter() - t0) * 1000.0, 3),
+    )
+    logger.debug("container: serviços de %s construídos em %.1f ms", db_path, servicos.construcao_ms)
+    return servicos
+
+
+# -----------------------------------------------------------------------------
+# API
+# -----------------------------------------------------------------------------
+def obter(db_path_like: Any) -> Servicos:
+    """Serviços do banco (construídos uma vez por processo)."""
+    db_path = resolve_db_path(db_path_like)
+    servicos = _servicos.get(db_path)
+    if servicos is not None:
+        _stats["reusos"] += 1
+        return servicos
+    with _lock:
+        servicos = _servicos.get(db_path)
+        if servicos is None:
+            servicos = _servicos[db_path] = _construir(db_path)
+            _stats["construcoes"] += 1
+    return servicos
+
+
+def estatisticas() -> Dict[str, Any]:
+    """Construções/reusos e tempo de construção por banco."""
+    with _lock:
+        return {
+            **_stats,
+            "bancos": {k: s.construcao_ms for k, s in _servicos.items()},
+        }
+
+
+def limpar(db_path_like: Optional[Any] = None) -> None:
+    """Descarta os serviços (de um banco ou de todos); a próxima chamada reconstrói."""
+    with _lock:
+        if db_path_like is None:
+            _servicos.clear()
+        else:
+            _servicos.pop(resolve_db_path(db_path_like), None)
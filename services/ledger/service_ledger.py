@@ -7,7 +7,13 @@ Fachada do Ledger que compõe mixins/serviços e delega as operações:
 
 - Saídas (dinheiro/bancária) via `_SaidasLedgerMixin`
 - Crédito / Fatura / Empréstimo / Boleto via serviços específicos
-- Repositórios resolvidos dinamicamente (evita acoplamento rígido)
+- Pagamento de várias obrigações numa transação via `_LoteLedgerMixin`
+  (`pagar_em_lote`)
+- Repositórios e mixins importados estaticamente (sem tentativas de import
+  em tempo de carga); o despacho de `registrar_lancamento` é resolvido uma vez
+  por classe.
+- Serviços auxiliares (boleto/fatura/empréstimo) vêm de
+  `services.ledger.container`: um grafo por banco, reaproveitado entre cliques.
 
 Notas:
 - Não reimplementa a lógica de `registrar_saida_*`: apenas delega.
@@ -17,11 +23,11 @@ Notas:
 
 from __future__ import annotations
 
-import importlib
 import logging
 import os
 import sys
-from typing import Any, Optional, Type
+from functools import lru_cache
+from typing import Any, Callable, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -34,97 +40,22 @@ if _PROJECT_ROOT not in sys.path:
     sys.path.insert(0, _PROJECT_ROOT)
 
 # =====================================================================
-# Resolução dinâmica de símbolos (classes)
+# Repositórios e mixins (imports estáticos; ordem da MRO abaixo)
 # =====================================================================
-def _resolve_symbol(mod_names: list[str], attr_candidates: list[str]) -> Optional[Type[Any]]:
-    """Retorna a primeira classe encontrada dentre módulos/atributos candidatos."""
-    for mod in mod_names:
-        try:
-            m = importlib.import_module(mod)
-        except Exception:
-            continue
-        for attr in attr_candidates:
-            cls = getattr(m, attr, None)
-            if isinstance(cls, type):
-                return cls  # type: ignore[return-value]
-    return None
-
-
-def _resolve_mixin(primary_mods: list[str], primary_attrs: list[str], fallback: Optional[Type[Any]] = None) -> Type[Any]:
-    """Resolve um mixin; se não encontrar, retorna um mixin vazio."""
-    cls = _resolve_symbol(primary_mods, primary_attrs)
-    return cls or (fallback or type("EmptyMixin", (), {}))
-
-
-# =====================================================================
-# Repositórios (dinâmicos; sem import estático rígido)
-# =====================================================================
-MovimentacoesRepoType: Optional[Type[Any]] = _resolve_symbol(
-    ["repository.movimentacoes_repository", "repository.movimentacoes_bancarias_repository"],
-    ["MovimentacoesRepository", "MovimentacoesBancariasRepository"],
-)
-
-CartoesRepoType: Optional[Type[Any]] = _resolve_symbol(
-    ["repository.cartoes_repository", "repository.cartoes_credito_repository"],
-    ["CartoesRepository", "CartoesCreditoRepository"],
-)
-
-SaidasRepoType: Optional[Type[Any]] = _resolve_symbol(
-    ["repository.saidas_repository"],
-    ["SaidasRepository"],
-)
-
-BancosRepoType: Optional[Type[Any]] = _resolve_symbol(
-    ["repository.bancos_repository"],
-    ["BancosRepository"],
-)
-
-CaixasRepoType: Optional[Type[Any]] = _resolve_symbol(
-    ["repository.caixas_repository", "repository.caixa_repository"],
-    ["CaixasRepository", "CaixaRepository"],
-)
-
-# CAP / Serviços especializados
-from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository  # type: ignore
-from services.ledger.service_ledger_boleto import ServiceLedgerBoleto  # type: ignore
-
-# =====================================================================
-# Mixins (ordem importa na MRO)
-# =====================================================================
-_InfraMixin = _resolve_mixin(
-    ["services.ledger.service_ledger_infra", "service_ledger_infra", ".service_ledger_infra"],
-    ["_InfraLedgerMixin"],
-)
-
-_CapStatusMixin = _resolve_mixin(
-    ["services.ledger.service_ledger_cap_helpers", "service_ledger_cap_helpers", ".service_ledger_cap_helpers"],
-    ["_CapStatusLedgerMixin"],
-)
-
-_AutoBaixaMixin = _resolve_mixin(
-    ["services.ledger.service_ledger_autobaixa", "service_ledger_autobaixa", ".service_ledger_autobaixa"],
-    ["_AutoBaixaLedgerMixin"],
-)
-
-_SaidasMixin = _resolve_mixin(
-    ["services.ledger.service_ledger_saida", "service_ledger_saida", ".service_ledger_saida"],
-    ["_SaidasLedgerMixin"],
-)
-
-_CreditoMixin = _resolve_mixin(
-    ["services.ledger.service_ledger_credito", "service_ledger_credito", ".service_ledger_credito"],
-    ["_CreditoLedgerMixin"],
-)
-
-_EmpMixin = _resolve_mixin(
-    ["services.ledger.service_ledger_emprestimo", "service_ledger_emprestimo", ".service_ledger_emprestimo"],
-    ["_EmprestimoLedgerMixin", "ServiceLedgerEmprestimo"],  # compat
-)
-
-_FaturaMixin = _resolve_symbol(
-    ["services.ledger.service_ledger_fatura", "service_ledger_fatura", ".service_ledger_fatura"],
-    ["_FaturaLedgerMixin", "FaturaCartaoMixin", "ServiceLedgerFatura"],
-) or type("EmptyFaturaMixin", (), {})
+from repository.cartoes_repository import CartoesRepository  # noqa: E402
+from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository  # noqa: E402
+from repository.movimentacoes_repository import MovimentacoesRepository  # noqa: E402
+from services.ledger import container  # noqa: E402
+from services.ledger.service_ledger_autobaixa import _AutoBaixaLedgerMixin as _AutoBaixaMixin  # noqa: E402
+from services.ledger.service_ledger_boleto import ServiceLedgerBoleto  # noqa: E402
+from services.ledger.service_ledger_cap_helpers import _CapStatusLedgerMixin as _CapStatusMixin  # noqa: E402
+from services.ledger.service_ledger_credito import _CreditoLedgerMixin as _CreditoMixin  # noqa: E402
+from services.ledger.service_ledger_emprestimo import ServiceLedgerEmprestimo as _EmpMixin  # noqa: E402
+from services.ledger.service_ledger_fatura import ServiceLedgerFatura as _FaturaMixin  # noqa: E402
+from services.ledger.service_ledger_infra import _InfraLedgerMixin as _InfraMixin  # noqa: E402
+from services.ledger.service_ledger_lote import _LoteLedgerMixin as _LoteMixin  # noqa: E402
+from services.ledger.service_ledger_saida import _SaidasLedgerMixin as _SaidasMixin  # noqa: E402
+from shared.instrumentacao import medido  # noqa: E402
 
 
 class _BoletoBase:
@@ -132,6 +63,16 @@ class _BoletoBase:
     pass
 
 
+@lru_cache(maxsize=None)
+def _impl_registrar_lancamento(cls: type) -> Optional[Callable[..., Any]]:
+    """Primeira implementação de `registrar_lancamento` na MRO (após a fachada)."""
+    for base in cls.mro()[1:]:
+        impl = base.__dict__.get("registrar_lancamento")
+        if impl is not None:
+            return impl
+    return None
+
+
 # =====================================================================
 # Serviço Agregador
 # =====================================================================
@@ -143,6 +84,7 @@ class LedgerService(
     _EmpMixin,
     _AutoBaixaMixin,
     _CapStatusMixin,
+    _LoteMixin,
     _InfraMixin,
 ):
     """
@@ -158,14 +100,15 @@ class LedgerService(
         self.db_path = db_path
 
         # Repositórios aguardados pelos mixins
-        self.mov_repo = MovimentacoesRepoType(db_path) if MovimentacoesRepoType else None  # type: ignore
+        self.mov_repo = MovimentacoesRepository(db_path)
         self.cap_repo = ContasAPagarMovRepository(db_path)
-        self.cartoes_repo = CartoesRepoType(db_path) if CartoesRepoType else None  # type: ignore
+        self.cartoes_repo = CartoesRepository(db_path)
 
-        # Repositórios auxiliares (saídas/caixa/bancos)
-        self.saidas_repo = SaidasRepoType(db_path) if SaidasRepoType else None  # type: ignore
-        self.bancos_repo = BancosRepoType(db_path) if BancosRepoType else None  # type: ignore
-        self.caixa_repo = CaixasRepoType(db_path) if CaixasRepoType else None  # type: ignore
+        # Repositórios auxiliares (saídas/caixa/bancos): sem módulo dedicado na
+        # árvore atual; atributos mantidos por compatibilidade com os mixins
+        self.saidas_repo = None
+        self.bancos_repo = None
+        self.caixa_repo = None
 
         self._boleto_svc: Optional[ServiceLedgerBoleto] = None
 
@@ -207,11 +150,11 @@ class LedgerService(
         if not id_saida:
             return
         try:
-            import sqlite3
-            with sqlite3.connect(self.db_path) as conn:
+            from shared.db import get_conn
+            from shared.schema import colunas
+            with get_conn(self.db_path) as conn:
                 cur = conn.cursor()
-                cur.execute("PRAGMA table_info(saida);")
-                cols = [row[1] for row in cur.fetchall()]
+                cols = colunas(conn, "saida")
 
                 updates: dict[str, object] = {}
 
@@ -259,6 +202,7 @@ class LedgerService(
             logger.warning("Pós-inserção defensivo em 'saida' falhou: %s", e)
 
     # ------------------ Saídas ------------------
+    @medido("ledger.registrar_saida_dinheiro")
     def registrar_saida_dinheiro(
         self,
         *,
@@ -312,6 +256,7 @@ class LedgerService(
         )
         return result
 
+    @medido("ledger.registrar_saida_bancaria")
     def registrar_saida_bancaria(
         self,
         *,
@@ -369,11 +314,12 @@ class LedgerService(
 
     # ------------------ BOLETO ------------------
     def _get_boleto(self) -> ServiceLedgerBoleto:
-        """Lazy-init do serviço de boleto (mantém ordem MRO intacta)."""
+        """Serviço de boleto (o do container, ligado na construção; mantém ordem MRO intacta)."""
         if self._boleto_svc is None:
-            self._boleto_svc = ServiceLedgerBoleto(self.db_path)
+            self._boleto_svc = container.obter(self.db_path).boleto
         return self._boleto_svc
 
+    @medido("ledger.registrar_saida_boleto")
     def registrar_saida_boleto(
         self,
         *,
@@ -445,15 +391,15 @@ class LedgerService(
         )
 
     # ------------------ Dispatcher seguro ------------------
+    @medido("ledger.registrar_lancamento")
     def registrar_lancamento(self, **kwargs: Any) -> dict[str, Any]:
         """
         Encaminha para a primeira implementação de `registrar_lancamento` encontrada
         na MRO (mixin de saídas).
         """
-        for base in self.__class__.mro()[1:]:
-            impl = base.__dict__.get("registrar_lancamento")
-            if impl is not None:
-                return impl(self, **kwargs)  # type: ignore[misc]
+        impl = _impl_registrar_lancamento(type(self))
+        if impl is not None:
+            return impl(self, **kwargs)
         raise RuntimeError(
             "registrar_lancamento() não está disponível. "
             "Verifique se o mixin de saídas (services.ledger.service_ledger_saida) "
@@ -461,6 +407,7 @@ class LedgerService(
         )
 
     # ------------------ Wrappers compat: boleto & empréstimo ------------------
+    @medido("ledger.pagar_parcela_boleto")
     def pagar_parcela_boleto(
         self,
         *,
@@ -498,6 +445,7 @@ class LedgerService(
             data_evento=_data_evt,
         )
 
+    @medido("ledger.pagar_parcela_emprestimo")
     def pagar_parcela_emprestimo(
         self,
         *,
@@ -522,13 +470,7 @@ class LedgerService(
         )
         _data_evt = data_evento or data  # <-- corrigido
 
-        try:
-            mod = importlib.import_module("services.ledger.service_ledger_emprestimo")
-            ServiceLedgerEmprestimo = getattr(mod, "ServiceLedgerEmprestimo")
-        except Exception as e:  # pragma: no cover
-            raise RuntimeError("ServiceLedgerEmprestimo não encontrado ou inválido.") from e
-
-        svc = ServiceLedgerEmprestimo(self.db_path)
+        svc = container.obter(self.db_path).emprestimo
         return svc.pagar_emprestimo(
             obrigacao_id=int(_obrig),
             principal=float(_principal or 0.0),
@@ -38,8 +38,7 @@ from datetime import datetime
 import sqlite3
 
 from shared.db import get_conn
-from services.ledger.service_ledger_boleto import ServiceLedgerBoleto
-from services.ledger.service_ledger_fatura import ServiceLedgerFatura
+from services.ledger import container
 from services.ledger.service_ledger_infra import vincular_mov_a_parcela_boleto
 
 __all__ = ["_AutoBaixaLedgerMixin"]
@@ -121,7 +120,7 @@ class _AutoBaixaLedgerMixin:
             SELECT id, data, banco, tipo, COALESCE(valor,0) AS valor, origem,
                    COALESCE(observacao,'') AS observacao, trans_uid
               FROM movimentacoes_bancarias
-             WHERE DATE(data) = DATE(?)
+             WHERE data_dia = DATE(?)
                AND ABS(COALESCE(valor,0) - ?) < 0.005
                AND LOWER(tipo) = 'saida'
              ORDER BY id DESC
@@ -255,7 +254,7 @@ class _AutoBaixaLedgerMixin:
             usuario = (usuario or "-").strip() or "-"
 
             if tipo == "FATURA_CARTAO":
-                svc = ServiceLedgerFatura(self.db_path)  # type: ignore[attr-defined]
+                svc = container.obter(self.db_path).fatura  # type: ignore[attr-defined]
                 res = svc.pagar_fatura_cartao(
                     conn,
                     obrigacao_id=int(obrigacao_id),
@@ -278,7 +277,7 @@ class _AutoBaixaLedgerMixin:
 
             else:
                 # BOLETO / EMPRESTIMO usam o mesmo core FIFO do service de boletos
-                svc = ServiceLedgerBoleto(self.db_path)  # type: ignore[attr-defined]
+                svc = container.obter(self.db_path).boleto  # type: ignore[attr-defined]
                 res = svc.pagar_boleto(
                     obrigacao_id=int(obrigacao_id),
                     principal=float(caixa_total),
@@ -31,7 +31,9 @@ from typing import Any, Dict, Iterator, List, Optional
 from uuid import uuid4
 import sqlite3
 
-from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
+from shared.db import get_conn
+
+from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository, recalcular_status_cap
 from services.ledger.service_ledger_infra import _fmt_obs_saida, log_mov_bancaria
 
 _EPS = 1e-9  # Tolerância numérica para comparações de ponto flutuante
@@ -300,6 +302,7 @@ class ServiceLedgerBoleto:
                     desconto=aplicar_desconto,
                     data_evento=data_evt,
                     usuario=usuario,
+                    recalcular_status=False,
                 )
 
                 saida_total_agregado = round(saida_total_agregado + float(snap["saida_total"]), 2)
@@ -320,6 +323,9 @@ class ServiceLedgerBoleto:
                 if restante_principal <= _EPS and aplicar_principal <= _EPS:
                     break
 
+            # Status das parcelas tocadas: um único UPDATE ao fim da transação
+            recalcular_status_cap(c, parcela_ids=[r.parcela_id for r in resultados])
+
         return {
             "trans_uid": trans_uid,
             "saida_total": float(saida_total_agregado),
@@ -339,12 +345,8 @@ class ServiceLedgerBoleto:
         if conn is not None:
             yield conn
         else:
-            c = sqlite3.connect(self.db_path)
-            try:
+            with get_conn(self.db_path) as c:
                 yield c
-            finally:
-                c.commit()
-                c.close()
 
 
 # --- Retrocompat (mantém nomes antigos esperados por imports legados) ---
@@ -18,6 +18,7 @@ APIs (retrocompat mantida onde possível):
 - _saldo_agregado_por_obrigacao(conn, obrigacao_id) -> float # Σ(valor_evento) − Σ(principal_pago_acumulado)
 - _atualizar_status_por_id(conn, parcela_id, ...) -> str
 - _atualizar_status_por_obrigacao(conn, obrigacao_id) -> str
+- _recalcular_status_cap(conn, obrigacao_ids=..., parcela_ids=...) -> int   # set-based
 """
 
 from __future__ import annotations
@@ -25,16 +26,20 @@ from __future__ import annotations
 import logging
 import sqlite3
 from contextlib import contextmanager
-from typing import Optional, Iterator
+from typing import Iterable, Optional, Iterator
+
+from shared.db import get_conn
+from repository.contas_a_pagar_mov_repository import (
+    STATUS_ABERTO,
+    STATUS_PARCIAL,
+    STATUS_QUITADO,
+    recalcular_status_cap,
+    status_agregado_cap,
+    status_parcela,
+)
 
 logger = logging.getLogger(__name__)
 
-STATUS_ABERTO = "EM ABERTO"
-STATUS_PARCIAL = "PARCIAL"
-STATUS_QUITADO = "QUITADO"
-
-_EPS = 1e-9  # tolerância numérica para comparações de status
-
 
 class _CapHelpersLedgerMixin:
     """Helpers utilitários para CAP (saldo, total pago, status) no padrão novo."""
@@ -45,7 +50,7 @@ class _CapHelpersLedgerMixin:
         """Garante `row_factory=sqlite3.Row` dentro do escopo.
 
         Se `conn` for fornecida, apenas aplica/recupera `row_factory` no bloco.
-        Caso contrário, abre/commita/fecha automaticamente uma nova conexão.
+        Caso contrário, usa a conexão do pool (`get_conn`) com commit/rollback automático.
 
         Args:
             conn: Conexão SQLite existente (opcional).
@@ -61,13 +66,8 @@ class _CapHelpersLedgerMixin:
             finally:
                 conn.row_factory = old
         else:
-            c = sqlite3.connect(self.db_path)  # type: ignore[attr-defined]
-            c.row_factory = sqlite3.Row
-            try:
+            with get_conn(self.db_path) as c:  # type: ignore[attr-defined]
                 yield c
-            finally:
-                c.commit()
-                c.close()
 
     # ------------------------ expressões SQL ------------------
     def _expr_valor_documento(self, conn: sqlite3.Connection) -> str:  # noqa: ARG002 (assinatura compat)
@@ -122,12 +122,8 @@ class _CapHelpersLedgerMixin:
 
     # ------------------------ status helpers ------------------
     def _status_from_vals(self, valor_evento: float, principal_pago: float) -> str:
-        """Determina o status apenas pelo principal amortizado."""
-        if (principal_pago or 0.0) >= (valor_evento or 0.0) - _EPS:
-            return STATUS_QUITADO
-        if (principal_pago or 0.0) > 0:
-            return STATUS_PARCIAL
-        return STATUS_ABERTO
+        """Determina o status apenas pelo principal amortizado (`status_parcela`)."""
+        return status_parcela(valor_evento, principal_pago)
 
     def _atualizar_status_por_id(
         self,
@@ -205,50 +201,33 @@ class _CapHelpersLedgerMixin:
         """Recalcula e atualiza o STATUS de todas as linhas `LANCAMENTO` da obrigação.
 
         Regras:
-            - Usa apenas `valor_evento` e `principal_pago_acumulado` de cada parcela.
+            - Usa apenas `valor_evento` e `principal_pago_acumulado` de cada parcela
+              (motor set-based: um único UPDATE).
             - Retorna o status agregado final:
                 • QUITADO se todas QUITADO
-                • PARCIAL se qualquer PARCIAL (ou mistura)
                 • EM ABERTO se todas EM ABERTO
+                • PARCIAL nos demais casos
         """
         with self._conn_ctx(conn) as c:
-            cur = c.cursor()
-            rows = cur.execute(
-                """
-                SELECT id, valor_evento, principal_pago_acumulado
-                  FROM contas_a_pagar_mov
-                 WHERE categoria_evento = 'LANCAMENTO'
-                   AND obrigacao_id = ?
-                """,
-                (int(obrigacao_id),),
-            ).fetchall()
-            if not rows:
+            recalcular_status_cap(c, obrigacao_ids=[int(obrigacao_id)])
+            agregado = status_agregado_cap(c, [int(obrigacao_id)]).get(int(obrigacao_id))
+            if agregado is None:
                 raise ValueError(f"Obrigação {obrigacao_id} não encontrada.")
 
-            statuses: list[str] = []
-            for r in rows:
-                novo = self._status_from_vals(
-                    float(r["valor_evento"] or 0.0),
-                    float(r["principal_pago_acumulado"] or 0.0),
-                )
-                statuses.append(novo)
-                cur.execute("UPDATE contas_a_pagar_mov SET status = ? WHERE id = ?", (novo, int(r["id"])) )
-
-            if all(s == STATUS_QUITADO for s in statuses):
-                agregado = STATUS_QUITADO
-            elif any(s == STATUS_PARCIAL for s in statuses):
-                agregado = STATUS_PARCIAL
-            elif all(s == STATUS_ABERTO for s in statuses):
-                agregado = STATUS_ABERTO
-            else:
-                agregado = STATUS_PARCIAL
-
-            logger.debug(
-                "Status por obrigacao (novo padrão): obrig=%s => %s (itens=%s)",
-                obrigacao_id, agregado, statuses
-            )
+            logger.debug("Status por obrigacao (novo padrão): obrig=%s => %s", obrigacao_id, agregado)
             return agregado
 
+    def _recalcular_status_cap(
+        self,
+        conn: Optional[sqlite3.Connection],
+        *,
+        obrigacao_ids: Optional[Iterable[int]] = None,
+        parcela_ids: Optional[Iterable[int]] = None,
+    ) -> int:
+        """Recalcula o STATUS de um conjunto de parcelas/obrigações (ou de todas) em um UPDATE."""
+        with self._conn_ctx(conn) as c:
+            return recalcular_status_cap(c, obrigacao_ids=obrigacao_ids, parcela_ids=parcela_ids)
+
 
 # --- Retrocompat: manter nome antigo esperado por imports legados ---
 class _CapStatusLedgerMixin(_CapHelpersLedgerMixin):
@@ -12,6 +12,9 @@ Responsabilidades:
 - Criar/atualizar LANCAMENTO da fatura (`tipo_obrigacao='FATURA_CARTAO'`).
 - Inserir itens detalhados em `fatura_cartao_itens` (se existir a tabela).
 - Preservar idempotência via `trans_uid` (`mov_repo.ja_existe_transacao`).
+- Caminho em lote: cronograma (competências/vencimentos) calculado de uma vez,
+  LANCAMENTOs existentes lidos em uma consulta, upserts/itens via `executemany`
+  e status recalculado uma vez por fatura tocada.
 
 Dependências:
 - shared.db.get_conn
@@ -20,7 +23,7 @@ Dependências:
 - self.mov_repo (ja_existe_transacao) [opcional]
 - self.cartoes_repo (obter_por_nome)  [opcional]
 - self._competencia_compra (helper no mixin de infra)
-- self._atualizar_status_por_id (helper no mixin de CAP)
+- self._recalcular_status_cap (motor de status no mixin de CAP)
 
 Notas:
 - NÃO movimenta caixa nem banco (somente log de 'registro' para auditoria).
@@ -33,11 +36,12 @@ from __future__ import annotations
 # Imports
 # -----------------------------------------------------------------------------
 import calendar
+import json
 import logging
 import os
 import sys
 import sqlite3
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 # Garante que a raiz do projeto (<raiz>/services/ledger/..) esteja no sys.path
@@ -52,6 +56,7 @@ import pandas as pd  # noqa: E402
 # Internos
 from shared.db import get_conn  # noqa: E402
 from shared.ids import sanitize, uid_credito_programado  # noqa: E402
+from shared.instrumentacao import medido  # noqa: E402
 from services.ledger.service_ledger_infra import (  # noqa: E402
     _fmt_obs_saida,
     log_mov_bancaria,
@@ -153,11 +158,8 @@ class _CreditoLedgerMixin:
                 (cartao_nome, int(lanc_id)),
             )
 
-        # Recalcula STATUS (helper de CAP)
-        try:
-            self._atualizar_status_por_id(conn, int(lanc_id))  # type: ignore[attr-defined]
-        except Exception:
-            pass
+        # Recalcula STATUS (motor set-based de CAP)
+        self._recalcular_status_cap(conn, parcela_ids=[int(lanc_id)])  # type: ignore[attr-defined]
 
         logger.debug(
             "_add_valor_fatura: cartao=%s comp=%s add=%.2f lanc_id=%s",
@@ -165,9 +167,133 @@ class _CreditoLedgerMixin:
         )
         return int(lanc_id)
 
+    # ------------------------------------------------------------------
+    # Cronograma e upsert em lote das faturas
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _cronograma_fatura(
+        comp_base: str,
+        parcelas: int,
+        vencimento_dia: int,
+        valor: float,
+    ) -> List[Tuple[int, str, date, float]]:
+        """
+        Calcula todas as parcelas de uma vez: [(parcela, competencia, vencimento, valor)].
+
+        Rateio com ajuste na última parcela (evita sobra/defasagem de centavos).
+        """
+        n = int(parcelas)
+        valor_parc = round(float(valor) / n, 2)
+        ajuste = round(float(valor) - valor_parc * n, 2)
+        y0, m0 = int(comp_base[:4]), int(comp_base[5:7])
+
+        out: List[Tuple[int, str, date, float]] = []
+        for p in range(1, n + 1):
+            idx = (m0 - 1) + (p - 1)
+            y, m = y0 + idx // 12, idx % 12 + 1
+            venc_d = min(int(vencimento_dia), calendar.monthrange(y, m)[1])
+            vparc = round(valor_parc + (ajuste if p == n else 0.0), 2)
+            out.append((p, f"{y:04d}-{m:02d}", date(y, m, venc_d), vparc))
+        return out
+
+    def _add_valores_fatura(
+        self,
+        conn: sqlite3.Connection,
+        *,
+        cartao_nome: str,
+        cronograma: List[Tuple[int, str, date, float]],
+        data_evento: str,
+        usuario: str,
+        descricao: Optional[str],
+    ) -> Dict[str, int]:
+        """
+        Versão em lote de `_add_valor_fatura`: soma cada parcela ao LANCAMENTO da
+        sua competência. Retorna {competencia: lancamento_id}.
+
+        - 1 SELECT para os LANCAMENTOs já existentes do cartão nas competências;
+        - 1 `executemany` de UPDATE para os existentes;
+        - INSERT apenas das competências novas (obrigacao_id sequencial);
+        - status recalculado uma vez por LANCAMENTO tocado.
+        """
+        cur = conn.cursor()
+        parcelas_total = len(cronograma)
+        por_comp: Dict[str, float] = {}
+        for _p, comp, _v, vparc in cronograma:
+            por_comp[comp] = round(por_comp.get(comp, 0.0) + float(vparc), 2)
+
+        existentes: Dict[str, int] = {}
+        for row in cur.execute(
+            """
+            SELECT id, competencia
+              FROM contas_a_pagar_mov
+             WHERE tipo_obrigacao='FATURA_CARTAO'
+               AND categoria_evento='LANCAMENTO'
+               AND LOWER(TRIM(credor)) = LOWER(TRIM(?))
+               AND competencia IN (SELECT value FROM json_each(?))
+             ORDER BY id
+            """,
+            (cartao_nome, json.dumps(list(por_comp))),
+        ).fetchall():
+            existentes.setdefault(str(row[1]), int(row[0]))
+
+        cur.executemany(
+            """
+            UPDATE contas_a_pagar_mov
+               SET valor_evento = COALESCE(valor_evento,0) + ?,
+                   descricao    = COALESCE(descricao, ?)
+             WHERE id = ?
+            """,
+            [(por_comp[comp], descricao, lanc_id) for comp, lanc_id in existentes.items()],
+        )
+
+        lanc_ids = dict(existentes)
+        novas = [(p, comp, vcto) for p, comp, vcto, _v in cronograma if comp not in lanc_ids]
+        if novas:
+            try:
+                proximo = int(self.cap_repo.proximo_obrigacao_id(conn))  # type: ignore[attr-defined]
+            except Exception:
+                r = cur.execute("SELECT COALESCE(MAX(obrigacao_id),0) FROM contas_a_pagar_mov").fetchone()
+                proximo = int((r[0] or 0) + 1)
+            r = cur.execute(
+                "SELECT id FROM cartoes_credito WHERE LOWER(TRIM(nome)) = LOWER(TRIM(?)) LIMIT 1",
+                (cartao_nome,),
+            ).fetchone()
+            cartao_id = int(r[0]) if r else None
+
+            for p, comp, vcto in novas:
+                if comp in lanc_ids:  # mesma competência repetida no cronograma
+                    continue
+                lanc_ids[comp] = self.cap_repo.registrar_lancamento(  # type: ignore[attr-defined]
+                    conn,
+                    obrigacao_id=proximo,
+                    tipo_obrigacao="FATURA_CARTAO",
+                    valor_total=por_comp[comp],
+                    data_evento=data_evento,
+                    vencimento=str(vcto),
+                    descricao=descricao or f"Fatura {cartao_nome} {comp}",
+                    credor=cartao_nome,
+                    competencia=comp,
+                    parcela_num=int(p),
+                    parcelas_total=int(parcelas_total),
+                    usuario=usuario,
+                    tipo_origem="FATURA_CARTAO",
+                    cartao_id=cartao_id,
+                )
+                proximo += 1
+
+        # Recalcula STATUS dos LANCAMENTOs tocados em um único UPDATE (motor de CAP)
+        self._recalcular_status_cap(conn, parcela_ids=lanc_ids.values())  # type: ignore[attr-defined]
+
+        logger.debug(
+            "_add_valores_fatura: cartao=%s comps=%s existentes=%s novas=%s",
+            cartao_nome, list(por_comp), len(existentes), len(lanc_ids) - len(existentes),
+        )
+        return lanc_ids
+
     # ------------------------------------------------------------------
     # Programa compra a crédito em N parcelas na(s) fatura(s)
     # ------------------------------------------------------------------
+    @medido("ledger.registrar_saida_credito")
     def registrar_saida_credito(
         self,
         *,
@@ -179,8 +305,8 @@ class _CreditoLedgerMixin:
         sub_categoria: Optional[str],
         descricao: Optional[str],
         usuario: str,
-        fechamento: int,  # fallback: dias_fechamento quando não houver cartoes_repo
-        vencimento: int,  # fallback: vencimento_dia   quando não houver cartoes_repo
+        fechamento: int = 0,  # fallback: dias_fechamento quando não houver cartoes_repo
+        vencimento: int = 0,  # fallback: vencimento_dia   quando não houver cartoes_repo
         trans_uid: Optional[str] = None,
     ) -> Tuple[List[int], int]:
         """Rateia o valor em parcelas e agrega cada parcela à fatura adequada.
@@ -244,14 +370,11 @@ class _CreditoLedgerMixin:
                 vencimento_dia=vencimento_dia,
                 dias_fechamento=dias_fechamento,
             )
-            comp_base = pd.to_datetime(comp_base_str + "-01")
-
-            # Rateio com ajuste na última parcela (evita sobra/defasagem de centavos)
-            valor_parc = round(float(valor) / int(parcelas), 2)
-            ajuste = round(float(valor) - valor_parc * int(parcelas), 2)
-
-            lanc_ids: List[int] = []
-            total_programado = 0.0
+            # Cronograma completo (competência, vencimento e valor de cada parcela)
+            cronograma = self._cronograma_fatura(
+                comp_base_str, int(parcelas), vencimento_dia, float(valor)
+            )
+            total_programado = round(sum(v for *_x, v in cronograma), 2)
 
             # Confere existência de fatura_cartao_itens (itens são opcionais)
             itens_table_exists = bool(
@@ -268,60 +391,48 @@ class _CreditoLedgerMixin:
                 except Exception:
                     pass
 
-            for p in range(1, int(parcelas) + 1):
-                comp_dt = comp_base + pd.DateOffset(months=p - 1)
-                y, m = comp_dt.year, comp_dt.month
-
-                last = calendar.monthrange(y, m)[1]
-                venc_d = min(int(vencimento_dia), last)
-                vcto_date = datetime(y, m, venc_d).date()
-                competencia = f"{y:04d}-{m:02d}"
-
-                vparc = round(valor_parc + (ajuste if p == int(parcelas) else 0.0), 2)
+            # LANCAMENTOs na CAP com descrição genérica (mantém/povoa via COALESCE)
+            por_comp = self._add_valores_fatura(
+                conn,
+                cartao_nome=cartao_nome,
+                cronograma=cronograma,
+                data_evento=str(compra.date()),
+                usuario=usuario,
+                descricao=descricao_cap,
+            )
+            lanc_ids: List[int] = [por_comp[comp] for _p, comp, _v, _x in cronograma]
 
-                # LANCAMENTO na CAP com descrição genérica (mantém/povoa via COALESCE)
-                lanc_id = self._add_valor_fatura(
-                    conn,
-                    cartao_nome=cartao_nome,
-                    competencia=competencia,
-                    valor_add=float(vparc),
-                    data_evento=str(compra.date()),
-                    vencimento=str(vcto_date),
-                    usuario=usuario,
-                    descricao=descricao_cap or f"Fatura {cartao_nome} {competencia}",
-                    parcela_num=p,
-                    parcelas_total=int(parcelas),
-                )
-                lanc_ids.append(int(lanc_id))
-                total_programado = round(total_programado + float(vparc), 2)
-
-                # Item detalhado na fatura (se existir a tabela)
-                if itens_table_exists:
-                    try:
-                        cur.execute(
-                            """
-                            INSERT OR IGNORE INTO fatura_cartao_itens
-                                (purchase_uid, cartao, competencia, data_compra, descricao_compra, categoria,
-                                 parcela_num, parcelas, valor_parcela, usuario, lancamento_id)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
+            # Itens detalhados na fatura (se existir a tabela)
+            if itens_table_exists:
+                categoria_item = (f"{categoria or ''}" + (f" / {sub_categoria}" if sub_categoria else "")).strip(" /")
+                try:
+                    cur.executemany(
+                        """
+                        INSERT OR IGNORE INTO fatura_cartao_itens
+                            (purchase_uid, cartao, competencia, data_compra, descricao_compra, categoria,
+                             parcela_num, parcelas, valor_parcela, usuario, lancamento_id)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        [
                             (
                                 trans_uid,
                                 cartao_nome,
-                                competencia,
+                                comp,
                                 str(compra.date()),
                                 descricao_item or "",
-                                (f"{categoria or ''}" + (f" / {sub_categoria}" if sub_categoria else "")).strip(" /"),
+                                categoria_item,
                                 int(p),
                                 int(parcelas),
                                 float(vparc),
                                 usuario,
-                                int(lanc_id),
-                            ),
-                        )
-                    except Exception:
-                        # Não quebra programação por falha de itens (apenas log)
-                        logger.warning("Falha ao inserir item de fatura (uid=%s, parc=%s/%s)", trans_uid, p, parcelas)
+                                int(por_comp[comp]),
+                            )
+                            for p, comp, _vcto, vparc in cronograma
+                        ],
+                    )
+                except Exception:
+                    # Não quebra programação por falha de itens (apenas log)
+                    logger.warning("Falha ao inserir itens de fatura (uid=%s, parcelas=%s)", trans_uid, parcelas)
 
             # Log — padronizado (sem movimentar caixa; tipo 'registro', valor 0.0)
             obs = _fmt_obs_saida(
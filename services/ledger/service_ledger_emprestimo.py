@@ -18,11 +18,17 @@ Regras principais:
 
 Programação de empréstimo:
 - Cria N lançamentos no CAP (um por parcela), com `tipo_obrigacao='EMPRESTIMO'` e status inicial 'EM ABERTO'.
+- Cronograma FIXO/PRICE/SAC gerado de uma vez (`services.ledger.amortizacao`) e
+  gravado com `executemany` numa transação.
+- `reprogramar_emprestimo`: pré-pagamento/renegociação por diff contra as parcelas
+  ainda sem pagamento (mantém, reescreve, insere ou remove).
+- `programar_emprestimo_cadastrado`: parcelas a partir de `emprestimos_financiamentos`.
 
 Dependências (Repository):
 - listar_parcelas_em_aberto_fifo(conn, obrigacao_id)
 - aplicar_pagamento_parcela(conn, parcela_id, valor_base, juros, multa, desconto, data_evento, usuario)
-- registrar_lancamento(conn, obrigacao_id, tipo_obrigacao, valor_total, data_evento, vencimento, descricao, credor, competencia, parcela_num, parcelas_total, usuario, emprestimo_id)
+- registrar_lancamentos_lote(conn, lancamentos)
+- listar_parcelas_emprestimo / atualizar_parcelas_programadas / excluir_parcelas_programadas
 - proximo_obrigacao_id(conn)  (opcional; com fallback de MAX(obrigacao_id))
 """
 
@@ -35,14 +41,24 @@ from typing import Any, Dict, Iterator, List, Optional
 from uuid import uuid4
 import sqlite3
 
-import pandas as pd  # usado apenas para DateOffset no agendamento
-
-from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
+from repository.contas_a_pagar_mov_repository import (
+    ContasAPagarMovRepository,
+    calcular_pagamento_parcela,
+    recalcular_status_cap,
+)
+from shared.db import get_conn
+from shared.instrumentacao import medido
+from services.ledger.amortizacao import gerar_cronograma
 from services.ledger.service_ledger_infra import _fmt_obs_saida, log_mov_bancaria
 
 _EPS = 1e-9  # Tolerância numérica para comparações de ponto flutuante
 
 
+def _descricao_parcela(descricao: Optional[str], credor: Optional[str], parcela: int, total: int) -> str:
+    """Descrição da parcela: a informada ou '<credor> p/N - Empréstimo'."""
+    return (descricao or f"{credor or 'Credor'} {parcela}/{int(total)} - Empréstimo").strip()
+
+
 @dataclass
 class ResultadoParcela:
     """Snapshot resumido do efeito do pagamento em uma parcela de empréstimo.
@@ -83,6 +99,7 @@ class ServiceLedgerEmprestimo:
     # ------------------------------------------------------------------
     # Pagamento (principal pode cascatear; encargos não)
     # ------------------------------------------------------------------
+    @medido("ledger.pagar_emprestimo")
     def pagar_emprestimo(
         self,
         *,
@@ -286,6 +303,7 @@ class ServiceLedgerEmprestimo:
                     desconto=aplicar_desconto,
                     data_evento=data_evt,
                     usuario=usuario,
+                    recalcular_status=False,
                 )
 
                 saida_total_agregado = round(saida_total_agregado + float(snap["saida_total"]), 2)
@@ -307,6 +325,9 @@ class ServiceLedgerEmprestimo:
                 if restante_principal <= _EPS and aplicar_principal <= _EPS:
                     break
 
+            # Status das parcelas tocadas: um único UPDATE ao fim da transação
+            recalcular_status_cap(c, parcela_ids=[r.parcela_id for r in resultados])
+
         return {
             "trans_uid": trans_uid,
             "saida_total": float(saida_total_agregado),
@@ -315,97 +336,312 @@ class ServiceLedgerEmprestimo:
         }
 
     # ------------------------------------------------------------------
-    # Programação (criar N parcelas)
+    # Programação (cronograma inteiro em lote)
     # ------------------------------------------------------------------
+    @staticmethod
+    def _lancamentos_do_cronograma(
+        linhas: List[Dict[str, Any]],
+        *,
+        base_obrig_id: int,
+        parcelas_total: int,
+        credor: Optional[str],
+        descricao: Optional[str],
+        usuario: str,
+        emprestimo_id: Optional[int],
+    ) -> List[Dict[str, Any]]:
+        """Linhas do cronograma → kwargs de `registrar_lancamento` (uma obrigação por parcela)."""
+        return [
+            {
+                "obrigacao_id": base_obrig_id + k,
+                "tipo_obrigacao": "EMPRESTIMO",
+                "valor_total": ln["valor_parcela"],
+                "data_evento": ln["vencimento"],       # contratação pode ser vcto da 1ª parcela
+                "vencimento": ln["vencimento"],
+                "descricao": _descricao_parcela(descricao, credor, ln["parcela_num"], parcelas_total),
+                "credor": credor,
+                "competencia": ln["competencia"],      # YYYY-MM
+                "parcela_num": ln["parcela_num"],
+                "parcelas_total": parcelas_total,
+                "usuario": usuario,
+                "tipo_origem": "EMPRESTIMO",
+                "emprestimo_id": emprestimo_id,
+            }
+            for k, ln in enumerate(linhas)
+        ]
+
+    @medido("ledger.programar_emprestimo")
     def programar_emprestimo(
         self,
         *,
         credor: str,
         data_primeira_parcela: str,
         parcelas_total: int,
-        valor_parcela: float,
         usuario: str,
+        valor_parcela: Optional[float] = None,
         descricao: Optional[str] = None,
         emprestimo_id: Optional[int] = None,
+        sistema: str = "FIXO",
+        principal: Optional[float] = None,
+        taxa_juros_am: float = 0.0,
+        vencimento_dia: Optional[int] = None,
         conn: Optional[sqlite3.Connection] = None,
     ) -> List[int]:
-        """Cria N lançamentos no CAP para o empréstimo/financiamento.
+        """Cria as N parcelas do empréstimo/financiamento no CAP.
+
+        O cronograma vem de `services.ledger.amortizacao.gerar_cronograma` e é
+        gravado num único `executemany` (uma transação).
 
         Define:
-            - tipo_obrigacao='EMPRESTIMO'
+            - tipo_obrigacao='EMPRESTIMO', tipo_origem='EMPRESTIMO'
             - status inicial 'EM ABERTO'
 
         Args:
             credor: Nome do credor.
             data_primeira_parcela: Data da primeira parcela (YYYY-MM-DD).
             parcelas_total: Quantidade total de parcelas (>= 1).
-            valor_parcela: Valor de cada parcela (> 0).
             usuario: Usuário operador.
+            valor_parcela: Valor de cada parcela (> 0) no sistema 'FIXO'.
             descricao: Descrição base opcional para as parcelas.
             emprestimo_id: Identificador externo/relacional opcional.
+            sistema: 'FIXO' (padrão, parcela informada), 'PRICE' ou 'SAC'.
+            principal: Valor financiado (PRICE/SAC).
+            taxa_juros_am: Taxa mensal em % (PRICE/SAC).
+            vencimento_dia: Dia fixo de vencimento (padrão: o da 1ª parcela).
             conn: Conexão SQLite opcional. Se omitida, o serviço gerencia a transação.
 
         Returns:
             Lista de IDs dos lançamentos criados em `contas_a_pagar_mov`.
         """
-        if int(parcelas_total) < 1:
-            raise ValueError("Quantidade de parcelas inválida.")
-        if float(valor_parcela) <= 0:
-            raise ValueError("Valor da parcela deve ser > 0.")
+        cronograma = gerar_cronograma(
+            sistema=sistema,
+            parcelas=parcelas_total,
+            data_primeira_parcela=data_primeira_parcela,
+            principal=principal,
+            taxa_juros_am=taxa_juros_am,
+            valor_parcela=valor_parcela,
+            vencimento_dia=vencimento_dia,
+        )
+
+        with self._conn_ctx(conn) as c:
+            if not c.in_transaction:
+                c.execute("BEGIN IMMEDIATE")
+            # Base para obrigacao_id (compatível com o projeto)
+            base_obrig_id = int(self.cap_repo.proximo_obrigacao_id(c))
+            lancamentos = self._lancamentos_do_cronograma(
+                cronograma.linhas(),
+                base_obrig_id=base_obrig_id,
+                parcelas_total=len(cronograma),
+                credor=credor,
+                descricao=descricao,
+                usuario=usuario,
+                emprestimo_id=emprestimo_id,
+            )
+            return self.cap_repo.registrar_lancamentos_lote(c, lancamentos)
+
+    @medido("ledger.reprogramar_emprestimo")
+    def reprogramar_emprestimo(
+        self,
+        *,
+        emprestimo_id: int,
+        data_primeira_parcela: str,
+        parcelas_total: int,
+        usuario: str,
+        valor_parcela: Optional[float] = None,
+        sistema: str = "FIXO",
+        principal: Optional[float] = None,
+        taxa_juros_am: float = 0.0,
+        vencimento_dia: Optional[int] = None,
+        credor: Optional[str] = None,
+        descricao: Optional[str] = None,
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> Dict[str, Any]:
+        """Substitui o saldo do empréstimo por um novo cronograma (pré-pagamento, renegociação).
+
+        O novo cronograma (mesmos parâmetros de `programar_emprestimo`, com
+        `principal` = saldo devedor renegociado) é comparado posição a posição
+        com as parcelas **intocadas** (sem nenhum pagamento), por vencimento:
+
+            - iguais (vencimento, valor, numeração) → mantidas;
+            - diferentes → reescritas num `executemany`;
+            - parcelas novas excedentes → inseridas em lote;
+            - parcelas antigas excedentes → removidas.
+
+        Parcelas com qualquer pagamento (quitadas/parciais) ficam como estão e
+        entram só na numeração (`parcela_num` continua depois delas).
 
-        venc1 = pd.to_datetime(data_primeira_parcela)
+        Returns:
+            dict: `{mantidas, atualizadas, criadas, removidas, congeladas,
+            total, ids}` — `ids` são as parcelas do novo cronograma, em ordem.
+
+        Raises:
+            ValueError: cronograma inválido ou empréstimo sem parcelas no CAP.
+        """
+        cronograma = gerar_cronograma(
+            sistema=sistema,
+            parcelas=parcelas_total,
+            data_primeira_parcela=data_primeira_parcela,
+            principal=principal,
+            taxa_juros_am=taxa_juros_am,
+            valor_parcela=valor_parcela,
+            vencimento_dia=vencimento_dia,
+        )
 
-        ids_cap: List[int] = []
         with self._conn_ctx(conn) as c:
-            cur = c.cursor()
+            if not c.in_transaction:
+                c.execute("BEGIN IMMEDIATE")
+            atuais = self.cap_repo.listar_parcelas_emprestimo(c, int(emprestimo_id))
+            if not atuais:
+                raise ValueError(f"Empréstimo {emprestimo_id} sem parcelas programadas no CAP.")
+
+            congeladas = [p for p in atuais if not p["intocada"]]
+            livres = [p for p in atuais if p["intocada"]]
+            credor_eff = credor or next((p["credor"] for p in atuais if p["credor"]), None)
+            total = len(congeladas) + len(cronograma)
+
+            novas = self._lancamentos_do_cronograma(
+                cronograma.linhas(parcela_inicial=len(congeladas) + 1),
+                base_obrig_id=0,  # definido abaixo só para as excedentes
+                parcelas_total=total,
+                credor=credor_eff,
+                descricao=descricao,
+                usuario=usuario,
+                emprestimo_id=int(emprestimo_id),
+            )
 
-            # Base para obrigacao_id (compatível com o projeto)
-            try:
+            ids: List[int] = []
+            alteracoes: List[Dict[str, Any]] = []
+            for atual, nova in zip(livres, novas):
+                ids.append(int(atual["id"]))
+                if (
+                    str(atual["vencimento"])[:10] == nova["vencimento"]
+                    and abs(float(atual["valor_evento"]) - float(nova["valor_total"])) <= _EPS
+                    and atual["parcela_num"] == nova["parcela_num"]
+                    and atual["parcelas_total"] == total
+                    and (atual["descricao"] or None) == nova["descricao"]
+                ):
+                    continue
+                alteracoes.append({
+                    "id": int(atual["id"]),
+                    "vencimento": nova["vencimento"],
+                    "competencia": nova["competencia"],
+                    "valor_evento": nova["valor_total"],
+                    "parcela_num": nova["parcela_num"],
+                    "parcelas_total": total,
+                    "descricao": nova["descricao"],
+                })
+            self.cap_repo.atualizar_parcelas_programadas(c, alteracoes)
+
+            excedentes = novas[len(livres):]
+            if excedentes:
                 base_obrig_id = int(self.cap_repo.proximo_obrigacao_id(c))
-            except Exception:
-                row_max = cur.execute("SELECT COALESCE(MAX(obrigacao_id), 0) FROM contas_a_pagar_mov").fetchone()
-                base_obrig_id = int((row_max[0] or 0) + 1)
+                for k, lanc in enumerate(excedentes):
+                    lanc["obrigacao_id"] = base_obrig_id + k
+                ids.extend(self.cap_repo.registrar_lancamentos_lote(c, excedentes))
 
-            for p in range(1, int(parcelas_total) + 1):
-                vcto = (venc1 + pd.DateOffset(months=p - 1)).date()
-                obrig_id = base_obrig_id + (p - 1)
+            sobras = [int(p["id"]) for p in livres[len(novas):]]
+            removidas = self.cap_repo.excluir_parcelas_programadas(c, sobras)
 
-                desc_base = (descricao or f"{credor or 'Credor'} {p}/{int(parcelas_total)} - Empréstimo").strip()
+        return {
+            "mantidas": min(len(livres), len(novas)) - len(alteracoes),
+            "atualizadas": len(alteracoes),
+            "criadas": len(excedentes),
+            "removidas": removidas,
+            "congeladas": len(congeladas),
+            "total": cronograma.total,
+            "ids": ids,
+        }
 
-                lanc_id = self.cap_repo.registrar_lancamento(
-                    c,
-                    obrigacao_id=obrig_id,
-                    tipo_obrigacao="EMPRESTIMO",
-                    valor_total=float(valor_parcela),
-                    data_evento=str(vcto),       # contratação pode ser vcto da 1ª parcela
-                    vencimento=str(vcto),
-                    descricao=desc_base,
-                    credor=credor,
-                    competencia=str(vcto)[:7],   # YYYY-MM
-                    parcela_num=p,
-                    parcelas_total=int(parcelas_total),
-                    usuario=usuario,
-                    emprestimo_id=emprestimo_id,
+    @medido("ledger.programar_emprestimo_cadastrado")
+    def programar_emprestimo_cadastrado(
+        self,
+        *,
+        emprestimo_id: int,
+        usuario: str,
+        conn: Optional[sqlite3.Connection] = None,
+    ) -> Dict[str, Any]:
+        """Programa (ou reprograma) no CAP o empréstimo de `emprestimos_financiamentos`.
+
+        - `valor_parcela` informado → sistema FIXO; senão PRICE sobre
+          `valor_total` com `taxa_juros_am` (taxa zero = divisão igual).
+        - 1º vencimento: mês de `data_inicio_pagamento` (ou da contratação) no
+          `vencimento_dia` cadastrado.
+        - As `parcelas_pagas` iniciais (pagas fora do sistema) entram quitadas.
+        - Se o empréstimo já tem parcelas no CAP, aplica `reprogramar_emprestimo`
+          ao restante do contrato (parcelas depois das que já têm pagamento).
+
+        Returns:
+            dict: `{criadas, ajustes_quitadas, ids, ...}`.
+        """
+        with self._conn_ctx(conn) as c:
+            if not c.in_transaction:
+                c.execute("BEGIN IMMEDIATE")
+            cur = c.cursor()
+            cur.row_factory = sqlite3.Row
+            emp = cur.execute(
+                "SELECT * FROM emprestimos_financiamentos WHERE id = ?", (int(emprestimo_id),)
+            ).fetchone()
+            if emp is None:
+                raise ValueError(f"Empréstimo {emprestimo_id} não encontrado.")
+
+            vp = float(emp["valor_parcela"] or 0.0)
+            inicio = str(emp["data_inicio_pagamento"] or emp["data_contratacao"])[:10]
+            termos: Dict[str, Any] = dict(
+                sistema="FIXO" if vp > 0 else "PRICE",
+                valor_parcela=vp if vp > 0 else None,
+                principal=float(emp["valor_total"] or 0.0),
+                taxa_juros_am=float(emp["taxa_juros_am"] or 0.0),
+                vencimento_dia=int(emp["vencimento_dia"] or 0) or int(inicio[8:10]),
+            )
+            params: Dict[str, Any] = dict(
+                usuario=usuario,
+                credor=str(emp["banco"] or "") or None,
+                descricao=(str(emp["descricao"] or "").strip() or None),
+                conn=c,
+            )
+
+            atuais = self.cap_repo.listar_parcelas_emprestimo(c, int(emprestimo_id))
+            if atuais:
+                # Já programado: reprograma só a cauda do contrato, depois das
+                # parcelas que já têm pagamento
+                completo = gerar_cronograma(
+                    parcelas=int(emp["parcelas_total"]), data_primeira_parcela=inicio, **termos
+                )
+                pagas = sum(1 for p in atuais if not p["intocada"])
+                if pagas >= len(completo):
+                    livres = [int(p["id"]) for p in atuais if p["intocada"]]
+                    removidas = self.cap_repo.excluir_parcelas_programadas(c, livres)
+                    return {"mantidas": 0, "atualizadas": 0, "criadas": 0, "removidas": removidas,
+                            "congeladas": pagas, "total": 0.0, "ids": [], "ajustes_quitadas": 0}
+                if pagas:
+                    termos["principal"] = float(completo.saldo_devedor[pagas - 1])
+                res = self.reprogramar_emprestimo(
+                    emprestimo_id=int(emprestimo_id),
+                    parcelas_total=len(completo) - pagas,
+                    data_primeira_parcela=completo.vencimentos_iso()[pagas],
+                    **termos,
+                    **params,
                 )
-                ids_cap.append(int(lanc_id))
-
-            # Marcar origem/status
-            cur.execute(
-                """
-                UPDATE contas_a_pagar_mov
-                   SET tipo_origem='EMPRESTIMO',
-                       cartao_id=NULL,
-                       status = CASE
-                                  WHEN COALESCE(NULLIF(status,''), '') = ''
-                                  THEN 'EM ABERTO' ELSE UPPER(status)
-                                END
-                 WHERE obrigacao_id BETWEEN ? AND ?
-                   AND categoria_evento = 'LANCAMENTO'
-                """,
-                (base_obrig_id, base_obrig_id + int(parcelas_total) - 1),
+                return {**res, "ajustes_quitadas": 0}
+
+            ids = self.programar_emprestimo(
+                emprestimo_id=int(emprestimo_id),
+                parcelas_total=int(emp["parcelas_total"]),
+                data_primeira_parcela=inicio,
+                **termos,
+                **params,
             )
 
-        return ids_cap
+            # Parcelas pagas antes do cadastro: quitadas no vencimento
+            pagas = min(int(emp["parcelas_pagas"] or 0), len(ids))
+            estados = []
+            for p in self.cap_repo.listar_parcelas_emprestimo(c, int(emprestimo_id))[:pagas]:
+                snap = calcular_pagamento_parcela(p, principal=float(p["valor_evento"]))
+                estados.append((int(p["id"]), snap, str(p["vencimento"])[:10]))
+            self.cap_repo.gravar_acumulados(c, estados)
+            if estados:
+                recalcular_status_cap(c, parcela_ids=[pid for pid, _s, _d in estados])
+
+        return {"criadas": len(ids), "ajustes_quitadas": len(estados), "ids": ids}
 
     # ------------------------------------------------------------------
     # Utilitário interno: contexto de conexão/commit
@@ -415,7 +651,8 @@ class ServiceLedgerEmprestimo:
         """Gerencia a conexão SQLite.
 
         Se `conn` for fornecida, a função apenas a reutiliza (sem fechar/commit).
-        Caso contrário, abre uma conexão nova, faz commit e fecha ao final.
+        Caso contrário, usa a conexão do pool (`get_conn`), com commit ao final
+        (ou rollback em caso de erro).
 
         Args:
             conn: Conexão SQLite existente (opcional).
@@ -426,12 +663,8 @@ class ServiceLedgerEmprestimo:
         if conn is not None:
             yield conn
         else:
-            c = sqlite3.connect(self.db_path)
-            try:
+            with get_conn(self.db_path) as c:
                 yield c
-            finally:
-                c.commit()
-                c.close()
 
 
 # Compatibilidade com código legado que importava um "mixin"
@@ -31,7 +31,10 @@ from typing import Any, Dict, Iterator, List, Optional
 from uuid import uuid4
 import sqlite3
 
-from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
+from shared.db import get_conn
+from shared.instrumentacao import medido
+
+from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository, recalcular_status_cap
 # Utilitários de infra para padronizar logs de movimentação
 from services.ledger.service_ledger_infra import _ensure_mov_cols, _fmt_obs_saida
 
@@ -73,6 +76,7 @@ class ServiceLedgerFatura:
     # ------------------------------------------------------------------
     # API compatível com o helper legado (_pagar_fatura_por_obrigacao)
     # ------------------------------------------------------------------
+    @medido("ledger.pagar_fatura_cartao")
     def pagar_fatura_cartao(self, *args, **kwargs) -> Dict[str, Any]:
         """
         Wrapper compatível:
@@ -297,6 +301,7 @@ class ServiceLedgerFatura:
                     desconto=aplicar_desconto,
                     data_evento=data_evt,
                     usuario=usuario,
+                    recalcular_status=False,
                 )
 
                 saida_total_agregado = round(saida_total_agregado + float(snap["saida_total"]), 2)
@@ -317,6 +322,9 @@ class ServiceLedgerFatura:
                 if restante_principal <= _EPS and aplicar_principal <= _EPS:
                     break
 
+            # Status das parcelas tocadas: um único UPDATE ao fim da transação
+            recalcular_status_cap(c, parcela_ids=[r.parcela_id for r in resultados])
+
         return {
             "trans_uid": trans_uid,
             "saida_total": float(saida_total_agregado),  # dinheiro que sai: principal + juros + multa
@@ -336,16 +344,12 @@ class ServiceLedgerFatura:
     # ------------------------------------------------------------------
     @contextmanager
     def _conn_ctx(self, conn: Optional[sqlite3.Connection]) -> Iterator[sqlite3.Connection]:
-        """Gerencia a conexão SQLite (reusa a existente ou cria/commita/fecha)."""
+        """Gerencia a conexão SQLite (reusa a existente ou usa a do pool com commit/rollback)."""
         if conn is not None:
             yield conn
         else:
-            c = sqlite3.connect(self.db_path)
-            try:
+            with get_conn(self.db_path) as c:
                 yield c
-            finally:
-                c.commit()
-                c.close()
 
 
 # --- Retrocompat (mantém nomes esperados por imports antigos) ---
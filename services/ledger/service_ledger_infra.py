@@ -3,7 +3,7 @@ Infraestrutura do Ledger.
 
 Utilitários comuns para serviços do Ledger:
 - Garantir linhas em `saldos_caixas` e `saldos_bancos`.
-- Criar/ajustar colunas dinâmicas de bancos de forma segura.
+- Ajustar saldos de bancos via `repository.saldos_bancos_repository` (engine wide/long).
 - Helpers de data (somar meses preservando fim de mês; competência de cartão).
 - Helper para padronizar a coluna `observacao` (saídas).
 - Helper para registrar linhas padronizadas em `movimentacoes_bancarias` (com idempotência por trans_uid).
@@ -31,7 +31,6 @@ import calendar
 import hashlib
 import logging
 import os
-import re
 import sqlite3
 import sys
 import unicodedata
@@ -45,6 +44,13 @@ _PROJECT_ROOT = os.path.abspath(os.path.join(_CURRENT_DIR, "..", ".."))
 if _PROJECT_ROOT not in sys.path:
     sys.path.insert(0, _PROJECT_ROOT)
 
+from repository.saldos_bancos_repository import (  # noqa: E402
+    ajustar_saldo_banco,
+    garantir_linha_saldos_bancos,
+    validar_nome_banco,
+)
+from shared.schema import garantir_colunas  # noqa: E402
+
 logger = logging.getLogger(__name__)
 
 __all__ = [
@@ -76,21 +82,13 @@ class _InfraLedgerMixin:
             logger.debug("Criada linha em saldos_caixas para data=%s", data)
 
     def _garantir_linha_saldos_bancos(self, conn: sqlite3.Connection, data: str) -> None:
-        """Garante a existência da linha em `saldos_bancos` para a data."""
-        cur = conn.execute("SELECT 1 FROM saldos_bancos WHERE data = ? LIMIT 1", (data,))
-        if not cur.fetchone():
-            conn.execute("INSERT OR IGNORE INTO saldos_bancos (data) VALUES (?)", (data,))
-            logger.debug("Criada linha em saldos_bancos para data=%s", data)
+        """Garante a existência da linha em `saldos_bancos` para a data (engine wide)."""
+        garantir_linha_saldos_bancos(conn, data)
 
     # --------- validação segura de nome de coluna (bancos dinâmicos) --------
-    _COL_RE = re.compile(r"^[A-Za-z0-9_ ]{1,64}$")  # letras, números, underscore e espaço
-
     def _validar_nome_coluna_banco(self, banco_col: str) -> str:
-        """Valida o nome da coluna de banco (whitelist) e retorna a versão segura."""
-        banco_col = (banco_col or "").strip()
-        if not self._COL_RE.match(banco_col):
-            raise ValueError(f"Nome de coluna de banco inválido: {banco_col!r}")
-        return banco_col
+        """Valida o nome da coluna de banco (ver `validar_nome_banco`) e retorna a versão segura."""
+        return validar_nome_banco(banco_col)
 
     def _ajustar_banco_dynamic(
         self,
@@ -99,28 +97,14 @@ class _InfraLedgerMixin:
         delta: float,
         data: str,
     ) -> None:
-        """Ajusta dinamicamente a coluna do banco em `saldos_bancos`.
+        """Ajusta o saldo do banco em `saldos_bancos` (engine wide ou long).
 
-        - Cria a coluna do banco se não existir (DEFAULT 0.0).
-        - Garante a linha do dia.
-        - Aplica o `delta` na coluna.
+        - Garante o banco no armazenamento (coluna wide / view long) só na 1ª vez.
+        - Aplica o `delta` na data (update na wide / upsert na long).
+        - Atualiza incrementalmente `saldos_bancos_acumulado`.
         """
         banco_col = self._validar_nome_coluna_banco(banco_col)
-
-        # garante existência da coluna
-        cols = [r[1] for r in conn.execute("PRAGMA table_info(saldos_bancos)").fetchall()]
-        if banco_col not in cols:
-            conn.execute(f'ALTER TABLE saldos_bancos ADD COLUMN "{banco_col}" REAL DEFAULT 0.0;')
-            logger.debug("Criada coluna dinâmica em saldos_bancos: %s", banco_col)
-
-        # garante a linha do dia
-        self._garantir_linha_saldos_bancos(conn, data)
-
-        # aplica o delta
-        conn.execute(
-            f'UPDATE saldos_bancos SET "{banco_col}" = COALESCE("{banco_col}",0) + ? WHERE data = ?',
-            (float(delta), data),
-        )
+        ajustar_saldo_banco(conn, data, banco_col, delta)
         logger.debug("Ajustado banco_col=%s em %s com delta=%.2f", banco_col, data, float(delta))
 
     # ------------------------------------------------------------------
@@ -248,15 +232,18 @@ def _resolve_usuario(u: Any) -> str:
 
 
 def _ensure_mov_cols(cur: sqlite3.Cursor) -> None:
-    """Garante colunas em `movimentacoes_bancarias` (idempotente): usuario, data_hora, trans_uid."""
-    cols = {row[1] for row in cur.execute("PRAGMA table_info(movimentacoes_bancarias);").fetchall()}
-    if "usuario" not in cols:
-        cur.execute("ALTER TABLE movimentacoes_bancarias ADD COLUMN usuario TEXT;")
-    if "data_hora" not in cols:
-        cur.execute("ALTER TABLE movimentacoes_bancarias ADD COLUMN data_hora TEXT;")
-    if "trans_uid" not in cols:
-        # sem UNIQUE aqui para compatibilidade com bancos mais antigos
-        cur.execute("ALTER TABLE movimentacoes_bancarias ADD COLUMN trans_uid TEXT;")
+    """
+    Garante colunas em `movimentacoes_bancarias` (idempotente): usuario, data_hora, trans_uid.
+
+    Consulta o registro de schema em cache (sem PRAGMA por chamada); em bases já
+    migradas na inicialização (`executar_migracoes`) não executa DDL.
+    """
+    # trans_uid sem UNIQUE aqui para compatibilidade com bancos mais antigos
+    garantir_colunas(
+        cur.connection,
+        "movimentacoes_bancarias",
+        {"usuario": "TEXT", "data_hora": "TEXT", "trans_uid": "TEXT"},
+    )
 
 
 # === ID: helpers de UID/idempotência =========================================
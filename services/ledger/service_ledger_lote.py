@@ -0,0 +1,427 @@
+# services/ledger/service_ledger_lote.py
+"""
+Pagamento em Lote (CAP)
+=======================
+
+Paga várias parcelas do CAP (boletos, empréstimos, faturas) numa única
+operação atômica — ex.: a rodada de pagamentos do fim do mês.
+
+Funcionalidades principais
+--------------------------
+- `pagar_em_lote(itens, usuario=...)`: cada item é
+  `(obrigacao_id, principal, juros, multa, desconto, banco, data)` (tupla, dict
+  ou `ItemPagamento`); devolve o resultado por item.
+- Cada item equivale a um `registrar_saida_*` com obrigação: linha em `saida`,
+  rateio FIFO no CAP, ajuste do saldo (caixa ou banco) e uma linha em
+  `movimentacoes_bancarias` (com observação de sobra, se houver).
+- Tudo ou nada (padrão): se algum item for rejeitado, nada é gravado.
+  Aplicação parcial (só os itens válidos) é opt-in: `tudo_ou_nada=False`.
+
+Detalhes técnicos
+-----------------
+- Uma transação (`BEGIN IMMEDIATE`): leitura das parcelas em aberto de todas
+  as obrigações numa consulta, rateio **em memória** (mesma regra de
+  `_pagar_core` dos serviços de boleto/fatura/empréstimo, via
+  `calcular_pagamento_parcela`) e gravação em bloco:
+  acumuladores num `executemany`, status num único `recalcular_status_cap`,
+  encargos de cada item em `cap_encargos_eventos` (data do item), saldos
+  somados por (data, caixa/banco).
+- Itens da mesma obrigação encadeiam: o segundo enxerga o que o primeiro pagou.
+- Idempotência por `trans_uid` (determinístico pelos campos do item quando não
+  informado): item já registrado (ou repetido no lote) é rejeitado.
+- `banco` = 'Caixa'/'Caixa 2' → DINHEIRO (saldos_caixas); outro nome → PIX ou
+  DÉBITO (saldos_bancos). Sem `banco`: Caixa.
+
+Dependências
+------------
+- repository.contas_a_pagar_mov_repository
+- services.ledger.service_ledger_infra (saldos, log de movimentação)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from collections import defaultdict
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from repository.contas_a_pagar_mov_repository import (
+    calcular_pagamento_parcela,
+    recalcular_status_cap,
+    registrar_encargos_eventos,
+)
+from services.ledger.service_ledger_infra import _fmt_obs_saida, gerar_trans_uid, log_mov_bancaria
+from shared.db import get_conn
+from shared.instrumentacao import medido
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ItemPagamento", "_LoteLedgerMixin"]
+
+_EPS = 1e-9          # tolerância do rateio (a mesma dos `_pagar_core`)
+_EPS_ABERTO = 0.005  # “em aberto” = principal faltante acima disto (índices parciais do CAP)
+
+_CAIXAS = {"Caixa": "caixa", "Caixa 2": "caixa_2"}
+
+_CATEGORIA_PADRAO = {
+    "FATURA_CARTAO": "Fatura Cartão de Crédito",
+    "BOLETO": "Pagamento de Boleto",
+    "EMPRESTIMO": "Pagamento de Empréstimo",
+}
+
+
+@dataclass(frozen=True)
+class ItemPagamento:
+    """Um pagamento do lote (campos além dos 7 primeiros são opcionais)."""
+
+    obrigacao_id: int
+    principal: float = 0.0
+    juros: float = 0.0
+    multa: float = 0.0
+    desconto: float = 0.0
+    banco: Optional[str] = None      # 'Caixa'/'Caixa 2' ou nome do banco
+    data: Optional[str] = None       # padrão: hoje
+    forma: Optional[str] = None      # PIX | DÉBITO (banco); padrão PIX
+    categoria: Optional[str] = None  # padrão pelo tipo da obrigação
+    sub_categoria: Optional[str] = None
+    descricao: Optional[str] = None
+    trans_uid: Optional[str] = None
+
+    @classmethod
+    def de(cls, item: Any) -> "ItemPagamento":
+        """Aceita `ItemPagamento`, dict ou tupla/lista posicional."""
+        if isinstance(item, cls):
+            return item
+        if isinstance(item, Mapping):
+            nomes = {f.name for f in fields(cls)}
+            return cls(**{k: v for k, v in item.items() if k in nomes})
+        if isinstance(item, (tuple, list)):
+            return cls(*item)
+        raise TypeError(f"Item de pagamento inválido: {item!r}")
+
+
+class _LoteLedgerMixin:
+    """Pagamento de várias obrigações do CAP numa única transação."""
+
+    @medido("ledger.pagar_em_lote")
+    def pagar_em_lote(
+        self,
+        itens: Iterable[Any],
+        *,
+        usuario: str = "-",
+        tudo_ou_nada: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        Aplica os pagamentos na ordem recebida, numa transação.
+
+        Args:
+            itens: `(obrigacao_id, principal, juros, multa, desconto, banco, data)`
+                por item (tupla, dict ou `ItemPagamento`).
+            usuario: Operador gravado em `saida`/`movimentacoes_bancarias`.
+            tudo_ou_nada: Se True (padrão), qualquer item rejeitado cancela o
+                lote; False grava os itens válidos e devolve os rejeitados.
+
+        Returns:
+            dict: `ok` (todos aplicados), `aplicados`, `rejeitados`,
+            `saida_total` e `itens` — por item: `indice, ok, obrigacao_id,
+            tipo_obrigacao, trans_uid, saida_total, sobra, resultados
+            (por parcela), ids {id_saida, id_mov}` e `mensagem` se rejeitado.
+        """
+        lote = [ItemPagamento.de(i) for i in itens]
+        usuario_s = self._sane(usuario) or "-"
+
+        with get_conn(self.db_path) as conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            planos, tocadas = self._planejar_lote(conn, lote, usuario_s)
+            rejeitados = sum(1 for p in planos if not p["ok"])
+
+            if rejeitados and tudo_ou_nada:
+                for p in planos:
+                    if p["ok"]:
+                        p.update(
+                            ok=False,
+                            saida_total=0.0,
+                            sobra=0.0,
+                            resultados=[],
+                            mensagem="Lote cancelado (tudo_ou_nada): outro item foi rejeitado.",
+                        )
+                return self._resumo_lote(planos)
+
+            self._gravar_lote(conn, planos, tocadas, usuario_s)
+
+        logger.debug("pagar_em_lote: %d itens, %d rejeitados", len(planos), rejeitados)
+        return self._resumo_lote(planos)
+
+    # ------------------------------------------------------------------
+    # Planejamento (memória)
+    # ------------------------------------------------------------------
+    def _planejar_lote(
+        self,
+        conn: sqlite3.Connection,
+        lote: List[ItemPagamento],
+        usuario: str,
+    ) -> Tuple[List[Dict[str, Any]], Dict[int, Tuple[Dict[str, Any], str]]]:
+        """Rateio FIFO de todos os itens; devolve (planos, {parcela_id: (estado, data)})."""
+        abertas = self.cap_repo.listar_parcelas_em_aberto_lote(conn, [it.obrigacao_id for it in lote])
+
+        planos: List[Dict[str, Any]] = []
+        uids: List[str] = []
+        for idx, it in enumerate(lote):
+            plano: Dict[str, Any] = {
+                "indice": idx,
+                "ok": False,
+                "obrigacao_id": int(it.obrigacao_id),
+                "tipo_obrigacao": None,
+                "trans_uid": None,
+                "saida_total": 0.0,
+                "sobra": 0.0,
+                "resultados": [],
+                "ids": {"id_saida": None, "id_mov": None},
+            }
+            planos.append(plano)
+            try:
+                plano.update(self._normalizar_item(it, usuario))
+            except ValueError as e:
+                plano["mensagem"] = str(e)
+            uids.append(plano["trans_uid"] or "")
+
+        existentes = self._uids_existentes(conn, [u for u in uids if u])
+        vistos: set = set()
+        tocadas: Dict[int, Tuple[Dict[str, Any], str]] = {}
+
+        for plano in planos:
+            if plano.get("mensagem"):
+                continue
+            uid = plano["trans_uid"]
+            if uid in existentes or uid in vistos:
+                plano["mensagem"] = f"trans_uid já registrado ({uid})."
+                continue
+            parcelas = [
+                p for p in abertas.get(plano["obrigacao_id"], [])
+                if float(p["valor_evento"]) - float(p["principal_pago_acumulado"]) > _EPS_ABERTO
+            ]
+            if not parcelas:
+                plano["mensagem"] = "Nenhuma parcela em aberto para esta obrigação."
+                continue
+
+            vistos.add(uid)
+            plano["tipo_obrigacao"] = parcelas[0]["tipo_obrigacao"] or None
+            self._ratear(plano, parcelas, tocadas)
+            plano["ok"] = True
+        return planos, tocadas
+
+    def _normalizar_item(self, it: ItemPagamento, usuario: str) -> Dict[str, Any]:
+        """Valida/normaliza um item (ValueError = item rejeitado)."""
+        data = self._parse_date(it.data)
+        origem = self._sane(it.banco) or "Caixa"
+        principal = max(0.0, self._parse_money(it.principal))
+        juros = max(0.0, self._parse_money(it.juros))
+        multa = max(0.0, self._parse_money(it.multa))
+        desconto = max(0.0, self._parse_money(it.desconto))
+        if principal + juros + multa <= 0:
+            raise ValueError("Valor deve ser maior que zero.")
+
+        forma = (self._sane(it.forma) or "").upper().replace("DEBITO", "DÉBITO")
+        if origem in _CAIXAS:
+            if forma not in ("", "DINHEIRO"):
+                raise ValueError(f"Forma {forma} inválida para pagamento pelo {origem}.")
+            forma = "DINHEIRO"
+        else:
+            if forma in ("", "PIX"):
+                forma = "PIX"
+            elif forma != "DÉBITO":
+                raise ValueError(f"Forma {forma or '-'} inválida para pagamento pelo banco {origem}.")
+            self._validar_nome_coluna_banco(origem)
+
+        seed = (
+            f"LOTE|{int(it.obrigacao_id)}|{data}|{principal:.2f}|{juros:.2f}|{multa:.2f}|{desconto:.2f}"
+            f"|{origem}|{forma}|{usuario}"
+        )
+        return {
+            "data": data,
+            "origem": origem,
+            "forma": forma,
+            "principal": principal,
+            "juros": juros,
+            "multa": multa,
+            "desconto": desconto,
+            "categoria": self._sane(it.categoria),
+            "sub_categoria": self._sane(it.sub_categoria) or "-",
+            "descricao": self._sane(it.descricao),
+            "trans_uid": str(it.trans_uid or gerar_trans_uid("mb", seed=seed)),
+        }
+
+    @staticmethod
+    def _uids_existentes(conn: sqlite3.Connection, uids: List[str]) -> set:
+        if not uids:
+            return set()
+        rows = conn.execute(
+            "SELECT trans_uid FROM movimentacoes_bancarias WHERE trans_uid IN (SELECT value FROM json_each(?))",
+            (json.dumps(sorted(set(uids))),),
+        ).fetchall()
+        return {r[0] for r in rows}
+
+    @staticmethod
+    def _ratear(
+        plano: Dict[str, Any],
+        parcelas: List[Dict[str, Any]],
+        tocadas: Dict[int, Tuple[Dict[str, Any], str]],
+    ) -> None:
+        """FIFO do `_pagar_core`: principal em cascata; encargos na 1ª parcela aberta."""
+        restante = plano["principal"]
+        encargos = {"juros": plano["juros"], "multa": plano["multa"], "desconto": plano["desconto"]}
+        primeira = True
+        saida_total = 0.0
+        aplicado_principal = 0.0
+
+        for p in parcelas:
+            if restante <= _EPS and not primeira:
+                break
+            faltante = float(p["valor_evento"]) - float(p["principal_pago_acumulado"])
+            aplicar = min(restante, max(0.0, faltante))
+            restante = round(restante - aplicar, 2)
+            if primeira:
+                enc, encargos, primeira = encargos, {"juros": 0.0, "multa": 0.0, "desconto": 0.0}, False
+            else:
+                enc = {"juros": 0.0, "multa": 0.0, "desconto": 0.0}
+
+            calc = calcular_pagamento_parcela(p, principal=aplicar, **enc)
+            for chave in (
+                "principal_pago_acumulado",
+                "juros_pago_acumulado",
+                "multa_paga_acumulada",
+                "desconto_aplicado_acumulado",
+                "valor_pago_acumulado",
+            ):
+                p[chave] = calc[chave]
+            tocadas[int(p["parcela_id"])] = (p, plano["data"])
+
+            saida_total = round(saida_total + calc["saida_total"], 2)
+            aplicado_principal += calc["principal_aplicado"]
+            plano["resultados"].append(
+                {
+                    "parcela_id": int(p["parcela_id"]),
+                    "aplicado_principal": calc["principal_aplicado"],
+                    "aplicado_juros": calc["juros_aplicado"],
+                    "aplicado_multa": calc["multa_aplicada"],
+                    "aplicado_desconto": calc["desconto_aplicado"],
+                    "saida_total": calc["saida_total"],
+                    "status": calc["status"],
+                    "restante_principal": calc["restante"],
+                }
+            )
+            if restante <= _EPS and aplicar <= _EPS:
+                break
+
+        plano["saida_total"] = float(saida_total)
+        # Mesma regra das saídas com obrigação: principal informado que não amortizou nada
+        plano["sobra"] = max(0.0, round(plano["principal"] - aplicado_principal, 2))
+
+    # ------------------------------------------------------------------
+    # Gravação (uma transação)
+    # ------------------------------------------------------------------
+    def _gravar_lote(
+        self,
+        conn: sqlite3.Connection,
+        planos: List[Dict[str, Any]],
+        tocadas: Dict[int, Tuple[Dict[str, Any], str]],
+        usuario: str,
+    ) -> None:
+        # (1) CAP: acumuladores em bloco + status num único UPDATE
+        self.cap_repo.gravar_acumulados(conn, [(pid, estado, data) for pid, (estado, data) in tocadas.items()])
+        recalcular_status_cap(conn, parcela_ids=list(tocadas))
+        # encargos por item (a parcela paga duas vezes no lote tem dois eventos)
+        registrar_encargos_eventos(
+            conn,
+            [
+                (r["parcela_id"], plano["data"], r["aplicado_juros"], r["aplicado_multa"], r["aplicado_desconto"])
+                for plano in planos
+                if plano["ok"]
+                for r in plano["resultados"]
+            ],
+        )
+
+        cur = conn.cursor()
+        caixas: Dict[Tuple[str, str], float] = defaultdict(float)
+        bancos: Dict[Tuple[str, str], float] = defaultdict(float)
+        agora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        for plano in planos:
+            if not plano["ok"]:
+                continue
+            tipo = plano["tipo_obrigacao"] or ""
+            categoria = plano["categoria"] or _CATEGORIA_PADRAO.get(tipo, tipo or "-")
+            descricao = plano["descricao"] or f"Pagamento {tipo.lower() or 'obrigação'} (obrigação {plano['obrigacao_id']})"
+            dinheiro = plano["forma"] == "DINHEIRO"
+
+            # (2) saida (Valor = principal informado, como em registrar_saida_*)
+            cur.execute(
+                """
+                INSERT INTO saida (Data, Categoria, Sub_Categoria, Descricao,
+                                   Forma_de_Pagamento, Parcelas, Valor, Usuario,
+                                   Origem_Dinheiro, Banco_Saida)
+                VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?, ?)
+                """,
+                (
+                    plano["data"], categoria, plano["sub_categoria"], descricao, plano["forma"],
+                    float(plano["principal"]), usuario,
+                    plano["origem"] if dinheiro else "", "" if dinheiro else plano["origem"],
+                ),
+            )
+            id_saida = int(cur.lastrowid)
+
+            # (3) saldos: acumulados por (data, caixa/banco)
+            destino = caixas if dinheiro else bancos
+            destino[(plano["data"], plano["origem"])] += plano["saida_total"]
+
+            # (4) movimentação bancária
+            obs = _fmt_obs_saida(
+                forma=plano["forma"],
+                valor=plano["saida_total"],
+                categoria=categoria,
+                subcategoria=plano["sub_categoria"],
+                descricao=descricao,
+                banco=(plano["origem"] if plano["forma"] == "DÉBITO" else None),
+            )
+            id_mov = log_mov_bancaria(
+                conn,
+                data=plano["data"],
+                banco=plano["origem"],
+                tipo="saida",
+                valor=plano["saida_total"],
+                origem="saidas",
+                observacao=obs,
+                usuario=usuario,
+                referencia_id=id_saida,
+                referencia_tabela="saida",
+                trans_uid=plano["trans_uid"],
+                data_hora=agora,
+            )
+            self._registrar_sobra_obs(cur, id_mov, plano["sobra"])
+            plano["ids"] = {"id_saida": id_saida, "id_mov": id_mov}
+
+        for (data, origem), total in caixas.items():
+            col = _CAIXAS[origem]
+            self._garantir_linha_saldos_caixas(conn, data)
+            cur.execute(f"UPDATE saldos_caixas SET {col} = COALESCE({col},0) - ? WHERE data = ?", (round(total, 2), data))
+        for (data, banco), total in bancos.items():
+            self._garantir_linha_saldos_bancos(conn, data)
+            self._ajustar_banco_dynamic(conn, banco_col=banco, delta=-round(total, 2), data=data)
+
+    @staticmethod
+    def _resumo_lote(planos: List[Dict[str, Any]]) -> Dict[str, Any]:
+        internos = ("data", "origem", "forma", "principal", "juros", "multa", "desconto",
+                    "categoria", "sub_categoria", "descricao")
+        itens = [{k: v for k, v in p.items() if k not in internos} for p in planos]
+        aplicados = [p for p in planos if p["ok"]]
+        return {
+            "ok": len(aplicados) == len(planos),
+            "aplicados": len(aplicados),
+            "rejeitados": len(planos) - len(aplicados),
+            "saida_total": round(sum(p["saida_total"] for p in aplicados), 2),
+            "itens": itens,
+        }
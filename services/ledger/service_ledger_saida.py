@@ -10,7 +10,8 @@ Saídas (dinheiro, bancária e crédito)
 
 - CRÉDITO:
   * NÃO mexe em `saida` nem nos saldos agora
-  * Cria itens em `fatura_cartao_itens` (um por parcela)
+  * Desvia para `registrar_saida_credito` (`_CreditoLedgerMixin`): LANCAMENTO
+    da fatura por competência na CAP + itens em `fatura_cartao_itens`
   * Loga em MB como `tipo='registro'` com valor 0 (informativo)
   * CAP/Fatura cuidam do pagamento futuro da fatura
 
@@ -41,11 +42,13 @@ if _PROJECT_ROOT not in sys.path:
 # Internos
 from shared.db import get_conn  # noqa: E402
 from shared.ids import sanitize  # noqa: E402
+from shared.instrumentacao import medido  # noqa: E402
 from services.ledger.service_ledger_infra import (  # noqa: E402
     _fmt_obs_saida,
     log_mov_bancaria,
     gerar_trans_uid,
 )
+from services.ledger import container  # noqa: E402
 from services.ledger.service_ledger_boleto import ServiceLedgerBoleto  # noqa: E402
 from services.ledger.service_ledger_fatura import ServiceLedgerFatura  # noqa: E402
 
@@ -162,10 +165,10 @@ class _SaidasLedgerMixin:
     # -------------------------- Helpers de services --------------------------
 
     def _svc_boleto(self) -> ServiceLedgerBoleto:
-        return ServiceLedgerBoleto(self.db_path)
+        return container.obter(self.db_path).boleto
 
     def _svc_fatura(self) -> ServiceLedgerFatura:
-        return ServiceLedgerFatura(self.db_path)
+        return container.obter(self.db_path).fatura
 
     # ------------------------- API de compatibilidade -------------------------
 
@@ -655,106 +658,3 @@ class _SaidasLedgerMixin:
                 id_saida, id_mov, saida_total, sobra_reg, (tipo_eff or "-"), (obrigacao_id or "-"),
             )
             return (id_saida, id_mov)
-
-    # ------------------------ CRÉDITO: Fatura + MB registro ------------------------
-
-    def registrar_saida_credito(
-        self,
-        *,
-        data_compra: str,
-        valor: float,
-        parcelas: int,
-        cartao_nome: str,
-        categoria: Optional[str],
-        sub_categoria: Optional[str],
-        descricao: Optional[str],
-        usuario: str,
-        fechamento: int = 0,  # compat (não usado aqui)
-        vencimento: int = 0,  # compat (não usado aqui)
-        trans_uid: Optional[str] = None,
-    ) -> tuple[list[int], int]:
-        """
-        Compra no CARTÃO:
-          - Cria itens em `fatura_cartao_itens` (um por parcela).
-          - Loga em MB como 'registro' (valor=0.0).
-          - NÃO mexe em saldos de bancos/caixas aqui.
-
-        Retorna: (ids_itens_fatura, id_mov_mb)
-        """
-        # Import local para manter o arquivo autossuficiente
-        from repository.fatura_cartao_itens_repository import FaturaCartaoItensRepository
-        from hashlib import sha256
-
-        # -------- sane inputs --------
-        data_compra = self._parse_date(data_compra)
-        cartao_nome_s = self._sane(cartao_nome) or "Cartão"
-        categoria_s = self._sane(categoria) or "-"
-        subcat_s = self._sane(sub_categoria) or "-"
-        desc_s = self._sane(descricao) or "-"
-        usuario_s = self._sane(usuario) or "-"
-
-        # -------- parcelas e valores --------
-        p = max(1, int(parcelas or 1))
-        total = float(valor)
-        if total <= 0:
-            raise ValueError("Valor total da compra no crédito deve ser > 0.")
-
-        base = round((total / p), 2)
-        valores = [base] * p
-        ajuste = round(total - (base * p), 2)
-        if abs(ajuste) >= 0.01:
-            valores[-1] = round(valores[-1] + ajuste, 2)
-
-        # -------- UID por compra (compartilhado entre as parcelas) --------
-        seed = f"{cartao_nome_s}|{data_compra}|{desc_s}|{p}"
-        purchase_uid = sha256(seed.encode("utf-8")).hexdigest()
-
-        # -------- inserir itens na fatura --------
-        repo_fci = FaturaCartaoItensRepository(self.db_path)
-        ids_itens: list[int] = []
-        for i in range(1, p + 1):
-            item_id = repo_fci.inserir_item(
-                data_compra=data_compra,
-                cartao=cartao_nome_s,
-                descricao_compra=desc_s,
-                parcela_num=i,
-                parcelas=p,
-                valor_parcela=valores[i - 1],
-                categoria=categoria_s,
-                purchase_uid=purchase_uid,
-                usuario=usuario_s,
-            )
-            ids_itens.append(int(item_id))
-
-        # -------- log em MB como 'registro' (valor 0) --------
-        obs = _fmt_obs_saida(
-            forma="CRÉDITO",
-            valor=total,
-            categoria=categoria_s,
-            subcategoria=subcat_s,
-            descricao=desc_s,
-            banco=None,
-        )
-
-        valor_str = f"{total:.2f}"
-        seed_mb = f"CREDITO|{data_compra}|{valor_str}|{cartao_nome_s}|{p}|{desc_s}"
-        trans_uid_mb = str(trans_uid or gerar_trans_uid("mb", seed=seed_mb))
-
-        with get_conn(self.db_path) as conn:
-            id_mov = log_mov_bancaria(
-                conn,
-                data=data_compra,
-                banco=cartao_nome_s,         # guarda o nome do cartão na coluna 'banco'
-                tipo="registro",             # não afeta saldo agora
-                valor=0.0,                   # valor contábil 0 neste momento
-                origem="credito_programado", # para diferenciar no extrato
-                observacao=obs,
-                usuario=usuario_s,
-                referencia_id=(ids_itens[0] if ids_itens else None),
-                referencia_tabela="fatura_cartao_itens",
-                trans_uid=trans_uid_mb,
-                data_hora=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            )
-            conn.commit()
-
-        return (ids_itens, int(id_mov))
@@ -5,6 +5,9 @@ Módulo TaxaMaquinetaManager
 Gerencia a tabela `taxas_maquinas` no SQLite para configurar **taxas por
 maquineta/PSP** em diferentes combinações de forma de pagamento, bandeira
 e parcelas. Também suporta um **banco de destino** para a liquidação.
+
+Toda escrita invalida a tabela de taxas em memória
+(`repository.taxas_maquinas_repository.tabela_taxas`).
 """
 
 from __future__ import annotations
@@ -14,6 +17,9 @@ from typing import Iterable, Optional, Sequence, Tuple, Dict, Any
 
 import pandas as pd
 
+from shared.db import get_conn
+from repository.taxas_maquinas_repository import invalidar_tabela_taxas
+
 __all__ = ["TaxaMaquinetaManager"]
 
 
@@ -29,9 +35,7 @@ class TaxaMaquinetaManager:
     # Infra
     # ------------------------------------------------------------------ #
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.caminho_banco)
-        conn.execute("PRAGMA foreign_keys = ON")
-        return conn
+        return get_conn(self.caminho_banco)
 
     def _criar_tabela(self) -> None:
         with self._connect() as conn:
@@ -120,6 +124,7 @@ class TaxaMaquinetaManager:
                 (maq, frm, ban, par, tx, bco),
             )
             conn.commit()
+        invalidar_tabela_taxas(self.caminho_banco)
 
     def salvar_taxas_bulk(
         self,
@@ -152,6 +157,7 @@ class TaxaMaquinetaManager:
                 rows,
             )
             conn.commit()
+        invalidar_tabela_taxas(self.caminho_banco)
 
     def remover_taxa(
         self,
@@ -175,7 +181,8 @@ class TaxaMaquinetaManager:
                 (maq, frm, ban, par),
             )
             conn.commit()
-            return cur.rowcount
+        invalidar_tabela_taxas(self.caminho_banco)
+        return cur.rowcount
 
     def obter_taxa(
         self,
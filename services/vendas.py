@@ -9,21 +9,29 @@ em `movimentacoes_bancarias`.
 
 from __future__ import annotations
 
-from typing import Optional, Tuple
-import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import json
 import sqlite3
 from datetime import datetime
 
 import pandas as pd
 
 from shared.db import get_conn
+from shared.schema import colunas, executar_migracoes
+from repository.saldos_bancos_repository import (
+    ajustar_saldo_banco,
+    garantir_linha_saldos_bancos,
+    validar_nome_banco,
+)
+from repository.taxas_maquinas_repository import tabela_taxas
 from shared.ids import uid_venda_liquidacao, sanitize
+from shared.instrumentacao import medido
 
 __all__ = ["VendasService"]
 
 
 # -----------------------------------------------------------------------------#
-# Helper de taxa (consulta a tabela de taxas da maquineta)
+# Helper de taxa (tabela de taxas da maquineta em memória)
 # -----------------------------------------------------------------------------#
 def _resolver_taxa_percentual(
     conn: sqlite3.Connection,
@@ -34,32 +42,16 @@ def _resolver_taxa_percentual(
     maquineta: Optional[str],
 ) -> float:
     """
-    Busca na tabela `taxas_maquinas` uma taxa compatível com
+    Busca em `taxas_maquinas` uma taxa compatível com
     (forma, bandeira, parcelas, maquineta). Retorna 0.0 se não encontrar.
+
+    Usa a tabela compilada em memória (`tabela_taxas`), com a mesma
+    precedência de curingas (bandeira > parcelas > maquineta).
     """
     try:
-        row = pd.read_sql(
-            """
-            SELECT COALESCE(taxa_percentual,0) AS taxa
-              FROM taxas_maquinas
-             WHERE UPPER(forma)=?
-               AND (bandeira IS NULL OR bandeira=?)
-               AND (parcelas IS NULL OR parcelas=?)
-               AND (maquineta IS NULL OR maquineta=?)
-             ORDER BY 
-               CASE WHEN bandeira IS NULL THEN 1 ELSE 0 END,
-               CASE WHEN parcelas IS NULL THEN 1 ELSE 0 END,
-               CASE WHEN maquineta IS NULL THEN 1 ELSE 0 END
-             LIMIT 1
-            """,
-            conn,
-            params=[(forma or "").upper(), bandeira, int(parcelas or 1), maquineta],
-        )
-        if not row.empty:
-            return float(row.loc[0, "taxa"]) or 0.0
+        return tabela_taxas(conn).resolver(forma, bandeira, int(parcelas or 1), maquineta)
     except Exception:
-        pass
-    return 0.0
+        return 0.0
 
 
 class VendasService:
@@ -77,6 +69,8 @@ class VendasService:
                 atributo de caminho (ex.: SimpleNamespace(caminho_banco=...)).
         """
         self.db_path_like = db_path_like  # get_conn aceita db_path_like direto.
+        # Colunas opcionais (entrada/movimentacoes_bancarias): uma vez por processo
+        executar_migracoes(db_path_like)
 
     # =============================
     # Infraestrutura interna
@@ -95,36 +89,95 @@ class VendasService:
             )
 
     def _garantir_linha_saldos_bancos(self, conn: sqlite3.Connection, data: str) -> None:
-        """Garante existência da linha em `saldos_bancos` para a data."""
-        cur = conn.execute("SELECT 1 FROM saldos_bancos WHERE data = ? LIMIT 1", (data,))
-        if not cur.fetchone():
-            conn.execute("INSERT OR IGNORE INTO saldos_bancos (data) VALUES (?)", (data,))
-
-    _COL_RE = re.compile(r"^[A-Za-z0-9_ ]{1,64}$")
+        """Garante existência da linha em `saldos_bancos` para a data (engine wide)."""
+        garantir_linha_saldos_bancos(conn, data)
 
     def _validar_nome_coluna_banco(self, banco_col: str) -> str:
-        banco_col = (banco_col or "").strip()
-        if not self._COL_RE.match(banco_col):
-            raise ValueError(f"Nome de banco/coluna inválido: {banco_col!r}")
-        return banco_col
+        return validar_nome_banco(banco_col)
+
+    @staticmethod
+    def _nome_banco_ok(banco_col: str) -> bool:
+        try:
+            validar_nome_banco(banco_col)
+        except ValueError:
+            return False
+        return True
 
     def _ajustar_banco_dynamic(
         self, conn: sqlite3.Connection, banco_col: str, delta: float, data: str
     ) -> None:
-        """Ajusta dinamicamente a coluna do banco em `saldos_bancos`."""
+        """Ajusta o saldo do banco em `saldos_bancos` (engine wide/long + saldo acumulado)."""
         banco_col = self._validar_nome_coluna_banco(banco_col)
-        cols = pd.read_sql("PRAGMA table_info(saldos_bancos);", conn)["name"].tolist()
-        if banco_col not in cols:
-            conn.execute(f'ALTER TABLE saldos_bancos ADD COLUMN "{banco_col}" REAL DEFAULT 0.0;')
-        self._garantir_linha_saldos_bancos(conn, data)
-        conn.execute(
-            f'UPDATE saldos_bancos SET "{banco_col}" = COALESCE("{banco_col}", 0) + ? WHERE data = ?',
-            (float(delta), data),
-        )
+        ajustar_saldo_banco(conn, data, banco_col, delta)
+
+    @staticmethod
+    def _obs_venda(
+        forma_u: str,
+        parcelas: int,
+        bandeira: Optional[str],
+        maquineta: Optional[str],
+        banco_destino: Optional[str],
+        valor_bruto: float,
+        taxa_eff: float,
+        valor_liquido: float,
+    ) -> str:
+        """Observação padronizada do log da venda em `movimentacoes_bancarias`."""
+        if forma_u == "PIX" and not (maquineta and maquineta.strip()):
+            detalhe_meio = f"Direto — {banco_destino or '—'}"      # PIX direto para banco
+        elif forma_u in ("CRÉDITO", "DÉBITO", "LINK_PAGAMENTO"):
+            detalhe_meio = f"{(bandeira or '—')}/{(maquineta or '—')}"
+        elif forma_u == "DINHEIRO":
+            detalhe_meio = "Caixa"
+        else:
+            detalhe_meio = f"{(bandeira or '—')}/{(maquineta or '—')}"
+
+        return (
+            f"Lançamento VENDA {forma_u} {parcelas}x / "
+            f"{detalhe_meio} • Bruto R$ {valor_bruto:.2f} • "
+            f"Taxa {taxa_eff:.2f}% -> Líquido R$ {valor_liquido:.2f}"
+        ).strip()
 
     # =============================
     # Insert em `entrada`
     # =============================
+    @staticmethod
+    def _linha_entrada(
+        colnames: frozenset,
+        *,
+        data_venda: str,
+        data_liq: str,
+        valor_bruto: float,
+        valor_liquido: float,
+        forma: str,
+        parcelas: int,
+        bandeira: Optional[str],
+        maquineta: Optional[str],
+        banco_destino: Optional[str],
+        taxa: float,
+        usuario: str,
+    ) -> Dict[str, Any]:
+        """Monta a linha de `entrada` restrita às colunas existentes (None = NULL)."""
+        linha = {
+            "Data": data_venda,
+            "Data_Liq": data_liq,
+            "Valor": float(valor_bruto),
+            "valor_liquido": valor_liquido,
+            "Forma_de_Pagamento": forma,
+            "Parcelas": parcelas,
+            "Bandeira": bandeira or None,
+            "maquineta": maquineta,
+            "Banco_Destino": banco_destino or None,
+            "Usuario": usuario,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+        if "Taxa_percentual" in colnames:
+            linha["Taxa_percentual"] = float(taxa)
+        elif "Taxa_Percentual" in colnames:
+            linha["Taxa_Percentual"] = float(taxa)
+
+        return {k: v for k, v in linha.items() if k in colnames}
+
     def _insert_entrada(
         self,
         conn: sqlite3.Connection,
@@ -150,20 +203,10 @@ class VendasService:
         - `Forma_de_Pagamento` sempre preenchida (DINHEIRO, PIX, etc).
         - DINHEIRO / PIX direto -> taxa=0, maquineta=NULL.
         - PIX via maquineta / DÉBITO / CRÉDITO -> aplica taxa da tabela.
-        - Garante colunas: Usuario, valor_liquido, maquineta, created_at.
+        - Colunas Usuario, valor_liquido, maquineta, created_at são garantidas
+          na inicialização (`executar_migracoes`); aqui só o cache de schema.
         """
-        cols_df = pd.read_sql("PRAGMA table_info(entrada);", conn)
-        colnames = set(cols_df["name"].astype(str).tolist())
-
-        # garantir colunas obrigatórias
-        if "Usuario" not in colnames:
-            conn.execute('ALTER TABLE entrada ADD COLUMN "Usuario" TEXT;'); colnames.add("Usuario")
-        if "valor_liquido" not in colnames:
-            conn.execute('ALTER TABLE entrada ADD COLUMN "valor_liquido" REAL;'); colnames.add("valor_liquido")
-        if "maquineta" not in colnames:
-            conn.execute('ALTER TABLE entrada ADD COLUMN "maquineta" TEXT;'); colnames.add("maquineta")
-        if "created_at" not in colnames:
-            conn.execute('ALTER TABLE entrada ADD COLUMN "created_at" TEXT DEFAULT (CURRENT_TIMESTAMP);'); colnames.add("created_at")
+        colnames = colunas(conn, "entrada")
 
         forma_upper = (forma or "").upper()
         parcelas = int(parcelas or 1)
@@ -190,28 +233,24 @@ class VendasService:
             liquido = float(valor_liquido)
 
         # montar INSERT (usar None para gravar NULL em campos opcionais)
-        to_insert = {
-            "Data": data_venda,
-            "Data_Liq": data_liq,
-            "Valor": float(valor_bruto),
-            "valor_liquido": liquido,
-            "Forma_de_Pagamento": forma_upper,
-            "Parcelas": parcelas,
-            "Bandeira": bandeira or None,
-            "maquineta": maq_eff,
-            "Banco_Destino": banco_destino or None,
-            "Usuario": usuario,
-            "created_at": datetime.now().isoformat(timespec="seconds"),
-        }
-
-        if "Taxa_percentual" in colnames:
-            to_insert["Taxa_percentual"] = float(taxa_eff)
-        elif "Taxa_Percentual" in colnames:
-            to_insert["Taxa_Percentual"] = float(taxa_eff)
+        to_insert = self._linha_entrada(
+            colnames,
+            data_venda=data_venda,
+            data_liq=data_liq,
+            valor_bruto=float(valor_bruto),
+            valor_liquido=liquido,
+            forma=forma_upper,
+            parcelas=parcelas,
+            bandeira=bandeira,
+            maquineta=maq_eff,
+            banco_destino=banco_destino,
+            taxa=float(taxa_eff),
+            usuario=usuario,
+        )
 
         names, values = [], []
         for k, v in to_insert.items():
-            if k in colnames and v is not None:
+            if v is not None:
                 names.append(f'"{k}"'); values.append(v)
 
         placeholders = ", ".join("?" for _ in names)
@@ -222,6 +261,7 @@ class VendasService:
     # =============================
     # Regra principal (compat wrapper)
     # =============================
+    @medido("vendas.registrar_venda")
     def registrar_venda(self, *args, **kwargs) -> Tuple[int, int]:
         """
         Wrapper de compatibilidade:
@@ -384,23 +424,13 @@ class VendasService:
                 banco_label = banco_destino
 
             # 3) Log em movimentacoes_bancarias (OBS padronizada)
-            if forma_u == "PIX" and not (maquineta and maquineta.strip()):
-                detalhe_meio = f"Direto — {banco_destino or '—'}"      # PIX direto para banco
-            elif forma_u in ("CRÉDITO", "DÉBITO", "LINK_PAGAMENTO"):
-                detalhe_meio = f"{(bandeira or '—')}/{(maquineta or '—')}"
-            elif forma_u == "DINHEIRO":
-                detalhe_meio = "Caixa"
-            else:
-                detalhe_meio = f"{(bandeira or '—')}/{(maquineta or '—')}"
-
-            obs = (
-                f"Lançamento VENDA {forma_u} {parcelas}x / "
-                f"{detalhe_meio} • Bruto R$ {valor_bruto:.2f} • "
-                f"Taxa {taxa_eff:.2f}% -> Líquido R$ {valor_liquido:.2f}"
-            ).strip()
+            obs = self._obs_venda(
+                forma_u, parcelas, bandeira, maquineta, banco_destino,
+                float(valor_bruto), float(taxa_eff), float(valor_liquido),
+            )
 
             # INSERT dinâmico: inclui data_hora/usuario apenas se as colunas existirem
-            cols_exist = {r[1] for r in conn.execute("PRAGMA table_info(movimentacoes_bancarias)")}
+            cols_exist = colunas(conn, "movimentacoes_bancarias")
             payload = {
                 "data": data_liq,                 # data contábil (liquidação)
                 "banco": banco_label,
@@ -427,3 +457,226 @@ class VendasService:
             conn.commit()
 
         return (int(venda_id), int(mov_id))
+
+    # =============================
+    # Lançamento em lote
+    # =============================
+    _FORMAS = ("DINHEIRO", "PIX", "DÉBITO", "CRÉDITO", "LINK_PAGAMENTO")
+
+    @medido("vendas.registrar_vendas_lote")
+    def registrar_vendas_lote(self, vendas: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Registra várias vendas em **uma** transação.
+
+        Cada item aceita os mesmos nomes de `registrar_venda`
+        (data|data_venda, data_liq|data_liquidacao, valor|valor_bruto,
+        forma|forma_pagamento, parcelas, bandeira, maquineta, banco_destino,
+        taxa|taxa_percentual, usuario).
+
+        Fluxo:
+        1. Validação vetorizada (datas, valores, forma, parcelas, banco).
+        2. Taxas resolvidas pela tabela em memória (`tabela_taxas`).
+        3. Idempotência: `trans_uid` já existentes são buscados numa única consulta
+           (e repetidos dentro do lote são ignorados).
+        4. `entrada` e `movimentacoes_bancarias` via `executemany`; saldos ajustados
+           uma vez por (data, banco) / data (caixa_vendas).
+
+        Linhas inválidas não interrompem o lote; erro de banco desfaz tudo.
+
+        Returns:
+            Lista (na ordem de entrada) de dicts com `indice`, `status`
+            ("ok" | "duplicada" | "erro"), `venda_id`, `mov_id`, `trans_uid`
+            e `erro` (mensagem, quando houver).
+        """
+        itens = [dict(v) for v in vendas]
+        resultados: List[Dict[str, Any]] = [
+            {"indice": i, "status": "erro", "venda_id": None, "mov_id": None, "trans_uid": None, "erro": None}
+            for i in range(len(itens))
+        ]
+        if not itens:
+            return resultados
+
+        # 1) Normalização + validação vetorizada
+        def _pick(d: Dict[str, Any], *nomes: str, default: Any = None) -> Any:
+            for n in nomes:
+                if d.get(n) is not None:
+                    return d[n]
+            return default
+
+        df = pd.DataFrame(
+            {
+                "data_venda": [_pick(d, "data_venda", "data") for d in itens],
+                "data_liq": [_pick(d, "data_liq", "data_liquidacao") for d in itens],
+                "valor_bruto": [_pick(d, "valor_bruto", "valor") for d in itens],
+                "forma": [sanitize(_pick(d, "forma", "forma_pagamento", default="")).upper() for d in itens],
+                "parcelas": [_pick(d, "parcelas", default=1) for d in itens],
+                "bandeira": [sanitize(d.get("bandeira")) for d in itens],
+                "maquineta": [sanitize(d.get("maquineta")) for d in itens],
+                "banco_destino": [sanitize(d.get("banco_destino")) for d in itens],
+                "taxa": [_pick(d, "taxa_percentual", "taxa", default=0.0) for d in itens],
+                "usuario": [sanitize(_pick(d, "usuario", default="Sistema")) for d in itens],
+            }
+        )
+        dv = pd.to_datetime(df["data_venda"], errors="coerce")
+        dl = pd.to_datetime(df["data_liq"], errors="coerce")
+        df["data_venda"] = dv.dt.strftime("%Y-%m-%d")
+        df["data_liq"] = dl.dt.strftime("%Y-%m-%d")
+        df["valor_bruto"] = pd.to_numeric(df["valor_bruto"], errors="coerce")
+        df["parcelas"] = pd.to_numeric(df["parcelas"], errors="coerce").fillna(1)
+        df["taxa"] = pd.to_numeric(df["taxa"], errors="coerce").fillna(0.0)
+        df["forma"] = df["forma"].replace({"DEBITO": "DÉBITO"})
+
+        nao_dinheiro = df["forma"] != "DINHEIRO"
+        bancos_ok = df["banco_destino"].map(self._nome_banco_ok)
+        checks = [
+            (dv.isna() | dl.isna(), "Datas inválidas; use YYYY-MM-DD."),
+            (~(df["valor_bruto"] > 0), "valor_bruto deve ser > 0."),
+            (~df["forma"].isin(self._FORMAS), "Forma de pagamento inválida."),
+            (df["parcelas"] < 1, "parcelas deve ser >= 1."),
+            (nao_dinheiro & (df["banco_destino"] == ""), "banco_destino é obrigatório para formas não-DINHEIRO."),
+            (nao_dinheiro & (df["banco_destino"] != "") & ~bancos_ok, "Nome de banco/coluna inválido."),
+        ]
+        erro = pd.Series([None] * len(df), dtype=object)
+        for mask, msg in checks:
+            erro = erro.where(~(mask & erro.isna()), msg)
+        validos = df[erro.isna()].copy()
+        for i, msg in erro.dropna().items():
+            resultados[int(i)]["erro"] = msg
+
+        if validos.empty:
+            return resultados
+
+        validos["parcelas"] = validos["parcelas"].astype(int)
+        sem_maq = validos["maquineta"] == ""
+        isento = (validos["forma"] == "DINHEIRO") | ((validos["forma"] == "PIX") & sem_maq)
+
+        with get_conn(self.db_path_like) as conn:
+            # 2) Taxas (tabela em memória) e líquido
+            precisa = ~isento & (validos["taxa"] == 0.0)
+            if precisa.any():
+                tabela = tabela_taxas(conn)
+                validos.loc[precisa, "taxa"] = [
+                    tabela.resolver(r.forma, r.bandeira, int(r.parcelas), r.maquineta)
+                    for r in validos[precisa].itertuples()
+                ]
+            validos.loc[isento, "taxa"] = 0.0
+            validos["valor_liquido"] = (validos["valor_bruto"] * (1.0 - validos["taxa"] / 100.0)).round(2)
+
+            # 3) Idempotência: trans_uid em uma única consulta
+            validos["trans_uid"] = [
+                uid_venda_liquidacao(
+                    r.data_venda, r.data_liq, float(r.valor_bruto), r.forma, int(r.parcelas),
+                    r.bandeira, r.maquineta, r.banco_destino, float(r.taxa), r.usuario,
+                )
+                for r in validos.itertuples()
+            ]
+            existentes = {
+                row[0]
+                for row in conn.execute(
+                    "SELECT trans_uid FROM movimentacoes_bancarias "
+                    "WHERE trans_uid IN (SELECT value FROM json_each(?))",
+                    (json.dumps(validos["trans_uid"].tolist()),),
+                ).fetchall()
+            }
+            dup = validos["trans_uid"].isin(existentes) | validos["trans_uid"].duplicated()
+            for i, uid in validos.loc[dup, "trans_uid"].items():
+                resultados[int(i)].update(status="duplicada", trans_uid=uid)
+            novos = validos[~dup]
+            if novos.empty:
+                return resultados
+
+            # 4a) Saldos agregados (antes dos INSERTs: já garante o lock de escrita)
+            dinheiro = novos["forma"] == "DINHEIRO"
+            por_data = novos[dinheiro].groupby("data_liq")["valor_liquido"].sum()
+            for d in por_data.index:
+                self._garantir_linha_saldos_caixas(conn, d)
+            conn.executemany(
+                "UPDATE saldos_caixas SET caixa_vendas = COALESCE(caixa_vendas,0) + ? WHERE data = ?",
+                [(round(float(v), 2), d) for d, v in por_data.items()],
+            )
+            por_banco = novos[~dinheiro].groupby(["data_liq", "banco_destino"])["valor_liquido"].sum()
+            for d in por_banco.index.get_level_values(0).unique():
+                self._garantir_linha_saldos_bancos(conn, d)
+            for (d, banco), v in por_banco.items():
+                self._ajustar_banco_dynamic(conn, banco_col=banco, delta=round(float(v), 2), data=d)
+
+            # 4b) entrada (executemany; ids recuperados pela faixa de rowid do lote)
+            colnames = colunas(conn, "entrada")
+            linhas = [
+                self._linha_entrada(
+                    colnames,
+                    data_venda=r.data_venda,
+                    data_liq=r.data_liq,
+                    valor_bruto=float(r.valor_bruto),
+                    valor_liquido=float(r.valor_liquido),
+                    forma=r.forma,
+                    parcelas=int(r.parcelas),
+                    bandeira=r.bandeira,
+                    maquineta=None if r.forma == "DINHEIRO" or (r.forma == "PIX" and not r.maquineta) else r.maquineta,
+                    banco_destino=r.banco_destino,
+                    taxa=float(r.taxa),
+                    usuario=r.usuario,
+                )
+                for r in novos.itertuples()
+            ]
+            nomes = list(linhas[0].keys())
+            cols_sql = ", ".join(f'"{k}"' for k in nomes)
+            ph_sql = ", ".join("?" for _ in nomes)
+            antes = int(conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM entrada").fetchone()[0])
+            conn.executemany(
+                f"INSERT INTO entrada ({cols_sql}) VALUES ({ph_sql})",
+                [[ln[k] for k in nomes] for ln in linhas],
+            )
+            venda_ids = [
+                int(r[0])
+                for r in conn.execute("SELECT rowid FROM entrada WHERE rowid > ? ORDER BY rowid", (antes,))
+            ]
+            if len(venda_ids) != len(linhas):
+                raise RuntimeError("Falha ao recuperar os IDs do lote em `entrada`.")
+
+            # 4c) movimentacoes_bancarias (executemany)
+            cols_exist = colunas(conn, "movimentacoes_bancarias")
+            agora = datetime.now().isoformat(timespec="seconds")
+            nomes_mov = [
+                "data", "banco", "tipo", "valor", "origem", "observacao",
+                "referencia_tabela", "referencia_id", "trans_uid",
+            ]
+            extras_mov = [c for c in ("data_hora", "usuario") if c in cols_exist]
+            movs = []
+            for r, venda_id in zip(novos.itertuples(), venda_ids):
+                obs = self._obs_venda(
+                    r.forma, int(r.parcelas), r.bandeira, r.maquineta, r.banco_destino,
+                    float(r.valor_bruto), float(r.taxa), float(r.valor_liquido),
+                )
+                linha = [
+                    r.data_liq,
+                    "Caixa_Vendas" if r.forma == "DINHEIRO" else r.banco_destino,
+                    "entrada",
+                    float(r.valor_liquido),
+                    "lancamentos",
+                    obs,
+                    "entrada",
+                    int(venda_id),
+                    r.trans_uid,
+                ]
+                linha += [agora if c == "data_hora" else r.usuario for c in extras_mov]
+                movs.append(linha)
+            todas = nomes_mov + extras_mov
+            antes = int(conn.execute("SELECT COALESCE(MAX(id), 0) FROM movimentacoes_bancarias").fetchone()[0])
+            conn.executemany(
+                f"INSERT INTO movimentacoes_bancarias ({', '.join(todas)}) "
+                f"VALUES ({', '.join('?' for _ in todas)})",
+                movs,
+            )
+            mov_ids = [
+                int(r[0])
+                for r in conn.execute(
+                    "SELECT id FROM movimentacoes_bancarias WHERE id > ? ORDER BY id", (antes,)
+                )
+            ]
+            if len(mov_ids) != len(movs):
+                raise RuntimeError("Falha ao recuperar os IDs do lote em `movimentacoes_bancarias`.")
+
+        for i, uid, venda_id, mov_id in zip(novos.index, novos["trans_uid"], venda_ids, mov_ids):
+            resultados[int(i)].update(status="ok", venda_id=venda_id, mov_id=mov_id, trans_uid=uid)
+        return resultados
@@ -6,7 +6,12 @@ Módulo utilitário que concentra componentes globais usados em todo o sistema.
 
 Submódulos
 ----------
-- db ........ conexão central SQLite (`get_conn`, etc.)
+- db ........ conexão central SQLite com pool por thread (`get_conn`, etc.)
+- schema .... registro de colunas em cache (`colunas`, `executar_migracoes`)
+- cache ..... cache de consultas invalidado por versão de tabela (`cache_consulta`)
+- alteracoes . registro único de datas alteradas (resumo, fatos, DRE, exportação, cache)
+- instrumentacao ... tempo/SQL/linhas por serviço e página (`medido`, `medir`)
+- perfil_sql ....... comandos SQL distintos + EXPLAIN QUERY PLAN e alertas de full scan
 - ids ....... helpers para geração/sanitização de IDs
 
 Observação
@@ -14,11 +19,22 @@ Observação
 Não existe `shared.actions`, portanto esse import foi removido.
 """
 
-from shared.db import get_conn
+from shared.db import get_conn, close_pooled_conns, get_pool_stats, reset_pool_stats
+from shared.schema import colunas, garantir_colunas, executar_migracoes
+from shared.cache import cache_consulta, invalidar_tabelas, limpar_cache
 from shared.ids import sanitize, uid_saida_dinheiro, uid_saida_bancaria, uid_credito_programado, uid_boleto_programado
 
 __all__ = [
     "get_conn",
+    "close_pooled_conns",
+    "get_pool_stats",
+    "reset_pool_stats",
+    "colunas",
+    "garantir_colunas",
+    "executar_migracoes",
+    "cache_consulta",
+    "invalidar_tabelas",
+    "limpar_cache",
     "sanitize",
     "uid_saida_dinheiro",
     "uid_saida_bancaria",
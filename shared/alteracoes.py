@@ -0,0 +1,348 @@
+"""
+Módulo Alterações (Shared)
+==========================
+
+Registro único das **datas alteradas** nas tabelas de lançamentos e saldos:
+uma família de *triggers* por tabela de origem grava `(tabela, data, tipo,
+geração)` em `alteracoes_datas`. Todas as materializações (resumo do dia,
+fatos diários, DRE mensal, exportação Parquet e o cache de consultas) leem
+esse registro em vez de manter triggers próprios.
+
+Funcionalidades principais
+--------------------------
+- `garantir_alteracoes(conn)`: cria o registro, o contador de geração, os
+  cursores dos consumidores e os triggers das tabelas de `ORIGENS`.
+- `geracao_atual(conn)`: contador global (incrementado a cada linha escrita
+  numa tabela de origem).
+- `alteracoes_desde(conn, tabela, geracao)`: `(data, tipo)` alterados depois
+  de uma geração (consumidores com cursor próprio, ex.: exportação).
+- `pendencias(conn, consumidor, tabelas)` / `consumir(conn, consumidor, geracao)`:
+  datas ainda não processadas por um consumidor e avanço do cursor dele.
+- `alterada_desde(conn, data, geracao, tabelas_dia, tabelas_acumuladas)`:
+  validade de um valor calculado para uma data (resumo do dia).
+- `geracoes_tabelas(conn, tabelas)`: última geração por tabela (cache).
+
+Detalhes técnicos
+-----------------
+- Uma linha por `(tabela, data, tipo)`: o registro cresce com o número de dias
+  distintos, não com o de lançamentos. Cada escrita atualiza a `geracao` da
+  linha (UPSERT) — custo fixo de dois comandos por linha escrita, qualquer que
+  seja o número de consumidores.
+- `tipo`: `I` (INSERT) ou `M` (UPDATE/DELETE, datas antiga e nova). Quem
+  acompanha inserções por chave (exportação) só precisa das modificações.
+- `data`: `DATE()` das colunas de `ORIGENS`; data ilegível vira `''`.
+  Tabelas com mais de uma coluna de data registram a união (marcar a mais é
+  seguro: cada consumidor só recalcula o que for dele).
+- Trigger criado/recriado (tabela nova, banco antigo) registra `TUDO` (`'*'`):
+  escritas anteriores não foram vistas, o consumidor refaz a tabela inteira.
+- Consumidores sem cursor recebem `TUDO` para todas as tabelas. Sem nada
+  pendente, `pendencias` custa duas leituras pontuais e não escreve nada.
+- Triggers conferidos uma vez por `schema_version` (DDL comparado com o de
+  `sqlite_master`); views não recebem triggers.
+
+Dependências
+------------
+- sqlite3
+- shared.schema (colunas, db_key, schema_version)
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from shared.schema import colunas, db_key, schema_version
+
+logger = logging.getLogger(__name__)
+
+_TABELA = "alteracoes_datas"
+_GERACAO = "alteracoes_geracao"
+_CONSUMO = "alteracoes_consumo"
+_PREFIXO_TRIGGER = "trg_alteracoes_"
+
+TUDO = "*"          # data que invalida a tabela inteira
+INSERCAO = "I"
+MODIFICACAO = "M"
+
+# Tabelas monitoradas e suas colunas de data (união do que os consumidores usam)
+ORIGENS: Dict[str, Tuple[str, ...]] = {
+    "entrada": ("Data",),
+    "saida": ("Data",),
+    "movimentacoes_bancarias": ("data",),
+    "mercadorias": ("Data", "Recebimento"),
+    "contas_a_pagar_mov": ("data_evento", "data_pagamento"),
+    "cap_encargos_eventos": ("data_evento",),
+    "saldos_caixas": ("data",),
+    "saldos_bancos": ("data",),
+    "saldos_bancos_acumulado": ("data",),
+}
+
+# {db_key: schema_version em que registro/triggers foram conferidos}
+_garantidos: Dict[str, int] = {}
+_lock = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+# Schema / triggers
+# -----------------------------------------------------------------------------
+def _sql_triggers(tabela: str, cols: Sequence[str]) -> Dict[str, str]:
+    """DDL dos triggers (insert/update/delete) de uma tabela de origem."""
+    refs = {"ins": ("NEW",), "upd": ("OLD", "NEW"), "del": ("OLD",)}
+    eventos = {"ins": "INSERT", "upd": "UPDATE", "del": "DELETE"}
+    out: Dict[str, str] = {}
+    for sufixo, evento in eventos.items():
+        tipo = INSERCAO if sufixo == "ins" else MODIFICACAO
+        datas = " UNION ".join(
+            f"SELECT COALESCE(DATE({r}.\"{c}\"), '') AS d" for r in refs[sufixo] for c in cols
+        )
+        nome = f"{_PREFIXO_TRIGGER}{tabela}_{sufixo}"
+        out[nome] = (
+            f'CREATE TRIGGER {nome} AFTER {evento} ON "{tabela}" BEGIN '
+            f"UPDATE {_GERACAO} SET n = n + 1; "
+            f"INSERT INTO {_TABELA} (tabela, data, tipo, geracao) "
+            f"SELECT '{tabela}', d, '{tipo}', (SELECT n FROM {_GERACAO}) FROM ({datas}) WHERE true "
+            f"ON CONFLICT (tabela, data, tipo) DO UPDATE SET geracao = excluded.geracao; END"
+        )
+    return out
+
+
+def garantir_alteracoes(conn: sqlite3.Connection) -> None:
+    """
+    Cria registro, contador, cursores e triggers (uma vez por versão de schema).
+
+    Tabela cujo trigger foi criado/recriado ganha a marca `TUDO`. Não faz commit.
+    """
+    key = db_key(conn)
+    with _lock:
+        if _garantidos.get(key) == schema_version(conn):
+            return
+
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {_TABELA} (
+            tabela  TEXT NOT NULL,
+            data    TEXT NOT NULL,
+            tipo    TEXT NOT NULL,
+            geracao INTEGER NOT NULL,
+            PRIMARY KEY (tabela, data, tipo)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_{_TABELA}_geracao ON {_TABELA} (tabela, geracao)"
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {_GERACAO} (n INTEGER NOT NULL)")
+    conn.execute(
+        f"INSERT INTO {_GERACAO} (n) SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM {_GERACAO})"
+    )
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {_CONSUMO} (
+            consumidor TEXT PRIMARY KEY,
+            geracao    INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """
+    )
+
+    tipos = {
+        str(r[0]): str(r[1])
+        for r in conn.execute("SELECT name, type FROM sqlite_master WHERE type IN ('table','view')")
+    }
+    existentes = {
+        str(r[0]): str(r[1] or "")
+        for r in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type='trigger' AND name LIKE ?",
+            (f"{_PREFIXO_TRIGGER}%",),
+        ).fetchall()
+    }
+    for tabela, cols_data in ORIGENS.items():
+        if tipos.get(tabela) != "table":
+            continue
+        por_nome = {c.lower(): c for c in colunas(conn, tabela)}
+        cols = [por_nome[c.lower()] for c in cols_data if c.lower() in por_nome]
+        if not cols:
+            continue
+        recriou = False
+        for nome, ddl in _sql_triggers(tabela, cols).items():
+            if existentes.get(nome) == ddl:
+                continue
+            conn.execute(f"DROP TRIGGER IF EXISTS {nome}")
+            conn.execute(ddl)
+            recriou = True
+        if recriou:
+            # Escritas anteriores ao trigger não foram registradas
+            conn.execute(f"UPDATE {_GERACAO} SET n = n + 1")
+            conn.execute(
+                f"INSERT INTO {_TABELA} (tabela, data, tipo, geracao) "
+                f"VALUES (?, ?, ?, (SELECT n FROM {_GERACAO})) "
+                f"ON CONFLICT (tabela, data, tipo) DO UPDATE SET geracao = excluded.geracao",
+                (tabela, TUDO, MODIFICACAO),
+            )
+            logger.info("alteracoes: triggers de %s criados/atualizados", tabela)
+
+    with _lock:
+        _garantidos[key] = schema_version(conn)
+
+
+# -----------------------------------------------------------------------------
+# Leitura do registro
+# -----------------------------------------------------------------------------
+def geracao_atual(conn: sqlite3.Connection) -> int:
+    """Contador global de escritas nas tabelas de origem."""
+    garantir_alteracoes(conn)
+    row = conn.execute(f"SELECT n FROM {_GERACAO}").fetchone()
+    return int(row[0] or 0) if row else 0
+
+
+def alteracoes_desde(conn: sqlite3.Connection, tabela: str, geracao: int) -> List[Tuple[str, str]]:
+    """`(data, tipo)` da `tabela` alterados depois de `geracao`."""
+    garantir_alteracoes(conn)
+    return [
+        (str(r[0]), str(r[1]))
+        for r in conn.execute(
+            f"SELECT data, tipo FROM {_TABELA} WHERE tabela = ? AND geracao > ?",
+            (tabela, int(geracao)),
+        ).fetchall()
+    ]
+
+
+def alterada_desde(
+    conn: sqlite3.Connection,
+    data: str,
+    geracao: int,
+    tabelas_dia: Sequence[str] = (),
+    tabelas_acumuladas: Sequence[str] = (),
+) -> bool:
+    """
+    True se algo que afeta `data` mudou depois de `geracao`.
+
+    - `tabelas_dia`: só a própria data (ou `TUDO`);
+    - `tabelas_acumuladas`: qualquer data `<=` (saldos acumulados; `TUDO` e
+      datas ilegíveis também contam).
+    """
+    garantir_alteracoes(conn)
+    partes: List[str] = []
+    params: List[object] = []
+    for tabela in tabelas_dia:
+        partes.append(
+            f"SELECT 1 FROM {_TABELA} WHERE tabela = ? AND data IN (?, ?) AND geracao > ?"
+        )
+        params += [tabela, data, TUDO, int(geracao)]
+    for tabela in tabelas_acumuladas:
+        partes.append(
+            f"SELECT 1 FROM {_TABELA} WHERE tabela = ? AND geracao > ? AND data <= ?"
+        )
+        params += [tabela, int(geracao), data]
+    if not partes:
+        return False
+    row = conn.execute(" UNION ALL ".join(partes) + " LIMIT 1", params).fetchone()
+    return row is not None
+
+
+def geracoes_tabelas(conn: sqlite3.Connection, tabelas: Sequence[str]) -> Dict[str, int]:
+    """Última geração registrada de cada tabela de `ORIGENS` (0 se nenhuma)."""
+    garantir_alteracoes(conn)
+    out: Dict[str, int] = {}
+    for tabela in tabelas:
+        if tabela not in ORIGENS:
+            continue
+        row = conn.execute(
+            f"SELECT MAX(geracao) FROM {_TABELA} WHERE tabela = ?", (tabela,)
+        ).fetchone()
+        out[tabela] = int(row[0] or 0) if row else 0
+    return out
+
+
+# -----------------------------------------------------------------------------
+# Consumidores (cursor por nome)
+# -----------------------------------------------------------------------------
+def cursor_consumidor(conn: sqlite3.Connection, consumidor: str) -> Optional[int]:
+    """Geração até onde `consumidor` já processou (None: nunca processou)."""
+    garantir_alteracoes(conn)
+    row = conn.execute(
+        f"SELECT geracao FROM {_CONSUMO} WHERE consumidor = ?", (consumidor,)
+    ).fetchone()
+    return int(row[0]) if row else None
+
+
+def pendencias(
+    conn: sqlite3.Connection, consumidor: str, tabelas: Sequence[str]
+) -> Tuple[Dict[str, Set[str]], int]:
+    """
+    Datas alteradas depois do cursor de `consumidor`.
+
+    Returns:
+        ({tabela: datas}, geração lida) — só tabelas com pendências; consumidor
+        sem cursor recebe `{TUDO}` em todas. Passe a geração a `consumir` depois
+        de processar (na mesma transação). Não escreve nada.
+    """
+    cursor = cursor_consumidor(conn, consumidor)
+    atual = geracao_atual(conn)
+    if cursor is None:
+        return {t: {TUDO} for t in tabelas}, atual
+    if cursor >= atual:
+        return {}, atual
+    out: Dict[str, Set[str]] = {}
+    for tabela in tabelas:
+        datas = {d for d, _ in alteracoes_desde(conn, tabela, cursor)}
+        if datas:
+            out[tabela] = datas
+    return out, atual
+
+
+def consumir(conn: sqlite3.Connection, consumidor: str, geracao: int) -> None:
+    """Avança o cursor de `consumidor` até `geracao`. Não faz commit."""
+    garantir_alteracoes(conn)
+    conn.execute(
+        f"INSERT INTO {_CONSUMO} (consumidor, geracao) VALUES (?, ?) "
+        f"ON CONFLICT (consumidor) DO UPDATE SET geracao = MAX(geracao, excluded.geracao)",
+        (consumidor, int(geracao)),
+    )
+
+
+def reiniciar_consumidor(conn: sqlite3.Connection, consumidor: str) -> None:
+    """Apaga o cursor: a próxima leitura de `pendencias` devolve `TUDO`. Não faz commit."""
+    garantir_alteracoes(conn)
+    conn.execute(f"DELETE FROM {_CONSUMO} WHERE consumidor = ?", (consumidor,))
+
+
+def remover_triggers_legados(conn: sqlite3.Connection, prefixo: str, tabelas: Sequence[str] = ()) -> int:
+    """
+    Remove triggers antigos de um consumidor (`prefixo%`), opcionalmente só os
+    das `tabelas` informadas. Não faz commit.
+    """
+    nomes = [
+        (str(r[0]), str(r[1]))
+        for r in conn.execute(
+            "SELECT name, tbl_name FROM sqlite_master WHERE type='trigger' AND name LIKE ?",
+            (f"{prefixo}%",),
+        ).fetchall()
+    ]
+    alvo = set(tabelas)
+    removidos = 0
+    for nome, tabela in nomes:
+        if alvo and tabela not in alvo:
+            continue
+        conn.execute(f'DROP TRIGGER IF EXISTS "{nome}"')
+        removidos += 1
+    return removidos
+
+
+__all__ = [
+    "TUDO",
+    "INSERCAO",
+    "MODIFICACAO",
+    "ORIGENS",
+    "garantir_alteracoes",
+    "geracao_atual",
+    "alteracoes_desde",
+    "alterada_desde",
+    "geracoes_tabelas",
+    "cursor_consumidor",
+    "pendencias",
+    "consumir",
+    "reiniciar_consumidor",
+    "remover_triggers_legados",
+]
@@ -0,0 +1,310 @@
+"""
+Módulo Cache (Shared)
+=====================
+
+Cache de resultados de consultas com invalidação por tabela: cada tabela de
+origem tem uma **versão**, que muda a cada INSERT/UPDATE/DELETE. Um resultado
+em cache só é reutilizado enquanto as versões das tabelas de que ele depende
+não mudarem.
+
+Funcionalidades principais
+--------------------------
+- `@cache_consulta("tabela", ...)`: decora funções `f(caminho_banco, *args)`
+  (listas de bancos, maquinetas, bandeiras, categorias...). Reruns do Streamlit
+  e sessões diferentes reutilizam o resultado até uma escrita na tabela.
+- `consultar(db, sql, params, tabelas=...)`: o mesmo para um SELECT avulso
+  (retorna `list[tuple]`).
+- `versoes_tabelas(conn, tabelas)`: etiqueta de versão atual das tabelas.
+- `invalidar_tabelas(db, *tabelas)` / `limpar_cache()`: invalidação explícita.
+
+Detalhes técnicos
+-----------------
+- As versões ficam no próprio SQLite, então escritas de qualquer caminho
+  (repositórios, serviços, outros processos) invalidam o cache — não depende de
+  cada escrita lembrar de "limpar" nada. Só as tabelas afetadas são
+  invalidadas (ao contrário de `st.cache_data.clear()`).
+- A etiqueta inclui `PRAGMA schema_version`: DDL (ex.: coluna nova de banco em
+  `saldos_bancos`) invalida tudo daquele banco.
+- Tabelas de lançamentos/saldos (`shared.alteracoes.ORIGENS`, ex.
+  `saldos_bancos`) usam a última geração do registro de datas alteradas — não
+  ganham trigger próprio. As demais (cadastros, `fato_vendas_dia`, metas)
+  usam `cache_versoes`, incrementada por *triggers* criados sob demanda na
+  primeira consulta da tabela (e conferidos de novo quando o schema muda);
+  tabelas inexistentes têm versão 0 e ganham triggers quando forem criadas.
+  Views não recebem triggers.
+- O armazenamento é um dicionário do processo (compartilhado entre reruns e
+  sessões, como `st.cache_data`), com limite LRU por quantidade de entradas.
+  DataFrames, listas, dicts e tuplas são devolvidos como cópia profunda
+  (`_copia`): alterar uma linha devolvida não altera o cache.
+- Streamlit não é necessário (funciona em scripts e serviços).
+
+Dependências
+------------
+- sqlite3
+- shared.db.get_conn
+- shared.alteracoes (ORIGENS, geracoes_tabelas)
+- shared.schema (db_key, schema_version)
+"""
+
+from __future__ import annotations
+
+import copy
+import functools
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Sequence, Set, Tuple
+
+from shared.alteracoes import ORIGENS, geracoes_tabelas, remover_triggers_legados
+from shared.db import get_conn
+from shared.schema import db_key, schema_version
+
+logger = logging.getLogger(__name__)
+
+_TABELA = "cache_versoes"
+_PREFIXO_TRIGGER = "trg_cache_versao_"
+MAX_ENTRADAS = 512
+
+# {db_key: (schema_version, tabelas com triggers conferidos)}
+_garantidos: Dict[str, Tuple[int, Set[str]]] = {}
+# {chave: (etiqueta de versões, valor)} em ordem LRU
+_store: "OrderedDict[Hashable, Tuple[Tuple[int, ...], Any]]" = OrderedDict()
+_lock = threading.Lock()
+_stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+# -----------------------------------------------------------------------------
+# Versões por tabela (triggers)
+# -----------------------------------------------------------------------------
+def _sql_trigger(tabela: str, evento: str) -> Tuple[str, str]:
+    nome = f"{_PREFIXO_TRIGGER}{tabela}_{evento[:3].lower()}"
+    ddl = (
+        f'CREATE TRIGGER {nome} AFTER {evento} ON "{tabela}" BEGIN '
+        f"UPDATE {_TABELA} SET versao = versao + 1 WHERE tabela = '{tabela}'; END"
+    )
+    return nome, ddl
+
+
+def _garantir_triggers(conn: sqlite3.Connection, tabelas: Sequence[str]) -> None:
+    """Cria a tabela de versões e os triggers das `tabelas` (uma vez por schema)."""
+    key = db_key(conn)
+    sv = schema_version(conn)
+    with _lock:
+        cached = _garantidos.get(key)
+        if cached is not None and cached[0] == sv and cached[1].issuperset(tabelas):
+            return
+
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {_TABELA} (
+            tabela TEXT PRIMARY KEY,
+            versao INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+        """
+    )
+    tipos = {
+        str(r[0]): str(r[1])
+        for r in conn.execute("SELECT name, type FROM sqlite_master WHERE type IN ('table','view')")
+    }
+    triggers = {
+        str(r[0]): str(r[1] or "")
+        for r in conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type='trigger' AND name LIKE ?",
+            (f"{_PREFIXO_TRIGGER}%",),
+        )
+    }
+    # Tabelas do registro de alterações: versão vem de lá (sem trigger próprio)
+    remover_triggers_legados(conn, _PREFIXO_TRIGGER, [t for t in tabelas if t in ORIGENS])
+    for tabela in tabelas:
+        if tipos.get(tabela) != "table" or tabela in ORIGENS:
+            continue
+        criou = False
+        for evento in ("INSERT", "UPDATE", "DELETE"):
+            nome, ddl = _sql_trigger(tabela, evento)
+            if triggers.get(nome) != ddl:
+                conn.execute(f"DROP TRIGGER IF EXISTS {nome}")
+                conn.execute(ddl)
+                criou = True
+        if criou:
+            # Escritas anteriores ao trigger não foram contadas: nova versão
+            conn.execute(
+                f"INSERT INTO {_TABELA} (tabela, versao) VALUES (?, 1) "
+                f"ON CONFLICT(tabela) DO UPDATE SET versao = versao + 1",
+                (tabela,),
+            )
+
+    sv = schema_version(conn)
+    with _lock:
+        cached = _garantidos.get(key)
+        conferidas = set(cached[1]) if cached is not None and cached[0] == sv else set()
+        conferidas.update(tabelas)
+        _garantidos[key] = (sv, conferidas)
+
+
+def versoes_tabelas(conn: sqlite3.Connection, tabelas: Sequence[str]) -> Tuple[int, ...]:
+    """
+    Etiqueta `(schema_version, versão de cada tabela...)` na ordem de `tabelas`.
+
+    A versão soma `cache_versoes` (invalidação explícita) e, nas tabelas de
+    `ORIGENS`, a última geração do registro de alterações. Garante os
+    triggers na primeira chamada. Não faz commit.
+    """
+    _garantir_triggers(conn, tabelas)
+    rows = conn.execute(
+        f"""
+        SELECT j.value, COALESCE(v.versao, 0)
+          FROM json_each(?) j
+          LEFT JOIN {_TABELA} v ON v.tabela = j.value
+        """,
+        (json.dumps(list(tabelas)),),
+    ).fetchall()
+    por_tabela = {str(r[0]): int(r[1]) for r in rows}
+    for tabela, geracao in geracoes_tabelas(conn, tabelas).items():
+        por_tabela[tabela] = por_tabela.get(tabela, 0) + geracao
+    return (schema_version(conn),) + tuple(por_tabela.get(t, 0) for t in tabelas)
+
+
+def invalidar_tabelas(db_path_like: Any, *tabelas: str) -> None:
+    """Incrementa a versão das tabelas (para escritas que não passam por trigger)."""
+    with get_conn(db_path_like) as conn:
+        _garantir_triggers(conn, tabelas)
+        conn.executemany(
+            f"INSERT INTO {_TABELA} (tabela, versao) VALUES (?, 1) "
+            f"ON CONFLICT(tabela) DO UPDATE SET versao = versao + 1",
+            [(t,) for t in tabelas],
+        )
+
+
+# -----------------------------------------------------------------------------
+# Armazenamento
+# -----------------------------------------------------------------------------
+def _copia(valor: Any) -> Any:
+    """
+    Cópia profunda dos contêineres (list/dict/set/tuple, DataFrame): quem
+    altera uma linha devolvida não altera o cache dos demais chamadores.
+    Escalares e `sqlite3.Row` (imutáveis; não passam por `copy.deepcopy`)
+    são compartilhados.
+    """
+    if isinstance(valor, dict):
+        novo = copy.copy(valor)  # preserva a subclasse (OrderedDict, defaultdict)
+        for k, v in novo.items():
+            novo[k] = _copia(v)
+        return novo
+    if isinstance(valor, list):
+        return [_copia(v) for v in valor]
+    if isinstance(valor, set):
+        return set(valor)
+    if isinstance(valor, tuple):
+        itens = [_copia(v) for v in valor]
+        if all(a is b for a, b in zip(itens, valor)):
+            return valor
+        return type(valor)(*itens) if hasattr(valor, "_fields") else tuple(itens)
+    if hasattr(valor, "copy") and hasattr(valor, "columns"):  # DataFrame
+        return valor.copy(deep=True)
+    return valor
+
+
+def _obter(chave: Hashable, etiqueta: Tuple[int, ...]) -> Tuple[bool, Any]:
+    with _lock:
+        hit = _store.get(chave)
+        if hit is not None and hit[0] == etiqueta:
+            _store.move_to_end(chave)
+            _stats["hits"] += 1
+            return True, hit[1]
+        _stats["misses"] += 1
+    return False, None
+
+
+def _guardar(chave: Hashable, etiqueta: Tuple[int, ...], valor: Any) -> None:
+    with _lock:
+        _store[chave] = (etiqueta, valor)
+        _store.move_to_end(chave)
+        while len(_store) > MAX_ENTRADAS:
+            _store.popitem(last=False)
+
+
+def _cacheado(
+    db_path_like: Any, tabelas: Sequence[str], chave: Hashable, calcular: Callable[[], Any]
+) -> Any:
+    try:
+        with get_conn(db_path_like) as conn:
+            base = db_key(conn)
+            etiqueta = versoes_tabelas(conn, tabelas)
+    except sqlite3.Error as e:
+        logger.debug("cache: versões indisponíveis (%s); consultando direto.", e)
+        return calcular()
+
+    chave = (base, chave)
+    ok, valor = _obter(chave, etiqueta)
+    if ok:
+        return _copia(valor)
+    valor = calcular()
+    _guardar(chave, etiqueta, valor)
+    return _copia(valor)
+
+
+def cache_consulta(*tabelas: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Decora `f(caminho_banco, *args, **kwargs)` cujo resultado depende só de `tabelas`.
+
+    Argumentos não *hashable* desativam o cache para aquela chamada.
+    """
+
+    def deco(fn: Callable[..., Any]) -> Callable[..., Any]:
+        nome = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(db_path_like: Any, *args: Any, **kwargs: Any) -> Any:
+            chave = (nome, args, tuple(sorted(kwargs.items())))
+            try:
+                hash(chave)
+            except TypeError:
+                return fn(db_path_like, *args, **kwargs)
+            return _cacheado(
+                db_path_like, tabelas, chave, lambda: fn(db_path_like, *args, **kwargs)
+            )
+
+        wrapper.tabelas = tabelas  # type: ignore[attr-defined]
+        return wrapper
+
+    return deco
+
+
+def consultar(
+    db_path_like: Any, sql: str, params: Iterable[Any] = (), *, tabelas: Sequence[str]
+) -> List[Tuple[Any, ...]]:
+    """Executa um SELECT com cache por versão das `tabelas`; retorna `list[tuple]`."""
+    params = tuple(params)
+
+    def _calcular() -> List[Tuple[Any, ...]]:
+        with get_conn(db_path_like) as conn:
+            return [tuple(r) for r in conn.execute(sql, params).fetchall()]
+
+    return _cacheado(db_path_like, tabelas, ("sql", sql, params), _calcular)
+
+
+def limpar_cache() -> None:
+    """Descarta todos os resultados em cache deste processo."""
+    with _lock:
+        _store.clear()
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Contadores `hits`, `misses` e `entradas`."""
+    with _lock:
+        out = dict(_stats)
+        out["entradas"] = len(_store)
+    return out
+
+
+__all__ = [
+    "MAX_ENTRADAS",
+    "cache_consulta",
+    "consultar",
+    "versoes_tabelas",
+    "invalidar_tabelas",
+    "limpar_cache",
+    "get_cache_stats",
+]
@@ -2,16 +2,45 @@
 Módulo DB (Shared)
 ==================
 
-Camada de acesso SQLite (PRAGMAs padrão) para o FlowDash.
+Camada de acesso SQLite (PRAGMAs padrão + pool de conexões) para o FlowDash.
 
 Funcionalidades principais
 --------------------------
-- Fornece uma função utilitária `get_conn` para abrir conexões SQLite já
+- Fornece uma função utilitária `get_conn` que entrega conexões SQLite já
   configuradas para uso em produção.
-- Configuração automática de PRAGMAs de integridade e performance.
-- Suporte a parsing automático de DATE/DATETIME.
+- Pool por *thread*: cada thread reutiliza **uma** conexão por arquivo de banco
+  (chave = caminho resolvido), evitando reabrir o arquivo e reaplicar PRAGMAs a
+  cada chamada de repositório/serviço.
+- Health-check no checkout (conexão fechada, arquivo substituído ou removido
+  → reconecta), limitado a uma vez a cada `INTERVALO_HEALTH_S` por conexão
+  (ou logo após um erro); `_closed` é conferido sempre.
+- Contadores de uso do pool (`get_pool_stats` / `reset_pool_stats`).
+- Ganchos de observação do checkout (`adicionar_observador` /
+  `remover_observador`), usados pela instrumentação (`shared.instrumentacao`)
+  e pelo perfil de SQL (`shared.perfil_sql`) para equipar as conexões do pool
+  sem custo quando desligados.
 - Retorno de resultados com `row_factory` permitindo acesso por nome de coluna.
 
+Semântica das conexões do pool
+------------------------------
+- `with get_conn(db) as conn:` continua válido: ao sair do bloco **mais externo**
+  faz `commit` (ou `rollback` em exceção). Blocos aninhados na mesma thread
+  compartilham a transação do bloco externo, cada um sob um `SAVEPOINT`: se o
+  bloco interno falha, só as escritas dele são desfeitas (mesmo que o externo
+  capture a exceção e siga para o commit).
+- Dentro de um bloco aninhado, `conn.commit()` não confirma a transação do
+  bloco externo (no-op: o commit fica para o bloco mais externo) e
+  `conn.rollback()` volta só ao `SAVEPOINT` do bloco aninhado.
+- Checkout **mais externo** (nenhum `with` ativo na thread) com transação
+  aberta — um chamador anterior escreveu sem `with` nem `close()` — desfaz
+  essas pendências em vez de deixá-las para o próximo commit.
+- `conn.close()` **não** fecha a conexão física: apenas devolve ao pool
+  (descartando alterações não confirmadas, como o `close()` original faria).
+  Para fechar de fato, use `close_pooled_conns()`.
+- `row_factory` é restaurado para `sqlite3.Row` no checkout **mais externo**;
+  checkouts aninhados (com um `with` ativo na thread) não mexem nele.
+- Bancos em memória (`:memory:`) não são compartilhados.
+
 Detalhes técnicos
 -----------------
 - `journal_mode = WAL`: permite concorrência de leitura/escrita.
@@ -28,14 +57,195 @@ Dependências
 """
 
 from __future__ import annotations
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import os
 import sqlite3
+import threading
+import time
+import weakref
 from utils.utils import resolve_db_path
 
+logger = logging.getLogger(__name__)
+
+# -----------------------------------------------------------------------------
+# Conexão "poolável"
+# -----------------------------------------------------------------------------
+class PooledConnection(sqlite3.Connection):
+    """
+    Conexão SQLite reutilizável entre chamadas da mesma thread.
+
+    - `__enter__`/`__exit__` contam a profundidade: somente o bloco mais externo
+      confirma (commit) ou desfaz (rollback) a transação.
+    - Blocos aninhados abrem um `SAVEPOINT` (quando já há transação) e, em
+      exceção, voltam a ele; se a transação começou dentro do bloco aninhado,
+      a exceção a desfaz inteira (não havia nada do externo pendente).
+    - `commit()`/`rollback()` explícitos dentro de um bloco aninhado não
+      encerram a transação do externo (no-op / volta ao savepoint).
+    - `close()` devolve a conexão ao pool em vez de fechá-la.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._depth = 0
+        self._closed = False
+        self._pool_key: Optional[str] = None
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._checado_em = 0.0
+        self._savepoints: List[Optional[str]] = []
+
+    def __enter__(self) -> "PooledConnection":
+        self._depth += 1
+        if self._depth > 1:
+            nome: Optional[str] = None
+            if self.in_transaction:
+                nome = f"flowdash_sp{self._depth}"
+                self.execute(f"SAVEPOINT {nome}")
+            self._savepoints.append(nome)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._depth = max(0, self._depth - 1)
+        if self._depth == 0:
+            self._savepoints.clear()
+            if exc_type is not None:
+                self._checado_em = 0.0  # erro: confere a conexão no próximo checkout
+            return super().__exit__(exc_type, exc, tb)
+        nome = self._savepoints.pop() if self._savepoints else None
+        try:
+            if exc_type is None:
+                if nome:
+                    self.execute(f"RELEASE {nome}")
+            elif nome:
+                self.execute(f"ROLLBACK TO {nome}")
+                self.execute(f"RELEASE {nome}")
+            elif self.in_transaction:
+                self.rollback()  # transação aberta dentro do bloco aninhado
+        except sqlite3.OperationalError as e:
+            # Savepoint perdido: alguém encerrou a transação com SQL cru
+            # (COMMIT/ROLLBACK) dentro do bloco aninhado
+            logger.warning("db: savepoint %s perdido no bloco aninhado: %s", nome, e)
+        return False
+
+    def commit(self) -> None:
+        """Confirma — exceto dentro de um bloco aninhado (fica para o bloco mais externo)."""
+        if self._depth > 1:
+            return
+        super().commit()
+
+    def rollback(self) -> None:
+        """Desfaz — dentro de um bloco aninhado, só até o savepoint dele."""
+        if self._depth > 1:
+            nome = self._savepoints[-1] if self._savepoints else None
+            if nome:
+                self.execute(f"ROLLBACK TO {nome}")
+                return
+        super().rollback()
+
+    def close(self) -> None:
+        """Devolve ao pool (rollback de pendências se não houver bloco `with` ativo)."""
+        if self._pool_key is None:
+            self.close_physical()
+            return
+        if self._depth == 0 and not self._closed:
+            try:
+                if self.in_transaction:
+                    self.rollback()
+            except sqlite3.Error:
+                pass
+
+    def close_physical(self) -> None:
+        """Fecha de fato a conexão (usado no descarte/encerramento)."""
+        if not self._closed:
+            self._closed = True
+            try:
+                super().close()
+            except sqlite3.Error:
+                pass
+
+
+# -----------------------------------------------------------------------------
+# Pool por thread
+# -----------------------------------------------------------------------------
+_local = threading.local()
+_all_conns: "weakref.WeakSet[PooledConnection]" = weakref.WeakSet()
+_stats_lock = threading.Lock()
+_stats: Dict[str, float] = {
+    "opens": 0,
+    "reuses": 0,
+    "reconnects": 0,
+    "wait_ms": 0.0,
+}
+
+# Chamados a cada checkout com (conexão, evento) — evento: opens/reuses/reconnects
+_observadores: Tuple[Callable[[sqlite3.Connection, str], None], ...] = ()
+
+
+def _thread_pool() -> Dict[str, PooledConnection]:
+    pool = getattr(_local, "conns", None)
+    if pool is None:
+        pool = {}
+        _local.conns = pool
+    return pool
+
+
+def _file_id(path: str) -> Optional[Tuple[int, int]]:
+    """Identidade do arquivo (device, inode) — detecta banco substituído/removido."""
+    try:
+        st = os.stat(path)
+        return (st.st_dev, st.st_ino)
+    except OSError:
+        return None
+
+
+def _pool_key(db_path: str) -> Optional[str]:
+    if db_path == ":memory:" or db_path.startswith("file:"):
+        return None
+    return os.path.realpath(db_path)
+
+
+def _open(db_path: str, pooled: bool) -> PooledConnection:
+    conn = sqlite3.connect(
+        db_path,
+        timeout=30,
+        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+        factory=PooledConnection,
+    )
+    # PRAGMAs padrão do projeto (aplicados uma única vez por conexão física)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA busy_timeout=30000;")
+    conn.execute("PRAGMA foreign_keys=ON;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    if pooled:
+        _all_conns.add(conn)
+    return conn
+
+
+# Intervalo mínimo entre health-checks completos (stat + SELECT 1) por conexão
+INTERVALO_HEALTH_S = 2.0
+
+
+def _is_healthy(conn: PooledConnection, key: str) -> bool:
+    if conn._closed:
+        return False
+    if conn._depth > 0:
+        return True  # em uso por um bloco externo: não trocar debaixo dele
+    agora = time.monotonic()
+    if agora - conn._checado_em < INTERVALO_HEALTH_S:
+        return True
+    if conn._file_id != _file_id(key):
+        return False
+    try:
+        conn.execute("SELECT 1").fetchone()
+    except sqlite3.Error:
+        return False
+    conn._checado_em = agora
+    return True
+
 
 def get_conn(db_path_like: Any) -> sqlite3.Connection:
     """
-    Abre uma conexão SQLite pronta para uso em produção.
+    Obtém a conexão SQLite (do pool da thread atual) pronta para uso em produção.
 
     Aceita:
         - Caminho (str ou PathLike)
@@ -46,25 +256,133 @@ def get_conn(db_path_like: Any) -> sqlite3.Connection:
         db_path_like (Any): Referência ao banco (string/PathLike/objeto com atributo de caminho).
 
     Returns:
-        sqlite3.Connection: Conexão aberta. O chamador é responsável por fechá-la.
+        sqlite3.Connection: Conexão aberta e reutilizável. `close()` apenas a
+        devolve ao pool; use como context manager para commit/rollback.
     """
     db_path = resolve_db_path(db_path_like)
+    key = _pool_key(db_path)
+    t0 = time.perf_counter()
 
-    conn = sqlite3.connect(
-        db_path,
-        timeout=30,
-        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
-    )
-    # PRAGMAs padrão do projeto
-    conn.execute("PRAGMA journal_mode=WAL;")
-    conn.execute("PRAGMA busy_timeout=30000;")
-    conn.execute("PRAGMA foreign_keys=ON;")
-    conn.execute("PRAGMA synchronous=NORMAL;")
+    if key is None:
+        conn = _open(db_path, pooled=False)
+        conn.row_factory = sqlite3.Row
+        with _stats_lock:
+            _stats["opens"] += 1
+            _stats["wait_ms"] += (time.perf_counter() - t0) * 1000.0
+        for obs in _observadores:
+            obs(conn, "opens")
+        return conn
+
+    pool = _thread_pool()
+    conn = pool.get(key)
+    event = "reuses"
+    if conn is not None and not _is_healthy(conn, key):
+        conn.close_physical()
+        pool.pop(key, None)
+        conn = None
+        event = "reconnects"
+    if conn is None:
+        conn = _open(db_path, pooled=True)
+        conn._pool_key = key
+        conn._file_id = _file_id(key)
+        conn._checado_em = time.monotonic()
+        pool[key] = conn
+        if event == "reuses":
+            event = "opens"
 
-    # Rows acessíveis por nome de coluna
-    conn.row_factory = sqlite3.Row
+    # Rows acessíveis por nome de coluna (restaura se algum chamador alterou);
+    # só no checkout externo — um `with` ativo pode estar usando outro factory.
+    # Transação aberta sem `with` ativo = pendência de um chamador anterior que
+    # não confirmou nem devolveu a conexão: não pode vazar para o próximo commit
+    if conn._depth == 0:
+        conn.row_factory = sqlite3.Row
+        if conn.in_transaction:
+            logger.warning("db: transação pendente no checkout de %s desfeita", key)
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+
+    with _stats_lock:
+        _stats[event] += 1
+        if event == "reconnects":
+            _stats["opens"] += 1
+        _stats["wait_ms"] += (time.perf_counter() - t0) * 1000.0
+    for obs in _observadores:
+        obs(conn, event)
     return conn
 
 
+def adicionar_observador(fn: Callable[[sqlite3.Connection, str], None]) -> None:
+    """
+    Registra um observador de checkout do pool (idempotente).
+
+    O observador roda na thread dona da conexão, logo após o `row_factory` ser
+    restaurado — pode, portanto, trocar o `row_factory` (só quando
+    `conn._depth == 0`, como o próprio pool) ou instalar callbacks.
+    """
+    global _observadores
+    with _stats_lock:
+        if fn not in _observadores:
+            _observadores = _observadores + (fn,)
+
+
+def remover_observador(fn: Callable[[sqlite3.Connection, str], None]) -> None:
+    """Remove um observador registrado com `adicionar_observador` (se houver)."""
+    global _observadores
+    with _stats_lock:
+        _observadores = tuple(o for o in _observadores if o is not fn)
+
+
+def close_pooled_conns(db_path_like: Any = None) -> int:
+    """
+    Fecha fisicamente as conexões do pool da thread atual.
+
+    Args:
+        db_path_like (Any, opcional): Se informado, fecha apenas a conexão desse banco.
+
+    Returns:
+        int: Quantidade de conexões fechadas.
+    """
+    pool = _thread_pool()
+    if db_path_like is None:
+        keys = list(pool.keys())
+    else:
+        key = _pool_key(resolve_db_path(db_path_like))
+        keys = [key] if key in pool else []
+    for k in keys:
+        pool.pop(k).close_physical()
+    return len(keys)
+
+
+def get_pool_stats() -> Dict[str, float]:
+    """
+    Retorna os contadores do pool (todas as threads).
+
+    Chaves: `opens`, `reuses`, `reconnects`, `wait_ms` (tempo acumulado de
+    checkout, incluindo aberturas) e `live` (conexões físicas abertas).
+    """
+    with _stats_lock:
+        out = dict(_stats)
+    out["live"] = sum(1 for c in list(_all_conns) if not c._closed)
+    return out
+
+
+def reset_pool_stats() -> None:
+    """Zera os contadores do pool."""
+    with _stats_lock:
+        for k in _stats:
+            _stats[k] = 0.0 if k == "wait_ms" else 0
+
+
 # API pública explícita
-__all__ = ["get_conn"]
+__all__ = [
+    "get_conn",
+    "PooledConnection",
+    "INTERVALO_HEALTH_S",
+    "close_pooled_conns",
+    "get_pool_stats",
+    "reset_pool_stats",
+    "adicionar_observador",
+    "remover_observador",
+]
@@ -0,0 +1,341 @@
+"""
+Módulo Instrumentação (Shared)
+==============================
+
+Medição de chamadas de serviço e de renders de página em produção: tempo de
+parede, comandos SQL, linhas lidas/gravadas e conexões abertas por chamada,
+agregados em memória com percentis.
+
+Uso rápido
+----------
+1) Como *decorator* (serviços):
+    from shared.instrumentacao import medido
+
+    @medido("ledger.registrar_saida_dinheiro")
+    def registrar_saida_dinheiro(...):
+        ...
+
+2) Como *context manager* (blocos/páginas):
+    from shared.instrumentacao import medir
+
+    with medir("💼 Fechamento de Caixa", tipo="pagina"):
+        render()
+
+3) Ligar/desligar e consultar:
+    ativar(); ...; resumo(); exportar_json("instrumentacao.json"); desativar()
+
+Funcionalidades principais
+--------------------------
+- Desligada por padrão: `medido`/`medir` custam um teste de flag.
+  Liga com `ativar()`, pela página de administração ou com
+  `FLOWDASH_INSTRUMENTAR=1` no ambiente.
+- Enquanto ligada, cada checkout de `shared.db.get_conn` passa pelo
+  observador do pool, que instala `set_trace_callback` (comandos SQL) e um
+  `row_factory` contador (linhas lidas) na conexão.
+- Agregação por `(tipo, nome)`: chamadas, erros, totais e janela das últimas
+  `JANELA` durações para p50/p90/p95/p99.
+- `exportar_json()` devolve/grava o resumo; com
+  `FLOWDASH_INSTRUMENTACAO_JSON=<arquivo>` o resumo é gravado ao sair do processo.
+
+Detalhes técnicos
+-----------------
+- Contadores por thread (pilha de medições): medições aninhadas somam também
+  na medição externa (a página inclui os serviços que chamou).
+- **SQL**: comandos reportados pelo trace do SQLite; repetições consecutivas
+  do mesmo texto (sub-comandos de trigger) contam uma vez.
+- **Linhas lidas**: linhas entregues ao Python (`fetch*`/iteração) pelas
+  conexões do pool; pandas/`read_sql` entram, leituras internas do SQLite não.
+- **Linhas gravadas**: delta de `total_changes` das conexões usadas
+  (inclui linhas alteradas por triggers).
+- **Conexões abertas**: aberturas físicas (`opens`/`reconnects`) do pool.
+- Conexões que receberam o trace continuam com ele após `desativar()`;
+  sem medição ativa o callback só consulta a pilha vazia.
+
+Dependências
+------------
+- sqlite3
+- shared.db (observador de checkout)
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Generator, List, Optional, Tuple, TypeVar
+
+from shared import db as _db
+
+__all__ = [
+    "JANELA",
+    "ativar",
+    "desativar",
+    "ativo",
+    "medir",
+    "medido",
+    "resumo",
+    "exportar_json",
+    "limpar",
+]
+
+R = TypeVar("R")  # Tipo de retorno da função decorada
+
+JANELA = 2000  # durações guardadas por série (percentis sobre as mais recentes)
+_PERCENTIS = (50, 90, 95, 99)
+
+_ativo = False
+_local = threading.local()
+_lock = threading.Lock()
+
+
+# -----------------------------------------------------------------------------
+# Medição corrente (por thread)
+# -----------------------------------------------------------------------------
+class _Quadro:
+    """Contadores de uma medição em andamento."""
+
+    __slots__ = ("sql", "lidas", "aberturas", "conns")
+
+    def __init__(self) -> None:
+        self.sql = 0
+        self.lidas = 0
+        self.aberturas = 0
+        # id(conn) -> (conn, total_changes no início)
+        self.conns: Dict[int, Tuple[sqlite3.Connection, int]] = {}
+        for conn in _db._thread_pool().values():
+            if not conn._closed:
+                self.conns[id(conn)] = (conn, conn.total_changes)
+
+    def escritas(self) -> int:
+        total = 0
+        for conn, base in self.conns.values():
+            try:
+                total += conn.total_changes - base
+            except sqlite3.ProgrammingError:  # conexão fechada no meio da medição
+                pass
+        return total
+
+
+def _pilha() -> List[_Quadro]:
+    pilha = getattr(_local, "pilha", None)
+    if pilha is None:
+        pilha = []
+        _local.pilha = pilha
+    return pilha
+
+
+def _trace(sql: str) -> None:
+    pilha = getattr(_local, "pilha", None)
+    if not pilha:
+        return
+    if sql == getattr(_local, "ultimo_sql", None):
+        return
+    _local.ultimo_sql = sql
+    for q in pilha:
+        q.sql += 1
+
+
+def _linha(cursor: sqlite3.Cursor, row: Tuple[Any, ...]) -> sqlite3.Row:
+    pilha = getattr(_local, "pilha", None)
+    if pilha:
+        for q in pilha:
+            q.lidas += 1
+    return sqlite3.Row(cursor, row)
+
+
+def _observar(conn: sqlite3.Connection, evento: str) -> None:
+    """Observador de checkout do pool (só registrado enquanto ligada)."""
+    if not getattr(conn, "_instrumentada", False):
+        conn.set_trace_callback(_trace)
+        try:
+            conn._instrumentada = True  # type: ignore[attr-defined]
+        except AttributeError:  # conexão sem __dict__ (fora do pool)
+            pass
+    if getattr(conn, "_depth", 0) == 0:  # não troca o factory sob um `with` ativo
+        conn.row_factory = _linha
+    pilha = getattr(_local, "pilha", None)
+    if not pilha:
+        return
+    nova = evento in ("opens", "reconnects")
+    for q in pilha:
+        if nova:
+            q.aberturas += 1
+        if id(conn) not in q.conns:
+            q.conns[id(conn)] = (conn, 0 if nova else conn.total_changes)
+
+
+# -----------------------------------------------------------------------------
+# Agregação
+# -----------------------------------------------------------------------------
+class _Serie:
+    __slots__ = ("chamadas", "erros", "ms_total", "ms_max", "sql", "lidas", "escritas", "aberturas", "ms")
+
+    def __init__(self) -> None:
+        self.chamadas = 0
+        self.erros = 0
+        self.ms_total = 0.0
+        self.ms_max = 0.0
+        self.sql = 0
+        self.lidas = 0
+        self.escritas = 0
+        self.aberturas = 0
+        self.ms: Deque[float] = deque(maxlen=JANELA)
+
+
+_series: Dict[Tuple[str, str], _Serie] = {}
+
+
+def _registrar(tipo: str, nome: str, ms: float, q: _Quadro, erro: bool) -> None:
+    escritas = q.escritas()
+    with _lock:
+        s = _series.get((tipo, nome))
+        if s is None:
+            s = _series[(tipo, nome)] = _Serie()
+        s.chamadas += 1
+        s.erros += int(erro)
+        s.ms_total += ms
+        s.ms_max = max(s.ms_max, ms)
+        s.sql += q.sql
+        s.lidas += q.lidas
+        s.escritas += escritas
+        s.aberturas += q.aberturas
+        s.ms.append(ms)
+
+
+def _percentil(xs: List[float], p: int) -> float:
+    pos = (len(xs) - 1) * p / 100.0
+    lo = int(pos)
+    hi = min(lo + 1, len(xs) - 1)
+    return xs[lo] + (xs[hi] - xs[lo]) * (pos - lo)
+
+
+# -----------------------------------------------------------------------------
+# API
+# -----------------------------------------------------------------------------
+def ativar() -> None:
+    """Liga a instrumentação (afeta as próximas chamadas de todas as threads)."""
+    global _ativo
+    _db.adicionar_observador(_observar)
+    _ativo = True
+
+
+def desativar() -> None:
+    """Desliga a instrumentação; os dados agregados são mantidos."""
+    global _ativo
+    _ativo = False
+    _db.remover_observador(_observar)
+
+
+def ativo() -> bool:
+    return _ativo
+
+
+@contextmanager
+def medir(nome: str, tipo: str = "servico") -> Generator[None, None, None]:
+    """Context manager: mede o bloco como uma chamada `(tipo, nome)`."""
+    if not _ativo:
+        yield
+        return
+    pilha = _pilha()
+    q = _Quadro()
+    pilha.append(q)
+    t0 = time.perf_counter()
+    erro = False
+    try:
+        yield
+    except BaseException:
+        erro = True
+        raise
+    finally:
+        ms = (time.perf_counter() - t0) * 1000.0
+        pilha.pop()
+        if not pilha:
+            _local.ultimo_sql = None
+        _registrar(tipo, nome, ms, q, erro)
+
+
+def medido(nome: Optional[str] = None, tipo: str = "servico") -> Callable[[Callable[..., R]], Callable[..., R]]:
+    """Decorator: mede cada chamada da função (nome padrão: `modulo.Qualname`)."""
+    def deco(fn: Callable[..., R]) -> Callable[..., R]:
+        rotulo = nome or f"{fn.__module__}.{fn.__qualname__}"
+
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> R:
+            if not _ativo:
+                return fn(*args, **kwargs)
+            with medir(rotulo, tipo):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def resumo(tipo: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Séries agregadas, da maior para a menor soma de tempo.
+
+    Cada item: `tipo, nome, chamadas, erros, ms_total, ms_medio, ms_max,
+    p50, p90, p95, p99, sql_por_chamada, lidas_por_chamada,
+    escritas_por_chamada, aberturas` (percentis sobre a janela recente).
+    """
+    with _lock:
+        itens = [(k, s, sorted(s.ms)) for k, s in _series.items() if tipo is None or k[0] == tipo]
+        out = []
+        for (t, nome), s, xs in itens:
+            n = max(s.chamadas, 1)
+            linha: Dict[str, Any] = {
+                "tipo": t,
+                "nome": nome,
+                "chamadas": s.chamadas,
+                "erros": s.erros,
+                "ms_total": round(s.ms_total, 3),
+                "ms_medio": round(s.ms_total / n, 3),
+                "ms_max": round(s.ms_max, 3),
+            }
+            for p in _PERCENTIS:
+                linha[f"p{p}"] = round(_percentil(xs, p), 3) if xs else None
+            linha.update(
+                sql_por_chamada=round(s.sql / n, 2),
+                lidas_por_chamada=round(s.lidas / n, 2),
+                escritas_por_chamada=round(s.escritas / n, 2),
+                aberturas=s.aberturas,
+            )
+            out.append(linha)
+    out.sort(key=lambda r: r["ms_total"], reverse=True)
+    return out
+
+
+def exportar_json(caminho: Any = None) -> Dict[str, Any]:
+    """Resumo + contadores do pool; grava em `caminho` (JSON) se informado."""
+    dados = {
+        "gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "ativo": _ativo,
+        "pool": _db.get_pool_stats(),
+        "series": resumo(),
+    }
+    if caminho:
+        Path(caminho).write_text(json.dumps(dados, ensure_ascii=False, indent=2), encoding="utf-8")
+    return dados
+
+
+def limpar() -> None:
+    """Descarta as séries agregadas."""
+    with _lock:
+        _series.clear()
+
+
+# -----------------------------------------------------------------------------
+# Ambiente
+# -----------------------------------------------------------------------------
+if os.environ.get("FLOWDASH_INSTRUMENTAR", "0") in {"1", "true", "True"}:
+    ativar()
+
+_dump = os.environ.get("FLOWDASH_INSTRUMENTACAO_JSON")
+if _dump:
+    atexit.register(exportar_json, _dump)
@@ -0,0 +1,485 @@
+"""
+Módulo Perfil SQL (Shared)
+==========================
+
+Modo de diagnóstico (dev/ops) que captura cada comando SQL distinto executado
+pelas conexões do pool (`shared.db.get_conn`), roda `EXPLAIN QUERY PLAN` uma
+única vez por comando e aponta os que fazem *full scan* em tabelas grandes —
+para corrigir consultas lentas a partir de dados, não de palpite.
+
+Uso rápido
+----------
+    from shared import perfil_sql
+
+    perfil_sql.ativar()
+    ...                                   # navega/roda o fluxo suspeito
+    for item in perfil_sql.relatorio(apenas_alertas=True):
+        print(item["ms_total"], item["origem"], item["sql"])
+    perfil_sql.exportar_json("perfil_sql.json")
+
+Funcionalidades principais
+--------------------------
+- Desligado por padrão; liga com `ativar()`, pela página de administração
+  (📈 Desempenho), com `FLOWDASH_PERFIL_SQL=1` no ambiente ou com
+  `python -m benchmarks.suite run --perfil-sql`.
+- Agrupa por comando **normalizado** (literais → `?`, listas `IN (?, ?, …)`
+  colapsadas, espaços compactados): chamadas, tempo acumulado, linhas
+  entregues ao Python e o primeiro ponto de chamada no código (`arquivo:linha`).
+- Plano (`EXPLAIN QUERY PLAN`) capturado na primeira ocorrência, na própria
+  conexão e com os mesmos parâmetros; cada `SCAN <tabela>` é cruzado com o
+  tamanho da tabela e vira **alerta** a partir de `LIMIAR_LINHAS` linhas.
+- `exportar_json()` devolve/grava o relatório; com
+  `FLOWDASH_PERFIL_SQL_JSON=<arquivo>` ele é gravado ao sair do processo.
+
+Detalhes técnicos
+-----------------
+- Enquanto ligado, o observador de checkout do pool sombreia `cursor`,
+  `execute` e `executemany` **na instância** da conexão: os cursores passam a
+  ser `_CursorPerfilado`, que cronometra `execute*` e os `fetch*`/iteração
+  (o tempo de um SELECT inclui a leitura das linhas). `desativar()` remove o
+  sombreamento de todas as conexões do pool.
+- Cobre `conn.execute`, `conn.cursor().execute` e `pandas.read_sql` (que usa
+  `conn.cursor()`); `executescript` (migrações/DDL) fica de fora.
+- O tempo de um comando inclui o dos triggers que ele dispara; comandos
+  internos de trigger não aparecem separados.
+- Tamanho das tabelas: `MAX(rowid)` (aproximado, O(log n)) ou `COUNT(*)` em
+  tabelas `WITHOUT ROWID`; calculado uma vez por banco/tabela.
+- As consultas auxiliares (plano e tamanho de tabela) rodam na mesma conexão
+  e, com `shared.instrumentacao` ligada, entram na contagem de SQL da chamada
+  em que o comando apareceu pela primeira vez.
+- O perfil encarece cada comando (Python no caminho do cursor): use os tempos
+  para comparar comandos entre si, não como latência de produção.
+
+Linha de comando
+----------------
+    python -m shared.perfil_sql perfil_sql.json [--apenas-alertas] [--top 20]
+
+    Imprime um relatório exportado (por `exportar_json` ou pelo benchmark).
+
+Dependências
+------------
+- sqlite3
+- shared.db (observador de checkout)
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import itertools
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from shared import db as _db
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "LIMIAR_LINHAS",
+    "ativar",
+    "desativar",
+    "ativo",
+    "normalizar",
+    "relatorio",
+    "exportar_json",
+    "formatar",
+    "limpar",
+]
+
+LIMIAR_LINHAS = 1000  # SCAN em tabela com pelo menos isso de linhas vira alerta
+
+_ativo = False
+_lock = threading.Lock()
+
+_RAIZ = Path(__file__).resolve().parents[1]
+_IGNORAR_ORIGEM = (os.path.normcase(__file__), os.sep + "pandas" + os.sep, os.sep + "sqlite3" + os.sep)
+_EXPLICAVEIS = {"SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE"}
+
+
+# -----------------------------------------------------------------------------
+# Normalização
+# -----------------------------------------------------------------------------
+_RE_TEXTO = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMERO = re.compile(r"(?<![\w.])\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_RE_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_ESPACOS = re.compile(r"\s+")
+_RE_SCAN = re.compile(r"^SCAN (?:TABLE )?(?!CONSTANT ROW)([A-Za-z_]\w*)")
+_RE_ORIGEM_TABELA = re.compile(r"\b(?:FROM|JOIN)\s+\"?([A-Za-z_]\w*)\"?(?:\s+(?:AS\s+)?([A-Za-z_]\w*))?", re.IGNORECASE)
+_NAO_ALIAS = {
+    "WHERE", "ON", "USING", "JOIN", "LEFT", "RIGHT", "FULL", "INNER", "OUTER", "CROSS", "NATURAL",
+    "GROUP", "ORDER", "LIMIT", "HAVING", "UNION", "EXCEPT", "INTERSECT", "WINDOW", "INDEXED", "NOT", "SET",
+}
+
+_MAX_CACHE_NORMALIZACAO = 5000
+_normalizados: Dict[str, str] = {}
+
+
+def normalizar(sql: str) -> str:
+    """
+    Chave de agrupamento do comando: literais → `?`, `IN (?, ?, …)` → `IN (?…)`,
+    espaços compactados e `;` final removido.
+    """
+    s = _RE_TEXTO.sub("?", sql)
+    s = _RE_NUMERO.sub("?", s)
+    s = _RE_LISTA.sub("(?…)", s)
+    return _RE_ESPACOS.sub(" ", s).strip().rstrip(";").strip()
+
+
+def _aliases(sql: str) -> Dict[str, str]:
+    """Mapa alias → tabela dos `FROM`/`JOIN` do comando (o plano mostra o alias)."""
+    out: Dict[str, str] = {}
+    for tabela, alias in _RE_ORIGEM_TABELA.findall(sql):
+        if alias and alias.upper() not in _NAO_ALIAS:
+            out[alias] = tabela
+    return out
+
+
+def _chave(sql: str) -> str:
+    chave = _normalizados.get(sql)
+    if chave is None:
+        if len(_normalizados) >= _MAX_CACHE_NORMALIZACAO:
+            _normalizados.clear()
+        chave = _normalizados[sql] = normalizar(sql)
+    return chave
+
+
+# -----------------------------------------------------------------------------
+# Coleta
+# -----------------------------------------------------------------------------
+class _Comando:
+    """Estatísticas de um comando normalizado."""
+
+    __slots__ = ("chave", "sql", "banco", "origem", "chamadas", "ms_total", "linhas", "plano", "scans", "erro_plano")
+
+    def __init__(self, chave: str, sql: str, banco: Optional[str], origem: str) -> None:
+        self.chave = chave
+        self.sql = sql
+        self.banco = banco
+        self.origem = origem
+        self.chamadas = 0
+        self.ms_total = 0.0
+        self.linhas = 0
+        self.plano: Optional[List[str]] = None
+        # (tabela, detalhe do plano, linhas da tabela ou None)
+        self.scans: List[Tuple[str, str, Optional[int]]] = []
+        self.erro_plano: Optional[str] = None
+
+
+_comandos: Dict[str, _Comando] = {}
+_tamanhos: Dict[Tuple[Optional[str], str], Optional[int]] = {}
+
+
+def _origem() -> str:
+    """Primeiro quadro da pilha fora deste módulo/pandas/sqlite3 (`arquivo:linha (função)`)."""
+    f = sys._getframe(1)
+    while f is not None:
+        nome = os.path.normcase(f.f_code.co_filename)
+        if not any(p in nome for p in _IGNORAR_ORIGEM):
+            try:
+                arquivo = os.path.relpath(f.f_code.co_filename, _RAIZ)
+            except ValueError:  # outra unidade (Windows)
+                arquivo = f.f_code.co_filename
+            return f"{arquivo}:{f.f_lineno} ({f.f_code.co_name})"
+        f = f.f_back
+    return "?"
+
+
+def _tamanho(conn: sqlite3.Connection, banco: Optional[str], tabela: str) -> Optional[int]:
+    """Linhas (aprox.) de `tabela`; None para CTE/subconsulta/tabela temporária."""
+    chave = (banco, tabela)
+    if chave in _tamanhos:
+        return _tamanhos[chave]
+    n: Optional[int] = None
+    cur = sqlite3.Connection.cursor(conn)
+    cur.row_factory = None
+    try:
+        eh_tabela = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (tabela,)
+        ).fetchone()
+        if eh_tabela:
+            try:
+                n = cur.execute(f'SELECT MAX(rowid) FROM "{tabela}"').fetchone()[0] or 0
+            except sqlite3.OperationalError:  # WITHOUT ROWID
+                n = cur.execute(f'SELECT COUNT(*) FROM "{tabela}"').fetchone()[0]
+    except sqlite3.Error:
+        n = None
+    finally:
+        cur.close()
+    _tamanhos[chave] = n
+    return n
+
+
+def _explicar(conn: sqlite3.Connection, cmd: _Comando, sql: str, parametros: Any) -> None:
+    """Roda `EXPLAIN QUERY PLAN` (uma vez) e registra os SCANs do plano."""
+    palavras = sql.lstrip().split(None, 1)
+    if not palavras or palavras[0].upper() not in _EXPLICAVEIS:
+        cmd.plano = []
+        return
+    cur = sqlite3.Connection.cursor(conn)
+    cur.row_factory = None
+    try:
+        linhas = cur.execute("EXPLAIN QUERY PLAN " + sql, parametros).fetchall()
+    except (sqlite3.Error, ValueError, TypeError) as e:
+        cmd.plano = []
+        cmd.erro_plano = f"{type(e).__name__}: {e}"
+        logger.debug("perfil_sql: plano indisponível para %r: %s", cmd.chave, e)
+        return
+    finally:
+        cur.close()
+    cmd.plano = [str(r[3]) for r in linhas]
+    aliases = _aliases(sql)
+    for detalhe in cmd.plano:
+        m = _RE_SCAN.match(detalhe)
+        if m:
+            tabela = aliases.get(m.group(1), m.group(1))
+            cmd.scans.append((tabela, detalhe, _tamanho(conn, cmd.banco, tabela)))
+
+
+def _anotar(cur: "_CursorPerfilado", sql: Any, parametros: Any, segundos: float) -> None:
+    if not _ativo or not isinstance(sql, str):
+        return
+    chave = _chave(sql)
+    cur._perfil_chave = chave
+    novo = None
+    with _lock:
+        cmd = _comandos.get(chave)
+        if cmd is None:
+            conn = cur.connection
+            cmd = novo = _comandos[chave] = _Comando(chave, sql, getattr(conn, "_pool_key", None), _origem())
+        cmd.chamadas += 1
+        cmd.ms_total += segundos * 1000.0
+    if novo is not None:
+        _explicar(cur.connection, novo, sql, parametros)
+
+
+def _somar(cur: "_CursorPerfilado", segundos: float, linhas: int) -> None:
+    chave = getattr(cur, "_perfil_chave", None)
+    if chave is None or not _ativo:
+        return
+    with _lock:
+        cmd = _comandos.get(chave)
+        if cmd is not None:
+            cmd.ms_total += segundos * 1000.0
+            cmd.linhas += linhas
+
+
+class _CursorPerfilado(sqlite3.Cursor):
+    """Cursor que cronometra `execute*` e a leitura das linhas."""
+
+    def execute(self, sql: str, parameters: Any = ()) -> "_CursorPerfilado":  # type: ignore[override]
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _anotar(self, sql, parameters, time.perf_counter() - t0)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable[Any]) -> "_CursorPerfilado":  # type: ignore[override]
+        it = iter(seq_of_parameters)
+        primeiro = next(it, None)
+        lote = itertools.chain((primeiro,), it) if primeiro is not None else ()
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, lote)
+        finally:
+            _anotar(self, sql, primeiro if primeiro is not None else (), time.perf_counter() - t0)
+
+    def fetchone(self) -> Any:
+        t0 = time.perf_counter()
+        row = super().fetchone()
+        _somar(self, time.perf_counter() - t0, int(row is not None))
+        return row
+
+    def fetchmany(self, size: Optional[int] = None) -> List[Any]:
+        t0 = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        _somar(self, time.perf_counter() - t0, len(rows))
+        return rows
+
+    def fetchall(self) -> List[Any]:
+        t0 = time.perf_counter()
+        rows = super().fetchall()
+        _somar(self, time.perf_counter() - t0, len(rows))
+        return rows
+
+    def __next__(self) -> Any:
+        t0 = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            _somar(self, time.perf_counter() - t0, 0)
+            raise
+        _somar(self, time.perf_counter() - t0, 1)
+        return row
+
+
+_SOMBREADOS = ("cursor", "execute", "executemany")
+
+
+def _equipar(conn: sqlite3.Connection) -> None:
+    def cursor(factory: Any = None) -> sqlite3.Cursor:
+        return sqlite3.Connection.cursor(conn, factory or _CursorPerfilado)
+
+    def execute(sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        return cursor().execute(sql, parameters)
+
+    def executemany(sql: str, seq_of_parameters: Iterable[Any]) -> sqlite3.Cursor:
+        return cursor().executemany(sql, seq_of_parameters)
+
+    conn.cursor = cursor  # type: ignore[method-assign]
+    conn.execute = execute  # type: ignore[method-assign]
+    conn.executemany = executemany  # type: ignore[method-assign]
+
+
+def _desequipar(conn: sqlite3.Connection) -> None:
+    d = getattr(conn, "__dict__", {})
+    for nome in _SOMBREADOS:
+        d.pop(nome, None)
+
+
+def _observar(conn: sqlite3.Connection, evento: str) -> None:
+    """Observador de checkout do pool (só registrado enquanto ligado)."""
+    d = getattr(conn, "__dict__", None)
+    if d is not None and "cursor" not in d:
+        _equipar(conn)
+
+
+# -----------------------------------------------------------------------------
+# API
+# -----------------------------------------------------------------------------
+def ativar() -> None:
+    """Liga o perfil (afeta os próximos checkouts de todas as threads)."""
+    global _ativo
+    _ativo = True
+    _db.adicionar_observador(_observar)
+
+
+def desativar() -> None:
+    """Desliga o perfil e remove o sombreamento das conexões; os dados são mantidos."""
+    global _ativo
+    _ativo = False
+    _db.remover_observador(_observar)
+    for conn in list(_db._all_conns):
+        _desequipar(conn)
+
+
+def ativo() -> bool:
+    return _ativo
+
+
+def relatorio(*, apenas_alertas: bool = False, limiar_linhas: int = LIMIAR_LINHAS) -> List[Dict[str, Any]]:
+    """
+    Comandos capturados, do maior para o menor tempo acumulado.
+
+    Cada item: `sql, origem, chamadas, ms_total, ms_medio, pct_tempo, linhas,
+    plano, scans [{tabela, linhas_tabela, detalhe}], alerta, erro_plano`.
+    `alerta` é True quando algum SCAN atinge tabela com `limiar_linhas`+ linhas.
+    """
+    with _lock:
+        cmds = list(_comandos.values())
+        total = sum(c.ms_total for c in cmds) or 1.0
+        out: List[Dict[str, Any]] = []
+        for c in cmds:
+            scans = [{"tabela": t, "linhas_tabela": n, "detalhe": d} for t, d, n in c.scans]
+            alerta = any(n is not None and n >= limiar_linhas for _t, _d, n in c.scans)
+            if apenas_alertas and not alerta:
+                continue
+            out.append({
+                "sql": c.chave,
+                "origem": c.origem,
+                "banco": c.banco,
+                "chamadas": c.chamadas,
+                "ms_total": round(c.ms_total, 3),
+                "ms_medio": round(c.ms_total / max(c.chamadas, 1), 3),
+                "pct_tempo": round(100.0 * c.ms_total / total, 2),
+                "linhas": c.linhas,
+                "plano": list(c.plano or []),
+                "scans": scans,
+                "alerta": alerta,
+                "erro_plano": c.erro_plano,
+            })
+    out.sort(key=lambda r: r["ms_total"], reverse=True)
+    return out
+
+
+def exportar_json(caminho: Any = None, *, limiar_linhas: int = LIMIAR_LINHAS) -> Dict[str, Any]:
+    """Relatório completo; grava em `caminho` (JSON) se informado."""
+    itens = relatorio(limiar_linhas=limiar_linhas)
+    dados = {
+        "gerado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "ativo": _ativo,
+        "limiar_linhas": limiar_linhas,
+        "comandos": len(itens),
+        "alertas": sum(1 for i in itens if i["alerta"]),
+        "itens": itens,
+    }
+    if caminho:
+        Path(caminho).write_text(json.dumps(dados, ensure_ascii=False, indent=2), encoding="utf-8")
+    return dados
+
+
+def formatar(itens: Iterable[Dict[str, Any]], *, top: Optional[int] = None) -> str:
+    """Texto legível de itens de `relatorio()` (usado pela CLI e pelo benchmark)."""
+    blocos: List[str] = []
+    for i, item in enumerate(itens):
+        if top is not None and i >= top:
+            break
+        marca = "⚠ SCAN" if item["alerta"] else "      "
+        cab = (
+            f"{marca} {item['ms_total']:>10.2f} ms  {item['chamadas']:>6}x  "
+            f"{item['pct_tempo']:>5.1f}%  {item['origem']}"
+        )
+        linhas = [cab, f"         {item['sql']}"]
+        for s in item["scans"]:
+            n = "?" if s["linhas_tabela"] is None else s["linhas_tabela"]
+            linhas.append(f"         └ {s['detalhe']}  ({n} linhas)")
+        if item.get("erro_plano"):
+            linhas.append(f"         └ plano indisponível: {item['erro_plano']}")
+        blocos.append("\n".join(linhas))
+    return "\n\n".join(blocos)
+
+
+def limpar() -> None:
+    """Descarta os comandos capturados e o cache de tamanhos de tabela."""
+    with _lock:
+        _comandos.clear()
+        _tamanhos.clear()
+
+
+# -----------------------------------------------------------------------------
+# CLI / ambiente
+# -----------------------------------------------------------------------------
+def _main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Imprime um relatório do perfil SQL do FlowDash.")
+    parser.add_argument("arquivo", help="JSON gerado por exportar_json / benchmarks.suite --perfil-sql")
+    parser.add_argument("--apenas-alertas", action="store_true", help="Só comandos com SCAN em tabela grande")
+    parser.add_argument("--top", type=int, default=None, help="Limita aos N comandos mais caros")
+    args = parser.parse_args(argv)
+
+    dados = json.loads(Path(args.arquivo).read_text(encoding="utf-8"))
+    itens = [i for i in dados.get("itens", []) if i.get("alerta") or not args.apenas_alertas]
+    print(
+        f"{dados.get('comandos', len(itens))} comando(s), {dados.get('alertas', 0)} alerta(s) "
+        f"(limiar {dados.get('limiar_linhas', LIMIAR_LINHAS)} linhas)\n"
+    )
+    print(formatar(itens, top=args.top))
+    return 0
+
+
+if os.environ.get("FLOWDASH_PERFIL_SQL", "0") in {"1", "true", "True"}:
+    ativar()
+
+_dump = os.environ.get("FLOWDASH_PERFIL_SQL_JSON")
+if _dump:
+    atexit.register(exportar_json, _dump)
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
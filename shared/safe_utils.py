@@ -237,9 +237,9 @@ def processar_salvar_saida(payload: Dict[str, Any], db_path: str) -> Tuple[bool,
             return (False, "Informe o banco para PIX/DÉBITO.")
 
         # Import tardio evita problemas de import circular em alguns setups
-        from services.ledger.service_ledger import LedgerService
+        from services.ledger import container
 
-        L = LedgerService(db_path)
+        L = container.obter(db_path).ledger
 
         resultado = L.registrar_lancamento(
             tipo_evento="SAIDA",
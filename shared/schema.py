@@ -0,0 +1,192 @@
+"""
+Módulo Schema (Shared)
+======================
+
+Registro de *schema* por banco de dados: cache das colunas de cada tabela,
+invalidado somente quando o schema muda (`PRAGMA schema_version`).
+
+Funcionalidades principais
+--------------------------
+- `colunas(conn, tabela)`: conjunto de colunas da tabela (vazio se não existir),
+  sem `PRAGMA table_info` no caminho quente — apenas uma leitura barata de
+  `PRAGMA schema_version` para validar o cache.
+- `garantir_colunas(conn, tabela, {coluna: tipo})`: `ALTER TABLE ADD COLUMN`
+  só para as colunas ausentes (consulta o cache antes).
+- `executar_migracoes(db)`: passo único de inicialização (uma vez por processo e
+  por arquivo) com as migrações "garantir coluna" que antes rodavam a cada
+  escrita (vendas, movimentações bancárias, etc.).
+
+Detalhes técnicos
+-----------------
+- A chave do cache é o caminho resolvido do arquivo (a mesma do pool de
+  conexões); conexões fora do pool usam `PRAGMA database_list`.
+- `schema_version` é incrementado pelo SQLite a cada DDL (de qualquer conexão),
+  então alterações feitas por outros processos também invalidam o cache.
+
+Dependências
+------------
+- sqlite3
+- shared.db.get_conn
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, FrozenSet, Mapping, Tuple
+
+from shared.db import get_conn
+
+logger = logging.getLogger(__name__)
+
+# {db_key: (schema_version, {tabela: (colunas_ordenadas, colunas)})}
+_cache: Dict[str, Tuple[int, Dict[str, Tuple[Tuple[str, ...], FrozenSet[str]]]]] = {}
+_lock = threading.Lock()
+
+# Arquivos em que `executar_migracoes` já rodou neste processo
+_migrados: set = set()
+
+# Colunas garantidas na inicialização: {tabela: {coluna: declaração}}
+# (só aplicadas se a tabela existir; a criação das tabelas é dos repositórios)
+MIGRACOES_COLUNAS: Dict[str, Dict[str, str]] = {
+    "movimentacoes_bancarias": {
+        "usuario": "TEXT",
+        "data_hora": "TEXT",
+        "trans_uid": "TEXT",
+        "referencia_id": "INTEGER",
+    },
+    "entrada": {
+        "Usuario": "TEXT",
+        "valor_liquido": "REAL",
+        "maquineta": "TEXT",
+        # ADD COLUMN não aceita DEFAULT (CURRENT_TIMESTAMP); o valor é gravado no INSERT
+        "created_at": "TEXT",
+    },
+    "fatura_cartao_itens": {
+        "lancamento_id": "INTEGER",  # LANCAMENTO da fatura (CAP) que recebeu a parcela
+    },
+}
+
+
+# -----------------------------------------------------------------------------
+# Cache de colunas
+# -----------------------------------------------------------------------------
+def db_key(conn: sqlite3.Connection) -> str:
+    """Identifica o arquivo do banco principal da conexão."""
+    key = getattr(conn, "_pool_key", None)
+    if key:
+        return key
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        if row[1] == "main":
+            return str(row[2] or ":memory:")
+    return ":memory:"
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Versão do schema (muda a cada CREATE/ALTER/DROP)."""
+    return int(conn.execute("PRAGMA schema_version").fetchone()[0])
+
+
+def _entrada(conn: sqlite3.Connection, tabela: str) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+    key = db_key(conn)
+    sv = schema_version(conn)
+    with _lock:
+        cached = _cache.get(key)
+        if cached is None or cached[0] != sv:
+            cached = (sv, {})
+            _cache[key] = cached
+        tabelas = cached[1]
+        hit = tabelas.get(tabela)
+    if hit is not None:
+        return hit
+
+    # table_xinfo inclui colunas geradas (ocultas em table_info)
+    rows = conn.execute(f'PRAGMA table_xinfo("{tabela}")').fetchall()
+    ordenadas = tuple(str(r[1]) for r in rows if int(r[6] or 0) != 1)
+    hit = (ordenadas, frozenset(ordenadas))
+    with _lock:
+        tabelas[tabela] = hit
+    return hit
+
+
+def colunas(conn: sqlite3.Connection, tabela: str) -> FrozenSet[str]:
+    """Colunas da tabela/view (vazio se não existir), em cache até a próxima DDL."""
+    return _entrada(conn, tabela)[1]
+
+
+def colunas_ordenadas(conn: sqlite3.Connection, tabela: str) -> Tuple[str, ...]:
+    """Como `colunas`, preservando a ordem de declaração."""
+    return _entrada(conn, tabela)[0]
+
+
+def tabela_existe(conn: sqlite3.Connection, tabela: str) -> bool:
+    """True se a tabela (ou view) existir."""
+    return bool(colunas(conn, tabela))
+
+
+def invalidar(conn: sqlite3.Connection | None = None) -> None:
+    """Descarta o cache (de um banco ou de todos)."""
+    with _lock:
+        if conn is None:
+            _cache.clear()
+        else:
+            _cache.pop(db_key(conn), None)
+
+
+def garantir_colunas(conn: sqlite3.Connection, tabela: str, cols: Mapping[str, str]) -> bool:
+    """
+    Adiciona as colunas ausentes (`{coluna: declaração}`). Idempotente.
+
+    Não faz commit. Retorna True se alguma coluna foi criada.
+    """
+    existentes = colunas(conn, tabela)
+    faltantes = [(c, d) for c, d in cols.items() if c not in existentes]
+    for col, decl in faltantes:
+        conn.execute(f'ALTER TABLE "{tabela}" ADD COLUMN "{col}" {decl};')
+    return bool(faltantes)
+
+
+# -----------------------------------------------------------------------------
+# Migrações de inicialização
+# -----------------------------------------------------------------------------
+def executar_migracoes(db_path_like: Any, *, forcar: bool = False) -> None:
+    """
+    Aplica as migrações "garantir coluna/índice" uma única vez por processo.
+
+    Deve ser chamada na inicialização do app (e pelos serviços de escrita, onde
+    custa apenas uma consulta a um `set` depois da primeira vez).
+    """
+    with get_conn(db_path_like) as conn:
+        key = db_key(conn)
+        if key in _migrados and not forcar:
+            return
+        for tabela, cols in MIGRACOES_COLUNAS.items():
+            if tabela_existe(conn, tabela) and garantir_colunas(conn, tabela, cols):
+                logger.info("schema: colunas adicionadas em %s", tabela)
+
+        if tabela_existe(conn, "movimentacoes_bancarias"):
+            from repository.movimentacoes_repository import garantir_coluna_data_dia
+            garantir_coluna_data_dia(conn)
+
+        if tabela_existe(conn, "contas_a_pagar_mov"):
+            from repository.contas_a_pagar_mov_repository import (
+                garantir_encargos_eventos,
+                garantir_indices_em_aberto,
+            )
+            garantir_indices_em_aberto(conn)
+            garantir_encargos_eventos(conn)
+    _migrados.add(key)
+
+
+__all__ = [
+    "MIGRACOES_COLUNAS",
+    "db_key",
+    "schema_version",
+    "colunas",
+    "colunas_ordenadas",
+    "tabela_existe",
+    "invalidar",
+    "garantir_colunas",
+    "executar_migracoes",
+]
@@ -0,0 +1,36 @@
+"""
+Fixtures compartilhadas dos testes
+==================================
+
+- `banco`: cópia do `data/flowdash_template.db` em diretório temporário, já
+  migrada (`executar_migracoes`). Ao final, fecha as conexões do pool e
+  descarta os serviços do ledger ligados a ela.
+"""
+
+from __future__ import annotations
+
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parents[1]
+if str(RAIZ) not in sys.path:
+    sys.path.insert(0, str(RAIZ))
+
+from services.ledger import container  # noqa: E402
+from shared.db import close_pooled_conns  # noqa: E402
+from shared.schema import executar_migracoes  # noqa: E402
+
+TEMPLATE = RAIZ / "data" / "flowdash_template.db"
+
+
+@pytest.fixture
+def banco(tmp_path: Path) -> str:
+    caminho = str(tmp_path / "flowdash_teste.db")
+    shutil.copyfile(TEMPLATE, caminho)
+    executar_migracoes(caminho, forcar=True)
+    yield caminho
+    container.limpar(caminho)
+    close_pooled_conns(caminho)
@@ -0,0 +1,146 @@
+"""Registro único de datas alteradas e as materializações que o consomem."""
+
+from __future__ import annotations
+
+import pytest
+
+from flowdash_pages.lancamentos.pagina.actions_pagina import carregar_resumo_dia
+from repository.dre_repository import RECEITA_BRUTA, atualizar_dre, dre_periodo
+from repository.fatos_repository import agregar, atualizar_fatos
+from repository.resumo_diario_repository import (
+    geracao_resumo_diario,
+    gravar_resumo_diario,
+    ler_resumo_diario,
+)
+from services import exportacao
+from shared.alteracoes import TUDO, garantir_alteracoes, pendencias
+from shared.cache import versoes_tabelas
+from shared.db import get_conn
+
+_HOT = ("entrada", "saida", "movimentacoes_bancarias", "contas_a_pagar_mov", "saldos_bancos")
+
+
+def _venda(conn, data: str, valor: float) -> None:
+    conn.execute(
+        "INSERT INTO entrada (Data, Valor, Forma_de_Pagamento, Usuario, valor_liquido) "
+        "VALUES (?, ?, 'DINHEIRO', 'ana', ?)",
+        (data, valor, valor),
+    )
+
+
+def _garantir_tudo(banco: str) -> None:
+    with get_conn(banco) as conn:
+        atualizar_dre(conn)
+        ler_resumo_diario(conn, "2025-01-10")
+        versoes_tabelas(conn, ["saldos_bancos", "bancos_cadastrados"])
+    exportacao.garantir_exportacao(get_conn(banco))
+
+
+def test_uma_familia_de_triggers_por_tabela(banco):
+    _garantir_tudo(banco)
+    with get_conn(banco) as conn:
+        for tabela in _HOT:
+            nomes = [
+                str(r[0])
+                for r in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type='trigger' AND tbl_name = ?", (tabela,)
+                )
+            ]
+            proprios = [n for n in nomes if n.startswith("trg_alteracoes_")]
+            assert len(proprios) == 3, (tabela, nomes)
+            assert not [
+                n for n in nomes
+                if n.startswith(("trg_resumo_diario_", "trg_fatos_", "trg_dre_", "trg_export_", "trg_cache_versao_"))
+            ], (tabela, nomes)
+
+
+def test_resumo_diario_invalida_so_datas_afetadas(banco):
+    with get_conn(banco) as conn:
+        g = geracao_resumo_diario(conn)
+        assert gravar_resumo_diario(conn, "2025-01-10", {"total_vendas": 1.0}, g)
+        assert gravar_resumo_diario(conn, "2025-01-12", {"total_vendas": 2.0}, g)
+    with get_conn(banco) as conn:
+        _venda(conn, "2025-01-11", 50.0)
+    with get_conn(banco) as conn:
+        assert ler_resumo_diario(conn, "2025-01-10") == {"total_vendas": 1.0}
+        assert ler_resumo_diario(conn, "2025-01-12") == {"total_vendas": 2.0}
+        _venda(conn, "2025-01-10", 50.0)
+        # saldo acumulado: invalida a própria data e as seguintes
+        conn.execute("INSERT INTO saldos_caixas (data, caixa, caixa_2) VALUES ('2025-01-11', 10, 0)")
+    with get_conn(banco) as conn:
+        assert ler_resumo_diario(conn, "2025-01-10") is None
+        assert ler_resumo_diario(conn, "2025-01-12") is None
+
+
+def test_render_sem_alteracao_nao_escreve(banco):
+    with get_conn(banco) as conn:
+        _venda(conn, "2025-01-10", 150.0)
+    primeiro = carregar_resumo_dia(banco, "2025-01-10")
+    assert primeiro["total_vendas"] == pytest.approx(150.0)
+    with get_conn(banco) as conn:
+        atualizar_dre(conn)
+    # o 1º cálculo cria `saldos_bancos_acumulado` (tabela nova = marca TUDO)
+    assert carregar_resumo_dia(banco, "2025-01-10") == primeiro
+
+    conn = get_conn(banco)
+    antes = conn.total_changes
+    assert carregar_resumo_dia(banco, "2025-01-10") == primeiro
+    with get_conn(banco) as c:
+        assert atualizar_fatos(c) == {}
+        assert atualizar_dre(c) == []
+    assert conn.total_changes == antes
+
+
+def test_fatos_e_dre_reprocessam_datas_alteradas(banco):
+    with get_conn(banco) as conn:
+        atualizar_dre(conn)
+        _venda(conn, "2025-03-05", 100.0)
+    with get_conn(banco) as conn:
+        assert set(atualizar_fatos(conn)) == {"fato_vendas_dia"}
+        assert atualizar_dre(conn) == ["2025-03"]
+        linhas = {r["linha"]: r["valor"] for r in dre_periodo(conn, "2025-03", "2025-03")}
+        assert linhas[RECEITA_BRUTA] == pytest.approx(100.0)
+        conn.execute("UPDATE entrada SET Data = '2025-04-01' WHERE Data = '2025-03-05'")
+    with get_conn(banco) as conn:
+        assert atualizar_dre(conn) == ["2025-03", "2025-04"]
+        rows = agregar(conn, "fato_vendas_dia", (), "2025-03-01", "2025-04-30", granularidade="mes")
+        assert [(r["periodo"], r["valor_bruto"]) for r in rows] == [("2025-04", 100.0)]
+
+
+def test_consumidor_sem_cursor_recebe_tudo(banco):
+    with get_conn(banco) as conn:
+        garantir_alteracoes(conn)
+        pend, _ = pendencias(conn, "novo", ["entrada"])
+    assert pend == {"entrada": {TUDO}}
+
+
+def test_cache_muda_versao_com_escrita_em_saldos_bancos(banco):
+    with get_conn(banco) as conn:
+        v1 = versoes_tabelas(conn, ["saldos_bancos"])
+        conn.execute("INSERT INTO saldos_bancos (data, Inter) VALUES ('2025-01-10', 5)")
+        v2 = versoes_tabelas(conn, ["saldos_bancos"])
+        assert v2 != v1
+        assert versoes_tabelas(conn, ["saldos_bancos"]) == v2
+
+
+@pytest.mark.skipif(not exportacao.pyarrow_disponivel(), reason="pyarrow ausente")
+def test_exportacao_regrava_particao_modificada(banco, tmp_path):
+    destino = tmp_path / "snap"
+    with get_conn(banco) as conn:
+        _venda(conn, "2025-01-10", 10.0)
+        _venda(conn, "2025-02-10", 20.0)
+    assert exportacao.exportar(banco, destino, ["entrada"])[0]["status"] == "completa"
+
+    with get_conn(banco) as conn:
+        conn.execute("UPDATE entrada SET Valor = 11 WHERE Data = '2025-01-10'")
+        _venda(conn, "2025-03-10", 30.0)
+    r = exportacao.exportar(banco, destino, ["entrada"])[0]
+    assert r["status"] == "incremental"
+    assert sorted(r["particoes"]) == ["2025-01", "2025-03"]
+
+    df = exportacao.ler_snapshot(destino, "entrada", ["Data", "Valor"])
+    assert sorted(zip(df["Data"], df["Valor"])) == [
+        ("2025-01-10", 11.0), ("2025-02-10", 20.0), ("2025-03-10", 30.0)
+    ]
+    # nada alterado: só relê o estado
+    assert exportacao.exportar(banco, destino, ["entrada"])[0]["linhas"] == 0
@@ -0,0 +1,88 @@
+"""Motor de amortização (PRICE/SAC/FIXO) e reprogramação de empréstimos."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
+from services.ledger.amortizacao import gerar_cronograma, vencimentos_mensais
+from services.ledger.service_ledger import LedgerService
+from shared.db import get_conn
+
+
+@pytest.mark.parametrize("sistema", ["PRICE", "SAC"])
+@pytest.mark.parametrize("principal, n, taxa", [(10_000.0, 12, 2.0), (1_234.57, 7, 1.99), (500_000.0, 360, 0.8)])
+def test_amortizacao_fecha_o_principal(sistema, principal, n, taxa):
+    c = gerar_cronograma(sistema=sistema, parcelas=n, data_primeira_parcela="2025-01-10",
+                         principal=principal, taxa_juros_am=taxa)
+    assert len(c) == n
+    assert round(float(c.amortizacao.sum()), 2) == pytest.approx(principal)
+    assert c.saldo_devedor[-1] == 0.0
+    assert np.allclose(c.valor_parcela, c.amortizacao + c.juros)
+    assert c.total == pytest.approx(round(float(c.amortizacao.sum() + c.juros.sum()), 2))
+
+
+def test_price_parcela_constante():
+    c = gerar_cronograma(sistema="PRICE", parcelas=12, data_primeira_parcela="2025-01-10",
+                         principal=10_000.0, taxa_juros_am=2.0)
+    # pmt = P·i / (1 − (1+i)^−n) = 945,60
+    assert c.valor_parcela[0] == pytest.approx(945.60)
+    assert np.ptp(c.valor_parcela[:-1]) == 0.0
+    assert abs(c.valor_parcela[-1] - c.valor_parcela[0]) < 0.10  # resíduo de arredondamento na última
+    assert c.juros[0] == pytest.approx(200.0)
+    assert np.all(np.diff(c.amortizacao[:-1]) > 0)
+
+
+def test_sac_amortizacao_constante():
+    c = gerar_cronograma(sistema="SAC", parcelas=4, data_primeira_parcela="2025-01-10",
+                         principal=1_000.0, taxa_juros_am=1.0)
+    assert c.amortizacao.tolist() == [250.0, 250.0, 250.0, 250.0]
+    assert c.juros.tolist() == [10.0, 7.5, 5.0, 2.5]
+    assert c.saldo_devedor.tolist() == [750.0, 500.0, 250.0, 0.0]
+
+
+def test_taxa_zero_e_fixo():
+    c = gerar_cronograma(sistema="PRICE", parcelas=3, data_primeira_parcela="2025-01-10", principal=100.0)
+    assert c.valor_parcela.tolist() == [33.33, 33.33, 33.34]
+    f = gerar_cronograma(sistema="FIXO", parcelas=3, data_primeira_parcela="2025-01-10", valor_parcela=50.0)
+    assert f.total == pytest.approx(150.0) and f.juros.sum() == 0
+
+
+def test_vencimentos_no_fim_do_mes():
+    v = vencimentos_mensais("2025-01-31", 4)
+    assert np.datetime_as_string(v).tolist() == ["2025-01-31", "2025-02-28", "2025-03-31", "2025-04-30"]
+    with pytest.raises(ValueError):
+        gerar_cronograma(sistema="XYZ", parcelas=3, data_primeira_parcela="2025-01-10", principal=1.0)
+
+
+def test_reprogramar_emprestimo_preserva_parcelas_pagas(banco):
+    ledger = LedgerService(banco)
+    repo = ContasAPagarMovRepository(banco)
+    ids = ledger.programar_emprestimo(
+        credor="Banco X", data_primeira_parcela="2025-01-10", parcelas_total=6, usuario="teste",
+        emprestimo_id=77, sistema="PRICE", principal=1_200.0, taxa_juros_am=1.0,
+    )
+    assert len(ids) == 6
+    with get_conn(banco) as conn:
+        repo.aplicar_pagamento_parcela(conn, parcela_id=ids[0], valor_base=1_000.0, data_evento="2025-01-10")
+
+    novo = gerar_cronograma(sistema="SAC", parcelas=4, data_primeira_parcela="2025-02-10",
+                            principal=1_000.0, taxa_juros_am=1.0)
+    res = ledger.reprogramar_emprestimo(
+        emprestimo_id=77, data_primeira_parcela="2025-02-10", parcelas_total=4, usuario="teste",
+        sistema="SAC", principal=1_000.0, taxa_juros_am=1.0,
+    )
+    assert res["congeladas"] == 1
+    assert res["removidas"] == 1 and res["criadas"] == 0
+    assert res["ids"] == ids[1:5]
+    assert res["total"] == pytest.approx(novo.total)
+
+    with get_conn(banco) as conn:
+        parcelas = repo.listar_parcelas_emprestimo(conn, 77)
+    assert [p["id"] for p in parcelas] == ids[:5]
+    assert [p["parcela_num"] for p in parcelas] == [1, 2, 3, 4, 5]
+    assert {p["parcelas_total"] for p in parcelas[1:]} == {5}
+    assert [p["valor_evento"] for p in parcelas[1:]] == pytest.approx(novo.valor_parcela.tolist())
+    assert [str(p["vencimento"])[:10] for p in parcelas[1:]] == novo.vencimentos_iso()
+    assert parcelas[0]["principal_pago_acumulado"] > 0  # parcela paga intacta
@@ -0,0 +1,36 @@
+"""Cache de consultas (`shared.cache`): cópias independentes por chamador."""
+
+from __future__ import annotations
+
+import sqlite3
+
+from shared.cache import cache_consulta
+from shared.db import get_conn
+
+
+@cache_consulta("bancos_cadastrados")
+def _linhas(db) -> list:
+    with get_conn(db) as conn:
+        rows = conn.execute("SELECT id, nome FROM bancos_cadastrados ORDER BY id").fetchall()
+    return [{"id": r["id"], "nome": r["nome"], "tags": ["a"]} for r in rows]
+
+
+@cache_consulta("bancos_cadastrados")
+def _rows(db) -> list:
+    with get_conn(db) as conn:
+        return conn.execute("SELECT id, nome FROM bancos_cadastrados").fetchall()
+
+
+def test_alterar_linha_devolvida_nao_altera_o_cache(banco):
+    with get_conn(banco) as conn:
+        conn.execute("INSERT INTO bancos_cadastrados (nome) VALUES ('Inter')")
+    _linhas(banco)  # 1ª consulta cria os triggers de versão (muda o schema)
+    primeira = _linhas(banco)
+    primeira[0]["nome"] = "R$ formatado"
+    primeira[0]["tags"].append("b")
+    primeira.append({})
+
+    assert _linhas(banco) == [{"id": 1, "nome": "Inter", "tags": ["a"]}]
+    _rows(banco)
+    (row,) = _rows(banco)
+    assert isinstance(row, sqlite3.Row) and _rows(banco)[0]["nome"] == "Inter"
@@ -0,0 +1,90 @@
+"""Regra de status das parcelas do CAP: Python, motor SQL e rateio manual."""
+
+from __future__ import annotations
+
+import pytest
+
+from repository.contas_a_pagar_mov_repository import (
+    ContasAPagarMovRepository,
+    recalcular_status_cap,
+    status_parcela,
+)
+from services.ledger.service_ledger import LedgerService
+from shared.db import get_conn
+
+CASOS = [
+    (100.0, 0.0, "EM ABERTO"),
+    (100.0, 0.004, "EM ABERTO"),
+    (100.0, 0.01, "PARCIAL"),
+    (100.0, 99.99, "PARCIAL"),
+    (100.0, 100.0, "QUITADO"),
+    (100.0, 100.0 - 1e-10, "QUITADO"),
+    (100.0, 120.0, "QUITADO"),
+    (0.0, 0.0, "QUITADO"),
+]
+
+
+@pytest.mark.parametrize("valor, principal, esperado", CASOS)
+def test_status_parcela(valor, principal, esperado):
+    assert status_parcela(valor, principal) == esperado
+
+
+def _lancamento(conn, repo, obrigacao_id, valor, status="EM ABERTO"):
+    pid = repo.registrar_lancamento(
+        conn,
+        obrigacao_id=obrigacao_id,
+        tipo_obrigacao="BOLETO",
+        valor_total=valor,
+        data_evento="2025-01-10",
+        vencimento="2025-02-10",
+        descricao="teste",
+        credor="Fornecedor",
+        competencia="2025-02",
+        parcela_num=1,
+        parcelas_total=1,
+        usuario="teste",
+    )
+    conn.execute("UPDATE contas_a_pagar_mov SET status = ? WHERE id = ?", (status, pid))
+    return pid
+
+
+def test_motor_sql_e_helper_do_ledger_concordam(banco):
+    casos = [c for c in CASOS if c[0] > 0]  # valor_evento <> 0 (CHECK da tabela)
+    repo = ContasAPagarMovRepository(banco)
+    ledger = LedgerService(banco)
+    with get_conn(banco) as conn:
+        ids = []
+        for i, (valor, principal, _esp) in enumerate(casos, start=1):
+            pid = _lancamento(conn, repo, 9000 + i, valor, status="?")
+            conn.execute(
+                "UPDATE contas_a_pagar_mov SET principal_pago_acumulado = ? WHERE id = ?", (principal, pid)
+            )
+            ids.append(pid)
+        recalcular_status_cap(conn, parcela_ids=ids)
+        gravados = [
+            conn.execute("SELECT status FROM contas_a_pagar_mov WHERE id = ?", (pid,)).fetchone()[0]
+            for pid in ids
+        ]
+    assert gravados == [esp for *_x, esp in casos]
+    assert [ledger._status_from_vals(v, p) for v, p, _e in casos] == gravados
+
+
+def test_rateio_sem_principal_mantem_status(banco):
+    repo = ContasAPagarMovRepository(banco)
+    with get_conn(banco) as conn:
+        pid = _lancamento(conn, repo, 9100, 200.0, status="VENCIDO")
+        snap = repo.aplicar_rateio_parcela(conn, pid, juros_delta=5.0, data_pagamento="2025-02-15")
+        assert snap["status"] == "VENCIDO"
+        snap = repo.aplicar_rateio_parcela(conn, pid, principal_delta=50.0, data_pagamento="2025-02-16")
+        assert snap["status"] == "PARCIAL"
+        snap = repo.aplicar_rateio_parcela(conn, pid, principal_delta=150.0, data_pagamento="2025-02-17")
+        assert snap["status"] == "QUITADO"
+
+
+def test_motor_sem_principal_volta_para_em_aberto(banco):
+    repo = ContasAPagarMovRepository(banco)
+    with get_conn(banco) as conn:
+        pid = _lancamento(conn, repo, 9200, 200.0, status="VENCIDO")
+        recalcular_status_cap(conn, parcela_ids=[pid])
+        status = conn.execute("SELECT status FROM contas_a_pagar_mov WHERE id = ?", (pid,)).fetchone()[0]
+    assert status == "EM ABERTO"
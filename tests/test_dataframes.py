@@ -0,0 +1,70 @@
+"""Leitor estendido `ler_tabela` (faixa de datas, chunks) e CSV em chunks."""
+
+from __future__ import annotations
+
+import io
+
+import pandas as pd
+import pytest
+
+from flowdash_pages.dataframes import exportar_csv, ler_tabela
+from services import exportacao
+from shared.db import get_conn
+
+
+def _vendas(banco: str, n: int) -> None:
+    with get_conn(banco) as conn:
+        conn.executemany(
+            "INSERT INTO entrada (Data, Valor, Forma_de_Pagamento, Usuario, valor_liquido) "
+            "VALUES (?, ?, 'PIX', 'ana', ?)",
+            [(f"2025-01-{1 + i % 28:02d}", float(i), float(i)) for i in range(n)],
+        )
+
+
+def test_chunks_nao_prendem_conexao_do_pool(banco):
+    _vendas(banco, 25)
+    gen = ler_tabela(banco, "entrada", ["Data", "Valor"], chunksize=10)
+    primeiro = next(gen)
+    assert len(primeiro) == 10
+
+    # gerador suspenso: a conexão do pool segue livre para escrever e confirmar
+    conn = get_conn(banco)
+    assert conn._depth == 0 and not conn.in_transaction
+    with get_conn(banco) as c:
+        c.execute(
+            "INSERT INTO entrada (Data, Valor, Forma_de_Pagamento, Usuario) VALUES ('2025-02-01', 1, 'PIX', 'ana')"
+        )
+    assert not conn.in_transaction
+
+    resto = list(gen)
+    assert sum(len(df) for df in resto) == 15
+    gen.close()
+
+
+def test_chunks_respeitam_faixa_e_tipos(banco):
+    _vendas(banco, 56)
+    chunks = list(
+        ler_tabela(
+            banco, "entrada", ["Data", "Valor", "Forma_de_Pagamento"],
+            coluna_data="Data", inicio="2025-01-01", fim="2025-01-07", chunksize=5,
+        )
+    )
+    df = pd.concat(chunks)
+    assert len(df) == 14
+    assert df["Data"].max() <= pd.Timestamp("2025-01-07")
+    assert str(chunks[0]["Forma_de_Pagamento"].dtype) == "category"
+
+
+def test_exportar_csv_em_chunks(banco, tmp_path):
+    _vendas(banco, 30)
+    buf = io.StringIO()
+    n = exportar_csv(banco, "entrada", ["Data", "Valor"], buf, chunksize=7, coluna_data="Data", fim="2025-01-10")
+    linhas = buf.getvalue().strip().splitlines()
+    assert n == len(linhas) - 1 == 12  # dias 1..10 + 2 linhas que voltam ao dia 1 e 2
+    assert linhas[0] == "Data,Valor"
+
+    arquivo = tmp_path / "saida.csv"
+    assert exportacao.exportar_csv_tabela(banco, "saida", arquivo) == 0
+    assert arquivo.read_text(encoding="utf-8").startswith("id,Data,Valor")
+    with pytest.raises(ValueError):
+        exportacao.exportar_csv_tabela(banco, "usuarios", arquivo)
@@ -0,0 +1,119 @@
+"""Pool de conexões (`shared.db`): blocos aninhados, row_factory e health-check."""
+
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from shared import db
+from shared.db import get_conn
+
+
+@pytest.fixture
+def arquivo(tmp_path):
+    caminho = str(tmp_path / "pool.db")
+    with get_conn(caminho) as conn:
+        conn.execute("CREATE TABLE t (v INTEGER)")
+    yield caminho
+    db.close_pooled_conns(caminho)
+
+
+def _valores(caminho):
+    with get_conn(caminho) as conn:
+        return [r[0] for r in conn.execute("SELECT v FROM t ORDER BY v")]
+
+
+def test_bloco_interno_com_erro_capturado_nao_e_confirmado(arquivo):
+    with get_conn(arquivo) as externo:
+        externo.execute("INSERT INTO t VALUES (1)")
+        try:
+            with get_conn(arquivo) as interno:
+                interno.execute("INSERT INTO t VALUES (2)")
+                raise RuntimeError("falha no bloco interno")
+        except RuntimeError:
+            pass
+        externo.execute("INSERT INTO t VALUES (3)")
+    assert _valores(arquivo) == [1, 3]
+
+
+def test_bloco_interno_ok_confirma_com_o_externo(arquivo):
+    with pytest.raises(RuntimeError):
+        with get_conn(arquivo) as externo:
+            externo.execute("INSERT INTO t VALUES (1)")
+            with get_conn(arquivo) as interno:
+                interno.execute("INSERT INTO t VALUES (2)")
+            raise RuntimeError("falha no externo")
+    assert _valores(arquivo) == []
+
+
+def test_bloco_interno_pode_abrir_a_transacao(arquivo):
+    with get_conn(arquivo) as externo:
+        with get_conn(arquivo) as interno:
+            if not interno.in_transaction:
+                interno.execute("BEGIN IMMEDIATE")
+            interno.execute("INSERT INTO t VALUES (7)")
+        assert externo.in_transaction
+    assert _valores(arquivo) == [7]
+
+
+def test_checkout_aninhado_preserva_row_factory(arquivo):
+    with get_conn(arquivo) as externo:
+        externo.row_factory = None
+        with get_conn(arquivo) as interno:
+            assert interno is externo
+            assert interno.row_factory is None
+        assert type(externo.execute("SELECT 1").fetchone()) is tuple
+    assert isinstance(get_conn(arquivo).execute("SELECT 1").fetchone(), sqlite3.Row)
+
+
+def test_health_check_limitado_por_intervalo(arquivo, monkeypatch):
+    chamadas = []
+    original = db._file_id
+    monkeypatch.setattr(db, "_file_id", lambda p: chamadas.append(p) or original(p))
+    conn = get_conn(arquivo)
+    conn._checado_em = 0.0
+    for _ in range(5):
+        get_conn(arquivo)
+    assert len(chamadas) == 1
+
+
+def test_erro_forca_health_check_no_proximo_checkout(arquivo, monkeypatch):
+    get_conn(arquivo)
+    with pytest.raises(sqlite3.OperationalError):
+        with get_conn(arquivo) as conn:
+            conn.execute("SELECT * FROM inexistente")
+    chamadas = []
+    original = db._file_id
+    monkeypatch.setattr(db, "_file_id", lambda p: chamadas.append(p) or original(p))
+    get_conn(arquivo)
+    assert len(chamadas) == 1
+
+
+def test_commit_no_bloco_interno_nao_confirma_o_externo(arquivo):
+    with pytest.raises(RuntimeError):
+        with get_conn(arquivo) as externo:
+            externo.execute("INSERT INTO t VALUES (1)")
+            with get_conn(arquivo) as interno:
+                interno.execute("INSERT INTO t VALUES (2)")
+                interno.commit()
+            raise RuntimeError("falha no externo")
+    assert _valores(arquivo) == []
+
+
+def test_rollback_no_bloco_interno_volta_so_ao_savepoint(arquivo):
+    with get_conn(arquivo) as externo:
+        externo.execute("INSERT INTO t VALUES (1)")
+        with get_conn(arquivo) as interno:
+            interno.execute("INSERT INTO t VALUES (2)")
+            interno.rollback()
+            interno.execute("INSERT INTO t VALUES (3)")
+    assert _valores(arquivo) == [1, 3]
+
+
+def test_pendencia_sem_with_nao_vaza_para_o_proximo_commit(arquivo):
+    solto = get_conn(arquivo)
+    solto.execute("INSERT INTO t VALUES (1)")  # sem with, sem commit, sem close
+    with get_conn(arquivo) as conn:
+        conn.execute("INSERT INTO t VALUES (2)")
+    assert _valores(arquivo) == [2]
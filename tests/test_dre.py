@@ -0,0 +1,94 @@
+"""DRE mensal: receita, despesa operacional e encargos do CAP por competência."""
+
+from __future__ import annotations
+
+import pytest
+
+from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
+from repository.dre_repository import (
+    DESPESA,
+    JUROS,
+    MULTAS,
+    PAGAMENTO_OBRIGACOES,
+    RECEITA_BRUTA,
+    atualizar_dre,
+    dre_periodo,
+    reconstruir_dre,
+)
+from shared.db import get_conn
+
+
+def _linhas(conn, comp: str) -> dict:
+    return {(r["linha"], r["categoria"]): r["valor"] for r in dre_periodo(conn, comp, comp)}
+
+
+def _parcela(conn, repo, obrigacao_id: int, valor: float) -> int:
+    return repo.registrar_lancamento(
+        conn,
+        obrigacao_id=obrigacao_id,
+        tipo_obrigacao="BOLETO",
+        valor_total=valor,
+        data_evento="2025-01-10",
+        vencimento="2025-02-10",
+        descricao="teste",
+        credor="Fornecedor",
+        competencia="2025-02",
+        parcela_num=1,
+        parcelas_total=1,
+        usuario="teste",
+    )
+
+
+def test_encargos_no_mes_de_cada_pagamento(banco):
+    repo = ContasAPagarMovRepository(banco)
+    with get_conn(banco) as conn:
+        atualizar_dre(conn)
+        pid = _parcela(conn, repo, 9300, 200.0)
+        repo.aplicar_pagamento_parcela(
+            conn, parcela_id=pid, valor_base=100.0, juros=5.0, data_evento="2025-02-15"
+        )
+        repo.aplicar_pagamento_parcela(
+            conn, parcela_id=pid, valor_base=100.0, juros=7.0, multa=2.0, data_evento="2025-03-10"
+        )
+    with get_conn(banco) as conn:
+        assert atualizar_dre(conn) == ["2025-02", "2025-03"]
+        fev, mar = _linhas(conn, "2025-02"), _linhas(conn, "2025-03")
+    assert fev[(JUROS, "")] == pytest.approx(5.0)
+    assert (MULTAS, "") not in fev
+    assert mar[(JUROS, "")] == pytest.approx(7.0)
+    assert mar[(MULTAS, "")] == pytest.approx(2.0)
+
+
+def test_despesa_e_pagamentos_separados(banco):
+    with get_conn(banco) as conn:
+        conn.execute(
+            "INSERT INTO entrada (Data, Valor, Forma_de_Pagamento, Usuario, valor_liquido) "
+            "VALUES ('2025-05-03', 300, 'DINHEIRO', 'ana', 300)"
+        )
+        for cat, valor in (("Aluguel", 80.0), ("Pagamentos", 120.0)):
+            conn.execute(
+                "INSERT INTO saida (Data, Categoria, Sub_Categoria, Valor, Usuario) "
+                "VALUES ('2025-05-04', ?, '-', ?, 'ana')",
+                (cat, valor),
+            )
+    with get_conn(banco) as conn:
+        assert "2025-05" in reconstruir_dre(conn)
+        linhas = _linhas(conn, "2025-05")
+        assert atualizar_dre(conn) == []
+    assert linhas[(RECEITA_BRUTA, "")] == pytest.approx(300.0)
+    assert linhas[(DESPESA, "Aluguel")] == pytest.approx(80.0)
+    assert linhas[(PAGAMENTO_OBRIGACOES, "Pagamentos")] == pytest.approx(120.0)
+
+
+def test_primeiro_pagamento_do_banco_gera_um_unico_evento(banco):
+    repo = ContasAPagarMovRepository(banco)
+    with get_conn(banco) as conn:
+        conn.execute("DROP TABLE IF EXISTS cap_encargos_eventos")
+    with get_conn(banco) as conn:
+        pid = _parcela(conn, repo, 9310, 100.0)
+        repo.aplicar_pagamento_parcela(conn, parcela_id=pid, valor_base=40.0, juros=3.0, data_evento="2025-02-15")
+    with get_conn(banco) as conn:
+        eventos = [tuple(r) for r in conn.execute("SELECT parcela_id, juros FROM cap_encargos_eventos")]
+        atualizar_dre(conn)
+        assert _linhas(conn, "2025-02")[(JUROS, "")] == pytest.approx(3.0)
+    assert eventos == [(pid, 3.0)]
@@ -0,0 +1,56 @@
+"""Exportação incremental para Parquet particionado e leitura dos snapshots."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from services.exportacao import exportar, ler_snapshot, status_snapshot  # noqa: E402
+from shared.db import get_conn  # noqa: E402
+
+
+def _vender(banco: str, *vendas) -> None:
+    with get_conn(banco) as conn:
+        conn.executemany(
+            "INSERT INTO entrada (Data, Valor, Forma_de_Pagamento, Usuario, valor_liquido) "
+            "VALUES (?, ?, 'PIX', 'ana', ?)",
+            [(data, valor, valor) for data, valor in vendas],
+        )
+
+
+def _valores(destino, **periodo) -> list:
+    df = ler_snapshot(destino, "entrada", ["Data", "Valor"], **periodo)
+    return sorted(zip(df["Data"], df["Valor"]))
+
+
+def test_exportacao_incremental_por_particao(banco, tmp_path):
+    destino = tmp_path / "snap"
+    _vender(banco, ("2025-01-05", 10.0), ("2025-01-20", 20.0), ("2025-02-03", 30.0))
+
+    (r,) = exportar(banco, destino, ["entrada"])
+    assert r["status"] == "completa" and r["linhas"] == 3
+    assert sorted(r["particoes"]) == ["2025-01", "2025-02"]
+
+    # inserção: só o mês novo recebe um arquivo
+    _vender(banco, ("2025-03-01", 40.0))
+    (r,) = exportar(banco, destino, ["entrada"])
+    assert (r["status"], r["linhas"], r["particoes"]) == ("incremental", 1, ["2025-03"])
+    assert status_snapshot(destino)["entrada"]["hwm"] == 4
+
+    # UPDATE: a partição alterada é regravada inteira, sem duplicar linhas
+    with get_conn(banco) as conn:
+        conn.execute("UPDATE entrada SET Valor = 25 WHERE Data = '2025-01-20'")
+    (r,) = exportar(banco, destino, ["entrada"])
+    assert r["status"] == "incremental" and r["particoes"] == ["2025-01"]
+
+    assert _valores(destino) == [
+        ("2025-01-05", 10.0), ("2025-01-20", 25.0), ("2025-02-03", 30.0), ("2025-03-01", 40.0),
+    ]
+    assert _valores(destino, inicio="2025-01-10", fim="2025-02-28") == [
+        ("2025-01-20", 25.0), ("2025-02-03", 30.0),
+    ]
+
+    # sem alterações: nada é regravado
+    (r,) = exportar(banco, destino, ["entrada"])
+    assert r["linhas"] == 0 and r["particoes"] == []
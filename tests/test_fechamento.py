@@ -0,0 +1,94 @@
+"""Conciliação diária de Caixa / Caixa 2 (fechamento)."""
+
+from __future__ import annotations
+
+import pytest
+
+from flowdash_pages.lancamentos.caixa2.actions_caixa2 import transferir_para_caixa2
+from flowdash_pages.lancamentos.deposito.actions_deposito import registrar_deposito
+from repository.fechamento_repository import fechamento_periodo, totais_por
+from services.vendas import VendasService
+from shared.db import get_conn
+
+
+def test_venda_em_dinheiro_nao_gera_divergencia(banco):
+    with get_conn(banco) as conn:
+        conn.execute("INSERT INTO saldos_caixas (data, caixa, caixa_2) VALUES ('2025-01-09', 100, 20)")
+        conn.execute("INSERT INTO saldos_caixas (data, caixa, caixa_2) VALUES ('2025-01-10', 100, 20)")
+    VendasService(banco).registrar_venda(
+        data="2025-01-10", data_liq="2025-01-10", valor=150.0, forma="DINHEIRO", usuario="ana"
+    )
+
+    with get_conn(banco) as conn:
+        dia9, dia10 = fechamento_periodo(conn, "2025-01-09", "2025-01-10")
+        bancos = {r["banco"]: r["entrada"] for r in totais_por(conn, "2025-01-10", "2025-01-10")}
+
+    assert dia10["abertura_caixa"] == pytest.approx(100.0)
+    assert dia10["entradas_caixa"] == pytest.approx(150.0)
+    assert dia10["vendas_dinheiro"] == pytest.approx(150.0)
+    assert dia10["registrado_caixa"] == pytest.approx(250.0)
+    assert dia10["diferenca_caixa"] == pytest.approx(0.0)
+    assert dia10["diferenca_caixa2"] == pytest.approx(0.0)
+    assert dia9["vendas_dinheiro"] == 0.0
+    assert bancos == {"Caixa_Vendas": pytest.approx(150.0)}
+
+
+def test_divergencia_sem_movimento(banco):
+    with get_conn(banco) as conn:
+        conn.execute("INSERT INTO saldos_caixas (data, caixa, caixa_2) VALUES ('2025-01-09', 100, 0)")
+        conn.execute("INSERT INTO saldos_caixas (data, caixa, caixa_2) VALUES ('2025-01-10', 90, 0)")
+        (r,) = fechamento_periodo(conn, "2025-01-10")
+    assert r["esperado_caixa"] == pytest.approx(100.0)
+    assert r["diferenca_caixa"] == pytest.approx(-10.0)
+
+
+def _snapshot(banco: str, data: str, caixa: float, caixa2: float) -> None:
+    with get_conn(banco) as conn:
+        conn.execute(
+            "INSERT INTO saldos_caixas (data, caixa, caixa_2, caixa2_total) VALUES (?, ?, ?, ?)",
+            (data, caixa, caixa2, caixa2),
+        )
+
+
+def test_transferencia_para_caixa2_sai_do_caixa(banco):
+    _snapshot(banco, "2025-01-09", 100.0, 20.0)
+    transferir_para_caixa2(banco, "2025-01-10", 30.0, "ana")
+
+    with get_conn(banco) as conn:
+        (r,) = fechamento_periodo(conn, "2025-01-10")
+    assert r["saidas_caixa"] == pytest.approx(30.0)
+    assert r["transferencias_caixa2"] == pytest.approx(30.0)
+    assert r["entradas_caixa2"] == pytest.approx(30.0)
+    assert (r["registrado_caixa"], r["registrado_caixa2"]) == (pytest.approx(70.0), pytest.approx(50.0))
+    assert r["diferenca_caixa"] == pytest.approx(0.0)
+    assert r["diferenca_caixa2"] == pytest.approx(0.0)
+
+
+def test_deposito_sai_do_caixa2(banco):
+    _snapshot(banco, "2025-01-09", 100.0, 80.0)
+    with get_conn(banco) as conn:
+        conn.execute("INSERT INTO bancos_cadastrados (nome) VALUES ('Inter')")
+    registrar_deposito(banco, "2025-01-10", 50.0, "Inter", "ana")
+
+    with get_conn(banco) as conn:
+        (r,) = fechamento_periodo(conn, "2025-01-10")
+    assert r["saidas_caixa2"] == pytest.approx(50.0)
+    assert r["depositos"] == pytest.approx(50.0)
+    assert r["entradas_caixa2"] == 0.0
+    assert r["registrado_caixa2"] == pytest.approx(30.0)
+    assert r["diferenca_caixa2"] == pytest.approx(0.0)
+    assert r["diferenca_caixa"] == pytest.approx(0.0)
+
+
+def test_primeiro_snapshot_fica_sem_abertura(banco):
+    _snapshot(banco, "2025-01-09", 100.0, 20.0)
+    _snapshot(banco, "2025-01-10", 100.0, 20.0)
+
+    with get_conn(banco) as conn:
+        dia9, dia10 = fechamento_periodo(conn, "2025-01-09", "2025-01-10")
+    assert dia9["sem_abertura"]
+    assert dia9["abertura_caixa"] is None and dia9["esperado_caixa"] is None
+    assert dia9["diferenca_caixa"] is None and dia9["diferenca_caixa2"] is None
+    assert dia9["registrado_caixa"] == pytest.approx(100.0)
+    assert not dia10["sem_abertura"]
+    assert dia10["diferenca_caixa"] == pytest.approx(0.0)
@@ -0,0 +1,77 @@
+"""Compra a crédito pelo `LedgerService` (caminho em lote do mixin de crédito)."""
+
+from __future__ import annotations
+
+import pytest
+
+from services.ledger.service_ledger import LedgerService
+from services.ledger.service_ledger_credito import _CreditoLedgerMixin
+from shared.db import get_conn
+
+
+@pytest.fixture
+def ledger(banco):
+    with get_conn(banco) as conn:
+        conn.execute(
+            "INSERT INTO cartoes_credito (nome, fechamento, vencimento) VALUES ('Visa Teste', 7, 10)"
+        )
+    return LedgerService(banco)
+
+
+def test_mro_usa_mixin_de_credito():
+    assert LedgerService.registrar_saida_credito.__qualname__.startswith("_CreditoLedgerMixin.")
+
+
+def test_compra_12x_pelo_ledger_usa_caminho_em_lote(ledger, monkeypatch):
+    chamadas = []
+    original = _CreditoLedgerMixin._add_valores_fatura
+
+    def espiao(self, conn, **kw):
+        chamadas.append(len(kw["cronograma"]))
+        return original(self, conn, **kw)
+
+    monkeypatch.setattr(_CreditoLedgerMixin, "_add_valores_fatura", espiao)
+
+    id_like, id_mov = ledger.registrar_lancamento(
+        tipo_evento="SAIDA",
+        valor_evento=1200.05,
+        forma="CRÉDITO",
+        categoria_evento="Marketing",
+        descricao="compra 12x",
+        usuario="teste",
+        data_evento="2025-01-20",
+        parcelas=12,
+        cartao_nome="Visa Teste",
+    )
+    assert chamadas == [12]
+    assert id_like > 0 and id_mov > 0
+
+    with get_conn(ledger.db_path) as conn:
+        lancs = conn.execute(
+            """
+            SELECT id, competencia, valor_evento, status FROM contas_a_pagar_mov
+             WHERE tipo_obrigacao='FATURA_CARTAO' AND categoria_evento='LANCAMENTO'
+             ORDER BY competencia
+            """
+        ).fetchall()
+        itens = conn.execute(
+            "SELECT parcela_num, competencia, valor_parcela, lancamento_id FROM fatura_cartao_itens ORDER BY parcela_num"
+        ).fetchall()
+
+    # fatura fecha 7 dias antes do vencimento (dia 10): compra de 20/01 cai na fatura 2025-02
+    assert [r["competencia"] for r in lancs] == [f"2025-{m:02d}" for m in range(2, 13)] + ["2026-01"]
+    assert sum(r["valor_evento"] for r in lancs) == pytest.approx(1200.05)
+    assert {r["status"] for r in lancs} == {"EM ABERTO"}
+    assert len(itens) == 12
+    por_comp = {r["competencia"]: r["id"] for r in lancs}
+    assert all(it["lancamento_id"] == por_comp[it["competencia"]] for it in itens)
+
+
+def test_compra_repetida_e_idempotente(ledger):
+    kw = dict(
+        data_compra="2025-01-20", valor=300.0, parcelas=3, cartao_nome="Visa Teste",
+        categoria="Marketing", sub_categoria=None, descricao="x", usuario="teste",
+    )
+    ids, _mov = ledger.registrar_saida_credito(**kw)
+    assert len(ids) == 3
+    assert ledger.registrar_saida_credito(**kw) == ([], -1)
@@ -0,0 +1,103 @@
+"""Pagamento em lote do CAP: tudo ou nada (padrão), aplicação parcial e rollback."""
+
+from __future__ import annotations
+
+import pytest
+
+from repository.contas_a_pagar_mov_repository import ContasAPagarMovRepository
+from services.ledger import service_ledger_lote
+from services.ledger.service_ledger import LedgerService
+from shared.db import get_conn
+
+_CONTAGENS = {
+    "saida": "SELECT COUNT(*) FROM saida",
+    "mov": "SELECT COUNT(*) FROM movimentacoes_bancarias",
+    "principal": "SELECT COALESCE(SUM(principal_pago_acumulado), 0) FROM contas_a_pagar_mov",
+    "caixa": "SELECT COALESCE(SUM(caixa), 0) FROM saldos_caixas",
+}
+
+
+def _estado(banco: str) -> dict:
+    with get_conn(banco) as conn:
+        return {k: conn.execute(sql).fetchone()[0] for k, sql in _CONTAGENS.items()}
+
+
+@pytest.fixture
+def boletos(banco):
+    repo = ContasAPagarMovRepository(banco)
+    with get_conn(banco) as conn:
+        for ob in (9400, 9401):
+            repo.registrar_lancamento(
+                conn,
+                obrigacao_id=ob,
+                tipo_obrigacao="BOLETO",
+                valor_total=200.0,
+                data_evento="2025-01-10",
+                vencimento="2025-02-10",
+                descricao="boleto",
+                credor="Fornecedor",
+                competencia="2025-02",
+                parcela_num=1,
+                parcelas_total=1,
+                usuario="teste",
+            )
+    return banco
+
+
+def _itens(*obrigacoes):
+    return [
+        {"obrigacao_id": ob, "principal": 50.0, "juros": 2.0, "banco": "Caixa", "data": "2025-02-10"}
+        for ob in obrigacoes
+    ]
+
+
+def test_item_rejeitado_cancela_o_lote_por_padrao(boletos):
+    antes = _estado(boletos)
+    res = LedgerService(boletos).pagar_em_lote(_itens(9400, 123456))
+    assert not res["ok"]
+    assert res["aplicados"] == 0 and res["rejeitados"] == 2
+    assert "tudo_ou_nada" in res["itens"][0]["mensagem"]
+    assert _estado(boletos) == antes
+
+
+def test_aplicacao_parcial_e_opt_in(boletos):
+    res = LedgerService(boletos).pagar_em_lote(_itens(9400, 123456), tudo_ou_nada=False)
+    assert res["aplicados"] == 1 and res["rejeitados"] == 1
+    assert res["saida_total"] == pytest.approx(52.0)
+    with get_conn(boletos) as conn:
+        row = conn.execute(
+            "SELECT principal_pago_acumulado, status FROM contas_a_pagar_mov WHERE obrigacao_id = 9400"
+        ).fetchone()
+    assert tuple(row) == (50.0, "PARCIAL")
+
+
+def test_falha_na_gravacao_desfaz_o_lote(boletos, monkeypatch):
+    antes = _estado(boletos)
+    original = service_ledger_lote.log_mov_bancaria
+    chamadas = []
+
+    def falha_no_segundo(conn, **kw):
+        chamadas.append(kw["trans_uid"])
+        if len(chamadas) == 2:
+            raise RuntimeError("falha simulada")
+        return original(conn, **kw)
+
+    monkeypatch.setattr(service_ledger_lote, "log_mov_bancaria", falha_no_segundo)
+    with pytest.raises(RuntimeError):
+        LedgerService(boletos).pagar_em_lote(_itens(9400, 9401))
+    assert len(chamadas) == 2
+    assert _estado(boletos) == antes
+
+
+def test_encargos_de_cada_item_no_lote(boletos):
+    itens = _itens(9400) + [
+        {"obrigacao_id": 9400, "principal": 30.0, "juros": 1.5, "banco": "Caixa", "data": "2025-03-05"}
+    ]
+    assert LedgerService(boletos).pagar_em_lote(itens)["ok"]
+    with get_conn(boletos) as conn:
+        eventos = [
+            tuple(r) for r in conn.execute(
+                "SELECT data_evento, juros FROM cap_encargos_eventos ORDER BY data_evento"
+            )
+        ]
+    assert eventos == [("2025-02-10", 2.0), ("2025-03-05", 1.5)]
@@ -0,0 +1,69 @@
+"""Progresso das metas de venda (dia, semana e mês) e reuso do cache por mês."""
+
+from __future__ import annotations
+
+import pytest
+
+from repository.metas_repository import LOJA, OURO, PRATA, progresso_mes, resumo_metas
+from shared.db import get_conn
+
+
+def _vender(banco: str, *vendas) -> None:
+    with get_conn(banco) as conn:
+        conn.executemany(
+            "INSERT INTO entrada (Data, Valor, Forma_de_Pagamento, Usuario, valor_liquido) "
+            "VALUES (?, ?, 'PIX', ?, ?)",
+            [(data, valor, usuario, valor) for data, valor, usuario in vendas],
+        )
+
+
+@pytest.fixture
+def metas(banco):
+    with get_conn(banco) as conn:
+        uid = conn.execute("INSERT INTO usuarios (nome, perfil) VALUES ('Ana', 'funcionario')").lastrowid
+        for id_usuario, meta in ((uid, 1000.0), (None, 5000.0)):  # NULL = LOJA
+            conn.execute(
+                "INSERT INTO metas (id_usuario, mes, meta_mensal, perc_semanal, perc_segunda, perc_terca, "
+                "perc_quarta, perc_quinta, perc_sexta, perc_sabado, perc_domingo, perc_bronze, perc_prata) "
+                "VALUES (?, '2025-01', ?, 25, 20, 20, 20, 20, 10, 10, 0, 30, 50)",
+                (id_usuario, meta),
+            )
+    return banco
+
+
+def test_acumulados_por_semana_e_mes(metas):
+    # 2024-12-31 (terça) pertence à 1ª semana de janeiro, mas não ao mês
+    _vender(metas, ("2024-12-31", 50.0, "ana"), ("2025-01-06", 300.0, "ana"),
+            ("2025-01-07", 200.0, "ana"), ("2025-01-13", 100.0, "Ana"))
+    linhas = progresso_mes(metas, "2025-01")
+    por_dia = {(r["vendedor"], r["data"]): r for r in linhas}
+
+    assert len(linhas) == 2 * 31 and linhas[0]["vendedor"] == LOJA
+    assert por_dia[("ANA", "2025-01-01")]["acum_semana"] == pytest.approx(50.0)
+    assert por_dia[("ANA", "2025-01-01")]["acum_mes"] == 0.0
+    assert por_dia[("ANA", "2025-01-07")]["acum_semana"] == pytest.approx(500.0)
+    assert por_dia[("ANA", "2025-01-13")]["acum_semana"] == pytest.approx(100.0)
+    assert por_dia[("ANA", "2025-01-13")]["acum_mes"] == pytest.approx(600.0)
+    # meta_semanal = 1000 × 25% ; meta da segunda = 250 × 20%
+    assert por_dia[("ANA", "2025-01-13")]["meta_semanal"] == pytest.approx(250.0)
+    assert por_dia[("ANA", "2025-01-13")]["meta_dia"] == pytest.approx(50.0)
+    assert por_dia[(LOJA, "2025-01-13")]["acum_mes"] == pytest.approx(600.0)
+
+    (ana,) = [r for r in resumo_metas(linhas, "2025-01-13") if r["vendedor"] == "ANA"]
+    assert ana["nivel"] == PRATA
+    assert ana["falta_proximo"] == pytest.approx(400.0)
+    assert ana["perc_mes"] == pytest.approx(60.0)
+
+
+def test_venda_nova_invalida_o_progresso_do_mes(metas):
+    _vender(metas, ("2025-01-13", 600.0, "ana"))
+    assert progresso_mes(metas, "2025-01") == progresso_mes(metas, "2025-01")
+
+    _vender(metas, ("2025-01-14", 500.0, "ana"))
+    resumo = {r["vendedor"]: r for r in resumo_metas(progresso_mes(metas, "2025-01"), "2025-01-14")}
+    assert resumo["ANA"]["vendido_mes"] == pytest.approx(1100.0)
+    assert resumo["ANA"]["nivel"] == OURO and resumo["ANA"]["falta_proximo"] == 0.0
+    assert resumo[LOJA]["vendido_mes"] == pytest.approx(1100.0)
+
+    with pytest.raises(ValueError):
+        progresso_mes(metas, "janeiro")
@@ -0,0 +1,61 @@
+"""Nomes de banco em `saldos_bancos` (engines wide/long) e vendas acentuadas."""
+
+from __future__ import annotations
+
+import pytest
+
+from flowdash_pages.lancamentos.pagina.actions_pagina import carregar_resumo_dia
+from repository.saldos_bancos_repository import (
+    SaldosBancosRepository,
+    citar_identificador,
+    validar_nome_banco,
+)
+from services.vendas import VendasService
+from shared.db import get_conn
+
+
+@pytest.mark.parametrize("nome", ["Itaú", "Banco do Brasil", "C6 Bank", "Bradesco S.A.", "Nu-Pagamentos"])
+def test_nomes_aceitos(nome):
+    assert validar_nome_banco(f"  {nome} ") == nome
+
+
+@pytest.mark.parametrize("nome", ["", "   ", 'Ban"co', "Ban'co", "Ban`co", "x]", "a\nb", "a\x00", "x" * 65, "---"])
+def test_nomes_recusados(nome):
+    with pytest.raises(ValueError):
+        validar_nome_banco(nome)
+
+
+def test_citar_identificador_duplica_aspas():
+    assert citar_identificador('a"b') == '"a""b"'
+
+
+@pytest.mark.parametrize("engine", ["wide", "long"])
+def test_venda_pix_em_banco_acentuado(banco, engine):
+    repo = SaldosBancosRepository(banco)
+    if engine == "long":
+        repo.migrar_para_long()
+    VendasService(banco).registrar_venda(
+        data_venda="2025-01-10",
+        data_liq="2025-01-10",
+        valor_bruto=100.0,
+        forma="PIX",
+        parcelas=1,
+        banco_destino="Itaú",
+        taxa_percentual=0.0,
+        usuario="teste",
+    )
+    assert repo.engine() == engine
+    assert repo.saldo_em("Itaú", "2025-01-10") == pytest.approx(100.0)
+    with get_conn(banco) as conn:
+        total = conn.execute('SELECT SUM("Itaú") FROM saldos_bancos').fetchone()[0]
+    assert total == pytest.approx(100.0)
+
+
+def test_banco_cadastrado_sem_movimento_aparece_com_saldo_zero(banco):
+    with get_conn(banco) as conn:
+        conn.executemany("INSERT INTO bancos_cadastrados (nome) VALUES (?)", [("Inter",), ("Itaú",)])
+    SaldosBancosRepository(banco).ajustar("2025-01-10", "Itaú", 100.0)
+
+    resumo = carregar_resumo_dia(banco, "2025-01-10")
+    assert resumo["saldos_bancos"] == {"Inter": 0.0, "Itaú": 100.0}
+    assert SaldosBancosRepository(banco).saldos_em("2025-01-09") == {"Inter": 0.0, "Itaú": 0.0}
@@ -131,7 +131,7 @@ def garantir_trigger_totais_saldos_caixas(caminho_banco: str) -> None:
     - Se a tabela já existir com layout diferente, adiciona as colunas faltantes
       com DEFAULT 0 (idempotente).
     """
-    import sqlite3
+    from shared.db import get_conn  # import local: shared.db depende deste módulo
 
     colunas_necessarias = {
         "data": "TEXT",
@@ -143,9 +143,7 @@ def garantir_trigger_totais_saldos_caixas(caminho_banco: str) -> None:
         "caixa2_total": "REAL",
     }
 
-    with sqlite3.connect(caminho_banco, timeout=30) as conn:
-        conn.execute("PRAGMA foreign_keys = ON;")
-
+    with get_conn(caminho_banco) as conn:
         # Cria tabela se não existir (com 'data' como chave natural)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS saldos_caixas (